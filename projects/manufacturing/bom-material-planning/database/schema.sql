@@ -3,7 +3,9 @@
 -- PostgreSQL schema
 -- ============================================================================
 --
--- This schema supports deterministic, single-level BOM material planning.
+-- This schema supports deterministic, multi-level BOM material planning.
+-- A BOM line references either a purchased material or a subassembly product
+-- with its own BOM.
 -- Run it inside a dedicated PostgreSQL database for this project.
 --
 -- The tables are created in dependency order:
@@ -121,7 +123,8 @@ CREATE TABLE bom_components (
     bom_component_id         BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
     bom_id                   BIGINT NOT NULL,
     line_number              INTEGER NOT NULL,
-    material_id              BIGINT NOT NULL,
+    material_id              BIGINT,
+    component_product_id     BIGINT,
     quantity_per_unit        NUMERIC(16, 6) NOT NULL,
     expected_loss_pct        NUMERIC(6, 3) NOT NULL DEFAULT 0,
     created_at               TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
@@ -133,10 +136,17 @@ CREATE TABLE bom_components (
     CONSTRAINT fk_bom_components_material
         FOREIGN KEY (material_id)
         REFERENCES materials (material_id),
+    CONSTRAINT fk_bom_components_component_product
+        FOREIGN KEY (component_product_id)
+        REFERENCES products (product_id),
     CONSTRAINT uq_bom_components_line
         UNIQUE (bom_id, line_number),
     CONSTRAINT uq_bom_components_material
         UNIQUE (bom_id, material_id),
+    CONSTRAINT uq_bom_components_component_product
+        UNIQUE (bom_id, component_product_id),
+    CONSTRAINT ck_bom_components_single_component
+        CHECK ((material_id IS NULL) <> (component_product_id IS NULL)),
     CONSTRAINT ck_bom_components_line_number
         CHECK (line_number > 0),
     CONSTRAINT ck_bom_components_quantity_per_unit
@@ -161,6 +171,8 @@ CREATE TABLE supplier_materials (
     order_multiple           NUMERIC(16, 3) NOT NULL,
     preferred_flag           BOOLEAN NOT NULL DEFAULT FALSE,
     source_status            VARCHAR(20) NOT NULL,
+    quota_pct                NUMERIC(5, 2),
+    capacity_quantity        NUMERIC(16, 3),
     created_at               TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
 
     CONSTRAINT fk_supplier_materials_supplier
@@ -182,7 +194,11 @@ CREATE TABLE supplier_materials (
     CONSTRAINT ck_supplier_materials_order_multiple
         CHECK (order_multiple > 0),
     CONSTRAINT ck_supplier_materials_status
-        CHECK (source_status IN ('Approved', 'Conditional', 'Inactive'))
+        CHECK (source_status IN ('Approved', 'Conditional', 'Inactive')),
+    CONSTRAINT ck_supplier_materials_quota
+        CHECK (quota_pct IS NULL OR (quota_pct > 0 AND quota_pct <= 100)),
+    CONSTRAINT ck_supplier_materials_capacity
+        CHECK (capacity_quantity IS NULL OR capacity_quantity >= 0)
 );
 
 -- At most one preferred active sourcing option may exist for each material.
@@ -191,6 +207,26 @@ CREATE UNIQUE INDEX uq_supplier_materials_preferred_material
     ON supplier_materials (material_id)
     WHERE preferred_flag = TRUE AND source_status = 'Approved';
 
+-- Optional weekly receiving capacity of one supplier for one material
+-- category. Categories without a row are not capacity-limited.
+CREATE TABLE supplier_weekly_capacity (
+    supplier_capacity_id     BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    supplier_id              BIGINT NOT NULL,
+    material_category        VARCHAR(60) NOT NULL,
+    weekly_capacity_quantity NUMERIC(16, 3) NOT NULL,
+    created_at               TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT fk_supplier_weekly_capacity_supplier
+        FOREIGN KEY (supplier_id)
+        REFERENCES suppliers (supplier_id),
+    CONSTRAINT uq_supplier_weekly_capacity_category
+        UNIQUE (supplier_id, material_category),
+    CONSTRAINT ck_supplier_weekly_capacity_category_not_blank
+        CHECK (BTRIM(material_category) <> ''),
+    CONSTRAINT ck_supplier_weekly_capacity_quantity
+        CHECK (weekly_capacity_quantity > 0)
+);
+
 
 -- ============================================================================
 -- PLANNING AND TRANSACTIONAL DATA
@@ -317,6 +353,547 @@ CREATE TABLE purchase_orders (
 );
 
 
+-- ============================================================================
+-- INCREMENTAL PLANNING
+-- ============================================================================
+
+-- Queue of source changes not yet applied to the persisted netted plan.
+-- Triggers record the affected material or product; incremental planning
+-- re-nets only those materials and deletes the rows it consumed.
+CREATE TABLE planning_change_log (
+    change_id                BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    source_table             VARCHAR(40) NOT NULL,
+    material_id              BIGINT,
+    product_id               BIGINT,
+    changed_at               TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+
+-- Log each distinct affected material or product once per statement, so a
+-- COPY or merge of many rows adds one change row per key instead of one or
+-- two per row. Trigger arguments name the table's material and product
+-- columns, or NULL when it has none. Transition tables are only visible
+-- inside the trigger function, so the insert runs through EXECUTE here.
+CREATE FUNCTION log_planning_change()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    changed_rows TEXT := CASE TG_OP
+        WHEN 'INSERT' THEN 'SELECT * FROM new_rows'
+        WHEN 'DELETE' THEN 'SELECT * FROM old_rows'
+        ELSE 'SELECT * FROM old_rows UNION ALL SELECT * FROM new_rows'
+    END;
+BEGIN
+    EXECUTE format(
+        'INSERT INTO planning_change_log (source_table, material_id, product_id) '
+        'SELECT DISTINCT %L, %s::BIGINT, %s::BIGINT FROM (%s) AS changed',
+        TG_TABLE_NAME,
+        TG_ARGV[0],
+        TG_ARGV[1],
+        changed_rows
+    );
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE TRIGGER trg_production_demand_planning_change_insert
+    AFTER INSERT ON production_demand
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'NULL', 'product_id'
+    );
+
+CREATE TRIGGER trg_production_demand_planning_change_update
+    AFTER UPDATE ON production_demand
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'NULL', 'product_id'
+    );
+
+CREATE TRIGGER trg_production_demand_planning_change_delete
+    AFTER DELETE ON production_demand
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'NULL', 'product_id'
+    );
+
+CREATE TRIGGER trg_inventory_balances_planning_change_insert
+    AFTER INSERT ON inventory_balances
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+CREATE TRIGGER trg_inventory_balances_planning_change_update
+    AFTER UPDATE ON inventory_balances
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+CREATE TRIGGER trg_inventory_balances_planning_change_delete
+    AFTER DELETE ON inventory_balances
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+CREATE TRIGGER trg_purchase_orders_planning_change_insert
+    AFTER INSERT ON purchase_orders
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+CREATE TRIGGER trg_purchase_orders_planning_change_update
+    AFTER UPDATE ON purchase_orders
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+CREATE TRIGGER trg_purchase_orders_planning_change_delete
+    AFTER DELETE ON purchase_orders
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+CREATE TRIGGER trg_supplier_materials_planning_change_insert
+    AFTER INSERT ON supplier_materials
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+CREATE TRIGGER trg_supplier_materials_planning_change_update
+    AFTER UPDATE ON supplier_materials
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+CREATE TRIGGER trg_supplier_materials_planning_change_delete
+    AFTER DELETE ON supplier_materials
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+-- BOM structure changes force a full re-plan.
+CREATE TRIGGER trg_bills_of_materials_planning_change_insert
+    AFTER INSERT ON bills_of_materials
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'NULL', 'product_id'
+    );
+
+CREATE TRIGGER trg_bills_of_materials_planning_change_update
+    AFTER UPDATE ON bills_of_materials
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'NULL', 'product_id'
+    );
+
+CREATE TRIGGER trg_bills_of_materials_planning_change_delete
+    AFTER DELETE ON bills_of_materials
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'NULL', 'product_id'
+    );
+
+CREATE TRIGGER trg_bom_components_planning_change_insert
+    AFTER INSERT ON bom_components
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+CREATE TRIGGER trg_bom_components_planning_change_update
+    AFTER UPDATE ON bom_components
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+CREATE TRIGGER trg_bom_components_planning_change_delete
+    AFTER DELETE ON bom_components
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+
+CREATE TABLE planning_runs (
+    planning_run_id          BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    run_mode                 VARCHAR(20) NOT NULL,
+    changes_applied          INTEGER NOT NULL,
+    materials_replanned      INTEGER NOT NULL,
+    completed_at             TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT ck_planning_runs_mode
+        CHECK (run_mode IN ('Full', 'Incremental')),
+    CONSTRAINT ck_planning_runs_counts
+        CHECK (changes_applied >= 0 AND materials_replanned >= 0)
+);
+
+
+-- Last netted plan, one row per material and need date.
+CREATE TABLE netted_material_plan (
+    material_id                          BIGINT NOT NULL,
+    need_date                            DATE NOT NULL,
+    material_code                        VARCHAR(30) NOT NULL,
+    material_name                        VARCHAR(120) NOT NULL,
+    base_unit_of_measure                 VARCHAR(10) NOT NULL,
+    gross_requirement                    NUMERIC(16, 3) NOT NULL,
+    receipts_available_by_date           NUMERIC(16, 3) NOT NULL,
+    projected_supply_before_requirement  NUMERIC(16, 3) NOT NULL,
+    supply_applied                       NUMERIC(16, 3) NOT NULL,
+    net_requirement                      NUMERIC(16, 3) NOT NULL,
+    projected_supply_after_requirement   NUMERIC(16, 3) NOT NULL,
+    planning_run_id                      BIGINT NOT NULL,
+
+    CONSTRAINT pk_netted_material_plan
+        PRIMARY KEY (material_id, need_date),
+    CONSTRAINT fk_netted_material_plan_material
+        FOREIGN KEY (material_id)
+        REFERENCES materials (material_id),
+    CONSTRAINT fk_netted_material_plan_run
+        FOREIGN KEY (planning_run_id)
+        REFERENCES planning_runs (planning_run_id)
+);
+
+
+-- ============================================================================
+-- GROSS REQUIREMENT ROLLUP
+-- ============================================================================
+
+-- Unrounded single-level gross requirements by material and need date. Only
+-- BOM lines naming a material are priced; subassembly lines are not exploded,
+-- so readers use the rollup only while no active BOM has one.
+-- Statement triggers add the delta of every production_demand and
+-- bom_components change, so the rollup equals the single-level explosion.
+-- Changes the triggers cannot price, such as BOM status, effectivity, or
+-- active flags, mark the rollup stale until it is rebuilt.
+CREATE TABLE material_requirement_rollup (
+    material_id              BIGINT NOT NULL,
+    need_date                DATE NOT NULL,
+    gross_requirement        NUMERIC NOT NULL,
+
+    CONSTRAINT pk_material_requirement_rollup
+        PRIMARY KEY (material_id, need_date),
+    CONSTRAINT fk_material_requirement_rollup_material
+        FOREIGN KEY (material_id)
+        REFERENCES materials (material_id)
+);
+
+
+-- Single row; the rollup starts fresh because every table starts empty.
+CREATE TABLE material_requirement_rollup_state (
+    rollup_state_id          BOOLEAN PRIMARY KEY DEFAULT TRUE,
+    is_stale                 BOOLEAN NOT NULL DEFAULT FALSE,
+    refreshed_at             TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT ck_material_requirement_rollup_state_single_row
+        CHECK (rollup_state_id)
+);
+
+INSERT INTO material_requirement_rollup_state DEFAULT VALUES;
+
+
+-- Return the upsert that applies signed demand x component deltas. Both
+-- sources supply a change_sign of 1 or -1; the quantity expression matches
+-- the planning explosion exactly, so added and removed rows cancel exactly.
+-- The statement returns the keys it brought to zero as two arrays.
+CREATE FUNCTION requirement_rollup_delta_sql(
+    demand_source TEXT,
+    component_source TEXT
+)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT format(
+        $sql$
+        WITH changed AS (
+            INSERT INTO material_requirement_rollup AS rollup (
+                material_id,
+                need_date,
+                gross_requirement
+            )
+            SELECT
+                component.material_id,
+                demand.required_date,
+                SUM(
+                    demand.change_sign
+                    * component.change_sign
+                    * demand.demand_quantity
+                    * component.quantity_per_unit
+                    / (1 - component.expected_loss_pct / 100)
+                )
+            FROM (%s) AS demand
+            JOIN products AS product
+                ON product.product_id = demand.product_id
+                AND product.active_flag = TRUE
+            JOIN bills_of_materials AS bom
+                ON bom.product_id = demand.product_id
+                AND bom.bom_status = 'Active'
+                AND demand.required_date >= bom.effective_start_date
+                AND (
+                    bom.effective_end_date IS NULL
+                    OR demand.required_date <= bom.effective_end_date
+                )
+            JOIN (%s) AS component
+                ON component.bom_id = bom.bom_id
+            JOIN materials AS material
+                ON material.material_id = component.material_id
+                AND material.active_flag = TRUE
+            WHERE demand.demand_status IN ('Planned', 'Released')
+            GROUP BY component.material_id, demand.required_date
+            ON CONFLICT (material_id, need_date) DO UPDATE
+                SET gross_requirement =
+                    rollup.gross_requirement + EXCLUDED.gross_requirement
+            RETURNING
+                rollup.material_id,
+                rollup.need_date,
+                rollup.gross_requirement
+        )
+        SELECT array_agg(material_id), array_agg(need_date)
+        FROM changed
+        WHERE gross_requirement = 0
+        $sql$,
+        demand_source,
+        component_source
+    );
+$$;
+
+
+-- Serialize rollup writers on the state row until commit. A delta is priced
+-- against the other table's committed rows, so two concurrent transactions
+-- changing demand and components for the same BOM would each miss the other's
+-- new rows. Under READ COMMITTED the statement after the lock sees whatever
+-- the previous writer committed, so the later writer prices the new x new
+-- product. Stricter isolation keeps the old snapshot, so the rollup is marked
+-- stale instead, and the function returns whether the delta may be applied.
+CREATE FUNCTION lock_requirement_rollup()
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM 1 FROM material_requirement_rollup_state FOR UPDATE;
+    IF current_setting('transaction_isolation') = 'read committed' THEN
+        RETURN TRUE;
+    END IF;
+    UPDATE material_requirement_rollup_state
+    SET is_stale = TRUE
+    WHERE NOT is_stale;
+    RETURN FALSE;
+END;
+$$;
+
+
+-- Remove only the keys a delta brought to zero, by primary key.
+CREATE FUNCTION delete_zero_rollup_rows(
+    material_ids BIGINT[],
+    need_dates DATE[]
+)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    DELETE FROM material_requirement_rollup AS rollup
+    USING unnest(material_ids, need_dates) AS zero (material_id, need_date)
+    WHERE rollup.material_id = zero.material_id
+      AND rollup.need_date = zero.need_date
+      AND rollup.gross_requirement = 0;
+$$;
+
+
+-- Transition tables are only visible inside the trigger function itself,
+-- so each trigger function executes the shared delta statement directly.
+CREATE FUNCTION maintain_rollup_from_demand()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    old_demand TEXT := 'SELECT product_id, required_date, demand_quantity, '
+        'demand_status, -1 AS change_sign FROM old_rows';
+    new_demand TEXT := 'SELECT product_id, required_date, demand_quantity, '
+        'demand_status, 1 AS change_sign FROM new_rows';
+    zero_material_ids BIGINT[];
+    zero_need_dates DATE[];
+BEGIN
+    IF NOT lock_requirement_rollup() THEN
+        RETURN NULL;
+    END IF;
+    EXECUTE requirement_rollup_delta_sql(
+        CASE TG_OP
+            WHEN 'INSERT' THEN new_demand
+            WHEN 'DELETE' THEN old_demand
+            ELSE old_demand || ' UNION ALL ' || new_demand
+        END,
+        'SELECT bom_id, material_id, quantity_per_unit, expected_loss_pct, '
+        '1 AS change_sign FROM bom_components'
+    ) INTO zero_material_ids, zero_need_dates;
+    PERFORM delete_zero_rollup_rows(zero_material_ids, zero_need_dates);
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE FUNCTION maintain_rollup_from_components()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    old_components TEXT := 'SELECT bom_id, material_id, quantity_per_unit, '
+        'expected_loss_pct, -1 AS change_sign FROM old_rows';
+    new_components TEXT := 'SELECT bom_id, material_id, quantity_per_unit, '
+        'expected_loss_pct, 1 AS change_sign FROM new_rows';
+    zero_material_ids BIGINT[];
+    zero_need_dates DATE[];
+BEGIN
+    IF NOT lock_requirement_rollup() THEN
+        RETURN NULL;
+    END IF;
+    EXECUTE requirement_rollup_delta_sql(
+        'SELECT product_id, required_date, demand_quantity, demand_status, '
+        '1 AS change_sign FROM production_demand',
+        CASE TG_OP
+            WHEN 'INSERT' THEN new_components
+            WHEN 'DELETE' THEN old_components
+            ELSE old_components || ' UNION ALL ' || new_components
+        END
+    ) INTO zero_material_ids, zero_need_dates;
+    PERFORM delete_zero_rollup_rows(zero_material_ids, zero_need_dates);
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE FUNCTION mark_requirement_rollup_stale()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE material_requirement_rollup_state
+    SET is_stale = TRUE
+    WHERE NOT is_stale;
+    RETURN NULL;
+END;
+$$;
+
+
+CREATE TRIGGER trg_production_demand_rollup_insert
+    AFTER INSERT ON production_demand
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_rollup_from_demand();
+
+CREATE TRIGGER trg_production_demand_rollup_update
+    AFTER UPDATE ON production_demand
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_rollup_from_demand();
+
+CREATE TRIGGER trg_production_demand_rollup_delete
+    AFTER DELETE ON production_demand
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_rollup_from_demand();
+
+CREATE TRIGGER trg_bom_components_rollup_insert
+    AFTER INSERT ON bom_components
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_rollup_from_components();
+
+CREATE TRIGGER trg_bom_components_rollup_update
+    AFTER UPDATE ON bom_components
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_rollup_from_components();
+
+CREATE TRIGGER trg_bom_components_rollup_delete
+    AFTER DELETE ON bom_components
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_rollup_from_components();
+
+CREATE TRIGGER trg_products_rollup_stale
+    AFTER UPDATE OR DELETE OR TRUNCATE ON products
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_requirement_rollup_stale();
+
+CREATE TRIGGER trg_materials_rollup_stale
+    AFTER UPDATE OR DELETE OR TRUNCATE ON materials
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_requirement_rollup_stale();
+
+CREATE TRIGGER trg_bills_of_materials_rollup_stale
+    AFTER UPDATE OR DELETE OR TRUNCATE ON bills_of_materials
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_requirement_rollup_stale();
+
+CREATE TRIGGER trg_production_demand_rollup_truncate
+    AFTER TRUNCATE ON production_demand
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_requirement_rollup_stale();
+
+CREATE TRIGGER trg_bom_components_rollup_truncate
+    AFTER TRUNCATE ON bom_components
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_requirement_rollup_stale();
+
+
+-- ============================================================================
+-- STOCK POLICIES
+-- ============================================================================
+
+-- Statistical safety stock and reorder points from recent demand history,
+-- replaced nightly by src.planning.safety_stock. A material's policy safety
+-- stock replaces the sum of its per-location static safety stock in netting.
+CREATE TABLE material_stock_policies (
+    material_id              BIGINT PRIMARY KEY,
+    average_daily_demand     NUMERIC(16, 3) NOT NULL,
+    daily_demand_std         NUMERIC(16, 3) NOT NULL,
+    lead_time_days           INTEGER NOT NULL,
+    service_level            NUMERIC(5, 4) NOT NULL,
+    safety_stock_quantity    NUMERIC(16, 3) NOT NULL,
+    reorder_point_quantity   NUMERIC(16, 3) NOT NULL,
+    history_start_date       DATE NOT NULL,
+    history_end_date         DATE NOT NULL,
+    calculated_at            TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT fk_material_stock_policies_material
+        FOREIGN KEY (material_id)
+        REFERENCES materials (material_id),
+    CONSTRAINT ck_material_stock_policies_service_level
+        CHECK (service_level >= 0.5 AND service_level < 1),
+    CONSTRAINT ck_material_stock_policies_quantities
+        CHECK (
+            average_daily_demand >= 0
+            AND daily_demand_std >= 0
+            AND lead_time_days >= 0
+            AND safety_stock_quantity >= 0
+            AND reorder_point_quantity >= safety_stock_quantity
+        ),
+    CONSTRAINT ck_material_stock_policies_history
+        CHECK (history_end_date > history_start_date)
+);
+
+CREATE TRIGGER trg_material_stock_policies_planning_change_insert
+    AFTER INSERT ON material_stock_policies
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+CREATE TRIGGER trg_material_stock_policies_planning_change_update
+    AFTER UPDATE ON material_stock_policies
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+CREATE TRIGGER trg_material_stock_policies_planning_change_delete
+    AFTER DELETE ON material_stock_policies
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION log_planning_change(
+        'material_id', 'NULL'
+    );
+
+
 -- ============================================================================
 -- PLANNING-PATH INDEXES
 -- ============================================================================
@@ -332,6 +909,10 @@ CREATE INDEX idx_bills_of_materials_product_effective
 CREATE INDEX idx_bom_components_bom
     ON bom_components (bom_id);
 
+CREATE INDEX idx_bom_components_component_product
+    ON bom_components (component_product_id)
+    WHERE component_product_id IS NOT NULL;
+
 CREATE INDEX idx_supplier_materials_material_source
     ON supplier_materials (material_id, source_status, preferred_flag);
 
@@ -254,4 +254,40 @@ JOIN materials AS material
     ON material.material_code = seed.material_code
 ON CONFLICT (supplier_id, material_id) DO NOTHING;
 
+-- Dual-sourced wire split by quota for allocated sourcing. Pacific's share of
+-- 4140 wire is capped, so overflow falls back to the cheapest timely source.
+UPDATE supplier_materials AS source
+SET
+    quota_pct = seed.quota_pct,
+    capacity_quantity = seed.capacity_quantity
+FROM (
+    VALUES
+        ('SUP-ALPHA', 'MAT-AL2117-WR', 70.00::NUMERIC, NULL::NUMERIC),
+        ('SUP-PACIFIC', 'MAT-AL2117-WR', 30.00::NUMERIC, NULL::NUMERIC),
+        ('SUP-ALPHA', 'MAT-4140-WR', 60.00::NUMERIC, NULL::NUMERIC),
+        ('SUP-PACIFIC', 'MAT-4140-WR', 40.00::NUMERIC, 5000.000::NUMERIC)
+) AS seed (supplier_code, material_code, quota_pct, capacity_quantity)
+JOIN suppliers AS supplier
+    ON supplier.supplier_code = seed.supplier_code
+JOIN materials AS material
+    ON material.material_code = seed.material_code
+WHERE source.supplier_id = supplier.supplier_id
+  AND source.material_id = material.material_id;
+
+-- Alpha's wire line receives a limited quantity per week; capacity-aware
+-- planning shifts or splits overflowing wire orders into earlier weeks.
+INSERT INTO supplier_weekly_capacity (
+    supplier_id,
+    material_category,
+    weekly_capacity_quantity
+)
+SELECT supplier.supplier_id, seed.material_category, seed.weekly_capacity_quantity
+FROM (
+    VALUES
+        ('SUP-ALPHA', 'Metal Wire', 600.000::NUMERIC)
+) AS seed (supplier_code, material_category, weekly_capacity_quantity)
+JOIN suppliers AS supplier
+    ON supplier.supplier_code = seed.supplier_code
+ON CONFLICT (supplier_id, material_category) DO NOTHING;
+
 COMMIT;
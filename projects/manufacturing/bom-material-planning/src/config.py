@@ -7,3 +7,44 @@ DATABASE_URL = os.getenv(
     "DATABASE_URL",
     "postgresql+psycopg2:///bom_material_planning",
 )
+
+# Transaction load mode: skip populated tables, or merge on natural keys.
+LOAD_MODE = os.getenv("LOAD_MODE", "skip")
+
+# Worker processes for per-material netting and recommendations; 1 is serial.
+PLANNING_WORKERS = int(os.getenv("PLANNING_WORKERS", "1"))
+
+# Purchase sourcing: one preferred source, or quota allocation across sources.
+PLANNING_SOURCING = os.getenv("PLANNING_SOURCING", "preferred")
+
+# Lot sizing: lot_for_lot, fixed_period, period_order_quantity,
+# economic_order_quantity, or wagner_whitin.
+PLANNING_LOT_SIZING = os.getenv("PLANNING_LOT_SIZING", "lot_for_lot")
+
+# Shift or split orders to fit weekly supplier capacity buckets: true or false.
+PLANNING_SUPPLIER_CAPACITY = (
+    os.getenv("PLANNING_SUPPLIER_CAPACITY", "false").lower() == "true"
+)
+
+# Planning export format: csv, parquet, or arrow (columnar formats need pyarrow).
+PLANNING_EXPORT_FORMAT = os.getenv("PLANNING_EXPORT_FORMAT", "csv")
+
+# Planning buckets: daily, or tiers such as daily:28,weekly:182,monthly that
+# plan daily for 28 days, weekly until day 182, and monthly after that.
+PLANNING_BUCKETS = os.getenv("PLANNING_BUCKETS", "daily")
+
+# Reuse plans while the planning source tables are unchanged: true or false.
+PLAN_CACHE = os.getenv("PLAN_CACHE", "true").lower() == "true"
+
+# Size bound of the on-disk plan cache; least recently used plans go first.
+PLAN_CACHE_MAX_MB = int(os.getenv("PLAN_CACHE_MAX_MB", "512"))
+
+# Stock policies: target cycle service level and weeks of demand history.
+SAFETY_STOCK_SERVICE_LEVEL = float(os.getenv("SAFETY_STOCK_SERVICE_LEVEL", "0.95"))
+SAFETY_STOCK_HISTORY_WEEKS = int(os.getenv("SAFETY_STOCK_HISTORY_WEEKS", "26"))
+
+# Benchmark scales as demand-lines x materials pairs, comma separated.
+BENCHMARK_SCALES = os.getenv("BENCHMARK_SCALES", "1000x100,10000x1000,100000x10000")
+
+# Scratch database the benchmark may overwrite; unset plans in memory only.
+BENCHMARK_DATABASE_URL = os.getenv("BENCHMARK_DATABASE_URL")
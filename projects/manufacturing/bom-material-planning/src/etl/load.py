@@ -1,7 +1,21 @@
 """Retrieve master data and load generated planning transactions."""
 
+from collections import defaultdict
+from decimal import Decimal
+
 from sqlalchemy import text
 
+from src.planning.bom_explosion import (
+    ACTIVE_BOM_COMPONENT_QUERY,
+    ACTIVE_BOM_QUERY,
+    OPEN_DEMAND_QUERY,
+)
+from src.planning.multilevel import explode_material_requirements, find_missing_boms
+from src.planning.rollup import is_rollup_usable
+from src.planning.session import snapshot_connection
+
+from .bulk_load import copy_rows
+
 
 ACTIVE_PRODUCTS_QUERY = text(
     """
@@ -12,35 +26,31 @@ ACTIVE_PRODUCTS_QUERY = text(
     """
 )
 
-MATERIAL_REQUIREMENT_TOTALS_QUERY = text(
+ACTIVE_MATERIALS_QUERY = text(
+    """
+    SELECT
+        material_id,
+        material_code,
+        material_category,
+        base_unit_of_measure
+    FROM materials
+    WHERE active_flag = TRUE
+    ORDER BY material_code
+    """
+)
+
+ROLLUP_MATERIAL_REQUIREMENT_TOTALS_QUERY = text(
     """
     SELECT
         material.material_id,
         material.material_code,
         material.material_category,
         material.base_unit_of_measure,
-        COALESCE(
-            SUM(
-                demand.demand_quantity
-                * component.quantity_per_unit
-                / (1 - component.expected_loss_pct / 100)
-            ),
-            0
-        ) AS gross_requirement
+        COALESCE(SUM(ROUND(rollup.gross_requirement, 3)), 0)
+            AS gross_requirement
     FROM materials AS material
-    LEFT JOIN bom_components AS component
-        ON component.material_id = material.material_id
-    LEFT JOIN bills_of_materials AS bom
-        ON bom.bom_id = component.bom_id
-        AND bom.bom_status = 'Active'
-    LEFT JOIN production_demand AS demand
-        ON demand.product_id = bom.product_id
-        AND demand.demand_status IN ('Planned', 'Released')
-        AND demand.required_date >= bom.effective_start_date
-        AND (
-            bom.effective_end_date IS NULL
-            OR demand.required_date <= bom.effective_end_date
-        )
+    LEFT JOIN material_requirement_rollup AS rollup
+        ON rollup.material_id = material.material_id
     WHERE material.active_flag = TRUE
     GROUP BY
         material.material_id,
@@ -70,77 +80,46 @@ PREFERRED_MATERIAL_SOURCES_QUERY = text(
     """
 )
 
-INSERT_PRODUCTION_DEMAND = text(
-    """
-    INSERT INTO production_demand (
-        demand_reference,
-        product_id,
-        required_date,
-        demand_quantity,
-        demand_status,
-        priority
-    )
-    VALUES (
-        :demand_reference,
-        :product_id,
-        :required_date,
-        :demand_quantity,
-        :demand_status,
-        :priority
-    )
-    """
+PRODUCTION_DEMAND_COLUMNS = (
+    "demand_reference",
+    "product_id",
+    "required_date",
+    "demand_quantity",
+    "demand_status",
+    "priority",
 )
 
-INSERT_INVENTORY_BALANCES = text(
-    """
-    INSERT INTO inventory_balances (
-        material_id,
-        location_code,
-        on_hand_quantity,
-        reserved_quantity,
-        restricted_quantity,
-        safety_stock_quantity,
-        last_counted_at
-    )
-    VALUES (
-        :material_id,
-        :location_code,
-        :on_hand_quantity,
-        :reserved_quantity,
-        :restricted_quantity,
-        :safety_stock_quantity,
-        :last_counted_at
-    )
-    """
+INVENTORY_BALANCE_COLUMNS = (
+    "material_id",
+    "location_code",
+    "on_hand_quantity",
+    "reserved_quantity",
+    "restricted_quantity",
+    "safety_stock_quantity",
+    "last_counted_at",
 )
 
-INSERT_PURCHASE_ORDERS = text(
-    """
-    INSERT INTO purchase_orders (
-        purchase_order_number,
-        line_number,
-        supplier_id,
-        material_id,
-        order_date,
-        expected_receipt_date,
-        ordered_quantity,
-        received_quantity,
-        unit_price,
-        purchase_order_status
-    )
-    VALUES (
-        :purchase_order_number,
-        :line_number,
-        :supplier_id,
-        :material_id,
-        :order_date,
-        :expected_receipt_date,
-        :ordered_quantity,
-        :received_quantity,
-        :unit_price,
-        :purchase_order_status
-    )
-    """
+LOAD_MODES = {"skip", "merge"}
+
+# Natural keys matching each table's unique constraint, used by merge loads.
+MERGE_KEYS = {
+    "production_demand": ("demand_reference",),
+    "inventory_balances": ("material_id", "location_code"),
+    "purchase_orders": ("purchase_order_number", "line_number"),
+    "material_stock_policies": ("material_id",),
+}
+
+PURCHASE_ORDER_COLUMNS = (
+    "purchase_order_number",
+    "line_number",
+    "supplier_id",
+    "material_id",
+    "order_date",
+    "expected_receipt_date",
+    "ordered_quantity",
+    "received_quantity",
+    "unit_price",
+    "purchase_order_status",
 )
 
 
@@ -150,13 +129,59 @@ def get_active_products(engine):
         return [dict(row) for row in connection.execute(ACTIVE_PRODUCTS_QUERY).mappings()]
 
 
+def summarize_material_requirement_totals(materials, material_requirements):
+    """Attach each material's gross requirement summed over every need date."""
+    totals = defaultdict(Decimal)
+    for requirement in material_requirements:
+        totals[requirement["material_id"]] += requirement["gross_requirement"]
+    return [
+        {
+            **material,
+            "gross_requirement": totals.get(material["material_id"], Decimal("0")),
+        }
+        for material in materials
+    ]
+
+
 def get_material_requirement_totals(engine):
-    """Return active materials with gross demand across the planning horizon."""
-    with engine.connect() as connection:
-        return [
-            dict(row)
-            for row in connection.execute(MATERIAL_REQUIREMENT_TOTALS_QUERY).mappings()
-        ]
+    """Return active materials with gross demand across the planning horizon.
+
+    Totals come from the maintained requirement rollup while it is usable,
+    meaning fresh and with no subassembly lines to explode. Otherwise demand
+    is exploded through every BOM level. Both paths round each material and
+    date to three decimals before summing, and the check and the read share
+    one snapshot. Demand without an effective BOM adds nothing here; planning
+    reports it as an error.
+    """
+    with snapshot_connection(engine) as connection:
+        if is_rollup_usable(connection):
+            return [
+                dict(row)
+                for row in connection.execute(
+                    ROLLUP_MATERIAL_REQUIREMENT_TOTALS_QUERY
+                ).mappings()
+            ]
+        materials, demand_rows, bom_headers, bom_components = (
+            [dict(row) for row in connection.execute(query).mappings()]
+            for query in (
+                ACTIVE_MATERIALS_QUERY,
+                OPEN_DEMAND_QUERY,
+                ACTIVE_BOM_QUERY,
+                ACTIVE_BOM_COMPONENT_QUERY,
+            )
+        )
+    uncovered_demand = {
+        row["demand_id"] for row in find_missing_boms(demand_rows, bom_headers)
+    }
+    covered_demand = [
+        row for row in demand_rows if row["demand_id"] not in uncovered_demand
+    ]
+    return summarize_material_requirement_totals(
+        materials,
+        explode_material_requirements(
+            covered_demand, bom_headers, bom_components
+        ),
+    )
 
 
 def get_preferred_material_sources(engine):
@@ -180,37 +205,171 @@ def table_has_rows(connection, table_name):
     return connection.execute(text(f"SELECT EXISTS (SELECT 1 FROM {table_name})")).scalar_one()
 
 
-def load_production_demand(engine, demand_rows):
-    """Insert demand rows once and safely skip an already-populated table."""
-    if not demand_rows:
-        raise ValueError("No production demand rows were provided")
+def stage_rows(connection, table_name, columns, rows):
+    """COPY rows into a transaction-scoped temporary copy of a table's columns."""
+    staging_table = f"staged_{table_name}"
+    connection.execute(
+        text(
+            f"CREATE TEMPORARY TABLE {staging_table} ON COMMIT DROP AS "
+            f"SELECT {', '.join(columns)} FROM {table_name} WITH NO DATA"
+        )
+    )
+    return staging_table, copy_rows(connection, staging_table, columns, rows)
 
-    with engine.begin() as connection:
-        if table_has_rows(connection, "production_demand"):
-            return 0
-        connection.execute(INSERT_PRODUCTION_DEMAND, demand_rows)
-    return len(demand_rows)
 
+def build_duplicate_key_query(staging_table, key_columns):
+    """Return a query listing natural keys repeated within the staged rows."""
+    keys = ", ".join(key_columns)
+    return text(
+        f"""
+        SELECT {keys}
+        FROM {staging_table}
+        GROUP BY {keys}
+        HAVING COUNT(*) > 1
+        ORDER BY {keys}
+        LIMIT 10
+        """
+    )
 
-def load_inventory_balances(engine, inventory_rows):
-    """Insert inventory rows once and skip an already-populated table."""
-    if not inventory_rows:
-        raise ValueError("No inventory balance rows were provided")
 
-    with engine.begin() as connection:
-        if table_has_rows(connection, "inventory_balances"):
-            return 0
-        connection.execute(INSERT_INVENTORY_BALANCES, inventory_rows)
-    return len(inventory_rows)
+def build_merge_query(table_name, staging_table, columns, key_columns):
+    """Return an upsert that updates only rows whose values changed.
+
+    ``xmax = 0`` identifies rows created by the INSERT branch; conflicting rows
+    whose values are unchanged fail the ``WHERE`` and are not returned.
+    """
+    value_columns = [column for column in columns if column not in key_columns]
+    assignments = ",\n            ".join(
+        f"{column} = EXCLUDED.{column}" for column in value_columns
+    )
+    current_values = ", ".join(f"target.{column}" for column in value_columns)
+    new_values = ", ".join(f"EXCLUDED.{column}" for column in value_columns)
+    return text(
+        f"""
+        WITH merged AS (
+            INSERT INTO {table_name} AS target ({', '.join(columns)})
+            SELECT {', '.join(columns)}
+            FROM {staging_table}
+            ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET
+            {assignments}
+            WHERE ({current_values}) IS DISTINCT FROM ({new_values})
+            RETURNING (target.xmax = 0) AS inserted
+        )
+        SELECT
+            COUNT(*) FILTER (WHERE inserted) AS inserted_rows,
+            COUNT(*) FILTER (WHERE NOT inserted) AS updated_rows
+        FROM merged
+        """
+    )
+
+
+def merge_transaction_rows(connection, table_name, columns, rows):
+    """Stage rows with COPY and upsert them on the table's natural key.
+
+    Returns the COPY statistics plus inserted, updated, and unchanged counts.
+    A natural key repeated in the input raises ValueError before any upsert.
+    """
+    key_columns = MERGE_KEYS[table_name]
+    staging_table, load_stats = stage_rows(connection, table_name, columns, rows)
+    duplicate_keys = connection.execute(
+        build_duplicate_key_query(staging_table, key_columns)
+    ).all()
+    if duplicate_keys:
+        raise ValueError(
+            f"{table_name} rows repeat natural keys: "
+            + ", ".join(str(tuple(key)) for key in duplicate_keys)
+        )
+
+    counts = connection.execute(
+        build_merge_query(table_name, staging_table, columns, key_columns)
+    ).mappings().one()
+    return {
+        **load_stats,
+        "table_name": table_name,
+        "inserted_rows": counts["inserted_rows"],
+        "updated_rows": counts["updated_rows"],
+        "unchanged_rows": (
+            load_stats["row_count"]
+            - counts["inserted_rows"]
+            - counts["updated_rows"]
+        ),
+    }
+
 
+def describe_merge(merge_stats):
+    """Return a one-line summary of a merge load."""
+    return (
+        f"Merged {merge_stats['row_count']:,} {merge_stats['table_name']} rows: "
+        f"{merge_stats['inserted_rows']:,} inserted, "
+        f"{merge_stats['updated_rows']:,} updated, "
+        f"{merge_stats['unchanged_rows']:,} unchanged."
+    )
 
-def load_purchase_orders(engine, purchase_order_rows):
-    """Insert purchase-order rows once and skip an already-populated table."""
-    if not purchase_order_rows:
-        raise ValueError("No purchase-order rows were provided")
+
+def load_transaction_rows(
+    engine,
+    table_name,
+    columns,
+    rows,
+    empty_message,
+    mode="skip",
+):
+    """Load rows into a transactional table and return load statistics.
+
+    ``skip`` mode COPYs into an empty table and returns None without loading
+    when the table already contains data. ``merge`` mode upserts on the
+    natural key and also reports inserted, updated, and unchanged rows.
+    ``rows`` may be a generator; an empty input rolls back and raises
+    ValueError.
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unsupported load mode: {mode}")
 
     with engine.begin() as connection:
-        if table_has_rows(connection, "purchase_orders"):
-            return 0
-        connection.execute(INSERT_PURCHASE_ORDERS, purchase_order_rows)
-    return len(purchase_order_rows)
+        if mode == "merge":
+            load_stats = merge_transaction_rows(
+                connection, table_name, columns, rows
+            )
+        elif table_has_rows(connection, table_name):
+            return None
+        else:
+            load_stats = copy_rows(connection, table_name, columns, rows)
+        if not load_stats["row_count"]:
+            raise ValueError(empty_message)
+    return load_stats
+
+
+def load_production_demand(engine, demand_rows, mode="skip"):
+    """Bulk-load demand rows, skipping or merging into existing data."""
+    return load_transaction_rows(
+        engine,
+        "production_demand",
+        PRODUCTION_DEMAND_COLUMNS,
+        demand_rows,
+        "No production demand rows were provided",
+        mode,
+    )
+
+
+def load_inventory_balances(engine, inventory_rows, mode="skip"):
+    """Bulk-load inventory rows, skipping or merging into existing data."""
+    return load_transaction_rows(
+        engine,
+        "inventory_balances",
+        INVENTORY_BALANCE_COLUMNS,
+        inventory_rows,
+        "No inventory balance rows were provided",
+        mode,
+    )
+
+
+def load_purchase_orders(engine, purchase_order_rows, mode="skip"):
+    """Bulk-load purchase-order rows, skipping or merging into existing data."""
+    return load_transaction_rows(
+        engine,
+        "purchase_orders",
+        PURCHASE_ORDER_COLUMNS,
+        purchase_order_rows,
+        "No purchase-order rows were provided",
+        mode,
+    )
@@ -2,11 +2,13 @@
 
 from sqlalchemy import create_engine
 
-from .config import DATABASE_URL
+from .config import DATABASE_URL, LOAD_MODE
+from .etl.bulk_load import describe_load
 from .etl.generate_inventory_balances import generate_inventory_balances
 from .etl.generate_production_demand import generate_production_demand
 from .etl.generate_purchase_orders import generate_purchase_orders
 from .etl.load import (
+    describe_merge,
     get_active_products,
     get_material_requirement_totals,
     get_preferred_material_sources,
@@ -16,38 +18,40 @@ from .etl.load import (
 )
 
 
-def main():
-    """Generate and load the first planning dataset in dependency order."""
+def print_load_result(load_stats, table_name):
+    """Print the outcome of one skip-mode or merge-mode table load."""
+    if load_stats is None:
+        print(f"Skipped {table_name} because the table already contains data.")
+    elif "inserted_rows" in load_stats:
+        print(describe_merge(load_stats))
+    else:
+        print(describe_load(load_stats))
+
+
+def main(load_mode=LOAD_MODE):
+    """Generate and load the planning dataset in dependency order.
+
+    ``load_mode`` ``skip`` loads only empty tables; ``merge`` upserts each
+    table on its natural key so a refresh touches only changed rows.
+    """
     engine = create_engine(DATABASE_URL)
     products = get_active_products(engine)
     demand_rows = generate_production_demand(products)
-    inserted_rows = load_production_demand(engine, demand_rows)
-
-    if inserted_rows:
-        print(f"Loaded {inserted_rows} production demand rows.")
-    else:
-        print("Skipped production_demand because the table already contains data.")
+    load_stats = load_production_demand(engine, demand_rows, load_mode)
+    print_load_result(load_stats, "production_demand")
 
     material_requirements = get_material_requirement_totals(engine)
     inventory_rows = generate_inventory_balances(material_requirements)
-    inserted_rows = load_inventory_balances(engine, inventory_rows)
-
-    if inserted_rows:
-        print(f"Loaded {inserted_rows} inventory balance rows.")
-    else:
-        print("Skipped inventory_balances because the table already contains data.")
+    load_stats = load_inventory_balances(engine, inventory_rows, load_mode)
+    print_load_result(load_stats, "inventory_balances")
 
     preferred_sources = get_preferred_material_sources(engine)
     purchase_order_rows = generate_purchase_orders(
         material_requirements,
         preferred_sources,
     )
-    inserted_rows = load_purchase_orders(engine, purchase_order_rows)
-
-    if inserted_rows:
-        print(f"Loaded {inserted_rows} purchase-order rows.")
-    else:
-        print("Skipped purchase_orders because the table already contains data.")
+    load_stats = load_purchase_orders(engine, purchase_order_rows, load_mode)
+    print_load_result(load_stats, "purchase_orders")
 
 
 if __name__ == "__main__":
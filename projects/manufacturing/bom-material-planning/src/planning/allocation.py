@@ -0,0 +1,265 @@
+"""Allocate shortages across multiple approved sources with quota rules.
+
+Each shortage is split by the material's ``quota_pct`` values, or sent
+entirely to the preferred source when no quotas are set. A share that a
+source cannot deliver by the need date, or that exceeds its remaining
+``capacity_quantity``, falls back to the cheapest source that can. When no
+source meets the need date, the fastest source takes the whole shortage.
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import text
+
+from src.purchasing import apply_order_constraints, round_quantity
+
+from .instrumentation import traced
+from .recommendations import (
+    build_recommendation,
+    number_recommendations,
+    validate_source_coverage,
+)
+
+
+APPROVED_SOURCE_QUERY = text(
+    """
+    SELECT
+        source.material_id,
+        material.material_code,
+        supplier.supplier_id,
+        supplier.supplier_code,
+        supplier.supplier_name,
+        source.unit_price,
+        source.lead_time_days,
+        source.minimum_order_quantity,
+        source.order_multiple,
+        source.preferred_flag,
+        source.quota_pct,
+        source.capacity_quantity
+    FROM supplier_materials AS source
+    JOIN materials AS material
+        ON material.material_id = source.material_id
+        AND material.active_flag = TRUE
+    JOIN suppliers AS supplier
+        ON supplier.supplier_id = source.supplier_id
+        AND supplier.supplier_status = 'Approved'
+    WHERE source.source_status = 'Approved'
+    ORDER BY material.material_code, supplier.supplier_code
+    """
+)
+
+
+def source_cost_key(source):
+    """Order sources cheapest first, then fastest, then by supplier code."""
+    return (
+        Decimal(str(source["unit_price"])),
+        source["lead_time_days"],
+        source["supplier_code"],
+    )
+
+
+def group_sources_by_material(approved_sources):
+    """Group approved sources by material and validate quota totals."""
+    sources_by_material = defaultdict(list)
+    for source in approved_sources:
+        sources_by_material[source["material_id"]].append(source)
+
+    invalid_materials = sorted(
+        sources[0]["material_code"]
+        for sources in sources_by_material.values()
+        if any(source.get("quota_pct") is not None for source in sources)
+        and sum(
+            Decimal(str(source["quota_pct"]))
+            for source in sources
+            if source.get("quota_pct") is not None
+        )
+        != 100
+    )
+    if invalid_materials:
+        raise ValueError(
+            "Source quotas must total 100% for: " + ", ".join(invalid_materials)
+        )
+    return dict(sources_by_material)
+
+
+def get_quota_targets(sources):
+    """Return (source, percentage) pairs that split a material's shortages."""
+    quota_sources = [
+        source for source in sources if source.get("quota_pct") is not None
+    ]
+    if quota_sources:
+        return [
+            (source, Decimal(str(source["quota_pct"])))
+            for source in quota_sources
+        ]
+    preferred_sources = [source for source in sources if source.get("preferred_flag")]
+    default_source = (preferred_sources or sorted(sources, key=source_cost_key))[0]
+    return [(default_source, Decimal("100"))]
+
+
+def allocate_shortage(quantity, sources, need_date, planning_date, capacity_used):
+    """Split one shortage into (source, quantity, reason) allocations.
+
+    ``capacity_used`` maps supplier IDs to quantity already ordered for this
+    material and is read, not updated. Shares are rounded to three decimals
+    and the last quota share absorbs the rounding remainder.
+    """
+
+    def meets_need_date(source):
+        return need_date - timedelta(days=source["lead_time_days"]) >= planning_date
+
+    def available(source, allocated):
+        if source.get("capacity_quantity") is None:
+            return None
+        return max(
+            Decimal(str(source["capacity_quantity"]))
+            - capacity_used.get(source["supplier_id"], Decimal("0"))
+            - allocated.get(source["supplier_id"], Decimal("0")),
+            Decimal("0"),
+        )
+
+    feasible_sources = sorted(
+        (source for source in sources if meets_need_date(source)),
+        key=source_cost_key,
+    )
+    if not feasible_sources:
+        fastest_source = min(
+            sources,
+            key=lambda source: (source["lead_time_days"], *source_cost_key(source)),
+        )
+        return [(fastest_source, quantity, "Late Source")]
+
+    allocated = {}
+    reasons = {}
+    sources_by_supplier = {}
+    unallocated = Decimal("0")
+
+    def allocate(source, share, reason):
+        supplier_id = source["supplier_id"]
+        allocated[supplier_id] = allocated.get(supplier_id, Decimal("0")) + share
+        reasons.setdefault(supplier_id, reason)
+        sources_by_supplier[supplier_id] = source
+
+    targets = get_quota_targets(sources)
+    assigned = Decimal("0")
+    for index, (source, percentage) in enumerate(targets):
+        if index == len(targets) - 1:
+            share = quantity - assigned
+        else:
+            share = round_quantity(quantity * percentage / 100)
+        assigned += share
+        if not meets_need_date(source):
+            unallocated += share
+            continue
+        capacity = available(source, allocated)
+        accepted = share if capacity is None else min(share, capacity)
+        unallocated += share - accepted
+        if accepted > 0:
+            allocate(source, accepted, "Quota")
+
+    for source in feasible_sources:
+        if unallocated <= 0:
+            break
+        capacity = available(source, allocated)
+        accepted = unallocated if capacity is None else min(unallocated, capacity)
+        if accepted > 0:
+            allocate(source, accepted, "Fallback")
+            unallocated -= accepted
+
+    if unallocated > 0:
+        allocate(feasible_sources[0], unallocated, "Over Capacity")
+
+    return [
+        (sources_by_supplier[supplier_id], round_quantity(share), reasons[supplier_id])
+        for supplier_id, share in allocated.items()
+    ]
+
+
+def create_allocated_material_recommendations(material_rows, sources, planning_date):
+    """Create unnumbered split recommendations for one material's netted rows.
+
+    Each allocated share gets its own MOQ and order multiple. Order excess from
+    every split is carried forward to later shortages, as in single-source
+    recommendations, and counts against the source's capacity.
+    """
+    recommendations = []
+    capacity_used = defaultdict(Decimal)
+    excess_planned_supply = Decimal("0.000")
+    for row in sorted(material_rows, key=lambda row: row["need_date"]):
+        net_requirement = round_quantity(row["net_requirement"])
+        excess_applied = min(excess_planned_supply, net_requirement)
+        remaining_shortage = round_quantity(net_requirement - excess_applied)
+        excess_planned_supply = round_quantity(
+            excess_planned_supply - excess_applied
+        )
+
+        if remaining_shortage <= 0:
+            continue
+
+        allocations = allocate_shortage(
+            remaining_shortage,
+            sources,
+            row["need_date"],
+            planning_date,
+            capacity_used,
+        )
+        for source, allocated_quantity, reason in allocations:
+            recommended_quantity = apply_order_constraints(
+                allocated_quantity,
+                source["minimum_order_quantity"],
+                source["order_multiple"],
+            )
+            capacity_used[source["supplier_id"]] += recommended_quantity
+            excess_planned_supply = round_quantity(
+                excess_planned_supply + recommended_quantity - allocated_quantity
+            )
+            recommendations.append(
+                {
+                    **build_recommendation(
+                        row,
+                        source,
+                        planning_date,
+                        net_requirement,
+                        excess_applied,
+                        remaining_shortage,
+                        recommended_quantity,
+                        excess_planned_supply,
+                    ),
+                    "allocated_requirement": allocated_quantity,
+                    "allocation_reason": reason,
+                }
+            )
+    return recommendations
+
+
+@traced("recommendations.allocated")
+def create_allocated_recommendations(
+    netted_requirements,
+    approved_sources,
+    planning_date=None,
+):
+    """Convert dated shortages into quota-split, capacity-capped recommendations.
+
+    Materials are independent, so work is linear in netted rows times each
+    material's source count. IDs follow ``create_purchase_recommendations``.
+    """
+    planning_date = planning_date or date.today()
+    sources_by_material = group_sources_by_material(approved_sources)
+    validate_source_coverage(netted_requirements, sources_by_material)
+
+    rows_by_material = defaultdict(list)
+    for row in netted_requirements:
+        rows_by_material[row["material_id"]].append(row)
+
+    return number_recommendations(
+        {
+            material_id: create_allocated_material_recommendations(
+                material_rows,
+                sources_by_material.get(material_id, []),
+                planning_date,
+            )
+            for material_id, material_rows in rows_by_material.items()
+        }
+    )
@@ -0,0 +1,585 @@
+"""Benchmark the planning pipeline on scaled synthetic data.
+
+Each scale builds master data for a requested number of demand lines and
+materials, runs the existing demand, inventory, and purchase-order generators
+on it, and times every planning stage with the process's peak RSS. Scales run
+in fresh worker processes so one scale's memory does not inflate the next.
+
+When ``BENCHMARK_DATABASE_URL`` is set, the generated data replaces the
+contents of that database and the snapshot is read with the production
+queries, adding the ``snapshot_query`` stage. Never point it at a database
+whose data matters.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+import json
+import multiprocessing
+from pathlib import Path
+import platform
+import resource
+import tempfile
+from time import perf_counter
+
+from sqlalchemy import create_engine, text
+
+from src.config import BENCHMARK_DATABASE_URL, BENCHMARK_SCALES
+from src.etl.bulk_load import copy_rows
+from src.etl.generate_inventory_balances import (
+    LOCATION_BY_CATEGORY,
+    generate_inventory_balances,
+)
+from src.etl.generate_production_demand import (
+    DEMAND_QUANTITY_RULES,
+    generate_production_demand,
+)
+from src.etl.generate_purchase_orders import generate_purchase_orders
+from src.etl.load import (
+    INVENTORY_BALANCE_COLUMNS,
+    PRODUCTION_DEMAND_COLUMNS,
+    PURCHASE_ORDER_COLUMNS,
+)
+
+from .multilevel import explode_material_requirements
+from .plan_cache import get_source_revision
+from .report import export_planning_results, summarize_plan
+from .session import PlanningSession, read_planning_snapshot
+
+
+DEFAULT_OUTPUT_FILE = (
+    Path(__file__).resolve().parents[2]
+    / "outputs"
+    / "benchmarks"
+    / "planning_benchmark.json"
+)
+
+DEMAND_LINES_PER_PRODUCT = 8
+MATERIAL_LINES_PER_BOM = 3
+# Every tenth product uses the previous product as a subassembly.
+SUBASSEMBLY_INTERVAL = 10
+MATERIALS_PER_SUPPLIER = 100
+UNIT_OF_MEASURE_BY_CATEGORY = {
+    "Metal Wire": "KG",
+    "Process Chemical": "L",
+    "Packaging": "EA",
+}
+
+MASTER_DATA_COLUMNS = {
+    "products": ("product_code", "product_name", "product_family"),
+    "materials": (
+        "material_code",
+        "material_name",
+        "material_category",
+        "base_unit_of_measure",
+        "standard_unit_cost",
+    ),
+    "suppliers": (
+        "supplier_code",
+        "supplier_name",
+        "supplier_status",
+        "quality_rating",
+        "on_time_delivery_pct",
+    ),
+    "bills_of_materials": (
+        "product_id",
+        "revision_code",
+        "effective_start_date",
+        "effective_end_date",
+        "bom_status",
+    ),
+    "bom_components": (
+        "bom_id",
+        "line_number",
+        "material_id",
+        "component_product_id",
+        "quantity_per_unit",
+        "expected_loss_pct",
+    ),
+    "supplier_materials": (
+        "supplier_id",
+        "material_id",
+        "supplier_material_code",
+        "unit_price",
+        "lead_time_days",
+        "minimum_order_quantity",
+        "order_multiple",
+        "preferred_flag",
+        "source_status",
+    ),
+}
+
+BENCHMARK_TABLES = (
+    "planning_change_log",
+    "netted_material_plan",
+    "planning_runs",
+    "purchase_orders",
+    "inventory_balances",
+    "production_demand",
+    "supplier_weekly_capacity",
+    "supplier_materials",
+    "bom_components",
+    "bills_of_materials",
+    "suppliers",
+    "materials",
+    "products",
+)
+
+
+def parse_benchmark_scales(value):
+    """Parse ``"1000x100,10000x1000"`` into (demand lines, materials) pairs."""
+    scales = []
+    for item in value.split(","):
+        try:
+            demand_lines, material_count = (
+                int(part) for part in item.strip().lower().split("x")
+            )
+        except ValueError:
+            raise ValueError(f"Invalid benchmark scale: {item.strip()}") from None
+        if demand_lines <= 0 or material_count <= 0:
+            raise ValueError(f"Benchmark scale must be positive: {item.strip()}")
+        scales.append((demand_lines, material_count))
+    return scales
+
+
+def build_master_data(demand_lines, material_count, planning_date):
+    """Return scaled master rows whose IDs are their one-based positions.
+
+    Rows match the master-data tables, so they can be planned in memory or
+    copied into an empty database whose identities restart at 1.
+    """
+    if material_count < MATERIAL_LINES_PER_BOM:
+        raise ValueError(
+            f"Benchmarks need at least {MATERIAL_LINES_PER_BOM} materials"
+        )
+    product_count = max(demand_lines // DEMAND_LINES_PER_PRODUCT, 1)
+    supplier_count = max(material_count // MATERIALS_PER_SUPPLIER, 1)
+    families = sorted(DEMAND_QUANTITY_RULES)
+    categories = sorted(LOCATION_BY_CATEGORY)
+
+    products = [
+        {
+            "product_id": product_id,
+            "product_code": f"PRD-B{product_id:07d}",
+            "product_name": f"Benchmark Product {product_id}",
+            "product_family": families[product_id % len(families)],
+        }
+        for product_id in range(1, product_count + 1)
+    ]
+    materials = []
+    for material_id in range(1, material_count + 1):
+        category = categories[material_id % len(categories)]
+        materials.append(
+            {
+                "material_id": material_id,
+                "material_code": f"MAT-B{material_id:06d}",
+                "material_name": f"Benchmark Material {material_id}",
+                "material_category": category,
+                "base_unit_of_measure": UNIT_OF_MEASURE_BY_CATEGORY[category],
+                "standard_unit_cost": Decimal(1 + material_id % 40),
+            }
+        )
+    suppliers = [
+        {
+            "supplier_id": supplier_id,
+            "supplier_code": f"SUP-B{supplier_id:05d}",
+            "supplier_name": f"Benchmark Supplier {supplier_id}",
+            "supplier_status": "Approved",
+            "quality_rating": Decimal("95.00"),
+            "on_time_delivery_pct": Decimal("95.00"),
+        }
+        for supplier_id in range(1, supplier_count + 1)
+    ]
+
+    bills_of_materials = []
+    bom_components = []
+    for product in products:
+        product_id = product["product_id"]
+        bills_of_materials.append(
+            {
+                "bom_id": product_id,
+                "product_id": product_id,
+                "revision_code": "A",
+                "effective_start_date": planning_date - timedelta(days=365),
+                "effective_end_date": None,
+                "bom_status": "Active",
+            }
+        )
+        first_material = (product_id - 1) * MATERIAL_LINES_PER_BOM
+        for line_number in range(1, MATERIAL_LINES_PER_BOM + 1):
+            bom_components.append(
+                {
+                    "bom_id": product_id,
+                    "line_number": line_number,
+                    "material_id": (
+                        (first_material + line_number - 1) % material_count + 1
+                    ),
+                    "component_product_id": None,
+                    "quantity_per_unit": (
+                        Decimal("0.000500") * (1 + (product_id + line_number) % 20)
+                    ),
+                    "expected_loss_pct": Decimal("2.000"),
+                }
+            )
+        if product_id > 1 and product_id % SUBASSEMBLY_INTERVAL == 0:
+            bom_components.append(
+                {
+                    "bom_id": product_id,
+                    "line_number": MATERIAL_LINES_PER_BOM + 1,
+                    "material_id": None,
+                    "component_product_id": product_id - 1,
+                    "quantity_per_unit": Decimal("1.000000"),
+                    "expected_loss_pct": Decimal("0.000"),
+                }
+            )
+
+    supplier_materials = [
+        {
+            "supplier_id": material["material_id"] % supplier_count + 1,
+            "material_id": material["material_id"],
+            "supplier_material_code": f"SM-{material['material_id']:06d}",
+            "unit_price": material["standard_unit_cost"] * Decimal("1.05"),
+            "lead_time_days": 7 + material["material_id"] % 35,
+            "minimum_order_quantity": Decimal("50.000"),
+            "order_multiple": Decimal("25.000"),
+            "preferred_flag": True,
+            "source_status": "Approved",
+        }
+        for material in materials
+    ]
+    return {
+        "products": products,
+        "materials": materials,
+        "suppliers": suppliers,
+        "bills_of_materials": bills_of_materials,
+        "bom_components": bom_components,
+        "supplier_materials": supplier_materials,
+    }
+
+
+def build_planning_snapshot(master_data, transactions):
+    """Return the planning snapshot the production queries would read."""
+    products = {row["product_id"]: row for row in master_data["products"]}
+    materials = {row["material_id"]: row for row in master_data["materials"]}
+    suppliers = {row["supplier_id"]: row for row in master_data["suppliers"]}
+
+    demand = [
+        {
+            "demand_id": demand_id,
+            "demand_reference": row["demand_reference"],
+            "product_id": row["product_id"],
+            "need_date": row["required_date"],
+            "priority": row["priority"],
+            "demand_quantity": Decimal(row["demand_quantity"]),
+            "product_code": products[row["product_id"]]["product_code"],
+            "product_name": products[row["product_id"]]["product_name"],
+            "product_active_flag": True,
+        }
+        for demand_id, row in enumerate(transactions["production_demand"], 1)
+    ]
+    bom_components = []
+    for row in master_data["bom_components"]:
+        material = materials.get(row["material_id"], {})
+        subassembly = products.get(row["component_product_id"], {})
+        bom_components.append(
+            {
+                **row,
+                "component_product_code": subassembly.get("product_code"),
+                "material_code": material.get("material_code"),
+                "material_name": material.get("material_name"),
+                "base_unit_of_measure": material.get("base_unit_of_measure"),
+            }
+        )
+
+    usable_inventory = dict.fromkeys(materials, Decimal("0"))
+    for row in transactions["inventory_balances"]:
+        usable_inventory[row["material_id"]] += max(
+            row["on_hand_quantity"]
+            - row["reserved_quantity"]
+            - row["restricted_quantity"]
+            - row["safety_stock_quantity"],
+            Decimal("0"),
+        )
+    open_receipts = {}
+    for row in transactions["purchase_orders"]:
+        if row["purchase_order_status"] not in {"Open", "Partially Received"}:
+            continue
+        key = (row["material_id"], row["expected_receipt_date"])
+        open_receipts[key] = open_receipts.get(key, Decimal("0")) + (
+            row["ordered_quantity"] - row["received_quantity"]
+        )
+
+    preferred_sources = []
+    for row in master_data["supplier_materials"]:
+        supplier = suppliers[row["supplier_id"]]
+        preferred_sources.append(
+            {
+                "material_id": row["material_id"],
+                "material_code": materials[row["material_id"]]["material_code"],
+                "supplier_id": row["supplier_id"],
+                "supplier_code": supplier["supplier_code"],
+                "supplier_name": supplier["supplier_name"],
+                "unit_price": row["unit_price"],
+                "lead_time_days": row["lead_time_days"],
+                "minimum_order_quantity": row["minimum_order_quantity"],
+                "order_multiple": row["order_multiple"],
+            }
+        )
+
+    return {
+        "demand": demand,
+        "bom_headers": [
+            {
+                column: row[column]
+                for column in (
+                    "bom_id",
+                    "product_id",
+                    "revision_code",
+                    "effective_start_date",
+                    "effective_end_date",
+                )
+            }
+            for row in master_data["bills_of_materials"]
+        ],
+        "bom_components": bom_components,
+        "inventory_supply": [
+            {
+                "material_id": material_id,
+                "material_code": materials[material_id]["material_code"],
+                "usable_inventory": quantity,
+            }
+            for material_id, quantity in usable_inventory.items()
+        ],
+        "scheduled_receipts": [
+            {
+                "material_id": material_id,
+                "material_code": materials[material_id]["material_code"],
+                "expected_receipt_date": receipt_date,
+                "open_receipt_quantity": quantity,
+            }
+            for (material_id, receipt_date), quantity in sorted(
+                open_receipts.items()
+            )
+            if quantity > 0
+        ],
+        "preferred_sources": preferred_sources,
+    }
+
+
+def generate_transactions(master_data, planning_date):
+    """Run the production generators on scaled master data."""
+    demand_rows = generate_production_demand(
+        master_data["products"],
+        DEMAND_LINES_PER_PRODUCT,
+        planning_date,
+    )
+    snapshot = build_planning_snapshot(
+        master_data,
+        {
+            "production_demand": demand_rows,
+            "inventory_balances": [],
+            "purchase_orders": [],
+        },
+    )
+    totals = dict.fromkeys(
+        (row["material_id"] for row in master_data["materials"]), Decimal("0")
+    )
+    for row in explode_material_requirements(
+        snapshot["demand"], snapshot["bom_headers"], snapshot["bom_components"]
+    ):
+        totals[row["material_id"]] += row["gross_requirement"]
+    material_requirements = [
+        {**material, "gross_requirement": totals[material["material_id"]]}
+        for material in master_data["materials"]
+    ]
+    return {
+        "production_demand": demand_rows,
+        "inventory_balances": generate_inventory_balances(
+            material_requirements,
+            datetime.combine(planning_date, datetime.min.time(), timezone.utc),
+        ),
+        "purchase_orders": generate_purchase_orders(
+            material_requirements,
+            master_data["supplier_materials"],
+            planning_date,
+        ),
+    }
+
+
+def load_benchmark_database(engine, master_data, transactions):
+    """Replace the benchmark database contents with generated rows.
+
+    Identities restart at 1 and rows are copied in ID order, so database IDs
+    equal the generated ones. Change-log rows written by the load triggers are
+    discarded.
+    """
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                f"TRUNCATE {', '.join(BENCHMARK_TABLES)} RESTART IDENTITY CASCADE"
+            )
+        )
+        for table_name, columns in MASTER_DATA_COLUMNS.items():
+            copy_rows(connection, table_name, columns, master_data[table_name])
+        for table_name, columns in (
+            ("production_demand", PRODUCTION_DEMAND_COLUMNS),
+            ("inventory_balances", INVENTORY_BALANCE_COLUMNS),
+            ("purchase_orders", PURCHASE_ORDER_COLUMNS),
+        ):
+            copy_rows(connection, table_name, columns, transactions[table_name])
+        connection.execute(text("TRUNCATE planning_change_log"))
+
+
+def count_rows(result):
+    """Return the rows in a stage result: a list, or a dict of row lists."""
+    if isinstance(result, dict):
+        return sum(len(rows) for rows in result.values())
+    if isinstance(result, list):
+        return len(result)
+    return None
+
+
+def get_peak_rss_mb():
+    """Return this process's peak resident set size in MiB (Linux KiB units)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_benchmark_scale(
+    demand_lines,
+    material_count,
+    planning_date=None,
+    database_url=None,
+):
+    """Time each planning stage for one scale and return its result record.
+
+    Stages run in pipeline order on one ``PlanningSession``. Each stage
+    records wall seconds, output rows, and the process peak RSS so far.
+    """
+    planning_date = planning_date or date.today()
+    stages = []
+
+    def timed(stage, function):
+        started = perf_counter()
+        result = function()
+        stages.append(
+            {
+                "stage": stage,
+                "seconds": round(perf_counter() - started, 6),
+                "rows_out": count_rows(result),
+                "peak_rss_mb": round(get_peak_rss_mb(), 1),
+            }
+        )
+        return result
+
+    master_data = timed(
+        "generate_master_data",
+        lambda: build_master_data(demand_lines, material_count, planning_date),
+    )
+    transactions = timed(
+        "generate_transactions",
+        lambda: generate_transactions(master_data, planning_date),
+    )
+    if database_url:
+        engine = create_engine(database_url)
+        timed(
+            "database_load",
+            lambda: load_benchmark_database(engine, master_data, transactions),
+        )
+        snapshot = timed("snapshot_query", lambda: read_planning_snapshot(engine))
+        engine.dispose()
+    else:
+        snapshot = timed(
+            "snapshot_build",
+            lambda: build_planning_snapshot(master_data, transactions),
+        )
+    del master_data, transactions
+
+    session = PlanningSession(snapshot, planning_date)
+    timed("bom_explosion", lambda: session.material_requirements)
+    timed("netting", lambda: session.netted_requirements)
+    timed("recommendations", lambda: session.recommendations)
+    timed(
+        "summary",
+        lambda: summarize_plan(
+            session.material_requirements,
+            session.netted_requirements,
+            session.recommendations,
+        )[1],
+    )
+    with tempfile.TemporaryDirectory() as output_directory:
+        timed(
+            "export",
+            lambda: export_planning_results(
+                session.iter_bom_explosion(),
+                session.netted_requirements,
+                session.recommendations,
+                Path(output_directory),
+            )
+            and None,
+        )
+
+    return {
+        "demand_lines_requested": demand_lines,
+        "materials": material_count,
+        "demand_lines": len(snapshot["demand"]),
+        "products": len({row["product_id"] for row in snapshot["demand"]}),
+        "stages": stages,
+        "total_seconds": round(sum(stage["seconds"] for stage in stages), 6),
+        "peak_rss_mb": stages[-1]["peak_rss_mb"],
+    }
+
+
+def run_benchmarks(scales, planning_date=None, database_url=None):
+    """Run every scale in its own fresh process and return the JSON document."""
+    planning_date = planning_date or date.today()
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for demand_lines, material_count in scales:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results.append(
+                executor.submit(
+                    run_benchmark_scale,
+                    demand_lines,
+                    material_count,
+                    planning_date,
+                    database_url,
+                ).result()
+            )
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source_revision": get_source_revision(),
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "planning_date": planning_date.isoformat(),
+        "database": bool(database_url),
+        "results": results,
+    }
+
+
+def write_benchmark(document, output_file=DEFAULT_OUTPUT_FILE):
+    """Write a benchmark document as indented JSON and return its path."""
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    return output_file
+
+
+def main():
+    """Benchmark every configured scale and write the JSON results."""
+    document = run_benchmarks(
+        parse_benchmark_scales(BENCHMARK_SCALES),
+        database_url=BENCHMARK_DATABASE_URL,
+    )
+    print("\nPLANNING BENCHMARK")
+    print("=" * 80)
+    for result in document["results"]:
+        print(
+            f"{result['demand_lines']:>9,} demand lines "
+            f"{result['materials']:>7,} materials "
+            f"{result['total_seconds']:>9.2f}s "
+            f"{result['peak_rss_mb']:>9,.1f} MiB peak RSS"
+        )
+    print(write_benchmark(document))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,9 @@
-"""Explode finished-product demand into dated raw-material requirements."""
+"""Read the demand and BOM snapshot rows that planning explodes.
+
+BOM lines reference either a purchased material or a subassembly product, so
+requirements are exploded in memory by ``src.planning.multilevel`` from the
+rows these queries return rather than by a single-level SQL join.
+"""
 
 from decimal import Decimal, ROUND_HALF_UP
 
@@ -8,125 +13,68 @@ from sqlalchemy import text
 THREE_DECIMALS = Decimal("0.001")
 
 
-MISSING_BOM_QUERY = text(
+OPEN_DEMAND_QUERY = text(
     """
-    SELECT demand.demand_reference, product.product_code, demand.required_date
+    SELECT
+        demand.demand_id,
+        demand.demand_reference,
+        demand.product_id,
+        demand.required_date AS need_date,
+        demand.priority,
+        demand.demand_quantity,
+        product.product_code,
+        product.product_name,
+        product.active_flag AS product_active_flag
     FROM production_demand AS demand
     JOIN products AS product
         ON product.product_id = demand.product_id
     WHERE demand.demand_status IN ('Planned', 'Released')
-      AND NOT EXISTS (
-          SELECT 1
-          FROM bills_of_materials AS bom
-          WHERE bom.product_id = demand.product_id
-            AND bom.bom_status = 'Active'
-            AND demand.required_date >= bom.effective_start_date
-            AND (
-                bom.effective_end_date IS NULL
-                OR demand.required_date <= bom.effective_end_date
-            )
-      )
     ORDER BY demand.required_date, demand.demand_reference
     """
 )
 
 
-BOM_EXPLOSION_QUERY = text(
+ACTIVE_BOM_QUERY = text(
     """
     SELECT
-        demand.demand_id,
-        demand.demand_reference,
-        demand.required_date AS need_date,
-        demand.priority,
-        product.product_code,
-        product.product_name,
-        bom.revision_code AS bom_revision,
-        component.line_number AS bom_line_number,
+        bom.bom_id,
+        bom.product_id,
+        bom.revision_code,
+        bom.effective_start_date,
+        bom.effective_end_date
+    FROM bills_of_materials AS bom
+    WHERE bom.bom_status = 'Active'
+    ORDER BY bom.product_id, bom.effective_start_date, bom.bom_id
+    """
+)
+
+
+ACTIVE_BOM_COMPONENT_QUERY = text(
+    """
+    SELECT
+        component.bom_id,
+        component.line_number,
+        component.component_product_id,
+        subassembly.product_code AS component_product_code,
         material.material_id,
         material.material_code,
         material.material_name,
         material.base_unit_of_measure,
-        demand.demand_quantity,
         component.quantity_per_unit,
-        component.expected_loss_pct,
-        ROUND(
-            demand.demand_quantity
-            * component.quantity_per_unit
-            / (1 - component.expected_loss_pct / 100),
-            3
-        ) AS gross_requirement
-    FROM production_demand AS demand
-    JOIN products AS product
-        ON product.product_id = demand.product_id
-        AND product.active_flag = TRUE
+        component.expected_loss_pct
+    FROM bom_components AS component
     JOIN bills_of_materials AS bom
-        ON bom.product_id = demand.product_id
+        ON bom.bom_id = component.bom_id
         AND bom.bom_status = 'Active'
-        AND demand.required_date >= bom.effective_start_date
-        AND (
-            bom.effective_end_date IS NULL
-            OR demand.required_date <= bom.effective_end_date
-        )
-    JOIN bom_components AS component
-        ON component.bom_id = bom.bom_id
-    JOIN materials AS material
+    LEFT JOIN materials AS material
         ON material.material_id = component.material_id
         AND material.active_flag = TRUE
-    WHERE demand.demand_status IN ('Planned', 'Released')
-    ORDER BY
-        demand.required_date,
-        demand.demand_reference,
-        component.line_number
-    """
-)
-
-
-MATERIAL_REQUIREMENTS_QUERY = text(
-    """
-    WITH exploded_requirements AS (
-        SELECT
-            demand.required_date AS need_date,
-            material.material_id,
-            material.material_code,
-            material.material_name,
-            material.base_unit_of_measure,
-            demand.demand_quantity
-            * component.quantity_per_unit
-            / (1 - component.expected_loss_pct / 100) AS gross_requirement
-        FROM production_demand AS demand
-        JOIN products AS product
-            ON product.product_id = demand.product_id
-            AND product.active_flag = TRUE
-        JOIN bills_of_materials AS bom
-            ON bom.product_id = demand.product_id
-            AND bom.bom_status = 'Active'
-            AND demand.required_date >= bom.effective_start_date
-            AND (
-                bom.effective_end_date IS NULL
-                OR demand.required_date <= bom.effective_end_date
-            )
-        JOIN bom_components AS component
-            ON component.bom_id = bom.bom_id
-        JOIN materials AS material
-            ON material.material_id = component.material_id
-            AND material.active_flag = TRUE
-        WHERE demand.demand_status IN ('Planned', 'Released')
-    )
-    SELECT
-        need_date,
-        material_id,
-        material_code,
-        material_name,
-        base_unit_of_measure,
-        ROUND(SUM(gross_requirement), 3) AS gross_requirement
-    FROM exploded_requirements
-    GROUP BY
-        need_date,
-        material_id,
-        material_code,
-        material_name,
-        base_unit_of_measure
-    ORDER BY need_date, material_code
+    LEFT JOIN products AS subassembly
+        ON subassembly.product_id = component.component_product_id
+        AND subassembly.active_flag = TRUE
+    WHERE material.material_id IS NOT NULL
+       OR subassembly.product_id IS NOT NULL
+    ORDER BY component.bom_id, component.line_number
     """
 )
 
@@ -144,32 +92,3 @@ def calculate_gross_requirement(demand_quantity, quantity_per_unit, loss_pct):
 
     gross_requirement = demand * quantity / (Decimal("1") - loss / 100)
     return gross_requirement.quantize(THREE_DECIMALS, rounding=ROUND_HALF_UP)
-
-
-def validate_bom_coverage(connection):
-    """Fail planning when any open demand lacks an effective active BOM."""
-    missing_boms = [
-        dict(row) for row in connection.execute(MISSING_BOM_QUERY).mappings()
-    ]
-    if missing_boms:
-        references = ", ".join(row["demand_reference"] for row in missing_boms)
-        raise ValueError(f"Open demand is missing an effective BOM: {references}")
-
-
-def get_bom_explosion(engine):
-    """Return detailed demand-to-material requirement rows."""
-    with engine.connect() as connection:
-        validate_bom_coverage(connection)
-        return [
-            dict(row) for row in connection.execute(BOM_EXPLOSION_QUERY).mappings()
-        ]
-
-
-def get_material_requirements(engine):
-    """Return gross requirements aggregated by material and need date."""
-    with engine.connect() as connection:
-        validate_bom_coverage(connection)
-        return [
-            dict(row)
-            for row in connection.execute(MATERIAL_REQUIREMENTS_QUERY).mappings()
-        ]
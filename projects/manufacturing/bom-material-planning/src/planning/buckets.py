@@ -0,0 +1,100 @@
+"""Group far-out planning dates into weekly or monthly buckets.
+
+A bucket specification such as ``daily:28,weekly:182,monthly`` plans daily
+for 28 days after the planning date, in Monday-start weeks until day 182, and
+in calendar months after that. Each requirement and receipt is dated to the
+start of its bucket, so netting and recommendations run once per bucket and
+material is planned to arrive by the first day it may be needed. Buckets never
+start before their tier begins, so tiers do not overlap.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+
+BUCKET_GRANULARITIES = ("daily", "weekly", "monthly")
+
+DAILY_BUCKETS = (("daily", None),)
+
+
+def parse_planning_buckets(value):
+    """Return ``((granularity, horizon_days), ...)`` tiers from a specification.
+
+    Every tier but the last ends ``horizon_days`` after the planning date;
+    horizons must increase and granularities may only get coarser.
+    """
+    tiers = []
+    for part in value.split(","):
+        granularity, _, horizon = part.strip().lower().partition(":")
+        if granularity not in BUCKET_GRANULARITIES:
+            raise ValueError(f"Unsupported planning bucket: {part.strip()}")
+        try:
+            horizon_days = int(horizon) if horizon else None
+        except ValueError:
+            raise ValueError(
+                f"Planning bucket horizon must be whole days: {part.strip()}"
+            ) from None
+        tiers.append((granularity, horizon_days))
+
+    for position, (granularity, horizon_days) in enumerate(tiers):
+        is_last = position == len(tiers) - 1
+        if is_last != (horizon_days is None):
+            raise ValueError(
+                "Every planning bucket except the last needs a horizon: " + value
+            )
+        if position == 0:
+            continue
+        previous_granularity, previous_horizon = tiers[position - 1]
+        if previous_horizon <= 0 or (
+            horizon_days is not None and horizon_days <= previous_horizon
+        ):
+            raise ValueError(f"Planning bucket horizons must increase: {value}")
+        if BUCKET_GRANULARITIES.index(granularity) < BUCKET_GRANULARITIES.index(
+            previous_granularity
+        ):
+            raise ValueError(f"Planning buckets must get coarser: {value}")
+    return tuple(tiers)
+
+
+def get_bucket_start(value, planning_date, buckets):
+    """Return the first date of the bucket that contains ``value``.
+
+    Dates before the planning date fall in the first tier.
+    """
+    offset_days = (value - planning_date).days
+    tier_start = None
+    for granularity, horizon_days in buckets:
+        if horizon_days is None or offset_days < horizon_days:
+            break
+        tier_start = planning_date + timedelta(days=horizon_days)
+
+    if granularity == "daily":
+        return value
+    if granularity == "weekly":
+        bucket_start = value - timedelta(days=value.weekday())
+    else:
+        bucket_start = value.replace(day=1)
+    return bucket_start if tier_start is None else max(bucket_start, tier_start)
+
+
+def bucket_scheduled_receipts(scheduled_receipts, bucket_start):
+    """Return open receipts summed by material and receipt bucket.
+
+    A receipt is available to every requirement in its bucket, matching the
+    bucket's single need date.
+    """
+    receipts = {}
+    quantities = defaultdict(Decimal)
+    for receipt in scheduled_receipts:
+        key = (receipt["material_id"], bucket_start(receipt["expected_receipt_date"]))
+        if key not in receipts:
+            receipts[key] = {**receipt, "expected_receipt_date": key[1]}
+        quantities[key] += receipt["open_receipt_quantity"]
+
+    for key, receipt in receipts.items():
+        receipt["open_receipt_quantity"] = quantities[key]
+    return sorted(
+        receipts.values(),
+        key=lambda row: (row["material_id"], row["expected_receipt_date"]),
+    )
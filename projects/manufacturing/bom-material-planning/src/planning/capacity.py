@@ -0,0 +1,260 @@
+"""Level purchase recommendations against weekly supplier capacity buckets.
+
+A bucket is one supplier's receiving capacity for one material category in
+one Monday-start week. Each recommendation is received in the week of its
+need date; when that bucket is full, the overflow moves to the latest earlier
+week with spare capacity that the supplier lead time still allows, splitting
+the order when one week cannot take all of it. Every split part and leftover
+keeps the source's order multiple and minimum order quantity. Whatever cannot be placed
+stays in the need week as ``Over Capacity``.
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_FLOOR, ROUND_HALF_UP
+import heapq
+
+from sqlalchemy import text
+
+from src.purchasing import round_quantity
+
+from .instrumentation import traced
+from .recommendations import (
+    TWO_DECIMALS,
+    get_urgency_status,
+    number_recommendations,
+)
+
+
+SUPPLIER_CAPACITY_QUERY = text(
+    """
+    SELECT
+        capacity.supplier_id,
+        material.material_id,
+        capacity.material_category,
+        capacity.weekly_capacity_quantity
+    FROM supplier_weekly_capacity AS capacity
+    JOIN materials AS material
+        ON material.material_category = capacity.material_category
+        AND material.active_flag = TRUE
+    ORDER BY capacity.supplier_id, material.material_id
+    """
+)
+
+
+def get_week_start(day):
+    """Return the Monday that starts a date's capacity week."""
+    return day - timedelta(days=day.weekday())
+
+
+def round_down_to_multiple(quantity, multiple):
+    """Return the largest whole number of order multiples within a quantity."""
+    return round_quantity(
+        (quantity / multiple).to_integral_value(rounding=ROUND_FLOOR) * multiple
+    )
+
+
+def get_part_quantity(quantity, capacity, order_multiple, minimum_order_quantity):
+    """Return how much of an order fits in a bucket as a valid split part.
+
+    A part is a whole number of order multiples and at least the minimum order
+    quantity, and it leaves either nothing or at least the minimum behind.
+    Returns zero when no such part fits.
+    """
+    if capacity >= quantity:
+        return quantity
+    multiple = Decimal(str(order_multiple))
+    minimum = Decimal(str(minimum_order_quantity))
+    part_quantity = round_down_to_multiple(capacity, multiple)
+    if quantity - part_quantity < minimum:
+        part_quantity = round_down_to_multiple(quantity - minimum, multiple)
+    if part_quantity <= 0 or part_quantity < minimum:
+        return Decimal("0.000")
+    return part_quantity
+
+
+def get_smallest_part(orders):
+    """Return the smallest quantity any of the orders could place in a week."""
+    return min(
+        min(
+            order["recommended_order_quantity"],
+            max(
+                Decimal(str(order["minimum_order_quantity"])),
+                Decimal(str(order["order_multiple"])),
+            ),
+        )
+        for order in orders
+    )
+
+
+def schedule_bucket_orders(orders, weekly_capacity, planning_date):
+    """Return (recommendation, week, quantity, status) parts for one resource.
+
+    ``orders`` share a supplier and material category. They are placed in
+    need-date order, so earlier needs claim their own weeks first. Weeks with
+    spare capacity sit in a max-heap; a week is popped for good once its
+    spare capacity is below the smallest part any order could place, so each
+    order costs O(log weeks) plus one pop per week it exhausts or cannot use.
+    """
+    orders = sorted(
+        orders,
+        key=lambda row: (row["need_date"], int(row["recommendation_id"][4:])),
+    )
+    earliest_weeks = [
+        get_week_start(
+            planning_date + timedelta(days=order["lead_time_days"])
+        )
+        for order in orders
+    ]
+    next_week = min(
+        min(earliest_weeks), get_week_start(orders[0]["need_date"])
+    )
+    smallest_part = get_smallest_part(orders)
+    remaining_capacity = {}
+    open_weeks = []
+
+    parts = []
+    for order, earliest_week in zip(orders, earliest_weeks):
+        need_week = get_week_start(order["need_date"])
+        while next_week <= need_week:
+            remaining_capacity[next_week] = weekly_capacity
+            heapq.heappush(open_weeks, -next_week.toordinal())
+            next_week += timedelta(days=7)
+
+        quantity = order["recommended_order_quantity"]
+        fragments = []
+        while quantity > 0 and open_weeks:
+            week = date.fromordinal(-open_weeks[0])
+            if week != need_week and week < earliest_week:
+                break
+            heapq.heappop(open_weeks)
+            part_quantity = get_part_quantity(
+                quantity,
+                remaining_capacity[week],
+                order["order_multiple"],
+                order["minimum_order_quantity"],
+            )
+            if part_quantity > 0:
+                parts.append(
+                    (
+                        order,
+                        week,
+                        part_quantity,
+                        (
+                            "Within Capacity"
+                            if week == need_week
+                            else "Shifted Earlier"
+                        ),
+                    )
+                )
+                quantity -= part_quantity
+                remaining_capacity[week] -= part_quantity
+            if remaining_capacity[week] >= smallest_part:
+                fragments.append(week)
+        for week in fragments:
+            heapq.heappush(open_weeks, -week.toordinal())
+
+        if quantity > 0:
+            parts.append((order, need_week, quantity, "Over Capacity"))
+            remaining_capacity[need_week] -= quantity
+    return parts
+
+
+def build_capacity_part(order, week, quantity, status, unit_price, planning_date):
+    """Return one recommendation for the share of an order received in a week."""
+    if status == "Shifted Earlier":
+        planned_receipt_date = week + timedelta(days=6)
+    else:
+        planned_receipt_date = order["need_date"]
+    recommended_order_date = planned_receipt_date - timedelta(
+        days=order["lead_time_days"]
+    )
+    if quantity == order["recommended_order_quantity"]:
+        estimated_cost = order["estimated_purchase_cost"]
+    else:
+        estimated_cost = (quantity * unit_price).quantize(
+            TWO_DECIMALS, rounding=ROUND_HALF_UP
+        )
+    return {
+        **order,
+        "recommended_order_quantity": quantity,
+        "recommended_order_date": recommended_order_date,
+        "urgency_status": get_urgency_status(
+            recommended_order_date, planning_date
+        ),
+        "estimated_purchase_cost": estimated_cost,
+        "planned_receipt_date": planned_receipt_date,
+        "capacity_status": status,
+    }
+
+
+@traced("recommendations.supplier_capacity")
+def apply_supplier_capacity(
+    recommendations,
+    supplier_capacity,
+    sources,
+    planning_date,
+):
+    """Shift or split recommendations so weekly supplier buckets hold.
+
+    ``supplier_capacity`` rows give a supplier's weekly quantity for each
+    material in a capacity-limited category; other recommendations pass
+    through as ``No Capacity Limit``. Every row gains ``planned_receipt_date``
+    and ``capacity_status``, and the result is renumbered so split parts
+    follow their original order. Work is O(n log n) in recommendations.
+    """
+    categories = {}
+    weekly_capacities = {}
+    for row in supplier_capacity:
+        categories[row["material_id"]] = row["material_category"]
+        weekly_capacities[(row["supplier_id"], row["material_category"])] = (
+            round_quantity(row["weekly_capacity_quantity"])
+        )
+    unit_prices = {
+        (source["material_id"], source["supplier_id"]): Decimal(
+            str(source["unit_price"])
+        )
+        for source in sources
+    }
+
+    orders_by_resource = defaultdict(list)
+    parts_by_id = defaultdict(list)
+    for recommendation in recommendations:
+        resource = (
+            recommendation["supplier_id"],
+            categories.get(recommendation["material_id"]),
+        )
+        if resource in weekly_capacities:
+            orders_by_resource[resource].append(recommendation)
+        else:
+            parts_by_id[recommendation["recommendation_id"]].append(
+                {
+                    **recommendation,
+                    "planned_receipt_date": recommendation["need_date"],
+                    "capacity_status": "No Capacity Limit",
+                }
+            )
+
+    for resource, orders in orders_by_resource.items():
+        for order, week, quantity, status in schedule_bucket_orders(
+            orders, weekly_capacities[resource], planning_date
+        ):
+            parts_by_id[order["recommendation_id"]].append(
+                build_capacity_part(
+                    order,
+                    week,
+                    quantity,
+                    status,
+                    unit_prices[(order["material_id"], order["supplier_id"])],
+                    planning_date,
+                )
+            )
+
+    recommendations_by_material = defaultdict(list)
+    for recommendation_id in sorted(parts_by_id, key=lambda key: int(key[4:])):
+        parts = sorted(
+            parts_by_id[recommendation_id],
+            key=lambda row: row["planned_receipt_date"],
+        )
+        recommendations_by_material[parts[0]["material_id"]].extend(parts)
+    return number_recommendations(recommendations_by_material)
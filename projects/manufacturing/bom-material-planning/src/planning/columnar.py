@@ -0,0 +1,180 @@
+"""Write planning datasets as typed Parquet or Arrow IPC files.
+
+PyArrow is an optional dependency used only by this exporter. Quantities and
+prices are written as decimal128 columns at their source scale, dates as
+date32. In Parquet, repeated codes, names, and statuses are
+dictionary-encoded per row group. The Arrow IPC file format allows only one
+dictionary per column for the whole file, so Arrow exports write them as plain
+strings.
+Types are inferred batch by batch. When a later batch fills a column that was
+empty so far, or needs a wider decimal scale, the rows already written are
+rewritten under the unified schema.
+"""
+
+from datetime import date
+from decimal import Decimal
+from itertools import islice
+
+
+COLUMNAR_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+DICTIONARY_SUFFIXES = ("_code", "_name", "_status", "_unit_of_measure")
+DICTIONARY_COLUMNS = {"priority", "bom_revision"}
+DEFAULT_BATCH_SIZE = 50_000
+
+
+def import_pyarrow():
+    """Import PyArrow or explain how to enable columnar exports."""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError(
+            "Columnar planning exports require pyarrow: "
+            "python -m pip install pyarrow"
+        ) from error
+    return pyarrow
+
+
+def is_dictionary_column(column):
+    """Return whether a string column repeats enough to dictionary-encode."""
+    return column.endswith(DICTIONARY_SUFFIXES) or column in DICTIONARY_COLUMNS
+
+
+def infer_column_type(pa, column, values, dictionary_encode=True):
+    """Return the Arrow type for one column from its Python values."""
+    sample = next((value for value in values if value is not None), None)
+    if sample is None:
+        return pa.null()
+    if isinstance(sample, Decimal):
+        scale = max(
+            -value.as_tuple().exponent for value in values if value is not None
+        )
+        return pa.decimal128(38, max(scale, 0))
+    if isinstance(sample, bool):
+        return pa.bool_()
+    if isinstance(sample, int):
+        return pa.int64()
+    if isinstance(sample, date):
+        return pa.date32()
+    if dictionary_encode and is_dictionary_column(column):
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+
+def infer_schema(pa, rows, dictionary_encode=True):
+    """Return an Arrow schema for a batch of planning dictionaries."""
+    return pa.schema(
+        [
+            pa.field(
+                column,
+                infer_column_type(
+                    pa,
+                    column,
+                    [row[column] for row in rows],
+                    dictionary_encode,
+                ),
+            )
+            for column in rows[0]
+        ]
+    )
+
+
+def unify_column_types(pa, column, current_type, batch_type):
+    """Return a type that holds both a column's written and new values."""
+    if current_type == batch_type or pa.types.is_null(batch_type):
+        return current_type
+    if pa.types.is_null(current_type):
+        return batch_type
+    if pa.types.is_decimal(current_type) and pa.types.is_decimal(batch_type):
+        return pa.decimal128(38, max(current_type.scale, batch_type.scale))
+    raise ValueError(
+        f"Column {column} changes type from {current_type} to {batch_type}"
+    )
+
+
+def unify_schema(pa, schema, batch_schema):
+    """Return ``schema`` widened to also hold a later batch's values."""
+    return pa.schema(
+        [
+            pa.field(
+                field.name,
+                unify_column_types(
+                    pa,
+                    field.name,
+                    field.type,
+                    batch_schema.field(field.name).type,
+                ),
+            )
+            for field in schema
+        ]
+    )
+
+
+def open_writer(pa, file_path, file_format, schema):
+    """Open a Parquet or Arrow IPC writer for ``schema``."""
+    if file_format == "parquet":
+        return pa.parquet.ParquetWriter(file_path, schema)
+    return pa.ipc.new_file(str(file_path), schema)
+
+
+def read_written_table(pa, file_path, file_format):
+    """Read back every row written to a closed columnar file."""
+    if file_format == "parquet":
+        return pa.parquet.read_table(file_path)
+    with pa.ipc.open_file(file_path) as reader:
+        return reader.read_all()
+
+
+def rows_to_batch(pa, rows, schema):
+    """Convert planning dictionaries into an Arrow record batch."""
+    arrays = []
+    for field in schema:
+        values = [row[field.name] for row in rows]
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_columnar(
+    file_path,
+    rows,
+    file_format="parquet",
+    batch_size=DEFAULT_BATCH_SIZE,
+):
+    """Write dictionaries to a columnar file and return whether it was created.
+
+    ``rows`` may be a generator. Rows are converted ``batch_size`` at a time;
+    the first batch defines the schema and later batches may widen it.
+    """
+    if file_format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unsupported columnar format: {file_format}")
+    pa = import_pyarrow()
+
+    rows = iter(rows)
+    batch = list(islice(rows, batch_size))
+    if not batch:
+        return False
+
+    dictionary_encode = file_format == "parquet"
+    schema = infer_schema(pa, batch, dictionary_encode)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = open_writer(pa, file_path, file_format, schema)
+    try:
+        while batch:
+            unified_schema = unify_schema(
+                pa, schema, infer_schema(pa, batch, dictionary_encode)
+            )
+            if unified_schema != schema:
+                writer.close()
+                written = read_written_table(pa, file_path, file_format)
+                schema = unified_schema
+                writer = open_writer(pa, file_path, file_format, schema)
+                writer.write_table(written.cast(schema))
+            writer.write_batch(rows_to_batch(pa, batch, schema))
+            batch = list(islice(rows, batch_size))
+    finally:
+        writer.close()
+    return True
@@ -9,12 +9,19 @@ import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 from sqlalchemy import create_engine
 
-from src.config import DATABASE_URL
-
-from .bom_explosion import get_material_requirements
-from .netting import get_netted_material_requirements
-from .recommendations import get_purchase_recommendations
+from src.config import (
+    DATABASE_URL,
+    PLAN_CACHE,
+    PLANNING_BUCKETS,
+    PLANNING_LOT_SIZING,
+    PLANNING_SOURCING,
+    PLANNING_SUPPLIER_CAPACITY,
+    PLANNING_WORKERS,
+)
+
+from .plan_cache import DEFAULT_CACHE_DIRECTORY, load_planning_session
 from .report import summarize_plan
+from .session import PlanningSession
 
 
 OUTPUT_DIRECTORY = Path(__file__).resolve().parents[2] / "docs" / "images"
@@ -157,11 +164,32 @@ def main():
     configure_plot_style()
     planning_date = date.today()
     engine = create_engine(DATABASE_URL)
-    material_requirements = get_material_requirements(engine)
-    netted_requirements = get_netted_material_requirements(engine)
-    recommendations = get_purchase_recommendations(engine, planning_date)
+    if PLAN_CACHE:
+        session = load_planning_session(
+            engine,
+            planning_date,
+            PLANNING_WORKERS,
+            PLANNING_SOURCING,
+            PLANNING_LOT_SIZING,
+            PLANNING_SUPPLIER_CAPACITY,
+            PLANNING_BUCKETS,
+            DEFAULT_CACHE_DIRECTORY,
+        )
+    else:
+        session = PlanningSession.from_database(
+            engine,
+            planning_date,
+            PLANNING_WORKERS,
+            PLANNING_SOURCING,
+            PLANNING_LOT_SIZING,
+            PLANNING_SUPPLIER_CAPACITY,
+            PLANNING_BUCKETS,
+        )
+    recommendations = session.recommendations
     overall_summary, material_summary = summarize_plan(
-        material_requirements, netted_requirements, recommendations
+        session.material_requirements,
+        session.netted_requirements,
+        recommendations,
     )
 
     created_files = [
@@ -0,0 +1,359 @@
+"""Re-net only the materials touched by source changes since the last run."""
+
+from collections import defaultdict
+
+from sqlalchemy import bindparam, create_engine, text
+
+from src.config import DATABASE_URL
+
+from .bom_explosion import (
+    ACTIVE_BOM_COMPONENT_QUERY,
+    ACTIVE_BOM_QUERY,
+    OPEN_DEMAND_QUERY,
+)
+from .multilevel import explode_material_requirements
+from .netting import (
+    INVENTORY_SUPPLY_QUERY,
+    SCHEDULED_RECEIPTS_QUERY,
+    net_material_requirements,
+)
+from .session import PlanningSession, read_planning_snapshot
+
+
+STRUCTURE_TABLES = {"bills_of_materials", "bom_components"}
+
+NETTED_PLAN_COLUMNS = (
+    "material_id",
+    "need_date",
+    "material_code",
+    "material_name",
+    "base_unit_of_measure",
+    "gross_requirement",
+    "receipts_available_by_date",
+    "projected_supply_before_requirement",
+    "supply_applied",
+    "net_requirement",
+    "projected_supply_after_requirement",
+)
+
+
+PENDING_CHANGES_QUERY = text(
+    """
+    SELECT change_id, source_table, material_id, product_id
+    FROM planning_change_log
+    ORDER BY change_id
+    """
+)
+
+PERSISTED_PLAN_QUERY = text(
+    f"""
+    SELECT {", ".join(NETTED_PLAN_COLUMNS)}
+    FROM netted_material_plan
+    ORDER BY need_date, material_code
+    """
+)
+
+PERSISTED_RUN_EXISTS_QUERY = text("SELECT EXISTS (SELECT 1 FROM planning_runs)")
+
+DEMAND_FOR_PRODUCTS_QUERY = text(
+    f"""
+    SELECT *
+    FROM ({OPEN_DEMAND_QUERY.text}) AS demand
+    WHERE demand.product_id IN :product_ids
+    """
+).bindparams(bindparam("product_ids", expanding=True))
+
+INVENTORY_FOR_MATERIALS_QUERY = text(
+    f"""
+    SELECT *
+    FROM ({INVENTORY_SUPPLY_QUERY.text}) AS supply
+    WHERE supply.material_id IN :material_ids
+    """
+).bindparams(bindparam("material_ids", expanding=True))
+
+RECEIPTS_FOR_MATERIALS_QUERY = text(
+    f"""
+    SELECT *
+    FROM ({SCHEDULED_RECEIPTS_QUERY.text}) AS receipt
+    WHERE receipt.material_id IN :material_ids
+    """
+).bindparams(bindparam("material_ids", expanding=True))
+
+INSERT_PLANNING_RUN = text(
+    """
+    INSERT INTO planning_runs (run_mode, changes_applied, materials_replanned)
+    VALUES (:run_mode, :changes_applied, :materials_replanned)
+    RETURNING planning_run_id
+    """
+)
+
+DELETE_ALL_PLAN_ROWS = text("DELETE FROM netted_material_plan")
+
+DELETE_MATERIAL_PLAN_ROWS = text(
+    "DELETE FROM netted_material_plan WHERE material_id IN :material_ids"
+).bindparams(bindparam("material_ids", expanding=True))
+
+INSERT_PLAN_ROWS = text(
+    f"""
+    INSERT INTO netted_material_plan ({", ".join(NETTED_PLAN_COLUMNS)}, planning_run_id)
+    VALUES ({", ".join(f":{column}" for column in NETTED_PLAN_COLUMNS)}, :planning_run_id)
+    """
+)
+
+DELETE_APPLIED_CHANGES = text(
+    "DELETE FROM planning_change_log WHERE change_id IN :change_ids"
+).bindparams(bindparam("change_ids", expanding=True))
+
+
+def index_bom_graph(bom_headers, bom_components):
+    """Return parent-to-child and child-to-parent links for all BOM lines.
+
+    Products and materials are distinguished by ``("product", id)`` and
+    ``("material", id)`` nodes.
+    """
+    product_by_bom = {bom["bom_id"]: bom["product_id"] for bom in bom_headers}
+    children = defaultdict(set)
+    parents = defaultdict(set)
+    for component in bom_components:
+        parent_id = product_by_bom.get(component["bom_id"])
+        if parent_id is None:
+            continue
+        if component.get("component_product_id") is not None:
+            child = ("product", component["component_product_id"])
+        else:
+            child = ("material", component["material_id"])
+        children[("product", parent_id)].add(child)
+        parents[child].add(("product", parent_id))
+    return children, parents
+
+
+def walk_graph(start_nodes, links):
+    """Return every node reachable from the start nodes through the links."""
+    reached = set(start_nodes)
+    pending = list(start_nodes)
+    while pending:
+        for linked_node in links.get(pending.pop(), ()):
+            if linked_node not in reached:
+                reached.add(linked_node)
+                pending.append(linked_node)
+    return reached
+
+
+def find_affected_materials(changes, bom_headers, bom_components):
+    """Return material IDs whose plan may differ after the given changes.
+
+    Demand changes affect every material below the product in any active BOM.
+    ``None`` means BOM structure changed and the whole plan must be rebuilt.
+    """
+    if any(change["source_table"] in STRUCTURE_TABLES for change in changes):
+        return None
+
+    children, _ = index_bom_graph(bom_headers, bom_components)
+    changed_nodes = set()
+    for change in changes:
+        if change["material_id"] is not None:
+            changed_nodes.add(("material", change["material_id"]))
+        elif change["product_id"] is not None:
+            changed_nodes.add(("product", change["product_id"]))
+
+    return {
+        node_id
+        for node_type, node_id in walk_graph(changed_nodes, children)
+        if node_type == "material"
+    }
+
+
+def find_where_used_products(material_ids, bom_headers, bom_components):
+    """Return products whose active BOM tree uses any of the materials."""
+    _, parents = index_bom_graph(bom_headers, bom_components)
+    return {
+        node_id
+        for node_type, node_id in walk_graph(
+            {("material", material_id) for material_id in material_ids},
+            parents,
+        )
+        if node_type == "product"
+    }
+
+
+def merge_netted_requirements(previous_rows, refreshed_rows, material_ids):
+    """Replace the affected materials' rows in a previously netted plan."""
+    retained_rows = [
+        row for row in previous_rows if row["material_id"] not in material_ids
+    ]
+    return sorted(
+        retained_rows + refreshed_rows,
+        key=lambda row: (row["need_date"], row["material_code"]),
+    )
+
+
+def replan_materials(connection, material_ids, bom_headers, bom_components):
+    """Explode and net only the given materials from filtered source reads."""
+    product_ids = find_where_used_products(
+        material_ids, bom_headers, bom_components
+    )
+    demand_rows = []
+    if product_ids:
+        demand_rows = [
+            dict(row)
+            for row in connection.execute(
+                DEMAND_FOR_PRODUCTS_QUERY, {"product_ids": sorted(product_ids)}
+            ).mappings()
+        ]
+    parameters = {"material_ids": sorted(material_ids)}
+    requirements = [
+        row
+        for row in explode_material_requirements(
+            demand_rows, bom_headers, bom_components
+        )
+        if row["material_id"] in material_ids
+    ]
+    return net_material_requirements(
+        requirements,
+        [
+            dict(row)
+            for row in connection.execute(
+                INVENTORY_FOR_MATERIALS_QUERY, parameters
+            ).mappings()
+        ],
+        [
+            dict(row)
+            for row in connection.execute(
+                RECEIPTS_FOR_MATERIALS_QUERY, parameters
+            ).mappings()
+        ],
+    )
+
+
+def read_incremental_plan(engine):
+    """Read pending changes and re-net affected materials in one snapshot.
+
+    Returns the merged netted plan, the changes applied, the re-planned
+    material IDs (``None`` for a full plan), and the refreshed rows.
+    """
+    with engine.connect() as connection:
+        connection.execution_options(
+            isolation_level="REPEATABLE READ",
+            postgresql_readonly=True,
+        )
+        with connection.begin():
+            changes = [
+                dict(row)
+                for row in connection.execute(PENDING_CHANGES_QUERY).mappings()
+            ]
+            has_previous_plan = connection.execute(
+                PERSISTED_RUN_EXISTS_QUERY
+            ).scalar_one()
+            bom_headers = [
+                dict(row) for row in connection.execute(ACTIVE_BOM_QUERY).mappings()
+            ]
+            bom_components = [
+                dict(row)
+                for row in connection.execute(ACTIVE_BOM_COMPONENT_QUERY).mappings()
+            ]
+            material_ids = None
+            if has_previous_plan:
+                material_ids = find_affected_materials(
+                    changes, bom_headers, bom_components
+                )
+
+            if material_ids is None:
+                return None, changes, None, None
+
+            previous_rows = [
+                dict(row)
+                for row in connection.execute(PERSISTED_PLAN_QUERY).mappings()
+            ]
+            refreshed_rows = []
+            if material_ids:
+                refreshed_rows = replan_materials(
+                    connection, material_ids, bom_headers, bom_components
+                )
+
+    return (
+        merge_netted_requirements(previous_rows, refreshed_rows, material_ids),
+        changes,
+        material_ids,
+        refreshed_rows,
+    )
+
+
+def persist_netted_plan(engine, changes, material_ids, refreshed_rows):
+    """Store refreshed plan rows and remove the change-log rows they applied."""
+    run_mode = "Full" if material_ids is None else "Incremental"
+    replanned_count = (
+        len({row["material_id"] for row in refreshed_rows})
+        if material_ids is None
+        else len(material_ids)
+    )
+    with engine.begin() as connection:
+        planning_run_id = connection.execute(
+            INSERT_PLANNING_RUN,
+            {
+                "run_mode": run_mode,
+                "changes_applied": len(changes),
+                "materials_replanned": replanned_count,
+            },
+        ).scalar_one()
+        if material_ids is None:
+            connection.execute(DELETE_ALL_PLAN_ROWS)
+        elif material_ids:
+            connection.execute(
+                DELETE_MATERIAL_PLAN_ROWS, {"material_ids": sorted(material_ids)}
+            )
+        if refreshed_rows:
+            connection.execute(
+                INSERT_PLAN_ROWS,
+                [
+                    {
+                        **{column: row[column] for column in NETTED_PLAN_COLUMNS},
+                        "planning_run_id": planning_run_id,
+                    }
+                    for row in refreshed_rows
+                ],
+            )
+        if changes:
+            connection.execute(
+                DELETE_APPLIED_CHANGES,
+                {"change_ids": [change["change_id"] for change in changes]},
+            )
+    return planning_run_id
+
+
+def run_incremental_netting(engine):
+    """Return the current netted plan, re-netting only changed materials.
+
+    The first run, and any run after a BOM structure change, nets the full
+    plan from a ``PlanningSession`` snapshot. Change-log rows are deleted only
+    after their effects are stored, so changes committed during a run are
+    applied by the next one.
+    """
+    netted_requirements, changes, material_ids, refreshed_rows = (
+        read_incremental_plan(engine)
+    )
+    if netted_requirements is None:
+        netted_requirements = PlanningSession(
+            read_planning_snapshot(engine)
+        ).netted_requirements
+        refreshed_rows = netted_requirements
+
+    persist_netted_plan(engine, changes, material_ids, refreshed_rows)
+    return netted_requirements, material_ids
+
+
+def main():
+    """Refresh the persisted netted plan and report how much was re-planned."""
+    netted_requirements, material_ids = run_incremental_netting(
+        create_engine(DATABASE_URL)
+    )
+    if material_ids is None:
+        print(f"Full re-plan: {len(netted_requirements)} netted rows stored.")
+    else:
+        print(
+            f"Incremental re-plan: {len(material_ids)} materials refreshed, "
+            f"{len(netted_requirements)} netted rows current."
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Record stage-level timing spans for a planning run.
+
+Spans measure wall time, CPU time, rows in and out, and database round trips
+for each query and in-Python stage. They are recorded only while a
+``RunLog`` is active, so library callers, tests, and worker processes pay
+nothing. A finished run log is written as OpenTelemetry-style JSON.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import json
+import secrets
+import time
+
+from sqlalchemy import event
+
+
+ACTIVE_RUN_LOG = ContextVar("active_run_log", default=None)
+
+
+class RunLog:
+    """Collect the spans of one planning run.
+
+    Engines passed to ``track_engine`` count every cursor execution as a
+    database round trip while the run log is active.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self.open_spans = []
+        self.round_trips = 0
+        self.engines = []
+        self.token = None
+        # One bound method, so the same listener can be removed later.
+        self.count_round_trip = self._count_round_trip
+
+    def _count_round_trip(self, *args, **kwargs):
+        self.round_trips += 1
+
+    def track_engine(self, engine):
+        """Count database round trips made through ``engine``."""
+        event.listen(engine, "before_cursor_execute", self.count_round_trip)
+        self.engines.append(engine)
+
+    def __enter__(self):
+        self.token = ACTIVE_RUN_LOG.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        ACTIVE_RUN_LOG.reset(self.token)
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self.count_round_trip)
+        self.engines = []
+
+    def to_dict(self):
+        """Return the run log as an OpenTelemetry-style span document."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "spans": [
+                {
+                    "trace_id": self.trace_id,
+                    "span_id": record["span_id"],
+                    "parent_span_id": record["parent_span_id"],
+                    "name": record["name"],
+                    "start_time_unix_nano": record["start_time_unix_nano"],
+                    "end_time_unix_nano": record["end_time_unix_nano"],
+                    "status": record["status"],
+                    "attributes": {
+                        "wall_seconds": record["wall_seconds"],
+                        "cpu_seconds": record["cpu_seconds"],
+                        "rows_in": record["rows_in"],
+                        "rows_out": record["rows_out"],
+                        "db_round_trips": record["db_round_trips"],
+                    },
+                }
+                for record in sorted(
+                    self.spans, key=lambda record: record["start_time_unix_nano"]
+                )
+            ],
+        }
+
+    def write(self, output_file):
+        """Write the run log as JSON and return its path."""
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file.write_text(
+            json.dumps(self.to_dict(), indent=2) + "\n", encoding="utf-8"
+        )
+        return output_file
+
+
+@contextmanager
+def span(name, rows_in=None):
+    """Time the enclosed block as one span of the active run log.
+
+    Yields a mutable record; set ``record["rows_out"]`` inside the block.
+    Without an active run log the record is discarded.
+    """
+    run_log = ACTIVE_RUN_LOG.get()
+    if run_log is None:
+        yield {}
+        return
+
+    record = {
+        "name": name,
+        "span_id": secrets.token_hex(8),
+        "parent_span_id": (
+            run_log.open_spans[-1]["span_id"] if run_log.open_spans else None
+        ),
+        "start_time_unix_nano": time.time_ns(),
+        "status": "ok",
+        "rows_in": rows_in,
+        "rows_out": None,
+    }
+    run_log.open_spans.append(record)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    round_trips_start = run_log.round_trips
+    try:
+        yield record
+    except BaseException:
+        record["status"] = "error"
+        raise
+    finally:
+        record["end_time_unix_nano"] = time.time_ns()
+        record["wall_seconds"] = round(time.perf_counter() - wall_start, 6)
+        record["cpu_seconds"] = round(time.process_time() - cpu_start, 6)
+        record["db_round_trips"] = run_log.round_trips - round_trips_start
+        run_log.open_spans.pop()
+        run_log.spans.append(record)
+
+
+def count_rows(rows):
+    """Return ``len(rows)`` for sized results, otherwise None."""
+    try:
+        return len(rows)
+    except TypeError:
+        return None
+
+
+def traced(name):
+    """Decorate a stage so each call is recorded as a span.
+
+    Rows in are the length of the first positional argument and rows out the
+    length of the result, when either is sized.
+    """
+
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            rows_in = count_rows(args[0]) if args else None
+            with span(name, rows_in) as record:
+                result = function(*args, **kwargs)
+                record["rows_out"] = count_rows(result)
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def iter_counted(rows, record):
+    """Yield ``rows`` while counting them into ``record["rows_out"]``."""
+    record["rows_out"] = 0
+    for row in rows:
+        record["rows_out"] += 1
+        yield row
@@ -0,0 +1,199 @@
+"""Group each material's dated shortages into fewer, larger order lots.
+
+A lot is ordered for its first need date and covers every shortage through
+``covered_through_date``. Policies only decide the grouping; MOQ, order
+multiples, and excess carry-forward are still applied by the recommendation
+engine to each lot.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+import math
+
+from src.purchasing import round_quantity
+
+from .instrumentation import traced
+
+
+LOT_SIZING_RULES = {
+    # Cost of placing one purchase-order line.
+    "ordering_cost": Decimal("75.00"),
+    # Annual cost of holding one unit, as a fraction of its unit price.
+    "annual_holding_rate": Decimal("0.24"),
+    # Calendar days covered by one fixed-period lot.
+    "period_days": 14,
+    # Most shortage dates one Wagner-Whitin lot may cover.
+    "window": 12,
+}
+
+
+def get_daily_holding_cost(unit_price, rules):
+    """Return the cost of holding one unit for one day."""
+    return float(unit_price) * float(rules["annual_holding_rate"]) / 365
+
+
+def get_daily_demand(shortages):
+    """Return average shortage per calendar day across the shortage span."""
+    span_days = (shortages[-1]["need_date"] - shortages[0]["need_date"]).days + 1
+    return sum(float(row["net_requirement"]) for row in shortages) / span_days
+
+
+def calculate_economic_order_quantity(shortages, unit_price, rules):
+    """Return the EOQ from average daily shortage and holding cost."""
+    holding_cost = get_daily_holding_cost(unit_price, rules)
+    if holding_cost <= 0:
+        return math.inf
+    daily_demand = get_daily_demand(shortages)
+    return math.sqrt(
+        2 * daily_demand * float(rules["ordering_cost"]) / holding_cost
+    )
+
+
+def group_by_period(shortages, period_days):
+    """Group shortages needed within ``period_days`` of each lot's start."""
+    groups = []
+    for row in shortages:
+        lot_start = groups[-1][0]["need_date"] if groups else None
+        if lot_start and (row["need_date"] - lot_start).days < period_days:
+            groups[-1].append(row)
+        else:
+            groups.append([row])
+    return groups
+
+
+def group_lot_for_lot(shortages, unit_price, rules):
+    """Order each shortage separately."""
+    return [[row] for row in shortages]
+
+
+def group_fixed_period(shortages, unit_price, rules):
+    """Cover a fixed number of calendar days with each lot."""
+    return group_by_period(shortages, rules["period_days"])
+
+
+def group_period_order_quantity(shortages, unit_price, rules):
+    """Cover the days of average shortage that one EOQ would supply."""
+    economic_quantity = calculate_economic_order_quantity(
+        shortages, unit_price, rules
+    )
+    daily_demand = get_daily_demand(shortages)
+    if math.isinf(economic_quantity) or daily_demand <= 0:
+        return [shortages]
+    return group_by_period(
+        shortages, max(round(economic_quantity / daily_demand), 1)
+    )
+
+
+def group_economic_order_quantity(shortages, unit_price, rules):
+    """Add consecutive shortages to a lot until it reaches the EOQ."""
+    economic_quantity = calculate_economic_order_quantity(
+        shortages, unit_price, rules
+    )
+    groups = []
+    lot_quantity = 0.0
+    for row in shortages:
+        if groups and lot_quantity < economic_quantity:
+            groups[-1].append(row)
+        else:
+            groups.append([row])
+            lot_quantity = 0.0
+        lot_quantity += float(row["net_requirement"])
+    return groups
+
+
+def group_wagner_whitin(shortages, unit_price, rules):
+    """Return the least-cost grouping with lots of at most ``window`` dates.
+
+    ``cost[j]`` is the cheapest plan for the first ``j`` shortages. A lot from
+    shortage ``i`` through ``j`` costs one order plus holding each quantity
+    from date ``i``; prefix sums make that O(1), so the dynamic program is
+    O(n * window) per material.
+    """
+    holding_cost = get_daily_holding_cost(unit_price, rules)
+    ordering_cost = float(rules["ordering_cost"])
+    window = max(int(rules["window"]), 1)
+    first_date = shortages[0]["need_date"]
+    days = [(row["need_date"] - first_date).days for row in shortages]
+    quantities = [float(row["net_requirement"]) for row in shortages]
+
+    quantity_sums = [0.0]
+    day_quantity_sums = [0.0]
+    for day, quantity in zip(days, quantities):
+        quantity_sums.append(quantity_sums[-1] + quantity)
+        day_quantity_sums.append(day_quantity_sums[-1] + day * quantity)
+
+    cost = [0.0] + [math.inf] * len(shortages)
+    lot_start = [0] * (len(shortages) + 1)
+    for end in range(1, len(shortages) + 1):
+        for start in range(max(end - window, 0), end):
+            held_quantity_days = (
+                day_quantity_sums[end] - day_quantity_sums[start]
+            ) - days[start] * (quantity_sums[end] - quantity_sums[start])
+            candidate = (
+                cost[start] + ordering_cost + holding_cost * held_quantity_days
+            )
+            if candidate < cost[end]:
+                cost[end] = candidate
+                lot_start[end] = start
+
+    groups = []
+    end = len(shortages)
+    while end > 0:
+        start = lot_start[end]
+        groups.append(shortages[start:end])
+        end = start
+    return groups[::-1]
+
+
+LOT_SIZING_POLICIES = {
+    "lot_for_lot": group_lot_for_lot,
+    "fixed_period": group_fixed_period,
+    "period_order_quantity": group_period_order_quantity,
+    "economic_order_quantity": group_economic_order_quantity,
+    "wagner_whitin": group_wagner_whitin,
+}
+
+
+def merge_lot(rows):
+    """Return one netted-style row that orders a group of shortages."""
+    return {
+        **rows[0],
+        "net_requirement": round_quantity(
+            sum((row["net_requirement"] for row in rows), Decimal("0"))
+        ),
+        "covered_through_date": rows[-1]["need_date"],
+    }
+
+
+@traced("recommendations.lot_sizing")
+def apply_lot_sizing(netted_requirements, sources, policy, rules=None):
+    """Return netted shortages grouped into lots by a lot-sizing policy.
+
+    ``sources`` supplies each material's unit price for holding costs; the
+    cheapest source is used when a material has several. Rows without a
+    shortage are dropped, and lots keep the netted plan's row order.
+    """
+    if policy not in LOT_SIZING_POLICIES:
+        raise ValueError(f"Unsupported lot-sizing policy: {policy}")
+    rules = {**LOT_SIZING_RULES, **(rules or {})}
+
+    unit_prices = {}
+    for source in sources:
+        material_id = source["material_id"]
+        price = Decimal(str(source["unit_price"]))
+        if material_id not in unit_prices or price < unit_prices[material_id]:
+            unit_prices[material_id] = price
+
+    shortages_by_material = defaultdict(list)
+    for row in netted_requirements:
+        if round_quantity(row["net_requirement"]) > 0:
+            shortages_by_material[row["material_id"]].append(row)
+
+    lots = []
+    for material_id, shortages in shortages_by_material.items():
+        shortages.sort(key=lambda row: row["need_date"])
+        groups = LOT_SIZING_POLICIES[policy](
+            shortages, unit_prices.get(material_id, Decimal("0")), rules
+        )
+        lots.extend(merge_lot(group) for group in groups)
+    return sorted(lots, key=lambda row: (row["need_date"], row["material_code"]))
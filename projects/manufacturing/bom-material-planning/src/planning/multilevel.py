@@ -0,0 +1,291 @@
+"""Explode multi-level BOMs in memory using low-level-code ordering.
+
+A BOM line references either a purchased material or a subassembly product
+with its own effective BOM. Low-level codes are calculated once, then demand is
+exploded one level at a time so each product and need date is expanded exactly
+once, however many parents use it.
+"""
+
+from collections import defaultdict, deque
+from decimal import Decimal, ROUND_HALF_UP
+
+from .bom_explosion import THREE_DECIMALS
+from .instrumentation import traced
+
+
+def is_bom_effective(bom, need_date):
+    """Return whether a BOM revision applies to a need date."""
+    return bom["effective_start_date"] <= need_date and (
+        bom["effective_end_date"] is None or need_date <= bom["effective_end_date"]
+    )
+
+
+def index_bom_structure(bom_headers, bom_components):
+    """Group BOM headers by product and components by BOM in line order."""
+    boms_by_product = defaultdict(list)
+    for bom in bom_headers:
+        boms_by_product[bom["product_id"]].append(bom)
+
+    components_by_bom = defaultdict(list)
+    for component in bom_components:
+        components_by_bom[component["bom_id"]].append(component)
+    for components in components_by_bom.values():
+        components.sort(key=lambda row: row["line_number"])
+
+    return boms_by_product, components_by_bom
+
+
+def calculate_low_level_codes(bom_headers, bom_components):
+    """Return the deepest BOM level at which each product is used.
+
+    Products that are never a subassembly have code 0. A subassembly's code is
+    one more than its deepest parent. Any product cycle raises ValueError.
+    """
+    product_by_bom = {bom["bom_id"]: bom["product_id"] for bom in bom_headers}
+    children_by_parent = defaultdict(set)
+    product_codes = {}
+    for component in bom_components:
+        child_id = component.get("component_product_id")
+        if child_id is None or component["bom_id"] not in product_by_bom:
+            continue
+        children_by_parent[product_by_bom[component["bom_id"]]].add(child_id)
+        product_codes[child_id] = component["component_product_code"]
+
+    products = set(product_by_bom.values()) | set(product_codes)
+    parent_counts = dict.fromkeys(products, 0)
+    for children in children_by_parent.values():
+        for child_id in children:
+            parent_counts[child_id] += 1
+
+    low_level_codes = dict.fromkeys(products, 0)
+    ready = deque(
+        product_id for product_id, count in parent_counts.items() if count == 0
+    )
+    ordered_count = 0
+    while ready:
+        parent_id = ready.popleft()
+        ordered_count += 1
+        for child_id in children_by_parent.get(parent_id, ()):
+            low_level_codes[child_id] = max(
+                low_level_codes[child_id], low_level_codes[parent_id] + 1
+            )
+            parent_counts[child_id] -= 1
+            if parent_counts[child_id] == 0:
+                ready.append(child_id)
+
+    if ordered_count < len(products):
+        cyclic_codes = sorted(
+            str(product_codes.get(product_id, product_id))
+            for product_id, count in parent_counts.items()
+            if count > 0
+        )
+        raise ValueError(
+            "BOM structure contains a cycle through: " + ", ".join(cyclic_codes)
+        )
+    return low_level_codes
+
+
+def find_missing_boms(demand_rows, bom_headers):
+    """Return open demand rows without an effective active BOM."""
+    boms_by_product = defaultdict(list)
+    for bom in bom_headers:
+        boms_by_product[bom["product_id"]].append(bom)
+
+    return [
+        demand
+        for demand in demand_rows
+        if not any(
+            is_bom_effective(bom, demand["need_date"])
+            for bom in boms_by_product.get(demand["product_id"], [])
+        )
+    ]
+
+
+def validate_demand_coverage(demand_rows, bom_headers):
+    """Fail planning when any open demand lacks an effective active BOM."""
+    missing_boms = find_missing_boms(demand_rows, bom_headers)
+    if missing_boms:
+        references = ", ".join(row["demand_reference"] for row in missing_boms)
+        raise ValueError(f"Open demand is missing an effective BOM: {references}")
+
+
+def get_effective_boms(boms_by_product, product_id, product_code, need_date):
+    """Return a subassembly's effective BOMs or fail when none applies."""
+    effective_boms = [
+        bom for bom in boms_by_product.get(product_id, [])
+        if is_bom_effective(bom, need_date)
+    ]
+    if not effective_boms:
+        raise ValueError(
+            f"Subassembly {product_code} is missing an effective BOM "
+            f"on {need_date}"
+        )
+    return effective_boms
+
+
+def calculate_line_quantity(parent_quantity, component):
+    """Return the unrounded input quantity for one BOM line."""
+    return (
+        parent_quantity
+        * Decimal(str(component["quantity_per_unit"]))
+        / (Decimal("1") - Decimal(str(component["expected_loss_pct"])) / 100)
+    )
+
+
+@traced("bom_explosion")
+def explode_material_requirements(
+    demand_rows, bom_headers, bom_components, bucket_start=None
+):
+    """Aggregate multi-level gross requirements by material and need date.
+
+    Open demand is bucketed by product and need date, then exploded in
+    low-level-code order. Each level's BOM is selected by the need date, and
+    unrounded quantities are carried through every level and rounded once per
+    material and date. Work is linear in BOM lines times product-date buckets.
+    With ``bucket_start``, material totals are kept per planning bucket and
+    dated to the bucket's first day; BOMs are still selected by demand date.
+    """
+    validate_demand_coverage(demand_rows, bom_headers)
+    low_level_codes = calculate_low_level_codes(bom_headers, bom_components)
+    boms_by_product, components_by_bom = index_bom_structure(
+        bom_headers, bom_components
+    )
+
+    buckets_by_level = defaultdict(lambda: defaultdict(Decimal))
+    product_codes = {}
+    for demand in demand_rows:
+        if not demand["product_active_flag"]:
+            continue
+        product_id = demand["product_id"]
+        product_codes[product_id] = demand["product_code"]
+        level = low_level_codes.get(product_id, 0)
+        buckets_by_level[level][(product_id, demand["need_date"])] += Decimal(
+            str(demand["demand_quantity"])
+        )
+
+    totals = {}
+    for level in range(max(low_level_codes.values(), default=0) + 1):
+        for (product_id, need_date), quantity in buckets_by_level.pop(
+            level, {}
+        ).items():
+            effective_boms = get_effective_boms(
+                boms_by_product,
+                product_id,
+                product_codes.get(product_id, product_id),
+                need_date,
+            )
+            for bom in effective_boms:
+                for component in components_by_bom[bom["bom_id"]]:
+                    line_quantity = calculate_line_quantity(quantity, component)
+                    child_id = component.get("component_product_id")
+                    if child_id is not None:
+                        product_codes[child_id] = component[
+                            "component_product_code"
+                        ]
+                        buckets_by_level[low_level_codes[child_id]][
+                            (child_id, need_date)
+                        ] += line_quantity
+                        continue
+
+                    requirement_date = (
+                        bucket_start(need_date) if bucket_start else need_date
+                    )
+                    key = (requirement_date, component["material_id"])
+                    if key not in totals:
+                        totals[key] = {
+                            "need_date": requirement_date,
+                            "material_id": component["material_id"],
+                            "material_code": component["material_code"],
+                            "material_name": component["material_name"],
+                            "base_unit_of_measure": component[
+                                "base_unit_of_measure"
+                            ],
+                            "gross_requirement": Decimal("0"),
+                        }
+                    totals[key]["gross_requirement"] += line_quantity
+
+    for requirement in totals.values():
+        requirement["gross_requirement"] = requirement[
+            "gross_requirement"
+        ].quantize(THREE_DECIMALS, rounding=ROUND_HALF_UP)
+    return sorted(
+        totals.values(),
+        key=lambda row: (row["need_date"], row["material_code"]),
+    )
+
+
+def iter_demand_explosion(demand_rows, bom_headers, bom_components):
+    """Yield indented demand-to-material audit rows for every BOM level.
+
+    Each row traces one open demand line through its effective BOM path to a
+    purchased material. ``bom_level`` is 1 for lines on the finished product's
+    own BOM and ``parent_product_code`` names the product owning the line.
+    Rows are yielded in need-date and demand-reference order, so callers can
+    stream them without holding the whole explosion in memory.
+    """
+    validate_demand_coverage(demand_rows, bom_headers)
+    calculate_low_level_codes(bom_headers, bom_components)
+    boms_by_product, components_by_bom = index_bom_structure(
+        bom_headers, bom_components
+    )
+
+    def explode_product(demand, product_id, product_code, quantity, level):
+        effective_boms = get_effective_boms(
+            boms_by_product, product_id, product_code, demand["need_date"]
+        )
+        for bom in effective_boms:
+            for component in components_by_bom[bom["bom_id"]]:
+                line_quantity = calculate_line_quantity(quantity, component)
+                if component.get("component_product_id") is not None:
+                    yield from explode_product(
+                        demand,
+                        component["component_product_id"],
+                        component["component_product_code"],
+                        line_quantity,
+                        level + 1,
+                    )
+                    continue
+
+                yield {
+                    "demand_id": demand["demand_id"],
+                    "demand_reference": demand["demand_reference"],
+                    "need_date": demand["need_date"],
+                    "priority": demand["priority"],
+                    "product_code": demand["product_code"],
+                    "product_name": demand["product_name"],
+                    "bom_level": level,
+                    "parent_product_code": product_code,
+                    "bom_revision": bom["revision_code"],
+                    "bom_line_number": component["line_number"],
+                    "material_id": component["material_id"],
+                    "material_code": component["material_code"],
+                    "material_name": component["material_name"],
+                    "base_unit_of_measure": component["base_unit_of_measure"],
+                    "demand_quantity": demand["demand_quantity"],
+                    "quantity_per_unit": component["quantity_per_unit"],
+                    "expected_loss_pct": component["expected_loss_pct"],
+                    "gross_requirement": line_quantity.quantize(
+                        THREE_DECIMALS, rounding=ROUND_HALF_UP
+                    ),
+                }
+
+    for demand in sorted(
+        demand_rows,
+        key=lambda row: (row["need_date"], row["demand_reference"]),
+    ):
+        if demand["product_active_flag"]:
+            yield from explode_product(
+                demand,
+                demand["product_id"],
+                demand["product_code"],
+                Decimal(str(demand["demand_quantity"])),
+                1,
+            )
+
+
+@traced("bom_explosion.detail")
+def explode_demand(demand_rows, bom_headers, bom_components):
+    """Return every indented demand-to-material audit row as a list."""
+    return list(
+        iter_demand_explosion(demand_rows, bom_headers, bom_components)
+    )
@@ -1,11 +1,11 @@
 """Time-phase material supply against gross BOM requirements."""
 
-from collections import defaultdict
 from decimal import Decimal, ROUND_HALF_UP
 
+import numpy as np
 from sqlalchemy import text
 
-from .bom_explosion import get_material_requirements
+from .instrumentation import traced
 
 
 THREE_DECIMALS = Decimal("0.001")
@@ -17,25 +17,45 @@ INVENTORY_SUPPLY_QUERY = text(
         material.material_id,
         material.material_code,
         ROUND(
-            COALESCE(
-                SUM(
-                    GREATEST(
-                        inventory.on_hand_quantity
-                        - inventory.reserved_quantity
-                        - inventory.restricted_quantity
-                        - inventory.safety_stock_quantity,
+            CASE
+                WHEN policy.material_id IS NULL THEN COALESCE(
+                    SUM(
+                        GREATEST(
+                            inventory.on_hand_quantity
+                            - inventory.reserved_quantity
+                            - inventory.restricted_quantity
+                            - inventory.safety_stock_quantity,
+                            0
+                        )
+                    ),
+                    0
+                )
+                ELSE GREATEST(
+                    COALESCE(
+                        SUM(
+                            inventory.on_hand_quantity
+                            - inventory.reserved_quantity
+                            - inventory.restricted_quantity
+                        ),
                         0
                     )
-                ),
-                0
-            ),
+                    - policy.safety_stock_quantity,
+                    0
+                )
+            END,
             3
         ) AS usable_inventory
     FROM materials AS material
     LEFT JOIN inventory_balances AS inventory
         ON inventory.material_id = material.material_id
+    LEFT JOIN material_stock_policies AS policy
+        ON policy.material_id = material.material_id
     WHERE material.active_flag = TRUE
-    GROUP BY material.material_id, material.material_code
+    GROUP BY
+        material.material_id,
+        material.material_code,
+        policy.material_id,
+        policy.safety_stock_quantity
     ORDER BY material.material_code
     """
 )
@@ -96,108 +116,237 @@ def validate_supply_inputs(requirements, inventory_supply, scheduled_receipts):
             raise ValueError("Every scheduled receipt needs an expected date")
 
 
-def net_material_requirements(requirements, inventory_supply, scheduled_receipts):
-    """Chronologically consume inventory and timely receipts by material.
+def to_thousandths(value):
+    """Convert a quantity to integer thousandths using planning rounding."""
+    return int(round_quantity(value).scaleb(3))
 
-    Supply used for an earlier requirement is removed from the projected
-    balance and cannot be reused. A purchase receipt is unavailable until its
-    expected receipt date is on or before the current need date.
+
+def thousandths_array(values):
+    """Convert quantities to an int64 thousandths array.
+
+    Planning quantities repeat heavily, so each distinct value is rounded once.
     """
-    validate_supply_inputs(requirements, inventory_supply, scheduled_receipts)
+    converted = {}
+    return np.fromiter(
+        (
+            converted[value]
+            if value in converted
+            else converted.setdefault(value, to_thousandths(value))
+            for value in values
+        ),
+        dtype=np.int64,
+    )
 
-    inventory_by_material = {
-        row["material_id"]: round_quantity(row["usable_inventory"])
-        for row in inventory_supply
-    }
-    receipts_by_material = defaultdict(list)
-    for receipt in scheduled_receipts:
-        receipts_by_material[receipt["material_id"]].append(receipt)
-    for material_receipts in receipts_by_material.values():
-        material_receipts.sort(key=lambda row: row["expected_receipt_date"])
 
-    requirements_by_material = defaultdict(list)
-    for requirement in requirements:
-        requirements_by_material[requirement["material_id"]].append(requirement)
+def from_thousandths(values):
+    """Convert int64 thousandths back to three-decimal Decimal quantities."""
+    if not len(values):
+        return []
+    distinct_values, positions = np.unique(values, return_inverse=True)
+    decimals = [Decimal(value).scaleb(-3) for value in distinct_values.tolist()]
+    return [decimals[position] for position in positions.tolist()]
 
-    results = []
-    for material_id, material_requirements in requirements_by_material.items():
-        material_requirements.sort(
-            key=lambda row: (row["need_date"], row["material_code"])
+
+def segmented_running_minimum(values, group_ids):
+    """Return a running minimum that restarts at every contiguous group.
+
+    Each group is shifted below every earlier group so one vectorized
+    ``minimum.accumulate`` cannot carry a minimum across a group boundary.
+    Inputs too large for the int64 shift fall back to a per-group loop.
+    """
+    if not len(values):
+        return values.copy()
+    span = int(values.max()) - int(values.min()) + 1
+    largest_shift = int(group_ids[-1]) * span
+    if largest_shift + max(abs(int(values.min())), abs(int(values.max()))) < (
+        2**62
+    ):
+        shift = group_ids.astype(np.int64) * span
+        return np.minimum.accumulate(values - shift) + shift
+
+    result = np.empty_like(values)
+    boundaries = np.flatnonzero(np.diff(group_ids)) + 1
+    for start, end in zip(
+        np.r_[0, boundaries], np.r_[boundaries, len(values)]
+    ):
+        result[start:end] = np.minimum.accumulate(values[start:end])
+    return result
+
+
+def net_fixed_point(
+    material_index,
+    need_days,
+    gross_requirement,
+    usable_inventory,
+    receipt_material_index,
+    receipt_days,
+    receipt_quantity,
+):
+    """Net int64-thousandth requirements for many materials at once.
+
+    Requirement arrays must be grouped by ``material_index`` and ordered by
+    ``need_days`` within each material. ``usable_inventory`` is indexed by
+    material. Each receipt is assigned to the first requirement for its
+    material on or after its receipt day, and the projected balance follows
+    ``balance = max(prior balance + receipts - gross, 0)``, evaluated with a
+    cumulative sum and a segmented running minimum instead of a Python loop.
+    Returns a dictionary of int64 arrays aligned with the requirement rows.
+    """
+    row_count = len(material_index)
+    receipts_by_row = np.zeros(row_count, dtype=np.int64)
+    if row_count and len(receipt_days):
+        first_day = min(int(need_days.min()), int(receipt_days.min()))
+        day_span = max(int(need_days.max()), int(receipt_days.max())) - first_day + 1
+        requirement_keys = material_index * day_span + (need_days - first_day)
+        receipt_keys = receipt_material_index * day_span + (
+            receipt_days - first_day
+        )
+        receipt_rows = np.searchsorted(requirement_keys, receipt_keys, side="left")
+        in_horizon = receipt_rows < row_count
+        in_horizon[in_horizon] = (
+            material_index[receipt_rows[in_horizon]]
+            == receipt_material_index[in_horizon]
         )
-        material_receipts = receipts_by_material.get(material_id, [])
-        receipt_index = 0
-        projected_available = inventory_by_material.get(
-            material_id, Decimal("0.000")
+        np.add.at(
+            receipts_by_row,
+            receipt_rows[in_horizon],
+            receipt_quantity[in_horizon],
         )
 
-        for requirement in material_requirements:
-            receipts_available_by_date = Decimal("0.000")
-            while (
-                receipt_index < len(material_receipts)
-                and material_receipts[receipt_index]["expected_receipt_date"]
-                <= requirement["need_date"]
-            ):
-                receipt_quantity = round_quantity(
-                    material_receipts[receipt_index]["open_receipt_quantity"]
-                )
-                projected_available += receipt_quantity
-                receipts_available_by_date += receipt_quantity
-                receipt_index += 1
-
-            projected_before_requirement = round_quantity(projected_available)
-            gross_requirement = round_quantity(requirement["gross_requirement"])
-            supply_applied = min(projected_before_requirement, gross_requirement)
-            net_requirement = gross_requirement - supply_applied
-            projected_available = projected_before_requirement - supply_applied
-
-            results.append(
-                {
-                    "need_date": requirement["need_date"],
-                    "material_id": material_id,
-                    "material_code": requirement["material_code"],
-                    "material_name": requirement["material_name"],
-                    "base_unit_of_measure": requirement[
-                        "base_unit_of_measure"
-                    ],
-                    "gross_requirement": gross_requirement,
-                    "receipts_available_by_date": round_quantity(
-                        receipts_available_by_date
-                    ),
-                    "projected_supply_before_requirement": (
-                        projected_before_requirement
-                    ),
-                    "supply_applied": round_quantity(supply_applied),
-                    "net_requirement": round_quantity(net_requirement),
-                    "projected_supply_after_requirement": round_quantity(
-                        projected_available
-                    ),
-                }
-            )
+    group_starts = np.ones(row_count, dtype=bool)
+    group_starts[1:] = material_index[1:] != material_index[:-1]
+    group_ids = np.cumsum(group_starts) - 1
+    opening_balance = usable_inventory[material_index]
+
+    change = receipts_by_row - gross_requirement
+    cumulative_change = np.cumsum(change)
+    group_base = (cumulative_change - change)[group_starts][group_ids]
+    unconstrained_balance = opening_balance + cumulative_change - group_base
+    projected_after = unconstrained_balance - np.minimum(
+        segmented_running_minimum(unconstrained_balance, group_ids), 0
+    )
+
+    projected_prior = np.empty(row_count, dtype=np.int64)
+    projected_prior[1:] = projected_after[:-1]
+    projected_prior[group_starts] = opening_balance[group_starts]
+    projected_before = projected_prior + receipts_by_row
+    supply_applied = np.minimum(projected_before, gross_requirement)
+
+    return {
+        "gross_requirement": gross_requirement,
+        "receipts_available_by_date": receipts_by_row,
+        "projected_supply_before_requirement": projected_before,
+        "supply_applied": supply_applied,
+        "net_requirement": gross_requirement - supply_applied,
+        "projected_supply_after_requirement": projected_before - supply_applied,
+    }
 
-    return sorted(results, key=lambda row: (row["need_date"], row["material_code"]))
 
+@traced("netting")
+def net_material_requirements(requirements, inventory_supply, scheduled_receipts):
+    """Chronologically consume inventory and timely receipts by material.
+
+    Supply used for an earlier requirement is removed from the projected
+    balance and cannot be reused. A purchase receipt is unavailable until its
+    expected receipt date is on or before the current need date.
+
+    Quantities are converted once to int64 thousandths and netted by
+    ``net_fixed_point``; results are identical to Decimal arithmetic rounded
+    to three decimals.
+    """
+    validate_supply_inputs(requirements, inventory_supply, scheduled_receipts)
+    if not requirements:
+        return []
 
-def get_inventory_supply(engine):
-    """Return usable inventory after reservations, restrictions, and safety stock."""
-    with engine.connect() as connection:
-        return [
-            dict(row) for row in connection.execute(INVENTORY_SUPPLY_QUERY).mappings()
-        ]
+    material_positions = {}
+    for requirement in requirements:
+        material_positions.setdefault(
+            requirement["material_id"], len(material_positions)
+        )
+    row_material = np.fromiter(
+        (material_positions[row["material_id"]] for row in requirements),
+        dtype=np.int64,
+        count=len(requirements),
+    )
+    row_days = np.fromiter(
+        (row["need_date"].toordinal() for row in requirements),
+        dtype=np.int64,
+        count=len(requirements),
+    )
+    material_codes = [row["material_code"] for row in requirements]
+    code_ranks = {code: rank for rank, code in enumerate(sorted(set(material_codes)))}
+    row_code_rank = np.fromiter(
+        (code_ranks[code] for code in material_codes),
+        dtype=np.int64,
+        count=len(requirements),
+    )
+    grouped_order = np.lexsort(
+        (np.arange(len(requirements)), row_code_rank, row_days, row_material)
+    )
 
+    usable_inventory = np.zeros(len(material_positions), dtype=np.int64)
+    for row in inventory_supply:
+        position = material_positions.get(row["material_id"])
+        if position is not None:
+            usable_inventory[position] = to_thousandths(row["usable_inventory"])
 
-def get_scheduled_receipts(engine):
-    """Return remaining quantities on open purchase orders by expected date."""
-    with engine.connect() as connection:
-        return [
-            dict(row)
-            for row in connection.execute(SCHEDULED_RECEIPTS_QUERY).mappings()
-        ]
+    timely_receipts = [
+        receipt
+        for receipt in scheduled_receipts
+        if receipt["material_id"] in material_positions
+    ]
+    receipt_material = np.fromiter(
+        (material_positions[row["material_id"]] for row in timely_receipts),
+        dtype=np.int64,
+        count=len(timely_receipts),
+    )
+    receipt_days = np.fromiter(
+        (row["expected_receipt_date"].toordinal() for row in timely_receipts),
+        dtype=np.int64,
+        count=len(timely_receipts),
+    )
+    receipt_quantity = thousandths_array(
+        row["open_receipt_quantity"] for row in timely_receipts
+    )
 
+    netted = net_fixed_point(
+        row_material[grouped_order],
+        row_days[grouped_order],
+        thousandths_array(
+            requirements[index]["gross_requirement"]
+            for index in grouped_order.tolist()
+        ),
+        usable_inventory,
+        receipt_material,
+        receipt_days,
+        receipt_quantity,
+    )
 
-def get_netted_material_requirements(engine):
-    """Return the complete time-phased gross-to-net requirements plan."""
-    return net_material_requirements(
-        get_material_requirements(engine),
-        get_inventory_supply(engine),
-        get_scheduled_receipts(engine),
+    # Materials are reported in first-seen order before the final date sort,
+    # matching the row order of the original per-material loop.
+    output_order = np.lexsort(
+        (
+            np.arange(len(requirements)),
+            row_code_rank[grouped_order],
+            row_days[grouped_order],
+        )
+    )
+    quantity_fields = list(netted)
+    quantity_columns = zip(
+        *(from_thousandths(netted[field][output_order]) for field in quantity_fields)
     )
+    results = []
+    for index, quantities in zip(
+        grouped_order[output_order].tolist(), quantity_columns
+    ):
+        requirement = requirements[index]
+        row = {
+            "need_date": requirement["need_date"],
+            "material_id": requirement["material_id"],
+            "material_code": requirement["material_code"],
+            "material_name": requirement["material_name"],
+            "base_unit_of_measure": requirement["base_unit_of_measure"],
+        }
+        row.update(zip(quantity_fields, quantities))
+        results.append(row)
+    return results
@@ -0,0 +1,158 @@
+"""Net and recommend independent material shards across worker processes."""
+
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import os
+
+from .netting import net_material_requirements, validate_supply_inputs
+from .recommendations import (
+    create_material_recommendations,
+    number_recommendations,
+    validate_source_coverage,
+)
+
+
+SHARDS_PER_WORKER = 4
+
+
+def partition_materials(material_ids, shard_count):
+    """Split ordered material IDs into contiguous, near-equal shards."""
+    if shard_count <= 0:
+        raise ValueError("shard_count must be positive")
+    material_ids = list(material_ids)
+    shard_size, remainder = divmod(len(material_ids), shard_count)
+    shards = []
+    start = 0
+    for shard_index in range(shard_count):
+        end = start + shard_size + (shard_index < remainder)
+        if end > start:
+            shards.append(material_ids[start:end])
+        start = end
+    return shards
+
+
+def plan_material_shard(
+    requirements,
+    inventory_supply,
+    scheduled_receipts,
+    sources_by_material,
+    planning_date,
+    recommend=True,
+):
+    """Net one shard and build its unnumbered recommendations by material.
+
+    Materials without a source are skipped here; the merged plan is validated
+    for source coverage so the error lists every material, as in serial runs.
+    With ``recommend`` false the shard is only netted.
+    """
+    netted_requirements = net_material_requirements(
+        requirements, inventory_supply, scheduled_receipts
+    )
+    if not recommend:
+        return netted_requirements, {}
+    rows_by_material = defaultdict(list)
+    for row in netted_requirements:
+        rows_by_material[row["material_id"]].append(row)
+
+    return netted_requirements, {
+        material_id: create_material_recommendations(
+            material_rows,
+            sources_by_material[material_id],
+            planning_date,
+        )
+        for material_id, material_rows in rows_by_material.items()
+        if material_id in sources_by_material
+    }
+
+
+def plan_materials_in_parallel(
+    material_requirements,
+    inventory_supply,
+    scheduled_receipts,
+    preferred_sources,
+    planning_date=None,
+    max_workers=None,
+    recommend=True,
+):
+    """Return netted requirements and recommendations computed by shard.
+
+    Materials are independent, so contiguous shards of the requirement order
+    are netted and recommended in worker processes. Shard results are merged
+    in shard order with the same stable sorts as the serial path, and REC IDs
+    are assigned afterwards in first-seen netting order, so both outputs are
+    identical to ``net_material_requirements`` followed by
+    ``create_purchase_recommendations``. With ``recommend`` false, shards only
+    net and the returned recommendations are ``None``.
+    """
+    planning_date = planning_date or date.today()
+    validate_supply_inputs(material_requirements, inventory_supply, scheduled_receipts)
+    sources_by_material = {
+        source["material_id"]: source for source in preferred_sources
+    }
+
+    requirements_by_material = defaultdict(list)
+    for requirement in material_requirements:
+        requirements_by_material[requirement["material_id"]].append(requirement)
+    inventory_by_material = defaultdict(list)
+    for row in inventory_supply:
+        inventory_by_material[row["material_id"]].append(row)
+    receipts_by_material = defaultdict(list)
+    for row in scheduled_receipts:
+        receipts_by_material[row["material_id"]].append(row)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    shards = partition_materials(
+        requirements_by_material, max_workers * SHARDS_PER_WORKER
+    )
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for shard in shards:
+            futures.append(
+                executor.submit(
+                    plan_material_shard,
+                    [
+                        row
+                        for material_id in shard
+                        for row in requirements_by_material[material_id]
+                    ],
+                    [
+                        row
+                        for material_id in shard
+                        for row in inventory_by_material[material_id]
+                    ],
+                    [
+                        row
+                        for material_id in shard
+                        for row in receipts_by_material[material_id]
+                    ],
+                    {
+                        material_id: sources_by_material[material_id]
+                        for material_id in shard
+                        if material_id in sources_by_material
+                    },
+                    planning_date,
+                    recommend,
+                )
+            )
+        shard_results = [future.result() for future in futures]
+
+    netted_requirements = sorted(
+        (row for netted_rows, _ in shard_results for row in netted_rows),
+        key=lambda row: (row["need_date"], row["material_code"]),
+    )
+    validate_source_coverage(netted_requirements, sources_by_material)
+    if not recommend:
+        return netted_requirements, None
+
+    recommendations_by_material = {}
+    for _, shard_recommendations in shard_results:
+        recommendations_by_material.update(shard_recommendations)
+    material_order = dict.fromkeys(row["material_id"] for row in netted_requirements)
+    recommendations = number_recommendations(
+        {
+            material_id: recommendations_by_material.get(material_id, [])
+            for material_id in material_order
+        }
+    )
+    return netted_requirements, recommendations
@@ -0,0 +1,293 @@
+"""Peg net shortages and purchase recommendations to their demand lines.
+
+Explosion keeps each open demand line's share of every material requirement
+instead of only the per-date total. Supply applied on a date covers that
+date's lines in priority order, so each net shortage is pegged to the lines
+left uncovered; recommendations are then matched first-in, first-out to each
+material's pegged shortages, including MOQ excess carried to later dates.
+
+Pegs are held in ``PeggingIndex`` as parallel int64 arrays with CSR-style
+offsets, so every lookup by key or by demand reference is one slice.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+import numpy as np
+
+from .multilevel import (
+    calculate_line_quantity,
+    calculate_low_level_codes,
+    get_effective_boms,
+    index_bom_structure,
+    validate_demand_coverage,
+)
+from .netting import from_thousandths, to_thousandths
+
+
+# Supply covers higher-priority demand lines first on a shared need date.
+PRIORITY_RANKS = {"Critical": 0, "High": 1, "Standard": 2}
+
+
+class PeggingIndex:
+    """Compact pegs from keys to demand references with O(1) lookups.
+
+    ``pegs`` yields ``(key, demand_reference, thousandths)`` in key order, as
+    produced by ``peg_net_requirements`` and ``peg_recommendations``.
+    """
+
+    def __init__(self, pegs):
+        self.keys = []
+        self.demand_references = []
+        key_positions = {}
+        demand_positions = {}
+        key_index = []
+        demand_index = []
+        quantities = []
+        for key, demand_reference, quantity in pegs:
+            if key not in key_positions:
+                key_positions[key] = len(self.keys)
+                self.keys.append(key)
+            if demand_reference not in demand_positions:
+                demand_positions[demand_reference] = len(self.demand_references)
+                self.demand_references.append(demand_reference)
+            key_index.append(key_positions[key])
+            demand_index.append(demand_positions[demand_reference])
+            quantities.append(quantity)
+
+        self.key_positions = key_positions
+        self.demand_positions = demand_positions
+        self.key_index = np.array(key_index, dtype=np.int64)
+        self.demand_index = np.array(demand_index, dtype=np.int64)
+        self.quantities = np.array(quantities, dtype=np.int64)
+
+        # Pegs arrive grouped by key; the demand view is a stable sort.
+        self.key_offsets = np.zeros(len(self.keys) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(self.key_index, minlength=len(self.keys)),
+            out=self.key_offsets[1:],
+        )
+        self.demand_order = np.argsort(self.demand_index, kind="stable")
+        self.demand_offsets = np.zeros(
+            len(self.demand_references) + 1, dtype=np.int64
+        )
+        np.cumsum(
+            np.bincount(self.demand_index, minlength=len(self.demand_references)),
+            out=self.demand_offsets[1:],
+        )
+
+    def __len__(self):
+        return len(self.quantities)
+
+    def demand_for(self, key):
+        """Return (demand_reference, quantity) pairs pegged to one key."""
+        position = self.key_positions.get(key)
+        if position is None:
+            return []
+        start, end = self.key_offsets[position], self.key_offsets[position + 1]
+        return list(
+            zip(
+                (
+                    self.demand_references[index]
+                    for index in self.demand_index[start:end].tolist()
+                ),
+                from_thousandths(self.quantities[start:end]),
+            )
+        )
+
+    def keys_for_demand(self, demand_reference):
+        """Return (key, quantity) pairs pegged to one demand reference."""
+        position = self.demand_positions.get(demand_reference)
+        if position is None:
+            return []
+        start = self.demand_offsets[position]
+        end = self.demand_offsets[position + 1]
+        pegs = self.demand_order[start:end]
+        return list(
+            zip(
+                (self.keys[index] for index in self.key_index[pegs].tolist()),
+                from_thousandths(self.quantities[pegs]),
+            )
+        )
+
+    def iter_pegs(self):
+        """Yield (key, demand_reference, quantity) in key order."""
+        for key_position, demand_position, quantity in zip(
+            self.key_index.tolist(),
+            self.demand_index.tolist(),
+            from_thousandths(self.quantities),
+        ):
+            yield (
+                self.keys[key_position],
+                self.demand_references[demand_position],
+                quantity,
+            )
+
+    def iter_rows(self, key_columns):
+        """Yield export rows that name each key part with ``key_columns``."""
+        for key, demand_reference, quantity in self.iter_pegs():
+            key_values = key if isinstance(key, tuple) else (key,)
+            yield {
+                **dict(zip(key_columns, key_values)),
+                "demand_reference": demand_reference,
+                "pegged_quantity": quantity,
+            }
+
+
+def explode_demand_contributions(
+    demand_rows, bom_headers, bom_components, bucket_start=None
+):
+    """Return each demand line's thousandths share of material requirements.
+
+    Keys are ``(material_id, need_date)``; values list ``(demand_reference,
+    thousandths)`` in coverage order. Per-unit requirements are memoized by
+    product and need date, so each subassembly is expanded once per date
+    however many demand lines use it. ``bucket_start`` dates keys by planning
+    bucket, as in ``explode_material_requirements``.
+    """
+    validate_demand_coverage(demand_rows, bom_headers)
+    calculate_low_level_codes(bom_headers, bom_components)
+    boms_by_product, components_by_bom = index_bom_structure(
+        bom_headers, bom_components
+    )
+    unit_requirements = {}
+
+    def get_unit_requirements(product_id, product_code, need_date):
+        key = (product_id, need_date)
+        if key not in unit_requirements:
+            totals = defaultdict(Decimal)
+            for bom in get_effective_boms(
+                boms_by_product, product_id, product_code, need_date
+            ):
+                for component in components_by_bom[bom["bom_id"]]:
+                    line_quantity = calculate_line_quantity(Decimal("1"), component)
+                    child_id = component.get("component_product_id")
+                    if child_id is None:
+                        totals[component["material_id"]] += line_quantity
+                        continue
+                    for material_id, quantity in get_unit_requirements(
+                        child_id, component["component_product_code"], need_date
+                    ).items():
+                        totals[material_id] += line_quantity * quantity
+            unit_requirements[key] = totals
+        return unit_requirements[key]
+
+    contributions = defaultdict(list)
+    for demand in sorted(
+        demand_rows,
+        key=lambda row: (
+            PRIORITY_RANKS.get(row["priority"], len(PRIORITY_RANKS)),
+            row["demand_reference"],
+        ),
+    ):
+        if not demand["product_active_flag"]:
+            continue
+        demand_quantity = Decimal(str(demand["demand_quantity"]))
+        requirement_date = (
+            bucket_start(demand["need_date"]) if bucket_start else demand["need_date"]
+        )
+        for material_id, unit_quantity in get_unit_requirements(
+            demand["product_id"], demand["product_code"], demand["need_date"]
+        ).items():
+            contributions[(material_id, requirement_date)].append(
+                (
+                    demand["demand_reference"],
+                    to_thousandths(demand_quantity * unit_quantity),
+                )
+            )
+    return dict(contributions)
+
+
+def peg_shortage(lines, supply_applied, net_requirement):
+    """Return [demand_reference, thousandths] pegs for one dated shortage.
+
+    Supply covers ``lines`` in order. Line shares are rounded separately, so
+    the last line absorbs any difference from the rounded net requirement.
+    """
+    pegs = []
+    remaining_supply = supply_applied
+    for demand_reference, share in lines:
+        covered = min(share, remaining_supply)
+        remaining_supply -= covered
+        if share > covered:
+            pegs.append([demand_reference, share - covered])
+
+    difference = net_requirement - sum(quantity for _, quantity in pegs)
+    if difference:
+        if pegs and pegs[-1][0] == lines[-1][0]:
+            pegs[-1][1] += difference
+        else:
+            pegs.append([lines[-1][0], difference])
+    return [peg for peg in pegs if peg[1] > 0]
+
+
+def peg_net_requirements(netted_requirements, contributions):
+    """Yield ``((material_id, need_date), demand_reference, thousandths)`` pegs.
+
+    Pegs follow the netted row order, so each material's shortages are
+    chronological. A shortage without contributing demand lines means the
+    netted plan and the contributions came from different snapshots.
+    """
+    for row in netted_requirements:
+        net_requirement = to_thousandths(row["net_requirement"])
+        if net_requirement <= 0:
+            continue
+        key = (row["material_id"], row["need_date"])
+        if key not in contributions:
+            raise ValueError(
+                f"No demand lines explain the {row['material_code']} shortage "
+                f"on {row['need_date']}"
+            )
+        for demand_reference, quantity in peg_shortage(
+            contributions[key],
+            to_thousandths(row["supply_applied"]),
+            net_requirement,
+        ):
+            yield key, demand_reference, quantity
+
+
+def peg_recommendations(recommendations, shortage_pegging):
+    """Return ``(recommendation_id, demand_reference, thousandths)`` pegs.
+
+    Each material's recommendations, in need-date and ID order, consume its
+    pegged shortages first-in, first-out. Order quantity beyond the last
+    shortage is excess and stays unpegged. Work is linear in pegs.
+    """
+    shortages_by_material = defaultdict(list)
+    for (material_id, _), demand_reference, quantity in shortage_pegging.iter_pegs():
+        shortages_by_material[material_id].append(
+            [demand_reference, to_thousandths(quantity)]
+        )
+
+    recommendations_by_material = defaultdict(list)
+    for recommendation in recommendations:
+        recommendations_by_material[recommendation["material_id"]].append(
+            recommendation
+        )
+
+    pegs = []
+    for material_id, material_recommendations in recommendations_by_material.items():
+        shortages = shortages_by_material.get(material_id, [])
+        position = 0
+        for recommendation in sorted(
+            material_recommendations,
+            key=lambda row: (
+                row["need_date"],
+                row.get("planned_receipt_date", row["need_date"]),
+                int(row["recommendation_id"][4:]),
+            ),
+        ):
+            supply = to_thousandths(recommendation["recommended_order_quantity"])
+            while supply > 0 and position < len(shortages):
+                demand_reference, remaining = shortages[position]
+                pegged = min(supply, remaining)
+                pegs.append(
+                    (recommendation["recommendation_id"], demand_reference, pegged)
+                )
+                supply -= pegged
+                shortages[position][1] -= pegged
+                if shortages[position][1] == 0:
+                    position += 1
+    # Group pegs by recommendation in REC-nnnn order for the index offsets.
+    pegs.sort(key=lambda peg: int(peg[0][4:]))
+    return pegs
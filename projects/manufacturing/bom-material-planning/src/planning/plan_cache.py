@@ -0,0 +1,256 @@
+"""Reuse computed plans while the planning source tables are unchanged.
+
+Each cache entry holds the planning snapshot with its material requirements,
+netted plan, and recommendations, keyed by a fingerprint of every source table
+plus the planning date, options, and source revision. The fingerprint is each
+table's row count and largest row version: PostgreSQL stamps every inserted or
+updated row with a new transaction ID, so ``xmin`` stands in for the update
+timestamps the schema does not keep, and deletes lower the row count. ``xmin``
+is 32 bits and wraps around, so it is widened to a 64-bit transaction ID with
+the epoch of the snapshot's ``xmax``; every later write then gets a larger
+version. Entries are evicted least recently used first once the directory
+exceeds its size bound.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+import subprocess
+
+from sqlalchemy import text
+
+from src.config import PLAN_CACHE_MAX_MB
+
+from .buckets import parse_planning_buckets
+from .instrumentation import span
+from .session import PlanningSession, read_snapshot_queries, snapshot_connection
+
+
+DEFAULT_CACHE_DIRECTORY = (
+    Path(__file__).resolve().parents[2] / "outputs" / "plan_cache"
+)
+
+DEFAULT_MAX_BYTES = PLAN_CACHE_MAX_MB * 1024 * 1024
+
+# Bump when cached rows change shape so older entries are never reused. The
+# source revision in the key already separates plans from different code.
+CACHE_FORMAT_VERSION = 1
+
+# Every table read by the planning snapshot queries.
+PLANNING_SOURCE_TABLES = (
+    "products",
+    "materials",
+    "suppliers",
+    "bills_of_materials",
+    "bom_components",
+    "supplier_materials",
+    "supplier_weekly_capacity",
+    "production_demand",
+    "inventory_balances",
+    "purchase_orders",
+    "material_stock_policies",
+)
+
+# Session stages stored with the snapshot; later stages derive from them.
+CACHED_STAGES = ("material_requirements", "netted_requirements", "recommendations")
+
+# A row's 64-bit transaction ID is the latest one at or below the snapshot's
+# xmax whose low 32 bits equal its xmin. Live row versions are always within
+# 2^32 transactions of xmax, so the result is exact for them.
+INPUT_FINGERPRINT_QUERY = text(
+    "WITH snapshot AS (\n"
+    "    SELECT pg_snapshot_xmax(pg_current_snapshot())::TEXT::BIGINT AS xmax\n"
+    ")\n"
+    + "\nUNION ALL\n".join(
+        f"""
+        SELECT
+            '{table_name}' AS table_name,
+            COUNT(*) AS row_count,
+            COALESCE(
+                MAX(
+                    snapshot.xmax
+                    - (snapshot.xmax - source.xmin::TEXT::BIGINT) % 4294967296
+                ),
+                0
+            ) AS max_row_version
+        FROM {table_name} AS source
+        CROSS JOIN snapshot
+        """
+        for table_name in PLANNING_SOURCE_TABLES
+    )
+)
+
+
+def read_input_fingerprint(connection):
+    """Return ``{table_name: [row_count, max_row_version]}`` for the inputs."""
+    with span("query.plan_cache.fingerprint") as record:
+        fingerprint = {
+            row["table_name"]: [row["row_count"], row["max_row_version"]]
+            for row in connection.execute(INPUT_FINGERPRINT_QUERY).mappings()
+        }
+        record["rows_out"] = len(fingerprint)
+    return fingerprint
+
+
+def get_source_revision():
+    """Return the current git commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_cache_key(
+    fingerprint,
+    planning_date,
+    sourcing,
+    lot_sizing,
+    supplier_capacity,
+    buckets,
+    source_revision=None,
+):
+    """Return the hex digest naming the cache entry for one plan."""
+    document = {
+        "format_version": CACHE_FORMAT_VERSION,
+        "source_revision": source_revision,
+        "fingerprint": fingerprint,
+        "planning_date": planning_date.isoformat(),
+        "sourcing": sourcing,
+        "lot_sizing": lot_sizing,
+        "supplier_capacity": supplier_capacity,
+        "buckets": parse_planning_buckets(buckets),
+    }
+    return hashlib.sha256(
+        json.dumps(document, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def load_cache_entry(cache_directory, cache_key):
+    """Return the cached entry for ``cache_key``, or None when it is missing.
+
+    A hit refreshes the file's modification time, which orders eviction.
+    Unreadable entries, such as those cut short by a crash, are misses.
+    """
+    entry_file = cache_directory / f"{cache_key}.pickle"
+    with span("plan_cache.load") as record:
+        try:
+            with entry_file.open("rb") as cache_file:
+                entry = pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if entry.get("cache_key") != cache_key:
+            return None
+        entry_file.touch()
+        record["rows_out"] = len(entry["stages"]["netted_requirements"])
+    return entry
+
+
+def evict_cache_entries(cache_directory, max_bytes, keep_file=None):
+    """Delete least recently used entries until the cache fits ``max_bytes``.
+
+    ``keep_file`` is never deleted, so the newest plan survives even when it
+    alone exceeds the bound. Return the deleted paths.
+    """
+    entries = []
+    for entry_file in cache_directory.glob("*.pickle"):
+        try:
+            status = entry_file.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((status.st_mtime, status.st_size, entry_file))
+
+    total_bytes = sum(size for _, size, _ in entries)
+    deleted_files = []
+    for _, size, entry_file in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        if entry_file == keep_file:
+            continue
+        entry_file.unlink(missing_ok=True)
+        total_bytes -= size
+        deleted_files.append(entry_file)
+    return deleted_files
+
+
+def store_cache_entry(cache_directory, cache_key, snapshot, stages, max_bytes):
+    """Atomically write one cache entry, evict old ones, and return its path."""
+    cache_directory.mkdir(parents=True, exist_ok=True)
+    entry_file = cache_directory / f"{cache_key}.pickle"
+    temporary_file = entry_file.with_name(f"{entry_file.name}.{os.getpid()}.tmp")
+    with span("plan_cache.store") as record:
+        with temporary_file.open("wb") as cache_file:
+            pickle.dump(
+                {"cache_key": cache_key, "snapshot": snapshot, "stages": stages},
+                cache_file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(temporary_file, entry_file)
+        deleted_files = evict_cache_entries(cache_directory, max_bytes, entry_file)
+        record["rows_out"] = len(deleted_files)
+    return entry_file
+
+
+def load_planning_session(
+    engine,
+    planning_date,
+    max_workers=1,
+    sourcing="preferred",
+    lot_sizing="lot_for_lot",
+    supplier_capacity=False,
+    buckets="daily",
+    cache_directory=DEFAULT_CACHE_DIRECTORY,
+    max_bytes=DEFAULT_MAX_BYTES,
+):
+    """Return a planning session, reusing cached stages when inputs match.
+
+    The fingerprint and, on a miss, the snapshot are read in one transaction,
+    so an entry never pairs a fingerprint with newer data. A miss computes
+    ``CACHED_STAGES`` and stores them; a hit seeds them into the session
+    without reading the snapshot queries. Worker count is not part of the key
+    because serial and sharded plans are identical; the git commit is, so a
+    code change never reuses a plan computed by older planning logic.
+    """
+    with snapshot_connection(engine) as connection:
+        cache_key = get_cache_key(
+            read_input_fingerprint(connection),
+            planning_date,
+            sourcing,
+            lot_sizing,
+            supplier_capacity,
+            buckets,
+            get_source_revision(),
+        )
+        entry = load_cache_entry(cache_directory, cache_key)
+        snapshot = (
+            entry["snapshot"] if entry else read_snapshot_queries(connection)
+        )
+
+    session = PlanningSession(
+        snapshot,
+        planning_date,
+        max_workers,
+        sourcing,
+        lot_sizing,
+        supplier_capacity,
+        buckets,
+    )
+    if entry:
+        # Seed the cached_property values so these stages are not recomputed.
+        session.__dict__.update(entry["stages"])
+    else:
+        store_cache_entry(
+            cache_directory,
+            cache_key,
+            snapshot,
+            {stage: getattr(session, stage) for stage in CACHED_STAGES},
+            max_bytes,
+        )
+    return session
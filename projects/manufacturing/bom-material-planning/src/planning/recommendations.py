@@ -8,7 +8,7 @@ from sqlalchemy import text
 
 from src.purchasing import apply_order_constraints, round_quantity
 
-from .netting import get_netted_material_requirements
+from .instrumentation import traced
 
 
 TWO_DECIMALS = Decimal("0.01")
@@ -65,92 +65,113 @@ def validate_source_coverage(netted_requirements, sources_by_material):
         )
 
 
-def create_purchase_recommendations(
-    netted_requirements,
-    preferred_sources,
-    planning_date=None,
+def build_recommendation(
+    row,
+    source,
+    planning_date,
+    net_requirement,
+    excess_applied,
+    remaining_shortage,
+    recommended_quantity,
+    excess_planned_supply,
 ):
-    """Convert dated shortages into constrained purchasing recommendations.
+    """Return one unnumbered recommendation for a netted row and source.
 
-    An MOQ or order-multiple may make a recommendation larger than the current
-    shortage. That excess supply is carried forward and offsets later shortage
-    rows for the same material.
+    Lot-sized rows also record the last need date their order covers.
     """
-    planning_date = planning_date or date.today()
-    sources_by_material = {
-        source["material_id"]: source for source in preferred_sources
+    recommended_order_date = row["need_date"] - timedelta(
+        days=source["lead_time_days"]
+    )
+    estimated_cost = (
+        recommended_quantity * Decimal(str(source["unit_price"]))
+    ).quantize(TWO_DECIMALS, rounding=ROUND_HALF_UP)
+    recommendation = {
+        "recommendation_id": None,
+        "material_id": row["material_id"],
+        "material_code": row["material_code"],
+        "material_name": row["material_name"],
+        "base_unit_of_measure": row["base_unit_of_measure"],
+        "need_date": row["need_date"],
+        "original_net_requirement": net_requirement,
+        "prior_order_excess_applied": round_quantity(excess_applied),
+        "remaining_net_requirement": remaining_shortage,
+        "supplier_id": source["supplier_id"],
+        "supplier_code": source["supplier_code"],
+        "supplier_name": source["supplier_name"],
+        "lead_time_days": source["lead_time_days"],
+        "minimum_order_quantity": source["minimum_order_quantity"],
+        "order_multiple": source["order_multiple"],
+        "recommended_order_quantity": recommended_quantity,
+        "recommended_order_date": recommended_order_date,
+        "urgency_status": get_urgency_status(
+            recommended_order_date, planning_date
+        ),
+        "estimated_purchase_cost": estimated_cost,
+        "excess_supply_carried_forward": excess_planned_supply,
     }
-    validate_source_coverage(netted_requirements, sources_by_material)
+    if "covered_through_date" in row:
+        recommendation["covered_through_date"] = row["covered_through_date"]
+    return recommendation
 
-    rows_by_material = defaultdict(list)
-    for row in netted_requirements:
-        rows_by_material[row["material_id"]].append(row)
 
+def create_material_recommendations(material_rows, source, planning_date):
+    """Create unnumbered recommendations for one material's netted rows.
+
+    An MOQ or order-multiple may make a recommendation larger than the current
+    shortage. That excess supply is carried forward and offsets later shortage
+    rows for the same material. ``recommendation_id`` is left as ``None`` for
+    ``number_recommendations`` to assign.
+    """
     recommendations = []
-    sequence = 1
-    for material_id, material_rows in rows_by_material.items():
-        material_rows.sort(key=lambda row: row["need_date"])
-        source = sources_by_material.get(material_id)
-        excess_planned_supply = Decimal("0.000")
-
-        for row in material_rows:
-            net_requirement = round_quantity(row["net_requirement"])
-            excess_applied = min(excess_planned_supply, net_requirement)
-            remaining_shortage = round_quantity(net_requirement - excess_applied)
-            excess_planned_supply = round_quantity(
-                excess_planned_supply - excess_applied
-            )
+    excess_planned_supply = Decimal("0.000")
+    for row in sorted(material_rows, key=lambda row: row["need_date"]):
+        net_requirement = round_quantity(row["net_requirement"])
+        excess_applied = min(excess_planned_supply, net_requirement)
+        remaining_shortage = round_quantity(net_requirement - excess_applied)
+        excess_planned_supply = round_quantity(
+            excess_planned_supply - excess_applied
+        )
 
-            if remaining_shortage <= 0:
-                continue
+        if remaining_shortage <= 0:
+            continue
 
-            recommended_quantity = apply_order_constraints(
+        recommended_quantity = apply_order_constraints(
+            remaining_shortage,
+            source["minimum_order_quantity"],
+            source["order_multiple"],
+        )
+        order_excess = round_quantity(recommended_quantity - remaining_shortage)
+        excess_planned_supply = round_quantity(
+            excess_planned_supply + order_excess
+        )
+        recommendations.append(
+            build_recommendation(
+                row,
+                source,
+                planning_date,
+                net_requirement,
+                excess_applied,
                 remaining_shortage,
-                source["minimum_order_quantity"],
-                source["order_multiple"],
-            )
-            order_excess = round_quantity(
-                recommended_quantity - remaining_shortage
-            )
-            excess_planned_supply = round_quantity(
-                excess_planned_supply + order_excess
-            )
-            recommended_order_date = row["need_date"] - timedelta(
-                days=source["lead_time_days"]
+                recommended_quantity,
+                excess_planned_supply,
             )
-            estimated_cost = (
-                recommended_quantity * Decimal(str(source["unit_price"]))
-            ).quantize(TWO_DECIMALS, rounding=ROUND_HALF_UP)
-
-            recommendations.append(
-                {
-                    "recommendation_id": f"REC-{sequence:04d}",
-                    "material_id": material_id,
-                    "material_code": row["material_code"],
-                    "material_name": row["material_name"],
-                    "base_unit_of_measure": row["base_unit_of_measure"],
-                    "need_date": row["need_date"],
-                    "original_net_requirement": net_requirement,
-                    "prior_order_excess_applied": round_quantity(excess_applied),
-                    "remaining_net_requirement": remaining_shortage,
-                    "supplier_id": source["supplier_id"],
-                    "supplier_code": source["supplier_code"],
-                    "supplier_name": source["supplier_name"],
-                    "lead_time_days": source["lead_time_days"],
-                    "minimum_order_quantity": source[
-                        "minimum_order_quantity"
-                    ],
-                    "order_multiple": source["order_multiple"],
-                    "recommended_order_quantity": recommended_quantity,
-                    "recommended_order_date": recommended_order_date,
-                    "urgency_status": get_urgency_status(
-                        recommended_order_date, planning_date
-                    ),
-                    "estimated_purchase_cost": estimated_cost,
-                    "excess_supply_carried_forward": excess_planned_supply,
-                }
+        )
+    return recommendations
+
+
+def number_recommendations(recommendations_by_material):
+    """Assign REC-nnnn IDs in material order and sort by order date.
+
+    ``recommendations_by_material`` maps material IDs, in their first-seen
+    netting order, to each material's recommendations in need-date order.
+    """
+    recommendations = []
+    for material_recommendations in recommendations_by_material.values():
+        for recommendation in material_recommendations:
+            recommendation["recommendation_id"] = (
+                f"REC-{len(recommendations) + 1:04d}"
             )
-            sequence += 1
+            recommendations.append(recommendation)
 
     return sorted(
         recommendations,
@@ -162,18 +183,35 @@ def create_purchase_recommendations(
     )
 
 
-def get_preferred_sources(engine):
-    """Return preferred approved supplier rules used for recommendations."""
-    with engine.connect() as connection:
-        return [
-            dict(row) for row in connection.execute(PREFERRED_SOURCE_QUERY).mappings()
-        ]
+@traced("recommendations")
+def create_purchase_recommendations(
+    netted_requirements,
+    preferred_sources,
+    planning_date=None,
+):
+    """Convert dated shortages into constrained purchasing recommendations.
+
+    An MOQ or order-multiple may make a recommendation larger than the current
+    shortage. That excess supply is carried forward and offsets later shortage
+    rows for the same material.
+    """
+    planning_date = planning_date or date.today()
+    sources_by_material = {
+        source["material_id"]: source for source in preferred_sources
+    }
+    validate_source_coverage(netted_requirements, sources_by_material)
 
+    rows_by_material = defaultdict(list)
+    for row in netted_requirements:
+        rows_by_material[row["material_id"]].append(row)
 
-def get_purchase_recommendations(engine, planning_date=None):
-    """Run gross-to-net planning and return actionable purchase recommendations."""
-    return create_purchase_recommendations(
-        get_netted_material_requirements(engine),
-        get_preferred_sources(engine),
-        planning_date,
+    return number_recommendations(
+        {
+            material_id: create_material_recommendations(
+                material_rows,
+                sources_by_material.get(material_id),
+                planning_date,
+            )
+            for material_id, material_rows in rows_by_material.items()
+        }
     )
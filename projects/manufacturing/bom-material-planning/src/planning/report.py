@@ -8,11 +8,21 @@ from pathlib import Path
 
 from sqlalchemy import create_engine
 
-from src.config import DATABASE_URL
+from src.config import (
+    DATABASE_URL,
+    PLAN_CACHE,
+    PLANNING_BUCKETS,
+    PLANNING_EXPORT_FORMAT,
+    PLANNING_LOT_SIZING,
+    PLANNING_SOURCING,
+    PLANNING_SUPPLIER_CAPACITY,
+    PLANNING_WORKERS,
+)
 
-from .bom_explosion import get_bom_explosion, get_material_requirements
-from .netting import get_netted_material_requirements
-from .recommendations import get_purchase_recommendations
+from .columnar import COLUMNAR_FORMATS, write_columnar
+from .instrumentation import RunLog, iter_counted, span
+from .plan_cache import DEFAULT_CACHE_DIRECTORY, load_planning_session
+from .session import PlanningSession
 
 
 DEFAULT_OUTPUT_DIRECTORY = (
@@ -100,13 +110,20 @@ def summarize_plan(material_requirements, netted_requirements, recommendations):
 
 
 def write_csv(file_path, rows):
-    """Write dictionaries to a CSV file and return whether a file was created."""
-    if not rows:
+    """Write dictionaries to a CSV file and return whether a file was created.
+
+    ``rows`` may be any iterable, including a generator; rows are written as
+    they are produced, and the first row supplies the column names.
+    """
+    rows = iter(rows)
+    first_row = next(rows, None)
+    if first_row is None:
         return False
     file_path.parent.mkdir(parents=True, exist_ok=True)
     with file_path.open("w", newline="", encoding="utf-8") as csv_file:
-        writer = csv.DictWriter(csv_file, fieldnames=rows[0].keys())
+        writer = csv.DictWriter(csv_file, fieldnames=first_row.keys())
         writer.writeheader()
+        writer.writerow(first_row)
         writer.writerows(rows)
     return True
 
@@ -116,17 +133,39 @@ def export_planning_results(
     netted_requirements,
     recommendations,
     output_directory=DEFAULT_OUTPUT_DIRECTORY,
+    export_format="csv",
+    shortage_pegging=(),
+    recommendation_pegging=(),
 ):
-    """Export detailed planning datasets and return their created paths."""
+    """Export detailed planning datasets and return their created paths.
+
+    ``export_format`` is ``csv`` or one of the columnar formats, ``parquet``
+    or ``arrow``. Pegging rows link shortages and recommendations to the
+    demand references that drive them.
+    """
     datasets = {
-        "bom_explosion.csv": bom_explosion,
-        "netted_material_requirements.csv": netted_requirements,
-        "purchase_recommendations.csv": recommendations,
+        "bom_explosion": bom_explosion,
+        "netted_material_requirements": netted_requirements,
+        "purchase_recommendations": recommendations,
+        "shortage_pegging": shortage_pegging,
+        "recommendation_pegging": recommendation_pegging,
     }
+    if export_format != "csv" and export_format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
     created_files = []
-    for file_name, rows in datasets.items():
-        file_path = output_directory / file_name
-        if write_csv(file_path, rows):
+    for dataset_name, rows in datasets.items():
+        with span(f"export.{dataset_name}") as record:
+            rows = iter_counted(rows, record)
+            if export_format == "csv":
+                file_path = output_directory / f"{dataset_name}.csv"
+                created = write_csv(file_path, rows)
+            else:
+                file_path = output_directory / (
+                    dataset_name + COLUMNAR_FORMATS[export_format]
+                )
+                created = write_columnar(file_path, rows, export_format)
+        if created:
             created_files.append(file_path)
     return created_files
 
@@ -174,25 +213,76 @@ def print_plan_summary(overall_summary, material_summary, planning_date):
         )
 
 
-def run_planning_report(engine, planning_date=None, output_directory=None):
-    """Execute, summarize, print, and export the complete material plan."""
+def run_planning_report(
+    engine,
+    planning_date=None,
+    output_directory=None,
+    max_workers=1,
+    export_format="csv",
+    sourcing="preferred",
+    lot_sizing="lot_for_lot",
+    supplier_capacity=False,
+    cache_directory=None,
+    buckets="daily",
+):
+    """Execute, summarize, print, and export the complete material plan.
+
+    Every stage is computed from one database snapshot read by
+    ``PlanningSession``. Explosion rows are streamed straight to the export
+    file, which is CSV by default or Parquet or Arrow when ``export_format``
+    selects a columnar format. With a ``cache_directory``, the plan is reused
+    from ``plan_cache`` while the source tables are unchanged. Query and stage
+    spans are written to ``planning_run_log.json`` in the output directory.
+    """
     planning_date = planning_date or date.today()
-    bom_explosion = get_bom_explosion(engine)
-    material_requirements = get_material_requirements(engine)
-    netted_requirements = get_netted_material_requirements(engine)
-    recommendations = get_purchase_recommendations(engine, planning_date)
-    overall_summary, material_summary = summarize_plan(
-        material_requirements,
-        netted_requirements,
-        recommendations,
-    )
+    output_directory = output_directory or DEFAULT_OUTPUT_DIRECTORY
+    run_log = RunLog("planning_report")
+    run_log.track_engine(engine)
+    with run_log, span("planning_report"):
+        if cache_directory is None:
+            session = PlanningSession.from_database(
+                engine,
+                planning_date,
+                max_workers,
+                sourcing,
+                lot_sizing,
+                supplier_capacity,
+                buckets,
+            )
+        else:
+            session = load_planning_session(
+                engine,
+                planning_date,
+                max_workers,
+                sourcing,
+                lot_sizing,
+                supplier_capacity,
+                buckets,
+                cache_directory,
+            )
+        material_requirements = session.material_requirements
+        netted_requirements = session.netted_requirements
+        recommendations = session.recommendations
+        with span("summary", rows_in=len(netted_requirements)) as record:
+            overall_summary, material_summary = summarize_plan(
+                material_requirements,
+                netted_requirements,
+                recommendations,
+            )
+            record["rows_out"] = len(material_summary)
 
-    print_plan_summary(overall_summary, material_summary, planning_date)
-    created_files = export_planning_results(
-        bom_explosion,
-        netted_requirements,
-        recommendations,
-        output_directory or DEFAULT_OUTPUT_DIRECTORY,
+        print_plan_summary(overall_summary, material_summary, planning_date)
+        created_files = export_planning_results(
+            session.iter_bom_explosion(),
+            netted_requirements,
+            recommendations,
+            output_directory,
+            export_format,
+            session.shortage_pegging.iter_rows(("material_id", "need_date")),
+            session.recommendation_pegging.iter_rows(("recommendation_id",)),
+        )
+    created_files.append(
+        run_log.write(output_directory / "planning_run_log.json")
     )
     print("\nPLANNING EXPORTS")
     print("=" * 80)
@@ -204,7 +294,16 @@ def run_planning_report(engine, planning_date=None, output_directory=None):
 
 def main():
     """Run the reproducible planning report against PostgreSQL."""
-    run_planning_report(create_engine(DATABASE_URL))
+    run_planning_report(
+        create_engine(DATABASE_URL),
+        max_workers=PLANNING_WORKERS,
+        export_format=PLANNING_EXPORT_FORMAT,
+        sourcing=PLANNING_SOURCING,
+        lot_sizing=PLANNING_LOT_SIZING,
+        supplier_capacity=PLANNING_SUPPLIER_CAPACITY,
+        cache_directory=DEFAULT_CACHE_DIRECTORY if PLAN_CACHE else None,
+        buckets=PLANNING_BUCKETS,
+    )
 
 
 if __name__ == "__main__":
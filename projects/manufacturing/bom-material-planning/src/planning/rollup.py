@@ -0,0 +1,183 @@
+"""Read and rebuild the database-maintained gross requirement rollup.
+
+``material_requirement_rollup`` holds unrounded single-level gross
+requirements by material and need date: only BOM lines that name a material
+are priced, and subassembly lines are not exploded. Database triggers apply
+every demand and BOM-line change to it, and mark it stale for changes they
+cannot price, such as BOM effectivity or active flags. Readers use it only
+while it is fresh and no active BOM has a subassembly line, so it always
+agrees with the multi-level explosion it stands in for; otherwise they
+explode demand with ``src.planning.multilevel``. The planning snapshot reads
+it under that check, and sessions bucket its rows instead of re-exploding
+demand. ``python -m src.planning.rollup`` rebuilds a stale rollup.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import create_engine, text
+
+from src.config import DATABASE_URL
+
+from .bom_explosion import THREE_DECIMALS
+
+
+ROLLUP_USABLE_QUERY = text(
+    """
+    SELECT
+        NOT state.is_stale
+        AND NOT EXISTS (
+            SELECT 1
+            FROM bom_components AS component
+            JOIN bills_of_materials AS bom
+                ON bom.bom_id = component.bom_id
+                AND bom.bom_status = 'Active'
+            WHERE component.component_product_id IS NOT NULL
+        )
+    FROM material_requirement_rollup_state AS state
+    """
+)
+
+LOCK_ROLLUP_STATE = text(
+    "SELECT is_stale FROM material_requirement_rollup_state FOR UPDATE"
+)
+
+LOCK_ROLLUP = text("LOCK TABLE material_requirement_rollup IN EXCLUSIVE MODE")
+
+DELETE_ROLLUP_ROWS = text("DELETE FROM material_requirement_rollup")
+
+INSERT_ROLLUP_ROWS = text(
+    """
+    INSERT INTO material_requirement_rollup (
+        material_id,
+        need_date,
+        gross_requirement
+    )
+    SELECT
+        material.material_id,
+        demand.required_date,
+        SUM(
+            demand.demand_quantity
+            * component.quantity_per_unit
+            / (1 - component.expected_loss_pct / 100)
+        )
+    FROM production_demand AS demand
+    JOIN products AS product
+        ON product.product_id = demand.product_id
+        AND product.active_flag = TRUE
+    JOIN bills_of_materials AS bom
+        ON bom.product_id = demand.product_id
+        AND bom.bom_status = 'Active'
+        AND demand.required_date >= bom.effective_start_date
+        AND (
+            bom.effective_end_date IS NULL
+            OR demand.required_date <= bom.effective_end_date
+        )
+    JOIN bom_components AS component
+        ON component.bom_id = bom.bom_id
+    JOIN materials AS material
+        ON material.material_id = component.material_id
+        AND material.active_flag = TRUE
+    WHERE demand.demand_status IN ('Planned', 'Released')
+    GROUP BY material.material_id, demand.required_date
+    HAVING SUM(
+        demand.demand_quantity
+        * component.quantity_per_unit
+        / (1 - component.expected_loss_pct / 100)
+    ) <> 0
+    """
+)
+
+MARK_ROLLUP_FRESH = text(
+    """
+    UPDATE material_requirement_rollup_state
+    SET is_stale = FALSE, refreshed_at = CURRENT_TIMESTAMP
+    """
+)
+
+ROLLUP_MATERIAL_REQUIREMENTS_QUERY = text(
+    """
+    SELECT
+        rollup.need_date,
+        material.material_id,
+        material.material_code,
+        material.material_name,
+        material.base_unit_of_measure,
+        rollup.gross_requirement
+    FROM material_requirement_rollup AS rollup
+    JOIN materials AS material
+        ON material.material_id = rollup.material_id
+    ORDER BY rollup.need_date, material.material_code
+    """
+)
+
+
+def is_rollup_usable(connection):
+    """Return whether the rollup equals the full multi-level explosion.
+
+    That holds while it reflects every committed source change and no active
+    BOM has a subassembly line the single-level rollup would drop.
+    """
+    return connection.execute(ROLLUP_USABLE_QUERY).scalar_one()
+
+
+def bucket_rollup_requirements(rollup_rows, bucket_start=None):
+    """Return rollup rows as rounded gross requirements per planning bucket.
+
+    Unrounded daily totals are summed into the bucket ``bucket_start`` gives
+    each need date and rounded once per material and bucket, matching
+    ``explode_material_requirements`` row for row.
+    """
+    totals = {}
+    for row in rollup_rows:
+        need_date = row["need_date"]
+        if bucket_start:
+            need_date = bucket_start(need_date)
+        key = (need_date, row["material_id"])
+        if key not in totals:
+            totals[key] = {
+                **row,
+                "need_date": need_date,
+                "gross_requirement": Decimal("0"),
+            }
+        totals[key]["gross_requirement"] += Decimal(
+            str(row["gross_requirement"])
+        )
+
+    for requirement in totals.values():
+        requirement["gross_requirement"] = requirement[
+            "gross_requirement"
+        ].quantize(THREE_DECIMALS, rounding=ROUND_HALF_UP)
+    return sorted(
+        totals.values(),
+        key=lambda row: (row["need_date"], row["material_code"]),
+    )
+
+
+def refresh_material_requirement_rollup(engine, force=False):
+    """Rebuild the rollup when it is stale and return whether it was rebuilt.
+
+    The state row is locked first, so a concurrent change that marks the
+    rollup stale waits and marks it again after this rebuild commits. The
+    exclusive table lock holds back trigger writes until the rebuild is done.
+    """
+    with engine.begin() as connection:
+        is_stale = connection.execute(LOCK_ROLLUP_STATE).scalar_one()
+        if not (is_stale or force):
+            return False
+        connection.execute(LOCK_ROLLUP)
+        connection.execute(DELETE_ROLLUP_ROWS)
+        connection.execute(INSERT_ROLLUP_ROWS)
+        connection.execute(MARK_ROLLUP_FRESH)
+    return True
+
+
+def main():
+    """Rebuild a stale gross requirement rollup."""
+    if refresh_material_requirement_rollup(create_engine(DATABASE_URL)):
+        print("Gross requirement rollup rebuilt.")
+    else:
+        print("Gross requirement rollup is already fresh.")
+
+
+if __name__ == "__main__":
+    main()
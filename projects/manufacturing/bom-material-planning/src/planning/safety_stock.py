@@ -0,0 +1,309 @@
+"""Set statistical safety stock and reorder points from demand history.
+
+Past production demand is exploded through the multi-level BOMs into weekly
+material usage over a trailing window. Each material's weekly mean and sample
+standard deviation, weeks without usage included, give daily rates, and the
+preferred source's lead time sets the exposure period:
+
+    safety stock  = z(service level) x daily std x sqrt(lead time days)
+    reorder point = daily mean x lead time days + safety stock
+
+Statistics are computed for every material at once with NumPy, and the
+policies are staged with COPY and merged into ``material_stock_policies`` so
+only policies that changed are written and queued for re-netting. Materials
+without usage in the window get no policy and keep their static safety stock.
+"""
+
+from datetime import date, timedelta
+from functools import partial
+from statistics import NormalDist
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from src.config import (
+    DATABASE_URL,
+    SAFETY_STOCK_HISTORY_WEEKS,
+    SAFETY_STOCK_SERVICE_LEVEL,
+)
+from src.etl.load import merge_transaction_rows
+
+from .bom_explosion import ACTIVE_BOM_COMPONENT_QUERY, ACTIVE_BOM_QUERY
+from .buckets import get_bucket_start, parse_planning_buckets
+from .multilevel import explode_material_requirements, find_missing_boms
+from .netting import from_thousandths
+from .recommendations import PREFERRED_SOURCE_QUERY
+
+
+STOCK_POLICY_COLUMNS = (
+    "material_id",
+    "average_daily_demand",
+    "daily_demand_std",
+    "lead_time_days",
+    "service_level",
+    "safety_stock_quantity",
+    "reorder_point_quantity",
+    "history_start_date",
+    "history_end_date",
+)
+
+WEEKLY_BUCKETS = parse_planning_buckets("weekly")
+
+HISTORICAL_DEMAND_QUERY = text(
+    """
+    SELECT
+        demand.demand_id,
+        demand.demand_reference,
+        demand.product_id,
+        demand.required_date AS need_date,
+        demand.priority,
+        demand.demand_quantity,
+        product.product_code,
+        product.product_name,
+        product.active_flag AS product_active_flag
+    FROM production_demand AS demand
+    JOIN products AS product
+        ON product.product_id = demand.product_id
+    WHERE demand.demand_status <> 'Cancelled'
+      AND demand.required_date >= :history_start_date
+      AND demand.required_date < :history_end_date
+    ORDER BY demand.required_date, demand.demand_reference
+    """
+)
+
+DELETE_DROPPED_STOCK_POLICIES = text(
+    """
+    DELETE FROM material_stock_policies
+    WHERE material_id <> ALL(CAST(:material_ids AS BIGINT[]))
+    """
+)
+
+
+def get_history_window(as_of_date, history_weeks):
+    """Return ``(start, end)`` covering whole Monday weeks before ``as_of_date``.
+
+    The end is exclusive; the current, incomplete week is left out.
+    """
+    if history_weeks < 2:
+        raise ValueError("Safety stock history needs at least two weeks")
+    history_end_date = as_of_date - timedelta(days=as_of_date.weekday())
+    return history_end_date - timedelta(weeks=history_weeks), history_end_date
+
+
+def get_weekly_usage(history_demand, bom_headers, bom_components, history_start_date):
+    """Return weekly material usage rows from historical demand.
+
+    Past demand whose BOM revision is no longer active cannot be exploded and
+    is left out of the history rather than failing the run.
+    """
+    missing_references = {
+        row["demand_reference"]
+        for row in find_missing_boms(history_demand, bom_headers)
+    }
+    return explode_material_requirements(
+        [
+            row
+            for row in history_demand
+            if row["demand_reference"] not in missing_references
+        ],
+        bom_headers,
+        bom_components,
+        partial(
+            get_bucket_start,
+            planning_date=history_start_date,
+            buckets=WEEKLY_BUCKETS,
+        ),
+    )
+
+
+def calculate_stock_policies(
+    weekly_usage,
+    preferred_sources,
+    history_weeks,
+    service_level,
+):
+    """Return one stock policy per used material with a preferred source.
+
+    Weekly totals are scattered into per-material sums with ``np.bincount``,
+    so the work is linear in usage rows with no per-material Python loop.
+    """
+    if not 0.5 <= service_level < 1:
+        raise ValueError("Service level must be at least 0.5 and below 1")
+    lead_time_by_material = {
+        source["material_id"]: source["lead_time_days"]
+        for source in preferred_sources
+    }
+    material_ids = sorted(
+        {
+            row["material_id"]
+            for row in weekly_usage
+            if row["material_id"] in lead_time_by_material
+        }
+    )
+    if not material_ids:
+        return []
+    material_positions = {
+        material_id: position for position, material_id in enumerate(material_ids)
+    }
+
+    usage_rows = [
+        row for row in weekly_usage if row["material_id"] in material_positions
+    ]
+    positions = np.fromiter(
+        (material_positions[row["material_id"]] for row in usage_rows),
+        dtype=np.int64,
+        count=len(usage_rows),
+    )
+    quantities = np.fromiter(
+        (float(row["gross_requirement"]) for row in usage_rows),
+        dtype=np.float64,
+        count=len(usage_rows),
+    )
+    weekly_sum = np.bincount(positions, quantities, minlength=len(material_ids))
+    weekly_sum_squares = np.bincount(
+        positions, quantities * quantities, minlength=len(material_ids)
+    )
+    weekly_mean = weekly_sum / history_weeks
+    # Sample variance over every week, including weeks without usage.
+    weekly_variance = np.maximum(
+        (weekly_sum_squares - history_weeks * weekly_mean * weekly_mean)
+        / (history_weeks - 1),
+        0,
+    )
+
+    lead_time_days = np.array(
+        [lead_time_by_material[material_id] for material_id in material_ids],
+        dtype=np.int64,
+    )
+    daily_mean = weekly_mean / 7
+    daily_std = np.sqrt(weekly_variance / 7)
+    safety_stock = (
+        NormalDist().inv_cdf(service_level) * daily_std * np.sqrt(lead_time_days)
+    )
+    reorder_point = daily_mean * lead_time_days + safety_stock
+
+    columns = {
+        "average_daily_demand": daily_mean,
+        "daily_demand_std": daily_std,
+        "safety_stock_quantity": safety_stock,
+        "reorder_point_quantity": reorder_point,
+    }
+    decimals = {
+        name: from_thousandths(np.rint(values * 1000).astype(np.int64))
+        for name, values in columns.items()
+    }
+    return [
+        {
+            "material_id": material_id,
+            **{name: values[position] for name, values in decimals.items()},
+            "lead_time_days": int(lead_time_days[position]),
+            "service_level": service_level,
+        }
+        for position, material_id in enumerate(material_ids)
+    ]
+
+
+def read_stock_policy_inputs(engine, history_start_date, history_end_date):
+    """Read history, BOMs, and preferred sources in one consistent snapshot."""
+    with engine.connect() as connection:
+        connection.execution_options(
+            isolation_level="REPEATABLE READ",
+            postgresql_readonly=True,
+        )
+        with connection.begin():
+            return {
+                "history_demand": [
+                    dict(row)
+                    for row in connection.execute(
+                        HISTORICAL_DEMAND_QUERY,
+                        {
+                            "history_start_date": history_start_date,
+                            "history_end_date": history_end_date,
+                        },
+                    ).mappings()
+                ],
+                "bom_headers": [
+                    dict(row)
+                    for row in connection.execute(ACTIVE_BOM_QUERY).mappings()
+                ],
+                "bom_components": [
+                    dict(row)
+                    for row in connection.execute(
+                        ACTIVE_BOM_COMPONENT_QUERY
+                    ).mappings()
+                ],
+                "preferred_sources": [
+                    dict(row)
+                    for row in connection.execute(PREFERRED_SOURCE_QUERY).mappings()
+                ],
+            }
+
+
+def write_stock_policies(engine, policies, history_start_date, history_end_date):
+    """Merge the policies in one transaction and return the merge statistics.
+
+    Policies whose values are unchanged are left alone, so the change log
+    only queues materials whose policy was added, changed, or dropped.
+    """
+    policies = list(policies)
+    with engine.begin() as connection:
+        deleted_rows = connection.execute(
+            DELETE_DROPPED_STOCK_POLICIES,
+            {"material_ids": [policy["material_id"] for policy in policies]},
+        ).rowcount
+        merge_stats = merge_transaction_rows(
+            connection,
+            "material_stock_policies",
+            STOCK_POLICY_COLUMNS,
+            (
+                {
+                    **policy,
+                    "history_start_date": history_start_date,
+                    "history_end_date": history_end_date,
+                }
+                for policy in policies
+            ),
+        )
+    return {**merge_stats, "deleted_rows": deleted_rows}
+
+
+def optimize_stock_policies(
+    engine,
+    as_of_date=None,
+    history_weeks=SAFETY_STOCK_HISTORY_WEEKS,
+    service_level=SAFETY_STOCK_SERVICE_LEVEL,
+):
+    """Recompute and store stock policies; return the policies written."""
+    history_start_date, history_end_date = get_history_window(
+        as_of_date or date.today(), history_weeks
+    )
+    inputs = read_stock_policy_inputs(engine, history_start_date, history_end_date)
+    policies = calculate_stock_policies(
+        get_weekly_usage(
+            inputs["history_demand"],
+            inputs["bom_headers"],
+            inputs["bom_components"],
+            history_start_date,
+        ),
+        inputs["preferred_sources"],
+        history_weeks,
+        service_level,
+    )
+    write_stock_policies(engine, policies, history_start_date, history_end_date)
+    return policies
+
+
+def main():
+    """Recompute statistical stock policies from recent demand history."""
+    policies = optimize_stock_policies(create_engine(DATABASE_URL))
+    total_safety_stock = sum(
+        policy["safety_stock_quantity"] for policy in policies
+    )
+    print(
+        f"Stock policies written for {len(policies)} materials; "
+        f"total safety stock {total_safety_stock}."
+    )
+
+
+if __name__ == "__main__":
+    main()
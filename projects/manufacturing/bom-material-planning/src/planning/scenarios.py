@@ -0,0 +1,330 @@
+"""Plan what-if scenarios as copy-on-write overlays on a base session.
+
+An overlay maps a row key to replacement fields, to a complete new row, or to
+``None`` to remove the row. Overlaid snapshots share every unchanged row with
+the base snapshot, and each scenario re-explodes, nets, and recommends only
+the materials its overlays can reach, reusing the base plan for the rest.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from functools import cached_property
+
+from .allocation import (
+    create_allocated_material_recommendations,
+    group_sources_by_material,
+)
+from .incremental import (
+    find_affected_materials,
+    find_where_used_products,
+    merge_netted_requirements,
+)
+from .multilevel import explode_material_requirements
+from .netting import net_material_requirements
+from .recommendations import (
+    create_material_recommendations,
+    number_recommendations,
+    validate_source_coverage,
+)
+from .report import summarize_plan
+from .session import PlanningSession
+
+
+# Snapshot inputs that accept overlays, their row keys, and the source table
+# whose change rules decide which materials are affected.
+OVERLAY_KEYS = {
+    "demand": ("demand_reference",),
+    "inventory_supply": ("material_id",),
+    "scheduled_receipts": ("material_id", "expected_receipt_date"),
+    "preferred_sources": ("material_id",),
+    "approved_sources": ("material_id", "supplier_id"),
+}
+OVERLAY_SOURCE_TABLES = {
+    "demand": "production_demand",
+    "inventory_supply": "inventory_balances",
+    "scheduled_receipts": "purchase_orders",
+    "preferred_sources": "supplier_materials",
+    "approved_sources": "supplier_materials",
+}
+
+
+def get_row_key(row, key_columns):
+    """Return a row's overlay key: a scalar for one column, else a tuple."""
+    if len(key_columns) == 1:
+        return row[key_columns[0]]
+    return tuple(row[column] for column in key_columns)
+
+
+def apply_overlay(rows, key_columns, changes):
+    """Return overlaid rows and every base or new row the overlay touched.
+
+    Unchanged rows are the base dictionaries themselves, so scenarios share
+    them structurally. Changed rows are new dictionaries. Keys missing from the
+    base rows add new rows, which must define every base column.
+    """
+    pending_changes = dict(changes)
+    overlaid_rows = []
+    touched_rows = []
+    for row in rows:
+        key = get_row_key(row, key_columns)
+        if key not in pending_changes:
+            overlaid_rows.append(row)
+            continue
+        fields = pending_changes.pop(key)
+        touched_rows.append(row)
+        if fields is not None:
+            changed_row = {**row, **fields}
+            overlaid_rows.append(changed_row)
+            touched_rows.append(changed_row)
+
+    required_columns = set(rows[0]) if rows else set(key_columns)
+    for key, fields in pending_changes.items():
+        if fields is None:
+            raise ValueError(f"Cannot remove missing scenario row: {key}")
+        missing_columns = sorted(required_columns - set(fields))
+        if missing_columns:
+            raise ValueError(
+                f"New scenario row {key} is missing: "
+                + ", ".join(missing_columns)
+            )
+        overlaid_rows.append(fields)
+        touched_rows.append(fields)
+    return overlaid_rows, touched_rows
+
+
+def apply_scenario_overlays(snapshot, overlays):
+    """Return an overlaid snapshot and change records for its touched rows.
+
+    Change records use the planning change-log shape, so affected materials
+    are found with the same rules as incremental re-netting.
+    """
+    unsupported = sorted(set(overlays) - set(OVERLAY_KEYS))
+    if unsupported:
+        raise ValueError(
+            "Unsupported scenario overlays: " + ", ".join(unsupported)
+        )
+
+    overlaid_snapshot = dict(snapshot)
+    changes = []
+    for name, overlay in overlays.items():
+        overlaid_snapshot[name], touched_rows = apply_overlay(
+            snapshot[name], OVERLAY_KEYS[name], overlay
+        )
+        for row in touched_rows:
+            changes.append(
+                {
+                    "source_table": OVERLAY_SOURCE_TABLES[name],
+                    "material_id": row.get("material_id"),
+                    "product_id": row.get("product_id"),
+                }
+            )
+    return overlaid_snapshot, changes
+
+
+def lead_time_overlay(preferred_sources, supplier_code, extra_days):
+    """Return a source overlay that lengthens one supplier's lead times."""
+    return {
+        source["material_id"]: {
+            "lead_time_days": source["lead_time_days"] + extra_days
+        }
+        for source in preferred_sources
+        if source["supplier_code"] == supplier_code
+    }
+
+
+def demand_scale_overlay(demand_rows, demand_references, factor):
+    """Return a demand overlay that multiplies the referenced quantities."""
+    demand_references = set(demand_references)
+    factor = Decimal(str(factor))
+    return {
+        row["demand_reference"]: {
+            "demand_quantity": Decimal(str(row["demand_quantity"])) * factor
+        }
+        for row in demand_rows
+        if row["demand_reference"] in demand_references
+    }
+
+
+class PlanningScenario(PlanningSession):
+    """A what-if plan computed from a base session and overlay diffs.
+
+    Only materials reachable from overlaid rows are re-planned; every other
+    material's requirements, netted rows, and recommendations come from the
+    base session. Results equal a full plan of the overlaid snapshot.
+    """
+
+    def __init__(self, base_session, overlays, name="Scenario"):
+        snapshot, self.changes = apply_scenario_overlays(
+            base_session.snapshot, overlays
+        )
+        super().__init__(
+            snapshot,
+            base_session.planning_date,
+            sourcing=base_session.sourcing,
+            lot_sizing=base_session.lot_sizing,
+            supplier_capacity=base_session.supplier_capacity,
+            buckets=base_session.buckets,
+        )
+        self.base_session = base_session
+        self.name = name
+
+    @cached_property
+    def affected_materials(self):
+        """Material IDs whose plan may differ from the base plan."""
+        return find_affected_materials(
+            self.changes,
+            self.snapshot["bom_headers"],
+            self.snapshot["bom_components"],
+        )
+
+    @cached_property
+    def material_requirements(self):
+        """Base gross requirements with demand-affected materials re-exploded."""
+        if not any(
+            change["source_table"] == "production_demand"
+            for change in self.changes
+        ):
+            return self.base_session.material_requirements
+
+        affected = self.affected_materials
+        product_ids = find_where_used_products(
+            affected,
+            self.snapshot["bom_headers"],
+            self.snapshot["bom_components"],
+        )
+        refreshed_rows = [
+            row
+            for row in explode_material_requirements(
+                [
+                    row
+                    for row in self.snapshot["demand"]
+                    if row["product_id"] in product_ids
+                ],
+                self.snapshot["bom_headers"],
+                self.snapshot["bom_components"],
+                self.bucket_start,
+            )
+            if row["material_id"] in affected
+        ]
+        return merge_netted_requirements(
+            self.base_session.material_requirements, refreshed_rows, affected
+        )
+
+    @cached_property
+    def netted_requirements(self):
+        """Base netted plan with the affected materials re-netted."""
+        affected = self.affected_materials
+        refreshed_rows = net_material_requirements(
+            [
+                row
+                for row in self.material_requirements
+                if row["material_id"] in affected
+            ],
+            [
+                row
+                for row in self.snapshot["inventory_supply"]
+                if row["material_id"] in affected
+            ],
+            [
+                row
+                for row in self.scheduled_receipts
+                if row["material_id"] in affected
+            ],
+        )
+        return merge_netted_requirements(
+            self.base_session.netted_requirements, refreshed_rows, affected
+        )
+
+    @cached_property
+    def uncapacitated_recommendations(self):
+        """Recommendations re-created for affected materials and renumbered.
+
+        Capacity leveling then runs over the whole plan, because a changed
+        material can shift orders of others that share its buckets.
+        """
+        affected = self.affected_materials
+        if self.sourcing == "allocated":
+            sources_by_material = group_sources_by_material(
+                self.snapshot["approved_sources"]
+            )
+            create_recommendations = create_allocated_material_recommendations
+        else:
+            sources_by_material = {
+                source["material_id"]: source
+                for source in self.snapshot["preferred_sources"]
+            }
+            create_recommendations = create_material_recommendations
+        validate_source_coverage(self.netted_requirements, sources_by_material)
+
+        rows_by_material = defaultdict(list)
+        for row in self.order_lots:
+            rows_by_material[row["material_id"]].append(row)
+        base_by_material = defaultdict(list)
+        for recommendation in self.base_session.uncapacitated_recommendations:
+            if recommendation["material_id"] not in affected:
+                base_by_material[recommendation["material_id"]].append(
+                    dict(recommendation)
+                )
+
+        recommendations_by_material = {}
+        for material_id, material_rows in rows_by_material.items():
+            if material_id in affected:
+                recommendations_by_material[material_id] = (
+                    create_recommendations(
+                        material_rows,
+                        sources_by_material.get(material_id),
+                        self.planning_date,
+                    )
+                )
+            else:
+                # Base IDs were assigned in each material's creation order.
+                recommendations_by_material[material_id] = sorted(
+                    base_by_material[material_id],
+                    key=lambda row: int(row["recommendation_id"][4:]),
+                )
+        return number_recommendations(recommendations_by_material)
+
+
+def compare_scenarios(base_session, scenario_overlays):
+    """Return one summary row for the base plan and each named scenario.
+
+    ``scenario_overlays`` maps scenario names to overlay dictionaries. Cost and
+    past-due changes are measured against the base plan.
+    """
+    base_summary, _ = summarize_plan(
+        base_session.material_requirements,
+        base_session.netted_requirements,
+        base_session.recommendations,
+    )
+    comparison = [
+        {
+            "scenario": "Base",
+            "affected_materials": 0,
+            **base_summary,
+            "purchase_cost_change": Decimal("0"),
+            "past_due_change": 0,
+        }
+    ]
+    for name, overlays in scenario_overlays.items():
+        scenario = PlanningScenario(base_session, overlays, name)
+        summary, _ = summarize_plan(
+            scenario.material_requirements,
+            scenario.netted_requirements,
+            scenario.recommendations,
+        )
+        comparison.append(
+            {
+                "scenario": name,
+                "affected_materials": len(scenario.affected_materials),
+                **summary,
+                "purchase_cost_change": (
+                    summary["estimated_purchase_cost"]
+                    - base_summary["estimated_purchase_cost"]
+                ),
+                "past_due_change": (
+                    summary["past_due_recommendations"]
+                    - base_summary["past_due_recommendations"]
+                ),
+            }
+        )
+    return comparison
@@ -0,0 +1,348 @@
+"""Run every planning stage from one consistent database snapshot."""
+
+from contextlib import contextmanager
+from datetime import date
+from functools import cached_property, partial
+
+from .allocation import APPROVED_SOURCE_QUERY, create_allocated_recommendations
+from .bom_explosion import (
+    ACTIVE_BOM_COMPONENT_QUERY,
+    ACTIVE_BOM_QUERY,
+    OPEN_DEMAND_QUERY,
+)
+from .buckets import (
+    DAILY_BUCKETS,
+    bucket_scheduled_receipts,
+    get_bucket_start,
+    parse_planning_buckets,
+)
+from .capacity import SUPPLIER_CAPACITY_QUERY, apply_supplier_capacity
+from .instrumentation import span
+from .lot_sizing import LOT_SIZING_POLICIES, apply_lot_sizing
+from .multilevel import (
+    explode_demand,
+    explode_material_requirements,
+    iter_demand_explosion,
+    validate_demand_coverage,
+)
+from .netting import (
+    INVENTORY_SUPPLY_QUERY,
+    SCHEDULED_RECEIPTS_QUERY,
+    net_material_requirements,
+)
+from .parallel import plan_materials_in_parallel
+from .pegging import (
+    PeggingIndex,
+    explode_demand_contributions,
+    peg_net_requirements,
+    peg_recommendations,
+)
+from .recommendations import (
+    PREFERRED_SOURCE_QUERY,
+    create_purchase_recommendations,
+)
+from .rollup import (
+    ROLLUP_MATERIAL_REQUIREMENTS_QUERY,
+    bucket_rollup_requirements,
+    is_rollup_usable,
+)
+
+
+SNAPSHOT_QUERIES = {
+    "demand": OPEN_DEMAND_QUERY,
+    "bom_headers": ACTIVE_BOM_QUERY,
+    "bom_components": ACTIVE_BOM_COMPONENT_QUERY,
+    "inventory_supply": INVENTORY_SUPPLY_QUERY,
+    "scheduled_receipts": SCHEDULED_RECEIPTS_QUERY,
+    "preferred_sources": PREFERRED_SOURCE_QUERY,
+    "approved_sources": APPROVED_SOURCE_QUERY,
+    "supplier_capacity": SUPPLIER_CAPACITY_QUERY,
+}
+
+# ``preferred`` orders every shortage from the one preferred source;
+# ``allocated`` splits shortages across approved sources by quota.
+SOURCING_MODES = {"preferred": "preferred_sources", "allocated": "approved_sources"}
+
+
+@contextmanager
+def snapshot_connection(engine):
+    """Yield a connection inside one read-only REPEATABLE READ transaction."""
+    with engine.connect() as connection:
+        connection.execution_options(
+            isolation_level="REPEATABLE READ",
+            postgresql_readonly=True,
+        )
+        with connection.begin():
+            yield connection
+
+
+def read_snapshot_queries(connection):
+    """Run every snapshot query on ``connection`` as a ``query.snapshot`` span.
+
+    While the maintained requirement rollup is usable in this snapshot, its
+    rows are read as ``requirement_rollup`` so sessions need not re-explode
+    demand into material requirements.
+    """
+    queries = dict(SNAPSHOT_QUERIES)
+    if is_rollup_usable(connection):
+        queries["requirement_rollup"] = ROLLUP_MATERIAL_REQUIREMENTS_QUERY
+    snapshot = {}
+    for name, query in queries.items():
+        with span(f"query.snapshot.{name}") as record:
+            snapshot[name] = [
+                dict(row) for row in connection.execute(query).mappings()
+            ]
+            record["rows_out"] = len(snapshot[name])
+    return snapshot
+
+
+def read_planning_snapshot(engine):
+    """Read every planning input in one read-only REPEATABLE READ transaction.
+
+    All queries share one connection and one transaction snapshot, so demand,
+    BOMs, inventory, receipts, and sources cannot change between stages.
+    """
+    with snapshot_connection(engine) as connection:
+        return read_snapshot_queries(connection)
+
+
+class PlanningSession:
+    """Lazily derive explosion, netting, and recommendations from a snapshot.
+
+    Each stage is computed at most once and reused by every later stage, so a
+    report, its CSV exports, and its figures all describe the same plan. With
+    ``max_workers`` above 1, netting and recommendations run by material shard
+    in worker processes and produce identical results. ``sourcing`` selects
+    one of ``SOURCING_MODES``; only its source list must be in the snapshot.
+    ``lot_sizing`` names a policy in ``LOT_SIZING_POLICIES`` that groups
+    shortages into order lots before recommendations are created. With
+    ``supplier_capacity`` enabled, recommendations are shifted or split to fit
+    weekly supplier capacity buckets. ``buckets`` is a specification for
+    ``parse_planning_buckets``; beyond the daily horizon, requirements and
+    receipts are planned per weekly or monthly bucket.
+    """
+
+    def __init__(
+        self,
+        snapshot,
+        planning_date=None,
+        max_workers=1,
+        sourcing="preferred",
+        lot_sizing="lot_for_lot",
+        supplier_capacity=False,
+        buckets="daily",
+    ):
+        if sourcing not in SOURCING_MODES:
+            raise ValueError(f"Unsupported sourcing mode: {sourcing}")
+        if lot_sizing not in LOT_SIZING_POLICIES:
+            raise ValueError(f"Unsupported lot-sizing policy: {lot_sizing}")
+        optional_inputs = set(SOURCING_MODES.values()) - {
+            SOURCING_MODES[sourcing]
+        }
+        if not supplier_capacity:
+            optional_inputs.add("supplier_capacity")
+        required_inputs = set(SNAPSHOT_QUERIES) - optional_inputs
+        missing_inputs = sorted(required_inputs - set(snapshot))
+        if missing_inputs:
+            raise ValueError(
+                "Planning snapshot is missing: " + ", ".join(missing_inputs)
+            )
+        self.snapshot = snapshot
+        self.planning_date = planning_date or date.today()
+        self.max_workers = max_workers
+        self.sourcing = sourcing
+        self.lot_sizing = lot_sizing
+        self.supplier_capacity = supplier_capacity
+        self.buckets = buckets
+        self.planning_buckets = parse_planning_buckets(buckets)
+        self.bucket_start = (
+            None
+            if self.planning_buckets == DAILY_BUCKETS
+            else partial(
+                get_bucket_start,
+                planning_date=self.planning_date,
+                buckets=self.planning_buckets,
+            )
+        )
+
+    @classmethod
+    def from_database(
+        cls,
+        engine,
+        planning_date=None,
+        max_workers=1,
+        sourcing="preferred",
+        lot_sizing="lot_for_lot",
+        supplier_capacity=False,
+        buckets="daily",
+    ):
+        """Create a session from one consistent PostgreSQL snapshot."""
+        return cls(
+            read_planning_snapshot(engine),
+            planning_date,
+            max_workers,
+            sourcing,
+            lot_sizing,
+            supplier_capacity,
+            buckets,
+        )
+
+    @cached_property
+    def bom_explosion(self):
+        """Indented demand-to-material requirement rows for every BOM level."""
+        return explode_demand(
+            self.snapshot["demand"],
+            self.snapshot["bom_headers"],
+            self.snapshot["bom_components"],
+        )
+
+    def iter_bom_explosion(self):
+        """Yield explosion rows without caching them, for streaming exports."""
+        return iter_demand_explosion(
+            self.snapshot["demand"],
+            self.snapshot["bom_headers"],
+            self.snapshot["bom_components"],
+        )
+
+    @cached_property
+    def material_requirements(self):
+        """Multi-level gross requirements aggregated by material and need date.
+
+        A snapshot carrying ``requirement_rollup`` already holds these totals
+        by day, so they are only bucketed; demand coverage is still checked.
+        """
+        if "requirement_rollup" in self.snapshot:
+            validate_demand_coverage(
+                self.snapshot["demand"], self.snapshot["bom_headers"]
+            )
+            return bucket_rollup_requirements(
+                self.snapshot["requirement_rollup"], self.bucket_start
+            )
+        return explode_material_requirements(
+            self.snapshot["demand"],
+            self.snapshot["bom_headers"],
+            self.snapshot["bom_components"],
+            self.bucket_start,
+        )
+
+    @cached_property
+    def scheduled_receipts(self):
+        """Open purchase-order receipts, summed by planning bucket if enabled."""
+        if self.bucket_start is None:
+            return self.snapshot["scheduled_receipts"]
+        return bucket_scheduled_receipts(
+            self.snapshot["scheduled_receipts"], self.bucket_start
+        )
+
+    @cached_property
+    def parallel_plan(self):
+        """Netted requirements and recommendations computed by material shard.
+
+        Shards build recommendations only for ``preferred`` sourcing with
+        lot-for-lot sizing, the one mode that uses them directly. Otherwise
+        they only net, and the sources are passed so coverage is still
+        checked.
+        """
+        with span(
+            "netting.parallel", rows_in=len(self.material_requirements)
+        ) as record:
+            netted_requirements, recommendations = plan_materials_in_parallel(
+                self.material_requirements,
+                self.snapshot["inventory_supply"],
+                self.scheduled_receipts,
+                self.snapshot[SOURCING_MODES[self.sourcing]],
+                self.planning_date,
+                self.max_workers,
+                recommend=self.uses_shard_recommendations,
+            )
+            record["rows_out"] = len(netted_requirements)
+        return netted_requirements, recommendations
+
+    @property
+    def uses_shard_recommendations(self):
+        """Whether shard recommendations are the plan's recommendations."""
+        return self.sourcing == "preferred" and self.lot_sizing == "lot_for_lot"
+
+    @cached_property
+    def netted_requirements(self):
+        """Time-phased gross-to-net requirements plan."""
+        if self.max_workers > 1:
+            return self.parallel_plan[0]
+        return net_material_requirements(
+            self.material_requirements,
+            self.snapshot["inventory_supply"],
+            self.scheduled_receipts,
+        )
+
+    @cached_property
+    def order_lots(self):
+        """Netted shortages grouped into order lots by the lot-sizing policy."""
+        if self.lot_sizing == "lot_for_lot":
+            return self.netted_requirements
+        return apply_lot_sizing(
+            self.netted_requirements,
+            self.snapshot[SOURCING_MODES[self.sourcing]],
+            self.lot_sizing,
+        )
+
+    @cached_property
+    def uncapacitated_recommendations(self):
+        """Supplier-constrained recommendations before capacity leveling."""
+        if self.sourcing == "allocated":
+            return create_allocated_recommendations(
+                self.order_lots,
+                self.snapshot["approved_sources"],
+                self.planning_date,
+            )
+        if self.max_workers > 1 and self.uses_shard_recommendations:
+            return self.parallel_plan[1]
+        return create_purchase_recommendations(
+            self.order_lots,
+            self.snapshot["preferred_sources"],
+            self.planning_date,
+        )
+
+    @cached_property
+    def recommendations(self):
+        """Supplier-constrained purchase recommendations."""
+        if not self.supplier_capacity:
+            return self.uncapacitated_recommendations
+        return apply_supplier_capacity(
+            self.uncapacitated_recommendations,
+            self.snapshot["supplier_capacity"],
+            self.snapshot[SOURCING_MODES[self.sourcing]],
+            self.planning_date,
+        )
+
+    @cached_property
+    def shortage_pegging(self):
+        """Demand lines behind each net shortage, keyed by material and date."""
+        with span(
+            "pegging.shortages", rows_in=len(self.netted_requirements)
+        ) as record:
+            pegging = PeggingIndex(
+                peg_net_requirements(
+                    self.netted_requirements,
+                    explode_demand_contributions(
+                        self.snapshot["demand"],
+                        self.snapshot["bom_headers"],
+                        self.snapshot["bom_components"],
+                        self.bucket_start,
+                    ),
+                )
+            )
+            record["rows_out"] = len(pegging)
+        return pegging
+
+    @cached_property
+    def recommendation_pegging(self):
+        """Demand lines behind each recommendation, keyed by REC-nnnn ID."""
+        shortage_pegging = self.shortage_pegging
+        with span(
+            "pegging.recommendations", rows_in=len(self.recommendations)
+        ) as record:
+            pegging = PeggingIndex(
+                peg_recommendations(self.recommendations, shortage_pegging)
+            )
+            record["rows_out"] = len(pegging)
+        return pegging
@@ -0,0 +1,127 @@
+"""Tests for quota-based multi-source allocation."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.planning.allocation import (
+    allocate_shortage,
+    create_allocated_recommendations,
+    group_sources_by_material,
+)
+from src.planning.recommendations import create_purchase_recommendations
+
+
+PLANNING_DATE = date(2026, 8, 1)
+NEED_DATE = date(2026, 9, 1)
+
+
+def source(supplier_id, unit_price, lead_time_days, **rules):
+    """Build an approved-source fixture with unit MOQ and order multiple."""
+    return {
+        "material_id": 1,
+        "material_code": "MAT-1",
+        "supplier_id": supplier_id,
+        "supplier_code": f"SUP-{supplier_id}",
+        "supplier_name": f"Supplier {supplier_id}",
+        "unit_price": Decimal(unit_price),
+        "lead_time_days": lead_time_days,
+        "minimum_order_quantity": Decimal("1.000"),
+        "order_multiple": Decimal("1.000"),
+        "preferred_flag": rules.get("preferred_flag", False),
+        "quota_pct": rules.get("quota_pct"),
+        "capacity_quantity": rules.get("capacity_quantity"),
+    }
+
+
+def split(allocations):
+    """Return allocations as comparable (supplier, quantity, reason) tuples."""
+    return [
+        (source["supplier_code"], quantity, reason)
+        for source, quantity, reason in allocations
+    ]
+
+
+def test_shortage_is_split_by_quota():
+    sources = [
+        source(1, "2.00", 10, quota_pct=Decimal("70")),
+        source(2, "1.90", 20, quota_pct=Decimal("30")),
+    ]
+
+    allocations = allocate_shortage(
+        Decimal("100.001"), sources, NEED_DATE, PLANNING_DATE, {}
+    )
+
+    assert split(allocations) == [
+        ("SUP-1", Decimal("70.001"), "Quota"),
+        ("SUP-2", Decimal("30.000"), "Quota"),
+    ]
+
+
+def test_capacity_overflow_and_late_quota_fall_back_to_cheapest_timely_source():
+    sources = [
+        source(1, "2.00", 10, quota_pct=Decimal("50"), capacity_quantity=20),
+        source(2, "1.50", 60, quota_pct=Decimal("50")),
+        source(3, "2.50", 5),
+        source(4, "2.20", 5),
+    ]
+
+    allocations = allocate_shortage(
+        Decimal("100"), sources, NEED_DATE, PLANNING_DATE, {1: Decimal("5")}
+    )
+
+    # Supplier 2 cannot deliver by the need date; supplier 1 has 15 left.
+    assert split(allocations) == [
+        ("SUP-1", Decimal("15.000"), "Quota"),
+        ("SUP-4", Decimal("85.000"), "Fallback"),
+    ]
+
+
+def test_fastest_source_takes_shortage_no_source_can_meet():
+    sources = [source(1, "1.00", 90), source(2, "3.00", 45)]
+
+    allocations = allocate_shortage(
+        Decimal("10"), sources, NEED_DATE, PLANNING_DATE, {}
+    )
+
+    assert split(allocations) == [("SUP-2", Decimal("10"), "Late Source")]
+
+
+def test_quotas_must_total_one_hundred_percent():
+    with pytest.raises(ValueError, match="MAT-1"):
+        group_sources_by_material(
+            [
+                source(1, "2.00", 10, quota_pct=Decimal("60")),
+                source(2, "2.00", 10, quota_pct=Decimal("30")),
+            ]
+        )
+
+
+def test_preferred_source_without_quotas_matches_single_source_plan():
+    netted = [
+        {
+            "material_id": 1,
+            "material_code": "MAT-1",
+            "material_name": "Material One",
+            "base_unit_of_measure": "KG",
+            "need_date": NEED_DATE,
+            "net_requirement": Decimal("42.500"),
+        }
+    ]
+    preferred = source(1, "2.00", 10, preferred_flag=True)
+    sources = [preferred, source(2, "1.00", 10)]
+
+    allocated = create_allocated_recommendations(netted, sources, PLANNING_DATE)
+    single_source = create_purchase_recommendations(
+        netted, [preferred], PLANNING_DATE
+    )
+
+    assert [
+        {
+            key: value
+            for key, value in row.items()
+            if key not in {"allocated_requirement", "allocation_reason"}
+        }
+        for row in allocated
+    ] == single_source
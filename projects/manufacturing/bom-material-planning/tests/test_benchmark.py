@@ -0,0 +1,77 @@
+"""Tests for the scaled planning benchmark."""
+
+from datetime import date
+import json
+
+import pytest
+
+from src.planning.benchmark import (
+    build_master_data,
+    build_planning_snapshot,
+    generate_transactions,
+    parse_benchmark_scales,
+    run_benchmark_scale,
+    write_benchmark,
+)
+from src.planning.session import PlanningSession
+
+
+PLANNING_DATE = date(2026, 8, 3)
+
+
+def test_scales_parse_demand_lines_by_materials():
+    assert parse_benchmark_scales("1000x100, 1000000X100000") == [
+        (1000, 100),
+        (1_000_000, 100_000),
+    ]
+
+
+@pytest.mark.parametrize("value", ["1000", "0x100", "ax10"])
+def test_invalid_scales_fail(value):
+    with pytest.raises(ValueError, match="(?i)benchmark scale"):
+        parse_benchmark_scales(value)
+
+
+def test_master_data_scales_with_requested_sizes():
+    master_data = build_master_data(400, 30, PLANNING_DATE)
+
+    assert len(master_data["products"]) == 50
+    assert len(master_data["materials"]) == 30
+    assert len(master_data["supplier_materials"]) == 30
+    assert sum(
+        row["component_product_id"] is not None
+        for row in master_data["bom_components"]
+    ) == 5
+
+
+def test_generated_snapshot_plans_every_demand_line():
+    master_data = build_master_data(80, 12, PLANNING_DATE)
+    transactions = generate_transactions(master_data, PLANNING_DATE)
+    snapshot = build_planning_snapshot(master_data, transactions)
+
+    session = PlanningSession(snapshot, PLANNING_DATE)
+
+    assert len(snapshot["demand"]) == 80
+    assert session.recommendations
+    assert {row["material_id"] for row in session.material_requirements} <= {
+        row["material_id"] for row in master_data["materials"]
+    }
+
+
+def test_scale_result_times_every_stage_and_writes_json(tmp_path):
+    result = run_benchmark_scale(80, 12, PLANNING_DATE)
+
+    assert [stage["stage"] for stage in result["stages"]] == [
+        "generate_master_data",
+        "generate_transactions",
+        "snapshot_build",
+        "bom_explosion",
+        "netting",
+        "recommendations",
+        "summary",
+        "export",
+    ]
+    assert result["peak_rss_mb"] > 0
+
+    output_file = write_benchmark({"results": [result]}, tmp_path / "bench.json")
+    assert json.loads(output_file.read_text())["results"][0]["demand_lines"] == 80
@@ -0,0 +1,95 @@
+"""Tests for weekly and monthly planning buckets."""
+
+from datetime import date
+from decimal import Decimal
+from functools import partial
+
+import pytest
+
+from src.planning.buckets import (
+    bucket_scheduled_receipts,
+    get_bucket_start,
+    parse_planning_buckets,
+)
+
+
+PLANNING_DATE = date(2026, 8, 5)
+TIERS = parse_planning_buckets("daily:14,weekly:60,monthly")
+
+
+def test_specification_parses_tiers():
+    assert TIERS == (("daily", 14), ("weekly", 60), ("monthly", None))
+    assert parse_planning_buckets(" Daily ") == (("daily", None),)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "hourly",
+        "daily:14",
+        "daily,weekly",
+        "weekly:14,daily",
+        "daily:30,weekly:20,monthly",
+        "daily:x,weekly",
+    ],
+)
+def test_invalid_specifications_fail(value):
+    with pytest.raises(ValueError, match="(?i)planning bucket"):
+        parse_planning_buckets(value)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (date(2026, 8, 1), date(2026, 8, 1)),
+        (date(2026, 8, 18), date(2026, 8, 18)),
+        # Day 14 starts the weekly tier on a Wednesday, not the prior Monday.
+        (date(2026, 8, 21), date(2026, 8, 19)),
+        (date(2026, 8, 27), date(2026, 8, 24)),
+        # Day 60 is October 4; its month bucket starts there.
+        (date(2026, 10, 20), date(2026, 10, 4)),
+        (date(2026, 11, 30), date(2026, 11, 1)),
+    ],
+)
+def test_dates_map_to_their_bucket_start(value, expected):
+    assert get_bucket_start(value, PLANNING_DATE, TIERS) == expected
+
+
+def test_weekly_first_tier_keeps_past_due_dates_early():
+    assert get_bucket_start(
+        date(2026, 8, 2), PLANNING_DATE, parse_planning_buckets("weekly")
+    ) == date(2026, 7, 27)
+
+
+def test_receipts_are_summed_per_material_bucket():
+    receipts = [
+        {
+            "material_id": material_id,
+            "material_code": f"MAT-{material_id}",
+            "expected_receipt_date": receipt_date,
+            "open_receipt_quantity": Decimal(quantity),
+        }
+        for material_id, receipt_date, quantity in [
+            (2, date(2026, 11, 3), "5.000"),
+            (1, date(2026, 11, 20), "10.000"),
+            (1, date(2026, 11, 2), "2.500"),
+        ]
+    ]
+
+    bucketed = bucket_scheduled_receipts(
+        receipts,
+        partial(get_bucket_start, planning_date=PLANNING_DATE, buckets=TIERS),
+    )
+
+    assert [
+        (
+            row["material_id"],
+            row["expected_receipt_date"],
+            row["open_receipt_quantity"],
+        )
+        for row in bucketed
+    ] == [
+        (1, date(2026, 11, 1), Decimal("12.500")),
+        (2, date(2026, 11, 1), Decimal("5.000")),
+    ]
+    assert receipts[1]["expected_receipt_date"] == date(2026, 11, 20)
@@ -0,0 +1,39 @@
+"""Tests for COPY text formatting and streaming."""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from src.etl.bulk_load import CopyBuffer, format_copy_value, iter_copy_lines
+
+
+def test_copy_values_use_postgresql_text_format():
+    assert format_copy_value(None) == r"\N"
+    assert format_copy_value(True) == "t"
+    assert format_copy_value(Decimal("12.500")) == "12.500"
+    assert format_copy_value(date(2026, 9, 1)) == "2026-09-01"
+    assert (
+        format_copy_value(datetime(2026, 9, 1, 8, 30, tzinfo=timezone.utc))
+        == "2026-09-01T08:30:00+00:00"
+    )
+    assert format_copy_value("a\tb\\c\nd") == "a\\tb\\\\c\\nd"
+
+
+def test_copy_lines_follow_column_order():
+    rows = [{"priority": "High", "demand_reference": "PD-1", "extra": 1}]
+
+    assert list(iter_copy_lines(rows, ("demand_reference", "priority"))) == [
+        "PD-1\tHigh\n"
+    ]
+
+
+def test_copy_buffer_streams_generator_in_sized_chunks():
+    lines = (f"{index}\n" for index in range(1000))
+    buffer = CopyBuffer(lines)
+
+    chunks = []
+    while chunk := buffer.read(100):
+        assert len(chunk) <= 100
+        chunks.append(chunk)
+
+    assert "".join(chunks) == "".join(f"{index}\n" for index in range(1000))
+    assert buffer.row_count == 1000
@@ -0,0 +1,179 @@
+"""Tests for weekly supplier capacity leveling."""
+
+from datetime import date
+from decimal import Decimal
+
+from src.planning.capacity import apply_supplier_capacity, get_week_start
+
+
+PLANNING_DATE = date(2026, 8, 3)
+SOURCES = [
+    {"material_id": 1, "supplier_id": 7, "unit_price": Decimal("2.0000")},
+    {"material_id": 2, "supplier_id": 7, "unit_price": Decimal("3.0000")},
+    {"material_id": 3, "supplier_id": 8, "unit_price": Decimal("1.0000")},
+]
+
+
+def capacity(weekly_quantity, material_ids=(1, 2)):
+    """Build capacity rows for supplier 7's wire category."""
+    return [
+        {
+            "supplier_id": 7,
+            "material_id": material_id,
+            "material_category": "Metal Wire",
+            "weekly_capacity_quantity": Decimal(weekly_quantity),
+        }
+        for material_id in material_ids
+    ]
+
+
+def recommendation(number, material_id, need_date, quantity, supplier_id=7):
+    """Build a numbered recommendation with a 14-day lead time."""
+    quantity = Decimal(quantity)
+    unit_price = {1: Decimal("2"), 2: Decimal("3"), 3: Decimal("1")}[material_id]
+    return {
+        "recommendation_id": f"REC-{number:04d}",
+        "material_id": material_id,
+        "material_code": f"MAT-{material_id}",
+        "need_date": need_date,
+        "supplier_id": supplier_id,
+        "lead_time_days": 14,
+        "minimum_order_quantity": Decimal("100.000"),
+        "order_multiple": Decimal("50.000"),
+        "recommended_order_quantity": quantity,
+        "recommended_order_date": date.fromordinal(need_date.toordinal() - 14),
+        "urgency_status": "Future",
+        "estimated_purchase_cost": (quantity * unit_price).quantize(
+            Decimal("0.01")
+        ),
+    }
+
+
+def placements(recommendations):
+    """Return comparable (material, receipt, quantity, status) tuples."""
+    return sorted(
+        (
+            row["material_id"],
+            row["planned_receipt_date"],
+            row["recommended_order_quantity"],
+            row["capacity_status"],
+        )
+        for row in recommendations
+    )
+
+
+def test_week_starts_on_monday():
+    assert get_week_start(date(2026, 9, 3)) == date(2026, 8, 31)
+    assert get_week_start(date(2026, 8, 31)) == date(2026, 8, 31)
+
+
+def test_orders_within_capacity_are_unchanged():
+    recommendations = [
+        recommendation(1, 1, date(2026, 9, 3), "200"),
+        recommendation(2, 2, date(2026, 9, 10), "300"),
+    ]
+
+    leveled = apply_supplier_capacity(
+        recommendations, capacity("500"), SOURCES, PLANNING_DATE
+    )
+
+    assert placements(leveled) == [
+        (1, date(2026, 9, 3), Decimal("200"), "Within Capacity"),
+        (2, date(2026, 9, 10), Decimal("300"), "Within Capacity"),
+    ]
+    assert [row["recommendation_id"] for row in leveled] == [
+        "REC-0001",
+        "REC-0002",
+    ]
+
+
+def test_overflow_is_split_into_latest_earlier_week():
+    recommendations = [
+        recommendation(1, 1, date(2026, 9, 3), "300"),
+        recommendation(2, 2, date(2026, 9, 4), "400"),
+    ]
+
+    leveled = apply_supplier_capacity(
+        recommendations, capacity("500"), SOURCES, PLANNING_DATE
+    )
+
+    assert placements(leveled) == [
+        (1, date(2026, 9, 3), Decimal("300"), "Within Capacity"),
+        (2, date(2026, 8, 30), Decimal("200"), "Shifted Earlier"),
+        (2, date(2026, 9, 4), Decimal("200"), "Within Capacity"),
+    ]
+    shifted = next(
+        row for row in leveled if row["capacity_status"] == "Shifted Earlier"
+    )
+    assert shifted["recommended_order_date"] == date(2026, 8, 16)
+    assert shifted["estimated_purchase_cost"] == Decimal("600.00")
+    assert sorted(row["recommendation_id"] for row in leveled) == [
+        "REC-0001",
+        "REC-0002",
+        "REC-0003",
+    ]
+
+
+def test_parts_below_minimum_order_quantity_are_not_split_off():
+    recommendations = [
+        recommendation(1, 1, date(2026, 9, 3), "400"),
+        recommendation(2, 1, date(2026, 9, 4), "300"),
+    ]
+
+    leveled = apply_supplier_capacity(
+        recommendations, capacity("480"), SOURCES, PLANNING_DATE
+    )
+
+    assert placements(leveled) == [
+        (1, date(2026, 8, 30), Decimal("300"), "Shifted Earlier"),
+        (1, date(2026, 9, 3), Decimal("400"), "Within Capacity"),
+    ]
+
+
+def test_split_leaves_at_least_the_minimum_order_quantity():
+    recommendations = [recommendation(1, 1, date(2026, 9, 3), "500")]
+
+    leveled = apply_supplier_capacity(
+        recommendations, capacity("480"), SOURCES, PLANNING_DATE
+    )
+
+    assert placements(leveled) == [
+        (1, date(2026, 8, 30), Decimal("100"), "Shifted Earlier"),
+        (1, date(2026, 9, 3), Decimal("400"), "Within Capacity"),
+    ]
+
+
+def test_lead_time_limits_shifts_and_leaves_overflow():
+    recommendations = [
+        recommendation(1, 1, date(2026, 8, 20), "500"),
+        recommendation(2, 1, date(2026, 8, 21), "300"),
+    ]
+
+    leveled = apply_supplier_capacity(
+        recommendations, capacity("500"), SOURCES, PLANNING_DATE
+    )
+
+    assert placements(leveled) == [
+        (1, date(2026, 8, 20), Decimal("500"), "Within Capacity"),
+        (1, date(2026, 8, 21), Decimal("300"), "Over Capacity"),
+    ]
+
+
+def test_other_suppliers_and_categories_pass_through():
+    recommendations = [
+        recommendation(1, 3, date(2026, 9, 3), "900", supplier_id=8),
+        recommendation(2, 2, date(2026, 9, 3), "900"),
+    ]
+
+    leveled = apply_supplier_capacity(
+        recommendations,
+        capacity("5000", material_ids=(1,)),
+        SOURCES,
+        PLANNING_DATE,
+    )
+
+    assert {row["capacity_status"] for row in leveled} == {"No Capacity Limit"}
+    assert [row["planned_receipt_date"] for row in leveled] == [
+        date(2026, 9, 3),
+        date(2026, 9, 3),
+    ]
@@ -0,0 +1,115 @@
+"""Tests for typed columnar planning exports."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.planning.columnar import write_columnar
+from src.planning.report import export_planning_results
+
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+ROWS = [
+    {
+        "need_date": date(2026, 9, 1),
+        "material_id": 1,
+        "material_code": "MAT-1",
+        "gross_requirement": Decimal("10.125"),
+        "unit_price": Decimal("2.5000"),
+    },
+    {
+        "need_date": date(2026, 9, 2),
+        "material_id": 1,
+        "material_code": "MAT-1",
+        "gross_requirement": Decimal("4.500"),
+        "unit_price": Decimal("2.5000"),
+    },
+]
+
+
+def test_parquet_export_keeps_decimal_scale_dates_and_dictionary_codes(tmp_path):
+    file_path = tmp_path / "plan.parquet"
+
+    assert write_columnar(file_path, iter(ROWS), "parquet", batch_size=1)
+
+    table = pq.read_table(file_path)
+    assert table.schema.field("gross_requirement").type == pa.decimal128(38, 3)
+    assert table.schema.field("unit_price").type == pa.decimal128(38, 4)
+    assert table.schema.field("need_date").type == pa.date32()
+    assert table.schema.field("material_id").type == pa.int64()
+    assert pa.types.is_dictionary(table.schema.field("material_code").type)
+    assert table.to_pylist() == ROWS
+
+
+def test_arrow_export_round_trips_rows(tmp_path):
+    file_path = tmp_path / "plan.arrow"
+
+    assert write_columnar(file_path, ROWS, "arrow")
+
+    with pa.ipc.open_file(file_path) as reader:
+        assert reader.read_all().to_pylist() == ROWS
+
+
+def test_multi_batch_arrow_export_writes_codes_as_plain_strings(tmp_path):
+    file_path = tmp_path / "plan.arrow"
+    rows = [
+        {"material_code": f"MAT-{index % 2}", "supplier_name": "Acme"}
+        for index in range(5)
+    ]
+
+    assert write_columnar(file_path, iter(rows), "arrow", batch_size=2)
+
+    with pa.ipc.open_file(file_path) as reader:
+        table = reader.read_all()
+    assert table.schema.field("material_code").type == pa.string()
+    assert table.to_pylist() == rows
+
+
+def test_empty_dataset_creates_no_columnar_file(tmp_path):
+    file_path = tmp_path / "empty.parquet"
+
+    assert not write_columnar(file_path, [], "parquet")
+    assert not file_path.exists()
+
+
+def test_planning_export_selects_format_per_run(tmp_path):
+    created_files = export_planning_results(ROWS, ROWS, [], tmp_path, "arrow")
+
+    assert [path.name for path in created_files] == [
+        "bom_explosion.arrow",
+        "netted_material_requirements.arrow",
+    ]
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        export_planning_results(ROWS, ROWS, ROWS, tmp_path, "xlsx")
+
+
+def test_later_batches_widen_empty_columns_and_decimal_scale(tmp_path):
+    rows = [
+        {"receipt_date": None, "open_quantity": Decimal("5.5")},
+        {"receipt_date": date(2026, 9, 3), "open_quantity": Decimal("1.125")},
+        {"receipt_date": None, "open_quantity": Decimal("2")},
+    ]
+
+    for file_format in ("parquet", "arrow"):
+        file_path = tmp_path / f"receipts.{file_format}"
+
+        assert write_columnar(file_path, iter(rows), file_format, batch_size=1)
+
+        if file_format == "parquet":
+            table = pq.read_table(file_path)
+        else:
+            with pa.ipc.open_file(file_path) as reader:
+                table = reader.read_all()
+        assert table.schema.field("receipt_date").type == pa.date32()
+        assert table.schema.field("open_quantity").type == pa.decimal128(38, 3)
+        assert table.to_pylist() == rows
+
+
+def test_conflicting_column_types_are_rejected(tmp_path):
+    rows = [{"quantity": 1}, {"quantity": Decimal("1.5")}]
+
+    with pytest.raises(ValueError, match="Column quantity changes type"):
+        write_columnar(tmp_path / "bad.parquet", rows, batch_size=1)
@@ -0,0 +1,83 @@
+"""Tests for incremental re-netting scope."""
+
+from datetime import date
+from decimal import Decimal
+
+from src.planning.incremental import (
+    find_affected_materials,
+    find_where_used_products,
+    merge_netted_requirements,
+)
+
+
+# Product 1 uses material 10 and subassembly 2; product 2 uses material 20.
+# Product 3 uses only material 30.
+BOM_HEADERS = [
+    {"bom_id": 100, "product_id": 1},
+    {"bom_id": 200, "product_id": 2},
+    {"bom_id": 300, "product_id": 3},
+]
+BOM_COMPONENTS = [
+    {"bom_id": 100, "component_product_id": None, "material_id": 10},
+    {"bom_id": 100, "component_product_id": 2, "material_id": None},
+    {"bom_id": 200, "component_product_id": None, "material_id": 20},
+    {"bom_id": 300, "component_product_id": None, "material_id": 30},
+]
+
+
+def change(source_table, material_id=None, product_id=None):
+    """Build a compact change-log fixture."""
+    return {
+        "change_id": 1,
+        "source_table": source_table,
+        "material_id": material_id,
+        "product_id": product_id,
+    }
+
+
+def test_demand_change_affects_materials_below_product():
+    changes = [change("production_demand", product_id=1)]
+
+    assert find_affected_materials(changes, BOM_HEADERS, BOM_COMPONENTS) == {
+        10,
+        20,
+    }
+
+
+def test_supply_changes_affect_only_their_material():
+    changes = [
+        change("purchase_orders", material_id=30),
+        change("inventory_balances", material_id=30),
+    ]
+
+    assert find_affected_materials(changes, BOM_HEADERS, BOM_COMPONENTS) == {30}
+
+
+def test_bom_structure_change_requires_full_replan():
+    changes = [change("bom_components", material_id=10)]
+
+    assert find_affected_materials(changes, BOM_HEADERS, BOM_COMPONENTS) is None
+
+
+def test_where_used_includes_parents_of_subassemblies():
+    assert find_where_used_products({20}, BOM_HEADERS, BOM_COMPONENTS) == {1, 2}
+
+
+def test_merge_replaces_only_affected_materials():
+    def row(material_id, need_date, net):
+        return {
+            "material_id": material_id,
+            "material_code": f"MAT-{material_id}",
+            "need_date": need_date,
+            "net_requirement": Decimal(net),
+        }
+
+    previous = [row(10, date(2026, 9, 1), "5"), row(30, date(2026, 9, 1), "7")]
+    refreshed = [row(30, date(2026, 8, 20), "9")]
+
+    merged = merge_netted_requirements(previous, refreshed, {30})
+
+    assert [(item["material_id"], item["net_requirement"]) for item in merged] == [
+        (30, Decimal("9")),
+        (10, Decimal("5")),
+    ]
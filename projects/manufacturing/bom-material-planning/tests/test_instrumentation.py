@@ -0,0 +1,75 @@
+"""Tests for planning run spans and run logs."""
+
+import json
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.planning.instrumentation import RunLog, iter_counted, span, traced
+
+
+@traced("double")
+def double_rows(rows):
+    """Return every row twice."""
+    return rows + rows
+
+
+def test_spans_are_discarded_without_active_run_log():
+    with span("idle") as record:
+        record["rows_out"] = 3
+
+    assert double_rows([1]) == [1, 1]
+
+
+def test_traced_stages_nest_and_count_rows():
+    with RunLog("test") as run_log:
+        with span("outer", rows_in=2):
+            double_rows([1, 2])
+
+    outer, inner = run_log.to_dict()["spans"]
+    assert [outer["name"], inner["name"]] == ["outer", "double"]
+    assert inner["parent_span_id"] == outer["span_id"]
+    assert outer["parent_span_id"] is None
+    assert inner["attributes"]["rows_in"] == 2
+    assert inner["attributes"]["rows_out"] == 4
+    assert inner["attributes"]["wall_seconds"] >= 0
+    assert inner["attributes"]["cpu_seconds"] >= 0
+
+
+def test_failed_span_is_marked_and_reraised():
+    with RunLog("test") as run_log:
+        with pytest.raises(ValueError):
+            with span("broken"):
+                raise ValueError("bad input")
+
+    assert run_log.to_dict()["spans"][0]["status"] == "error"
+
+
+def test_round_trips_are_counted_per_span_and_listener_removed():
+    engine = create_engine("sqlite://")
+    run_log = RunLog("test")
+    run_log.track_engine(engine)
+    with run_log, engine.connect() as connection:
+        with span("query") as record:
+            rows = iter_counted(connection.execute(text("SELECT 1")), record)
+            assert list(rows) == [(1,)]
+            connection.execute(text("SELECT 2"))
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 3"))
+
+    attributes = run_log.to_dict()["spans"][0]["attributes"]
+    assert attributes["db_round_trips"] == 2
+    assert attributes["rows_out"] == 1
+    assert run_log.round_trips == 2
+
+
+def test_run_log_writes_json(tmp_path):
+    with RunLog("test") as run_log:
+        with span("stage"):
+            pass
+
+    output_file = run_log.write(tmp_path / "logs" / "run_log.json")
+    document = json.loads(output_file.read_text())
+    assert document["trace_id"] == run_log.trace_id
+    assert document["spans"][0]["trace_id"] == run_log.trace_id
@@ -0,0 +1,119 @@
+"""Tests for transactional load modes."""
+
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.etl.load import (
+    INVENTORY_BALANCE_COLUMNS,
+    MERGE_KEYS,
+    ROLLUP_MATERIAL_REQUIREMENT_TOTALS_QUERY,
+    build_merge_query,
+    get_material_requirement_totals,
+    load_inventory_balances,
+    summarize_material_requirement_totals,
+)
+from src.planning.rollup import ROLLUP_USABLE_QUERY
+
+
+class SnapshotConnection:
+    """Answer the rollup check and totals read, recording transactions."""
+
+    def __init__(self, events):
+        self.events = events
+        self.rows = []
+
+    def execution_options(self, **options):
+        self.events.append(("options", options["isolation_level"]))
+
+    @contextmanager
+    def begin(self):
+        self.events.append("begin")
+        yield
+        self.events.append("commit")
+
+    def execute(self, statement):
+        self.events.append(statement)
+        if statement is ROLLUP_MATERIAL_REQUIREMENT_TOTALS_QUERY:
+            self.rows = [{"material_id": 1, "gross_requirement": Decimal("2")}]
+        return self
+
+    def scalar_one(self):
+        return True
+
+    def mappings(self):
+        return self.rows
+
+
+class SnapshotEngine:
+    """Hand out one recording connection."""
+
+    def __init__(self):
+        self.events = []
+
+    @contextmanager
+    def connect(self):
+        yield SnapshotConnection(self.events)
+
+
+def test_merge_updates_only_changed_non_key_columns():
+    sql = build_merge_query(
+        "inventory_balances",
+        "staged_inventory_balances",
+        INVENTORY_BALANCE_COLUMNS,
+        MERGE_KEYS["inventory_balances"],
+    ).text
+
+    assert "ON CONFLICT (material_id, location_code) DO UPDATE" in sql
+    assert "on_hand_quantity = EXCLUDED.on_hand_quantity" in sql
+    assert "material_id = EXCLUDED.material_id" not in sql
+    assert "IS DISTINCT FROM" in sql
+
+
+def test_unknown_load_mode_is_rejected_before_connecting():
+    with pytest.raises(ValueError, match="Unsupported load mode: replace"):
+        load_inventory_balances(None, [], "replace")
+
+
+def test_requirement_totals_sum_dates_and_keep_unused_materials():
+    materials = [
+        {"material_id": 1, "material_code": "MAT-1"},
+        {"material_id": 2, "material_code": "MAT-2"},
+    ]
+    requirements = [
+        {
+            "need_date": date(2026, 11, 2),
+            "material_id": 1,
+            "gross_requirement": Decimal("4.250"),
+        },
+        {
+            "need_date": date(2026, 11, 9),
+            "material_id": 1,
+            "gross_requirement": Decimal("1.750"),
+        },
+    ]
+
+    totals = summarize_material_requirement_totals(materials, requirements)
+
+    assert [row["gross_requirement"] for row in totals] == [
+        Decimal("6.000"),
+        Decimal("0"),
+    ]
+    assert totals[0]["material_code"] == "MAT-1"
+
+
+def test_rollup_totals_are_checked_and_read_in_one_snapshot():
+    engine = SnapshotEngine()
+
+    totals = get_material_requirement_totals(engine)
+
+    assert totals == [{"material_id": 1, "gross_requirement": Decimal("2")}]
+    assert engine.events == [
+        ("options", "REPEATABLE READ"),
+        "begin",
+        ROLLUP_USABLE_QUERY,
+        ROLLUP_MATERIAL_REQUIREMENT_TOTALS_QUERY,
+        "commit",
+    ]
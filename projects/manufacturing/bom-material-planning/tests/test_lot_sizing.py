@@ -0,0 +1,124 @@
+"""Tests for lot-sizing policies."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import combinations
+
+import pytest
+
+from src.planning.lot_sizing import (
+    LOT_SIZING_RULES,
+    apply_lot_sizing,
+    group_economic_order_quantity,
+    group_fixed_period,
+    group_wagner_whitin,
+)
+
+
+START_DATE = date(2026, 9, 1)
+RULES = {**LOT_SIZING_RULES, "period_days": 7, "window": 4}
+
+
+def shortage(day, quantity, material_id=1):
+    """Build a netted shortage row ``day`` days after the start date."""
+    return {
+        "material_id": material_id,
+        "material_code": f"MAT-{material_id}",
+        "material_name": f"Material {material_id}",
+        "base_unit_of_measure": "KG",
+        "need_date": START_DATE + timedelta(days=day),
+        "net_requirement": Decimal(quantity),
+    }
+
+
+def lot_days(groups):
+    """Return each lot's shortage days for compact assertions."""
+    return [
+        [(row["need_date"] - START_DATE).days for row in group]
+        for group in groups
+    ]
+
+
+def plan_cost(groups, unit_price, rules):
+    """Return ordering plus holding cost for a grouping."""
+    holding_cost = float(unit_price) * float(rules["annual_holding_rate"]) / 365
+    return sum(
+        float(rules["ordering_cost"])
+        + sum(
+            holding_cost
+            * float(row["net_requirement"])
+            * (row["need_date"] - group[0]["need_date"]).days
+            for row in group
+        )
+        for group in groups
+    )
+
+
+def all_groupings(rows):
+    """Yield every split of ordered rows into consecutive groups."""
+    for cut_count in range(len(rows)):
+        for cuts in combinations(range(1, len(rows)), cut_count):
+            bounds = [0, *cuts, len(rows)]
+            yield [rows[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def test_fixed_period_covers_calendar_days_from_each_lot_start():
+    shortages = [shortage(day, "10") for day in (0, 3, 6, 7, 15)]
+
+    assert lot_days(group_fixed_period(shortages, Decimal("1"), RULES)) == [
+        [0, 3, 6],
+        [7],
+        [15],
+    ]
+
+
+def test_economic_order_quantity_groups_until_lot_reaches_eoq():
+    shortages = [shortage(day, "40") for day in range(6)]
+
+    # 40/day, $75 per order, $20 * 24% / 365 per unit-day gives EOQ ~ 675.
+    groups = group_economic_order_quantity(shortages, Decimal("20"), RULES)
+
+    assert lot_days(groups) == [[0, 1, 2, 3, 4, 5]]
+
+
+def test_wagner_whitin_matches_exhaustive_search_within_window():
+    quantities = ["500", "20", "900", "40", "300", "15", "800"]
+    days = [0, 2, 9, 10, 18, 20, 30]
+    shortages = [
+        shortage(day, quantity) for day, quantity in zip(days, quantities)
+    ]
+    unit_price = Decimal("25")
+
+    best_cost = min(
+        plan_cost(groups, unit_price, RULES)
+        for groups in all_groupings(shortages)
+        if all(len(group) <= RULES["window"] for group in groups)
+    )
+
+    groups = group_wagner_whitin(shortages, unit_price, RULES)
+    assert plan_cost(groups, unit_price, RULES) == pytest.approx(best_cost)
+
+
+def test_lots_sum_shortages_and_record_coverage():
+    netted = [
+        shortage(0, "10.250"),
+        shortage(0, "0.000", material_id=2),
+        shortage(5, "4.750"),
+    ]
+
+    lots = apply_lot_sizing(
+        netted,
+        [{"material_id": 1, "unit_price": Decimal("2")}],
+        "fixed_period",
+        {"period_days": 7},
+    )
+
+    assert [
+        (row["need_date"], row["net_requirement"], row["covered_through_date"])
+        for row in lots
+    ] == [(START_DATE, Decimal("15.000"), START_DATE + timedelta(days=5))]
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported lot-sizing policy"):
+        apply_lot_sizing([], [], "silver_meal")
@@ -0,0 +1,146 @@
+"""Tests for multi-level BOM explosion."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.planning.multilevel import (
+    calculate_low_level_codes,
+    explode_demand,
+    explode_material_requirements,
+)
+
+
+def bom(bom_id, product_id, start, end=None):
+    """Build a compact active-BOM header fixture."""
+    return {
+        "bom_id": bom_id,
+        "product_id": product_id,
+        "revision_code": f"R{bom_id}",
+        "effective_start_date": start,
+        "effective_end_date": end,
+    }
+
+
+def material_line(bom_id, line_number, material_id, quantity):
+    """Build a BOM line that consumes a purchased material."""
+    return {
+        "bom_id": bom_id,
+        "line_number": line_number,
+        "component_product_id": None,
+        "component_product_code": None,
+        "material_id": material_id,
+        "material_code": f"MAT-{material_id}",
+        "material_name": f"Material {material_id}",
+        "base_unit_of_measure": "KG",
+        "quantity_per_unit": Decimal(quantity),
+        "expected_loss_pct": Decimal("0"),
+    }
+
+
+def subassembly_line(bom_id, line_number, product_id, quantity):
+    """Build a BOM line that consumes a subassembly product."""
+    return {
+        "bom_id": bom_id,
+        "line_number": line_number,
+        "component_product_id": product_id,
+        "component_product_code": f"SUB-{product_id}",
+        "material_id": None,
+        "material_code": None,
+        "material_name": None,
+        "base_unit_of_measure": None,
+        "quantity_per_unit": Decimal(quantity),
+        "expected_loss_pct": Decimal("0"),
+    }
+
+
+def demand(reference, need_date, quantity):
+    """Build a finished-product demand fixture."""
+    return {
+        "demand_id": 1,
+        "demand_reference": reference,
+        "product_id": 1,
+        "need_date": need_date,
+        "priority": "Standard",
+        "demand_quantity": Decimal(quantity),
+        "product_code": "FG-1",
+        "product_name": "Finished Good",
+        "product_active_flag": True,
+    }
+
+
+# FG-1 uses SUB-2 directly and through SUB-3, so SUB-2 sits at level 2.
+BOM_HEADERS = [
+    bom(100, 1, date(2026, 1, 1)),
+    bom(300, 3, date(2026, 1, 1)),
+    bom(200, 2, date(2026, 1, 1), date(2026, 9, 30)),
+    bom(201, 2, date(2026, 10, 1)),
+]
+BOM_COMPONENTS = [
+    material_line(100, 1, 1, "2"),
+    subassembly_line(100, 2, 2, "3"),
+    subassembly_line(100, 3, 3, "1"),
+    subassembly_line(300, 1, 2, "2"),
+    material_line(200, 1, 2, "0.5"),
+    material_line(201, 1, 2, "1"),
+]
+
+
+def test_low_level_codes_use_deepest_parent():
+    codes = calculate_low_level_codes(BOM_HEADERS, BOM_COMPONENTS)
+
+    assert codes == {1: 0, 3: 1, 2: 2}
+
+
+def test_bom_cycle_is_rejected():
+    components = BOM_COMPONENTS + [subassembly_line(200, 2, 3, "1")]
+
+    with pytest.raises(ValueError, match="cycle through: SUB-2, SUB-3"):
+        calculate_low_level_codes(BOM_HEADERS, components)
+
+
+def test_shared_subassembly_is_aggregated_across_levels():
+    rows = explode_material_requirements(
+        [demand("PD-1", date(2026, 9, 1), "10")],
+        BOM_HEADERS,
+        BOM_COMPONENTS,
+    )
+
+    quantities = {row["material_code"]: row["gross_requirement"] for row in rows}
+    # SUB-2 needs 10 x 3 directly plus 10 x 1 x 2 through SUB-3.
+    assert quantities == {"MAT-1": Decimal("20.000"), "MAT-2": Decimal("25.000")}
+
+
+def test_subassembly_effectivity_uses_need_date():
+    rows = explode_material_requirements(
+        [demand("PD-1", date(2026, 10, 5), "10")],
+        BOM_HEADERS,
+        BOM_COMPONENTS,
+    )
+
+    assert rows[1]["gross_requirement"] == Decimal("50.000")
+
+
+def test_missing_subassembly_bom_fails_planning():
+    with pytest.raises(ValueError, match="Subassembly SUB-2"):
+        explode_material_requirements(
+            [demand("PD-1", date(2026, 9, 1), "10")],
+            BOM_HEADERS[:2],
+            BOM_COMPONENTS,
+        )
+
+
+def test_indented_explosion_matches_aggregated_requirements():
+    demand_rows = [demand("PD-1", date(2026, 9, 1), "10")]
+
+    rows = explode_demand(demand_rows, BOM_HEADERS, BOM_COMPONENTS)
+
+    assert [(row["bom_level"], row["parent_product_code"]) for row in rows] == [
+        (1, "FG-1"),
+        (2, "SUB-2"),
+        (3, "SUB-2"),
+    ]
+    assert sum(
+        row["gross_requirement"] for row in rows if row["material_id"] == 2
+    ) == Decimal("25.000")
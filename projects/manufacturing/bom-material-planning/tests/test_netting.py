@@ -3,9 +3,10 @@
 from datetime import date
 from decimal import Decimal
 
+import numpy as np
 import pytest
 
-from src.planning.netting import net_material_requirements
+from src.planning.netting import net_fixed_point, net_material_requirements
 
 
 def requirement(need_date, quantity):
@@ -107,3 +108,53 @@ def test_netting_rejects_negative_supply():
             [{"material_id": 1, "usable_inventory": Decimal("-1.000")}],
             [],
         )
+
+
+def test_fixed_point_kernel_restarts_balance_for_each_material():
+    netted = net_fixed_point(
+        material_index=np.array([0, 0, 1, 1]),
+        need_days=np.array([1, 5, 1, 5]),
+        gross_requirement=np.array([80_000, 50_000, 10_000, 10_000]),
+        usable_inventory=np.array([100_000, 0]),
+        receipt_material_index=np.array([1, 1]),
+        receipt_days=np.array([3, 9]),
+        receipt_quantity=np.array([15_000, 99_000]),
+    )
+
+    assert netted["net_requirement"].tolist() == [0, 30_000, 10_000, 0]
+    # The day-9 receipt arrives after the last need date and is never used.
+    assert netted["receipts_available_by_date"].tolist() == [0, 0, 0, 15_000]
+    assert netted["projected_supply_after_requirement"].tolist() == [
+        20_000,
+        0,
+        0,
+        5_000,
+    ]
+
+
+def test_same_day_requirements_receive_receipts_once():
+    requirements = [
+        requirement(date(2026, 9, 1), "10.000"),
+        requirement(date(2026, 9, 1), "10.000"),
+    ]
+    receipts = [
+        {
+            "material_id": 1,
+            "expected_receipt_date": date(2026, 8, 30),
+            "open_receipt_quantity": Decimal("15.0004"),
+        }
+    ]
+
+    rows = net_material_requirements(requirements, [], receipts)
+
+    assert [row["receipts_available_by_date"] for row in rows] == [
+        Decimal("15.000"),
+        Decimal("0.000"),
+    ]
+    assert [row["net_requirement"] for row in rows] == [
+        Decimal("0.000"),
+        Decimal("5.000"),
+    ]
+    assert all(
+        row["net_requirement"].as_tuple().exponent == -3 for row in rows
+    )
@@ -0,0 +1,103 @@
+"""Tests for sharded per-material planning."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from src.planning.netting import net_material_requirements
+from src.planning.parallel import partition_materials, plan_materials_in_parallel
+from src.planning.recommendations import create_purchase_recommendations
+
+
+MATERIAL_IDS = [7, 3, 5, 1, 9]
+PLANNING_DATE = date(2026, 8, 1)
+
+REQUIREMENTS = [
+    {
+        "need_date": date(2026, 9, 1) + timedelta(days=(day * material_id) % 17),
+        "material_id": material_id,
+        "material_code": f"MAT-{material_id}",
+        "material_name": f"Material {material_id}",
+        "base_unit_of_measure": "KG",
+        "gross_requirement": Decimal(f"{40 + day * material_id}.125"),
+    }
+    for day in range(6)
+    for material_id in MATERIAL_IDS
+]
+INVENTORY = [
+    {"material_id": material_id, "usable_inventory": Decimal("90.000")}
+    for material_id in MATERIAL_IDS
+]
+RECEIPTS = [
+    {
+        "material_id": material_id,
+        "expected_receipt_date": date(2026, 9, 5),
+        "open_receipt_quantity": Decimal("75.500"),
+    }
+    for material_id in MATERIAL_IDS[::2]
+]
+SOURCES = [
+    {
+        "material_id": material_id,
+        "supplier_id": 10,
+        "supplier_code": "SUP-TEST",
+        "supplier_name": "Test Supplier",
+        "unit_price": Decimal("2.5000"),
+        "lead_time_days": 5 * material_id,
+        "minimum_order_quantity": Decimal("100.000"),
+        "order_multiple": Decimal("25.000"),
+    }
+    for material_id in MATERIAL_IDS
+]
+
+
+def test_partition_keeps_material_order_in_contiguous_shards():
+    assert partition_materials(MATERIAL_IDS, 3) == [[7, 3], [5, 1], [9]]
+    assert partition_materials(MATERIAL_IDS[:2], 4) == [[7], [3]]
+
+
+def test_parallel_plan_matches_serial_plan():
+    serial_netted = net_material_requirements(REQUIREMENTS, INVENTORY, RECEIPTS)
+    serial_recommendations = create_purchase_recommendations(
+        serial_netted, SOURCES, PLANNING_DATE
+    )
+
+    netted, recommendations = plan_materials_in_parallel(
+        REQUIREMENTS,
+        INVENTORY,
+        RECEIPTS,
+        SOURCES,
+        PLANNING_DATE,
+        max_workers=2,
+    )
+
+    assert netted == serial_netted
+    assert recommendations == serial_recommendations
+
+
+def test_parallel_plan_reports_every_material_missing_a_source():
+    with pytest.raises(ValueError, match="MAT-1, MAT-9"):
+        plan_materials_in_parallel(
+            REQUIREMENTS,
+            [],
+            [],
+            [source for source in SOURCES if source["material_id"] not in {1, 9}],
+            PLANNING_DATE,
+            max_workers=2,
+        )
+
+
+def test_netting_only_plan_skips_recommendations():
+    netted, recommendations = plan_materials_in_parallel(
+        REQUIREMENTS,
+        INVENTORY,
+        RECEIPTS,
+        SOURCES,
+        PLANNING_DATE,
+        max_workers=2,
+        recommend=False,
+    )
+
+    assert netted == net_material_requirements(REQUIREMENTS, INVENTORY, RECEIPTS)
+    assert recommendations is None
@@ -0,0 +1,177 @@
+"""Tests for demand pegging of shortages and recommendations."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.planning.pegging import (
+    PeggingIndex,
+    explode_demand_contributions,
+    peg_net_requirements,
+    peg_recommendations,
+    peg_shortage,
+)
+
+
+NEED_DATE = date(2026, 9, 1)
+LATER_DATE = date(2026, 9, 15)
+
+BOM_HEADERS = [
+    {
+        "bom_id": 1,
+        "product_id": 1,
+        "revision_code": "A",
+        "effective_start_date": date(2026, 1, 1),
+        "effective_end_date": None,
+    },
+    {
+        "bom_id": 2,
+        "product_id": 2,
+        "revision_code": "A",
+        "effective_start_date": date(2026, 1, 1),
+        "effective_end_date": None,
+    },
+]
+
+BOM_COMPONENTS = [
+    {
+        "bom_id": 1,
+        "line_number": 1,
+        "component_product_id": 2,
+        "component_product_code": "SUB-2",
+        "material_id": None,
+        "quantity_per_unit": Decimal("2"),
+        "expected_loss_pct": Decimal("0"),
+    },
+    {
+        "bom_id": 2,
+        "line_number": 1,
+        "component_product_id": None,
+        "component_product_code": None,
+        "material_id": 9,
+        "material_code": "MAT-9",
+        "quantity_per_unit": Decimal("0.5"),
+        "expected_loss_pct": Decimal("0"),
+    },
+]
+
+
+def demand(reference, quantity, need_date=NEED_DATE, priority="Standard"):
+    """Build an open-demand fixture for finished product 1."""
+    return {
+        "demand_reference": reference,
+        "product_id": 1,
+        "product_code": "PRD-1",
+        "product_active_flag": True,
+        "need_date": need_date,
+        "priority": priority,
+        "demand_quantity": Decimal(quantity),
+    }
+
+
+def netted(need_date, gross, supply_applied):
+    """Build a netted row for material 9 in thousandths-friendly decimals."""
+    gross = Decimal(gross)
+    supply_applied = Decimal(supply_applied)
+    return {
+        "material_id": 9,
+        "material_code": "MAT-9",
+        "need_date": need_date,
+        "gross_requirement": gross,
+        "supply_applied": supply_applied,
+        "net_requirement": gross - supply_applied,
+    }
+
+
+def recommendation(number, need_date, quantity):
+    """Build a recommendation fixture for material 9."""
+    return {
+        "recommendation_id": f"REC-{number:04d}",
+        "material_id": 9,
+        "need_date": need_date,
+        "recommended_order_quantity": Decimal(quantity),
+    }
+
+
+def test_contributions_expand_subassemblies_in_priority_order():
+    contributions = explode_demand_contributions(
+        [
+            demand("PD-1", "100"),
+            demand("PD-2", "40", priority="Critical"),
+        ],
+        BOM_HEADERS,
+        BOM_COMPONENTS,
+    )
+
+    assert contributions == {
+        (9, NEED_DATE): [("PD-2", 40_000), ("PD-1", 100_000)],
+    }
+
+
+def test_supply_covers_lines_before_shortage_is_pegged():
+    assert peg_shortage(
+        [("PD-2", 40_000), ("PD-1", 100_000)], 60_000, 80_000
+    ) == [["PD-1", 80_000]]
+
+
+def test_last_line_absorbs_rounding_difference():
+    assert peg_shortage([("PD-1", 33_333), ("PD-2", 33_333)], 0, 66_667) == [
+        ["PD-1", 33_333],
+        ["PD-2", 33_334],
+    ]
+
+
+def test_recommendations_consume_shortages_first_in_first_out():
+    contributions = {
+        (9, NEED_DATE): [("PD-1", 50_000)],
+        (9, LATER_DATE): [("PD-3", 30_000)],
+    }
+    shortage_pegging = PeggingIndex(
+        peg_net_requirements(
+            [netted(NEED_DATE, "50", "0"), netted(LATER_DATE, "30", "0")],
+            contributions,
+        )
+    )
+
+    # The MOQ-sized first order also covers part of the later shortage.
+    recommendation_pegging = PeggingIndex(
+        peg_recommendations(
+            [
+                recommendation(2, LATER_DATE, "10"),
+                recommendation(1, NEED_DATE, "70"),
+            ],
+            shortage_pegging,
+        )
+    )
+
+    assert recommendation_pegging.demand_for("REC-0001") == [
+        ("PD-1", Decimal("50.000")),
+        ("PD-3", Decimal("20.000")),
+    ]
+    assert recommendation_pegging.keys_for_demand("PD-3") == [
+        ("REC-0001", Decimal("20.000")),
+        ("REC-0002", Decimal("10.000")),
+    ]
+    assert shortage_pegging.demand_for((9, LATER_DATE)) == [
+        ("PD-3", Decimal("30.000"))
+    ]
+    assert recommendation_pegging.demand_for("REC-9999") == []
+
+
+def test_export_rows_name_key_columns():
+    index = PeggingIndex([((9, NEED_DATE), "PD-1", 1_500)])
+
+    assert list(index.iter_rows(("material_id", "need_date"))) == [
+        {
+            "material_id": 9,
+            "need_date": NEED_DATE,
+            "demand_reference": "PD-1",
+            "pegged_quantity": Decimal("1.500"),
+        }
+    ]
+
+
+def test_shortage_without_demand_lines_fails():
+    with pytest.raises(ValueError, match="MAT-9 shortage"):
+        list(peg_net_requirements([netted(NEED_DATE, "5", "0")], {}))
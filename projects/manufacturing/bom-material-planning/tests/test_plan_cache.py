@@ -0,0 +1,82 @@
+"""Tests for the fingerprint-keyed plan cache."""
+
+from datetime import date
+import os
+
+from src.planning.plan_cache import (
+    evict_cache_entries,
+    get_cache_key,
+    load_cache_entry,
+    store_cache_entry,
+)
+
+
+PLANNING_DATE = date(2026, 8, 3)
+FINGERPRINT = {"materials": [10, 899], "production_demand": [48, 901]}
+STAGES = {
+    "material_requirements": [],
+    "netted_requirements": [{"material_id": 1}],
+    "recommendations": [],
+}
+
+
+def cache_key(fingerprint=FINGERPRINT, planning_date=PLANNING_DATE, **options):
+    """Return a cache key with default planning options."""
+    return get_cache_key(
+        fingerprint,
+        planning_date,
+        options.get("sourcing", "preferred"),
+        options.get("lot_sizing", "lot_for_lot"),
+        options.get("supplier_capacity", False),
+        options.get("buckets", "daily"),
+        options.get("source_revision"),
+    )
+
+
+def test_key_changes_with_inputs_date_and_options():
+    changed_table = {**FINGERPRINT, "materials": [10, 936]}
+
+    keys = {
+        cache_key(),
+        cache_key(changed_table),
+        cache_key(planning_date=date(2026, 8, 4)),
+        cache_key(sourcing="allocated"),
+        cache_key(supplier_capacity=True),
+        cache_key(buckets="daily:28,monthly"),
+        cache_key(source_revision="616605f"),
+    }
+
+    assert len(keys) == 7
+    assert cache_key() == cache_key(dict(reversed(FINGERPRINT.items())))
+    assert cache_key() == cache_key(buckets=" Daily ")
+
+
+def test_stored_entry_round_trips(tmp_path):
+    key = cache_key()
+    store_cache_entry(tmp_path, key, {"demand": []}, STAGES, max_bytes=10**6)
+
+    entry = load_cache_entry(tmp_path, key)
+
+    assert entry["snapshot"] == {"demand": []}
+    assert entry["stages"] == STAGES
+    assert load_cache_entry(tmp_path, cache_key(sourcing="allocated")) is None
+
+
+def test_truncated_entry_is_a_miss(tmp_path):
+    key = cache_key()
+    (tmp_path / f"{key}.pickle").write_bytes(b"\x80\x05")
+
+    assert load_cache_entry(tmp_path, key) is None
+
+
+def test_eviction_removes_least_recently_used_entries(tmp_path):
+    for age, name in enumerate(["newest", "middle", "oldest"]):
+        entry_file = tmp_path / f"{name}.pickle"
+        entry_file.write_bytes(b"x" * 100)
+        modified_time = 1_000_000 - age * 10
+        os.utime(entry_file, (modified_time, modified_time))
+
+    deleted_files = evict_cache_entries(tmp_path, 150, tmp_path / "oldest.pickle")
+
+    assert [path.name for path in deleted_files] == ["middle.pickle", "newest.pickle"]
+    assert [path.name for path in tmp_path.iterdir()] == ["oldest.pickle"]
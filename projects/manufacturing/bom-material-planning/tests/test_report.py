@@ -57,3 +57,26 @@ def test_write_csv_creates_reproducible_output(tmp_path):
     assert output_file.read_text(encoding="utf-8") == (
         "material_code,quantity\nMAT-1,10.000\n"
     )
+
+
+def test_write_csv_streams_rows_from_a_generator(tmp_path):
+    output_file = tmp_path / "streamed.csv"
+    rows = (
+        {"material_code": f"MAT-{index}", "quantity": Decimal(index)}
+        for index in range(3)
+    )
+
+    assert write_csv(output_file, rows) is True
+    assert output_file.read_text(encoding="utf-8").splitlines() == [
+        "material_code,quantity",
+        "MAT-0,0",
+        "MAT-1,1",
+        "MAT-2,2",
+    ]
+
+
+def test_write_csv_skips_empty_generator(tmp_path):
+    output_file = tmp_path / "empty.csv"
+
+    assert write_csv(output_file, (row for row in [])) is False
+    assert not output_file.exists()
@@ -0,0 +1,59 @@
+"""Tests for rebuilding the gross requirement rollup."""
+
+from contextlib import contextmanager
+
+from src.planning.rollup import (
+    DELETE_ROLLUP_ROWS,
+    INSERT_ROLLUP_ROWS,
+    LOCK_ROLLUP,
+    LOCK_ROLLUP_STATE,
+    MARK_ROLLUP_FRESH,
+    refresh_material_requirement_rollup,
+)
+
+
+class RecordingConnection:
+    """Record executed statements and report a fixed stale flag."""
+
+    def __init__(self, is_stale):
+        self.is_stale = is_stale
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def scalar_one(self):
+        return self.is_stale
+
+
+class RecordingEngine:
+    """Hand out one recording connection inside ``begin``."""
+
+    def __init__(self, is_stale):
+        self.connection = RecordingConnection(is_stale)
+
+    @contextmanager
+    def begin(self):
+        yield self.connection
+
+
+def test_stale_rollup_is_rebuilt_under_locks():
+    engine = RecordingEngine(is_stale=True)
+
+    assert refresh_material_requirement_rollup(engine) is True
+    assert engine.connection.statements == [
+        LOCK_ROLLUP_STATE,
+        LOCK_ROLLUP,
+        DELETE_ROLLUP_ROWS,
+        INSERT_ROLLUP_ROWS,
+        MARK_ROLLUP_FRESH,
+    ]
+
+
+def test_fresh_rollup_is_left_alone_unless_forced():
+    engine = RecordingEngine(is_stale=False)
+
+    assert refresh_material_requirement_rollup(engine) is False
+    assert engine.connection.statements == [LOCK_ROLLUP_STATE]
+    assert refresh_material_requirement_rollup(engine, force=True) is True
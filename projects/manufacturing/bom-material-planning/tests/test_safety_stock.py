@@ -0,0 +1,123 @@
+"""Tests for statistical safety stock and reorder points."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.planning.safety_stock import (
+    calculate_stock_policies,
+    get_history_window,
+    get_weekly_usage,
+)
+
+
+HISTORY_START_DATE = date(2026, 6, 1)
+
+
+def usage(material_id, week_start, quantity):
+    """Build one weekly usage row."""
+    return {
+        "material_id": material_id,
+        "need_date": week_start,
+        "gross_requirement": Decimal(quantity),
+    }
+
+
+def demand(reference, product_id, need_date, quantity):
+    """Build a historical finished-product demand row."""
+    return {
+        "demand_id": 1,
+        "demand_reference": reference,
+        "product_id": product_id,
+        "need_date": need_date,
+        "priority": "Standard",
+        "demand_quantity": Decimal(quantity),
+        "product_code": f"FG-{product_id}",
+        "product_name": f"Finished Good {product_id}",
+        "product_active_flag": True,
+    }
+
+
+def test_history_window_covers_whole_weeks_before_as_of_date():
+    assert get_history_window(date(2026, 8, 6), 4) == (
+        date(2026, 7, 6),
+        date(2026, 8, 3),
+    )
+    with pytest.raises(ValueError, match="two weeks"):
+        get_history_window(date(2026, 8, 6), 1)
+
+
+def test_policy_counts_weeks_without_usage():
+    weekly_usage = [
+        usage(1, date(2026, 6, 1), "10"),
+        usage(1, date(2026, 6, 15), "20"),
+        usage(1, date(2026, 6, 22), "10"),
+        usage(2, date(2026, 6, 1), "5"),
+        usage(3, date(2026, 6, 1), "5"),
+    ]
+    sources = [
+        {"material_id": 1, "lead_time_days": 9},
+        {"material_id": 2, "lead_time_days": 4},
+    ]
+
+    policies = calculate_stock_policies(weekly_usage, sources, 4, 0.95)
+
+    # Weeks 10, 0, 20, 10: daily mean 10 / 7, daily std sqrt(200 / 3 / 7).
+    assert policies[0] == {
+        "material_id": 1,
+        "average_daily_demand": Decimal("1.429"),
+        "daily_demand_std": Decimal("3.086"),
+        "safety_stock_quantity": Decimal("15.228"),
+        "reorder_point_quantity": Decimal("28.086"),
+        "lead_time_days": 9,
+        "service_level": 0.95,
+    }
+    # Material 3 has no preferred source and keeps its static safety stock.
+    assert [policy["material_id"] for policy in policies] == [1, 2]
+
+
+@pytest.mark.parametrize("service_level", [0.4, 1.0])
+def test_service_level_must_be_a_usable_probability(service_level):
+    with pytest.raises(ValueError, match="Service level"):
+        calculate_stock_policies([], [], 4, service_level)
+
+
+def test_weekly_usage_skips_demand_without_an_active_bom():
+    bom_headers = [
+        {
+            "bom_id": 10,
+            "product_id": 1,
+            "revision_code": "R10",
+            "effective_start_date": date(2026, 1, 1),
+            "effective_end_date": None,
+        }
+    ]
+    bom_components = [
+        {
+            "bom_id": 10,
+            "line_number": 1,
+            "component_product_id": None,
+            "component_product_code": None,
+            "material_id": 7,
+            "material_code": "MAT-7",
+            "material_name": "Material 7",
+            "base_unit_of_measure": "KG",
+            "quantity_per_unit": Decimal("2"),
+            "expected_loss_pct": Decimal("0"),
+        }
+    ]
+    history_demand = [
+        demand("PD-1", 1, date(2026, 6, 3), "4"),
+        demand("PD-2", 1, date(2026, 6, 7), "1"),
+        demand("PD-3", 2, date(2026, 6, 3), "50"),
+    ]
+
+    weekly_usage = get_weekly_usage(
+        history_demand, bom_headers, bom_components, HISTORY_START_DATE
+    )
+
+    assert [
+        (row["material_id"], row["need_date"], row["gross_requirement"])
+        for row in weekly_usage
+    ] == [(7, date(2026, 6, 1), Decimal("10.000"))]
@@ -0,0 +1,152 @@
+"""Tests for copy-on-write what-if planning scenarios."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.planning.scenarios import (
+    PlanningScenario,
+    apply_overlay,
+    compare_scenarios,
+    demand_scale_overlay,
+    lead_time_overlay,
+)
+from src.planning.session import PlanningSession
+
+
+def demand(reference, product_id, quantity):
+    """Build a compact open-demand fixture."""
+    return {
+        "demand_id": int(reference[-1]),
+        "demand_reference": reference,
+        "product_id": product_id,
+        "need_date": date(2026, 9, 1),
+        "priority": "Standard",
+        "demand_quantity": Decimal(quantity),
+        "product_code": f"PRD-{product_id}",
+        "product_name": f"Product {product_id}",
+        "product_active_flag": True,
+    }
+
+
+def component(bom_id, material_id):
+    """Build a one-per-unit purchased-material BOM line."""
+    return {
+        "bom_id": bom_id,
+        "line_number": 1,
+        "component_product_id": None,
+        "material_id": material_id,
+        "material_code": f"MAT-{material_id}",
+        "material_name": f"Material {material_id}",
+        "base_unit_of_measure": "EA",
+        "quantity_per_unit": Decimal("1.000000"),
+        "expected_loss_pct": Decimal("0.000"),
+    }
+
+
+def source(material_id, supplier_code):
+    """Build a preferred-source fixture."""
+    return {
+        "material_id": material_id,
+        "supplier_id": material_id,
+        "supplier_code": supplier_code,
+        "supplier_name": supplier_code,
+        "unit_price": Decimal("2.0000"),
+        "lead_time_days": 10,
+        "minimum_order_quantity": Decimal("1.000"),
+        "order_multiple": Decimal("1.000"),
+    }
+
+
+# Product 1 uses material 1 and product 2 uses material 2.
+SNAPSHOT = {
+    "demand": [demand("PD-1", 1, "100"), demand("PD-2", 2, "40")],
+    "bom_headers": [
+        {
+            "bom_id": bom_id,
+            "product_id": bom_id,
+            "revision_code": "A",
+            "effective_start_date": date(2026, 1, 1),
+            "effective_end_date": None,
+        }
+        for bom_id in (1, 2)
+    ],
+    "bom_components": [component(1, 1), component(2, 2)],
+    "inventory_supply": [
+        {"material_id": 1, "usable_inventory": Decimal("30.000")},
+        {"material_id": 2, "usable_inventory": Decimal("10.000")},
+    ],
+    "scheduled_receipts": [],
+    "preferred_sources": [source(1, "SUP-A"), source(2, "SUP-B")],
+}
+PLANNING_DATE = date(2026, 8, 1)
+
+
+def test_overlay_shares_unchanged_rows_and_copies_changed_rows():
+    rows = SNAPSHOT["inventory_supply"]
+
+    overlaid, touched = apply_overlay(
+        rows, ("material_id",), {2: {"usable_inventory": Decimal("0.000")}}
+    )
+
+    assert overlaid[0] is rows[0]
+    assert overlaid[1] is not rows[1]
+    assert rows[1]["usable_inventory"] == Decimal("10.000")
+    assert [row["usable_inventory"] for row in touched] == [
+        Decimal("10.000"),
+        Decimal("0.000"),
+    ]
+
+
+def test_scenario_replans_only_affected_materials_and_matches_full_plan():
+    base = PlanningSession(SNAPSHOT, PLANNING_DATE)
+    scenario = PlanningScenario(
+        base,
+        {
+            "demand": demand_scale_overlay(SNAPSHOT["demand"], ["PD-2"], 2),
+            "preferred_sources": lead_time_overlay(
+                SNAPSHOT["preferred_sources"], "SUP-B", 10
+            ),
+        },
+    )
+    full_plan = PlanningSession(scenario.snapshot, PLANNING_DATE)
+
+    assert scenario.affected_materials == {2}
+    assert scenario.netted_requirements[0] is base.netted_requirements[0]
+    assert scenario.netted_requirements == full_plan.netted_requirements
+    assert scenario.recommendations == full_plan.recommendations
+    assert scenario.recommendations[0]["lead_time_days"] == 20
+
+
+def test_removing_demand_drops_its_materials_from_the_plan():
+    base = PlanningSession(SNAPSHOT, PLANNING_DATE)
+    scenario = PlanningScenario(base, {"demand": {"PD-1": None}})
+
+    assert {row["material_id"] for row in scenario.netted_requirements} == {2}
+    assert [row["recommendation_id"] for row in scenario.recommendations] == [
+        "REC-0001"
+    ]
+
+
+def test_new_rows_must_define_every_column():
+    base = PlanningSession(SNAPSHOT, PLANNING_DATE)
+
+    with pytest.raises(ValueError, match="PD-9 is missing"):
+        PlanningScenario(base, {"demand": {"PD-9": {"product_id": 1}}})
+    with pytest.raises(ValueError, match="Unsupported scenario overlays"):
+        PlanningScenario(base, {"bom_components": {}})
+
+
+def test_comparison_reports_cost_change_against_base():
+    base = PlanningSession(SNAPSHOT, PLANNING_DATE)
+
+    overlays = {
+        "demand": demand_scale_overlay(SNAPSHOT["demand"], ["PD-1"], 2)
+    }
+
+    comparison = compare_scenarios(base, {"More PD-1": overlays})
+
+    assert [row["scenario"] for row in comparison] == ["Base", "More PD-1"]
+    assert comparison[1]["affected_materials"] == 1
+    assert comparison[1]["purchase_cost_change"] == Decimal("200.00")
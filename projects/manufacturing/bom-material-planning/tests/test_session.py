@@ -0,0 +1,260 @@
+"""Tests for snapshot-based planning sessions."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from src.planning.multilevel import (
+    explode_demand,
+    explode_material_requirements,
+)
+from src.planning.session import PlanningSession
+
+
+def demand(reference, need_date, quantity, product_id=1):
+    """Build a compact open-demand fixture."""
+    return {
+        "demand_id": int(reference[-1]),
+        "demand_reference": reference,
+        "product_id": product_id,
+        "need_date": need_date,
+        "priority": "Standard",
+        "demand_quantity": Decimal(quantity),
+        "product_code": f"PRD-{product_id}",
+        "product_name": f"Product {product_id}",
+        "product_active_flag": True,
+    }
+
+
+BOM_HEADERS = [
+    {
+        "bom_id": 10,
+        "product_id": 1,
+        "revision_code": "A",
+        "effective_start_date": date(2026, 1, 1),
+        "effective_end_date": date(2026, 9, 30),
+    },
+    {
+        "bom_id": 11,
+        "product_id": 1,
+        "revision_code": "B",
+        "effective_start_date": date(2026, 10, 1),
+        "effective_end_date": None,
+    },
+]
+
+BOM_COMPONENTS = [
+    {
+        "bom_id": 10,
+        "line_number": 1,
+        "material_id": 1,
+        "material_code": "MAT-1",
+        "material_name": "Material One",
+        "base_unit_of_measure": "KG",
+        "quantity_per_unit": Decimal("0.012500"),
+        "expected_loss_pct": Decimal("4.000"),
+    },
+    {
+        "bom_id": 11,
+        "line_number": 1,
+        "material_id": 1,
+        "material_code": "MAT-1",
+        "material_name": "Material One",
+        "base_unit_of_measure": "KG",
+        "quantity_per_unit": Decimal("0.020000"),
+        "expected_loss_pct": Decimal("0.000"),
+    },
+]
+
+SNAPSHOT = {
+    "demand": [
+        demand("PD-1", date(2026, 9, 1), "8000"),
+        demand("PD-2", date(2026, 9, 1), "8000"),
+        demand("PD-3", date(2026, 10, 5), "5000"),
+    ],
+    "bom_headers": BOM_HEADERS,
+    "bom_components": BOM_COMPONENTS,
+    "inventory_supply": [
+        {"material_id": 1, "usable_inventory": Decimal("50.000")}
+    ],
+    "scheduled_receipts": [],
+    "preferred_sources": [
+        {
+            "material_id": 1,
+            "supplier_id": 10,
+            "supplier_code": "SUP-TEST",
+            "supplier_name": "Test Supplier",
+            "unit_price": Decimal("2.5000"),
+            "lead_time_days": 10,
+            "minimum_order_quantity": Decimal("100.000"),
+            "order_multiple": Decimal("10.000"),
+        }
+    ],
+}
+
+
+def test_explosion_selects_effective_bom_revision_per_demand():
+    rows = explode_demand(SNAPSHOT["demand"], BOM_HEADERS, BOM_COMPONENTS)
+
+    assert [row["bom_revision"] for row in rows] == ["A", "A", "B"]
+    assert rows[0]["gross_requirement"] == Decimal("104.167")
+    assert rows[2]["gross_requirement"] == Decimal("100.000")
+
+
+def test_aggregation_rounds_after_summing_unrounded_lines():
+    requirements = explode_material_requirements(
+        SNAPSHOT["demand"], BOM_HEADERS, BOM_COMPONENTS
+    )
+
+    # 104.1666... twice is 208.333, not 104.167 + 104.167.
+    assert requirements[0]["gross_requirement"] == Decimal("208.333")
+    assert requirements[1]["gross_requirement"] == Decimal("100.000")
+
+
+def test_explosion_fails_when_demand_lacks_effective_bom():
+    with pytest.raises(ValueError, match="PD-9"):
+        explode_material_requirements(
+            [demand("PD-9", date(2025, 12, 1), "10")],
+            BOM_HEADERS,
+            BOM_COMPONENTS,
+        )
+
+
+def test_session_stages_share_one_snapshot():
+    session = PlanningSession(SNAPSHOT, planning_date=date(2026, 8, 1))
+
+    assert session.netted_requirements[0]["net_requirement"] == Decimal("158.333")
+    assert session.recommendations[0]["recommended_order_quantity"] == Decimal(
+        "160.000"
+    )
+    assert session.bom_explosion is session.bom_explosion
+
+
+def test_session_requires_every_snapshot_input():
+    with pytest.raises(ValueError, match="preferred_sources"):
+        PlanningSession(
+            {key: value for key, value in SNAPSHOT.items() if key != "preferred_sources"}
+        )
+
+
+def test_supplier_capacity_levels_session_recommendations():
+    with pytest.raises(ValueError, match="supplier_capacity"):
+        PlanningSession(SNAPSHOT, supplier_capacity=True)
+
+    snapshot = {
+        **SNAPSHOT,
+        "preferred_sources": [
+            {
+                **SNAPSHOT["preferred_sources"][0],
+                "minimum_order_quantity": Decimal("50.000"),
+            }
+        ],
+        "supplier_capacity": [
+            {
+                "supplier_id": 10,
+                "material_id": 1,
+                "material_category": "Metal Wire",
+                "weekly_capacity_quantity": Decimal("100.000"),
+            }
+        ],
+    }
+    base = PlanningSession(snapshot, planning_date=date(2026, 8, 1))
+    leveled = PlanningSession(
+        snapshot, planning_date=date(2026, 8, 1), supplier_capacity=True
+    )
+
+    assert sum(
+        row["recommended_order_quantity"] for row in leveled.recommendations
+    ) == sum(row["recommended_order_quantity"] for row in base.recommendations)
+    assert max(
+        row["recommended_order_quantity"] for row in leveled.recommendations
+    ) == Decimal("100.000")
+    assert "Shifted Earlier" in {
+        row["capacity_status"] for row in leveled.recommendations
+    }
+
+
+def test_monthly_buckets_net_far_requirements_per_bucket():
+    snapshot = {
+        **SNAPSHOT,
+        "demand": [*SNAPSHOT["demand"], demand("PD-4", date(2026, 10, 20), "5000")],
+        "scheduled_receipts": [
+            {
+                "material_id": 1,
+                "material_code": "MAT-1",
+                "expected_receipt_date": date(2026, 10, 28),
+                "open_receipt_quantity": Decimal("30.000"),
+            }
+        ],
+    }
+    session = PlanningSession(
+        snapshot, planning_date=date(2026, 8, 1), buckets="daily:45,monthly"
+    )
+
+    assert [
+        (row["need_date"], row["gross_requirement"], row["supply_applied"])
+        for row in session.netted_requirements
+    ] == [
+        (date(2026, 9, 1), Decimal("208.333"), Decimal("50.000")),
+        (date(2026, 10, 1), Decimal("200.000"), Decimal("30.000")),
+    ]
+    assert [row["need_date"] for row in session.recommendations] == [
+        date(2026, 9, 1),
+        date(2026, 10, 1),
+    ]
+    assert session.shortage_pegging.demand_for((1, date(2026, 10, 1))) == [
+        ("PD-3", Decimal("70.000")),
+        ("PD-4", Decimal("100.000")),
+    ]
+
+
+def test_session_buckets_rollup_rows_like_the_explosion():
+    material = {
+        "material_id": 1,
+        "material_code": "MAT-1",
+        "material_name": "Material One",
+        "base_unit_of_measure": "KG",
+    }
+    snapshot = {
+        **SNAPSHOT,
+        "demand": [*SNAPSHOT["demand"], demand("PD-4", date(2026, 10, 20), "5000")],
+        "requirement_rollup": [
+            {
+                **material,
+                "need_date": date(2026, 9, 1),
+                "gross_requirement": Decimal("16000") * Decimal("0.0125")
+                / Decimal("0.96"),
+            },
+            {
+                **material,
+                "need_date": date(2026, 10, 5),
+                "gross_requirement": Decimal("100.000000"),
+            },
+            {
+                **material,
+                "need_date": date(2026, 10, 20),
+                "gross_requirement": Decimal("100.000000"),
+            },
+        ],
+    }
+
+    for buckets in ("daily", "daily:45,monthly"):
+        from_rollup = PlanningSession(
+            snapshot, planning_date=date(2026, 8, 1), buckets=buckets
+        )
+        exploded = PlanningSession(
+            {
+                key: value
+                for key, value in snapshot.items()
+                if key != "requirement_rollup"
+            },
+            planning_date=date(2026, 8, 1),
+            buckets=buckets,
+        )
+        assert from_rollup.material_requirements == exploded.material_requirements
+
+    with pytest.raises(ValueError, match="PD-9"):
+        PlanningSession(
+            {**snapshot, "demand": [demand("PD-9", date(2025, 12, 1), "10")]}
+        ).material_requirements
@@ -20,6 +20,8 @@
 -- CLEANUP
 -- ============================================================
 
+DROP TABLE IF EXISTS sensor_reading_daily CASCADE;
+DROP TABLE IF EXISTS sensor_reading_hourly CASCADE;
 DROP TABLE IF EXISTS sensor_readings CASCADE;
 DROP TABLE IF EXISTS maintenance_events CASCADE;
 DROP TABLE IF EXISTS downtime_events CASCADE;
@@ -1285,6 +1287,11 @@ CREATE INDEX idx_maintenance_events_start
 --
 -- Grain:
 --     One row per machine per sensor-reading timestamp.
+--
+-- Partitioning:
+--     Range-partitioned by calendar month of reading_timestamp in UTC.
+--     Partitions are named sensor_readings_YYYY_MM and are created by the
+--     loader before each COPY; retention drops whole expired partitions.
 -- ============================================================================
 
 CREATE TABLE sensor_readings (
@@ -1307,8 +1314,9 @@ CREATE TABLE sensor_readings (
 
     created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
 
+    -- Unique keys on a partitioned table must include the partition key.
     CONSTRAINT pk_sensor_readings
-        PRIMARY KEY (sensor_reading_id),
+        PRIMARY KEY (sensor_reading_id, reading_timestamp),
 
     CONSTRAINT uq_sensor_readings_machine_timestamp
         UNIQUE (machine_id, reading_timestamp),
@@ -1347,11 +1355,102 @@ CREATE TABLE sensor_readings (
             OR rpm >= 0
         )
 
-);
-
-CREATE INDEX idx_sensor_readings_machine_id
-    ON sensor_readings (machine_id);
+) PARTITION BY RANGE (reading_timestamp);
 
+-- Machine lookups use the leading column of the unique machine-timestamp key.
+-- Fleet-wide time ranges need their own B-tree: the loader copies readings
+-- machine by machine, so within a partition neighbouring pages span the whole
+-- month and a BRIN summary could not narrow a sub-month range.
 CREATE INDEX idx_sensor_readings_timestamp
     ON sensor_readings (reading_timestamp);
 
+-- ============================================================================
+-- sensor_reading_hourly and sensor_reading_daily
+--
+-- Purpose:
+--     Downsampled telemetry for dashboards and feature building. Counts,
+--     sums, and sums of squares combine exactly across buckets, so means and
+--     standard deviations at any coarser width come from these rows.
+--
+-- Grain:
+--     One row per machine per sensor per UTC hour or UTC day that has at
+--     least one non-NULL reading.
+--
+-- Maintenance:
+--     The sensor loader rebuilds the buckets its load window touches in the
+--     same transaction as the COPY. Retention deletes the rollups of each
+--     dropped raw partition's month in the same transaction as the DROP.
+-- ============================================================================
+
+CREATE TABLE sensor_reading_hourly (
+
+    machine_id BIGINT NOT NULL,
+
+    sensor_name VARCHAR(30) NOT NULL,
+
+    bucket_start TIMESTAMPTZ NOT NULL,
+
+    reading_count INTEGER NOT NULL,
+
+    value_sum NUMERIC NOT NULL,
+
+    value_sum_squares NUMERIC NOT NULL,
+
+    min_value NUMERIC NOT NULL,
+
+    max_value NUMERIC NOT NULL,
+
+    CONSTRAINT pk_sensor_reading_hourly
+        PRIMARY KEY (machine_id, sensor_name, bucket_start),
+
+    CONSTRAINT fk_sensor_reading_hourly_machines
+        FOREIGN KEY (machine_id)
+        REFERENCES machines (machine_id),
+
+    CONSTRAINT chk_sensor_reading_hourly_count
+        CHECK (reading_count > 0),
+
+    CONSTRAINT chk_sensor_reading_hourly_range
+        CHECK (min_value <= max_value)
+
+);
+
+CREATE INDEX idx_sensor_reading_hourly_bucket
+    ON sensor_reading_hourly (bucket_start);
+
+CREATE TABLE sensor_reading_daily (
+
+    machine_id BIGINT NOT NULL,
+
+    sensor_name VARCHAR(30) NOT NULL,
+
+    bucket_start TIMESTAMPTZ NOT NULL,
+
+    reading_count INTEGER NOT NULL,
+
+    value_sum NUMERIC NOT NULL,
+
+    value_sum_squares NUMERIC NOT NULL,
+
+    min_value NUMERIC NOT NULL,
+
+    max_value NUMERIC NOT NULL,
+
+    CONSTRAINT pk_sensor_reading_daily
+        PRIMARY KEY (machine_id, sensor_name, bucket_start),
+
+    CONSTRAINT fk_sensor_reading_daily_machines
+        FOREIGN KEY (machine_id)
+        REFERENCES machines (machine_id),
+
+    CONSTRAINT chk_sensor_reading_daily_count
+        CHECK (reading_count > 0),
+
+    CONSTRAINT chk_sensor_reading_daily_range
+        CHECK (min_value <= max_value)
+
+);
+
+CREATE INDEX idx_sensor_reading_daily_bucket
+    ON sensor_reading_daily (bucket_start);
+
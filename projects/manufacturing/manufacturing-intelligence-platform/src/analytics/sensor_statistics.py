@@ -0,0 +1,174 @@
+"""Summarize telemetry from the coarsest stored resolution that fits.
+
+A request names one sensor, a UTC time range with an exclusive end, and a
+bucket width in minutes. Daily rollups answer requests whose bucket width and
+range bounds fall on whole UTC days, hourly rollups answer whole hours, and
+anything finer reads raw five-minute readings. Every resolution returns the
+same per-machine bucket statistics, so callers do not need to know which one
+was used.
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from src.etl.sensor_rollups import ROLLUP_SENSOR_NAMES
+
+
+# Coarsest first: (resolution, bucket minutes, rollup table).
+ROLLUP_RESOLUTIONS = (
+    ("daily", 24 * 60, "sensor_reading_daily"),
+    ("hourly", 60, "sensor_reading_hourly"),
+)
+
+UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+STATISTICS_TEMPLATE = """
+    WITH buckets AS (
+        {bucket_query}
+    )
+    SELECT
+        machine_id,
+        bucket_start,
+        reading_count,
+        ROUND(value_sum / reading_count, 3) AS mean_value,
+        CASE
+            WHEN reading_count > 1 THEN ROUND(
+                SQRT(
+                    GREATEST(
+                        (
+                            value_sum_squares
+                            - value_sum * value_sum / reading_count
+                        ) / (reading_count - 1),
+                        0
+                    )
+                ),
+                3
+            )
+        END AS std_value,
+        min_value,
+        max_value
+    FROM buckets
+    ORDER BY machine_id, bucket_start
+    """
+
+ROLLUP_BUCKET_QUERY = """
+        SELECT
+            machine_id,
+            date_bin(
+                make_interval(mins => :bucket_minutes),
+                bucket_start,
+                :start_timestamp
+            ) AS bucket_start,
+            SUM(reading_count) AS reading_count,
+            SUM(value_sum) AS value_sum,
+            SUM(value_sum_squares) AS value_sum_squares,
+            MIN(min_value) AS min_value,
+            MAX(max_value) AS max_value
+        FROM {table_name}
+        WHERE sensor_name = :sensor_name
+          AND bucket_start >= :start_timestamp
+          AND bucket_start < :end_timestamp
+          AND (
+              CAST(:machine_ids AS BIGINT[]) IS NULL
+              OR machine_id = ANY(:machine_ids)
+          )
+        GROUP BY 1, 2
+"""
+
+RAW_BUCKET_QUERY = """
+        SELECT
+            machine_id,
+            date_bin(
+                make_interval(mins => :bucket_minutes),
+                reading_timestamp,
+                :start_timestamp
+            ) AS bucket_start,
+            COUNT({sensor_name}) AS reading_count,
+            SUM({sensor_name}::NUMERIC) AS value_sum,
+            SUM({sensor_name}::NUMERIC * {sensor_name}) AS value_sum_squares,
+            MIN({sensor_name}) AS min_value,
+            MAX({sensor_name}) AS max_value
+        FROM sensor_readings
+        WHERE reading_timestamp >= :start_timestamp
+          AND reading_timestamp < :end_timestamp
+          AND {sensor_name} IS NOT NULL
+          AND (
+              CAST(:machine_ids AS BIGINT[]) IS NULL
+              OR machine_id = ANY(:machine_ids)
+          )
+        GROUP BY 1, 2
+"""
+
+
+def is_aligned(timestamp, minutes):
+    """Return whether a timestamp falls on a UTC boundary of ``minutes``."""
+    return (timestamp - UNIX_EPOCH).total_seconds() % (minutes * 60) == 0
+
+
+def choose_sensor_resolution(start_timestamp, end_timestamp, bucket_minutes):
+    """Return the coarsest resolution whose buckets exactly tile the request."""
+    for resolution, resolution_minutes, _ in ROLLUP_RESOLUTIONS:
+        if (
+            bucket_minutes % resolution_minutes == 0
+            and is_aligned(start_timestamp, resolution_minutes)
+            and is_aligned(end_timestamp, resolution_minutes)
+        ):
+            return resolution
+    return "raw"
+
+
+def build_sensor_statistics_query(sensor_name, resolution):
+    """Return the statistics query for a validated sensor and resolution."""
+    if resolution == "raw":
+        bucket_query = RAW_BUCKET_QUERY.format(sensor_name=sensor_name)
+    else:
+        table_name = next(
+            table_name
+            for name, _, table_name in ROLLUP_RESOLUTIONS
+            if name == resolution
+        )
+        bucket_query = ROLLUP_BUCKET_QUERY.format(table_name=table_name)
+    return text(STATISTICS_TEMPLATE.format(bucket_query=bucket_query))
+
+
+def get_sensor_statistics(
+    engine,
+    sensor_name,
+    start_timestamp,
+    end_timestamp,
+    bucket_minutes,
+    machine_ids=None,
+):
+    """Return per-machine bucket statistics for one sensor.
+
+    Buckets are ``bucket_minutes`` wide and start at ``start_timestamp``.
+    Each row holds the reading count, mean, sample standard deviation,
+    minimum, and maximum. ``machine_ids`` limits the machines returned.
+    """
+    if sensor_name not in ROLLUP_SENSOR_NAMES:
+        raise ValueError(f"Unknown sensor: {sensor_name}")
+    if bucket_minutes <= 0:
+        raise ValueError("Bucket width must be a positive number of minutes.")
+    if end_timestamp <= start_timestamp:
+        raise ValueError("Sensor statistics need an end after the start.")
+
+    resolution = choose_sensor_resolution(
+        start_timestamp,
+        end_timestamp,
+        bucket_minutes,
+    )
+    query = build_sensor_statistics_query(sensor_name, resolution)
+    parameters = {
+        "sensor_name": sensor_name,
+        "start_timestamp": start_timestamp,
+        "end_timestamp": end_timestamp,
+        "bucket_minutes": bucket_minutes,
+        "machine_ids": list(machine_ids) if machine_ids is not None else None,
+    }
+
+    with engine.connect() as connection:
+        return [
+            dict(row)
+            for row in connection.execute(query, parameters).mappings()
+        ]
@@ -12,3 +12,18 @@ DATABASE_URL = os.getenv(
     "DATABASE_URL",
     "postgresql+psycopg2:///manufacturing_intelligence",
 )
+
+# Months of sensor telemetry kept before the current month; older monthly
+# partitions are dropped by ``python -m src.etl.sensor_partitions``.
+SENSOR_RETENTION_MONTHS = int(os.getenv("SENSOR_RETENTION_MONTHS", "24"))
+
+# Base seed for transactional data generation. Every stage and sensor machine
+# derives its own seed from it; a random seed is chosen and printed when unset.
+GENERATION_SEED = os.getenv("GENERATION_SEED")
+
+# ISO timestamp that generated history ends at, so a seeded run can be
+# reproduced later; the current time is used when unset.
+GENERATION_AS_OF = os.getenv("GENERATION_AS_OF")
+
+# Worker processes for independent generation stages and sensor machines.
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", str(os.cpu_count() or 1)))
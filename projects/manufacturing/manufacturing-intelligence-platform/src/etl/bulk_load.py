@@ -0,0 +1,209 @@
+"""Bulk-load rows into PostgreSQL with COPY instead of executemany INSERTs.
+
+Rows are formatted as COPY text lines and streamed to the server through a
+file-like buffer, so a generator of millions of rows is never materialized
+and the load costs one round trip instead of one per row. Columnar chunks can
+also be formatted on a background thread and handed to COPY through a
+bounded queue, so generation overlaps with database I/O.
+"""
+
+from datetime import date
+import queue
+import threading
+from time import perf_counter
+
+
+COPY_NULL = r"\N"
+COPY_BUFFER_SIZE = 1 << 16
+COPY_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+)
+
+# Formatted chunks waiting for COPY; bounds memory when generation is faster.
+COPY_QUEUE_CHUNKS = 4
+COPY_STREAM_END = object()
+
+
+def format_copy_value(value):
+    """Return one value in PostgreSQL COPY text format."""
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.translate(COPY_ESCAPES)
+    return str(value)
+
+
+def iter_copy_lines(rows, columns):
+    """Yield one COPY text line per dictionary row."""
+    for row in rows:
+        yield "\t".join(format_copy_value(row[column]) for column in columns) + "\n"
+
+
+class CopyBuffer:
+    """Read-only file object that feeds COPY lines to ``copy_expert``."""
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.pending = ""
+        self.row_count = 0
+
+    def read(self, size=-1):
+        """Return at least ``size`` characters unless the lines are exhausted."""
+        size = COPY_BUFFER_SIZE if size is None or size < 0 else size
+        parts = [self.pending]
+        length = len(self.pending)
+        for line in self.lines:
+            parts.append(line)
+            length += len(line)
+            self.row_count += 1
+            if length >= size:
+                break
+        chunk = "".join(parts)
+        self.pending = chunk[size:]
+        return chunk[:size]
+
+
+def copy_stream(connection, table_name, columns, stream):
+    """COPY a text-format stream into a table inside the open transaction.
+
+    ``stream`` is any file-like object with ``read``, such as ``io.StringIO``
+    or ``CopyBuffer``. Returns the number of rows PostgreSQL reports.
+    """
+    copy_sql = (
+        f"COPY {table_name} ({', '.join(columns)}) "
+        "FROM STDIN WITH (FORMAT text)"
+    )
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(copy_sql, stream, size=COPY_BUFFER_SIZE)
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def get_load_stats(table_name, row_count, started):
+    """Return row count, elapsed seconds, and rows/second for a load."""
+    elapsed_seconds = perf_counter() - started
+    return {
+        "table_name": table_name,
+        "row_count": row_count,
+        "elapsed_seconds": elapsed_seconds,
+        "rows_per_second": (
+            row_count / elapsed_seconds if elapsed_seconds > 0 else 0.0
+        ),
+    }
+
+
+def copy_rows(connection, table_name, columns, rows):
+    """COPY dictionary rows into a table and return load statistics.
+
+    ``rows`` may be a list or a generator; only ``columns`` are read from each
+    row. The result reports the row count, elapsed seconds, and rows/second.
+    """
+    started = perf_counter()
+    buffer = CopyBuffer(iter_copy_lines(rows, columns))
+    copy_stream(connection, table_name, columns, buffer)
+    return get_load_stats(table_name, buffer.row_count, started)
+
+
+def format_copy_frame(frame):
+    """Return a numeric and timestamp DataFrame in COPY text format.
+
+    Pandas writes whole columns at once, so this avoids per-value Python
+    formatting. Missing values become NULL; text columns are not escaped.
+    """
+    return frame.to_csv(sep="\t", header=False, index=False, na_rep=COPY_NULL)
+
+
+class QueueBuffer:
+    """Read-only file object that feeds COPY text blocks taken from a queue.
+
+    An exception placed on the queue is raised from ``read``, which aborts
+    the COPY and rolls back its transaction.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.pending = ""
+        self.finished = False
+
+    def read(self, size=-1):
+        """Return up to ``size`` characters, waiting for the next block."""
+        size = COPY_BUFFER_SIZE if size is None or size < 0 else size
+        while len(self.pending) < size and not self.finished:
+            block = self.blocks.get()
+            if block is COPY_STREAM_END:
+                self.finished = True
+            elif isinstance(block, BaseException):
+                raise block
+            else:
+                self.pending += block
+        chunk, self.pending = self.pending[:size], self.pending[size:]
+        return chunk
+
+
+def put_until_stopped(blocks, item, stopped):
+    """Put ``item`` on a bounded queue; return False once ``stopped`` is set."""
+    while not stopped.is_set():
+        try:
+            blocks.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def produce_copy_blocks(chunks, format_chunk, blocks, stopped):
+    """Format chunks onto the queue, then the end marker or the error raised."""
+    try:
+        for chunk in chunks:
+            if not put_until_stopped(blocks, format_chunk(chunk), stopped):
+                return
+        put_until_stopped(blocks, COPY_STREAM_END, stopped)
+    except Exception as error:
+        put_until_stopped(blocks, error, stopped)
+
+
+def copy_chunks(
+    connection,
+    table_name,
+    columns,
+    chunks,
+    format_chunk,
+    max_pending_chunks=COPY_QUEUE_CHUNKS,
+):
+    """COPY chunks produced and formatted on a background thread.
+
+    ``chunks`` is consumed by a producer thread that turns each chunk into
+    COPY text with ``format_chunk``. At most ``max_pending_chunks`` formatted
+    chunks wait in the queue, so memory stays bounded while generation and
+    formatting overlap with the server's COPY. Returns load statistics.
+    """
+    started = perf_counter()
+    blocks = queue.Queue(maxsize=max_pending_chunks)
+    stopped = threading.Event()
+    producer = threading.Thread(
+        target=produce_copy_blocks,
+        args=(chunks, format_chunk, blocks, stopped),
+        daemon=True,
+    )
+    producer.start()
+    try:
+        row_count = copy_stream(connection, table_name, columns, QueueBuffer(blocks))
+    finally:
+        stopped.set()
+        producer.join()
+    return get_load_stats(table_name, row_count, started)
+
+
+def describe_load(load_stats):
+    """Return a one-line summary of a COPY load."""
+    return (
+        f"Loaded {load_stats['row_count']:,} {load_stats['table_name']} rows "
+        f"in {load_stats['elapsed_seconds']:.2f}s "
+        f"({load_stats['rows_per_second']:,.0f} rows/s)."
+    )
@@ -23,19 +23,19 @@ PRICE_MARKUP_RANGES = {
 }
 
 
-def generate_ordered_quantity(product_family):
+def generate_ordered_quantity(product_family, rng=random):
     """Generate a realistic order quantity for a product family."""
 
     minimum, maximum, increment = QUANTITY_RULES[product_family]
-    return random.randrange(minimum, maximum + increment, increment)
+    return rng.randrange(minimum, maximum + increment, increment)
 
 
-def generate_unit_price(product, ordered_quantity):
+def generate_unit_price(product, ordered_quantity, rng=random):
     """Calculate a selling price from product cost, margin, and volume."""
 
     product_family = product["product_family"]
     minimum_markup, maximum_markup = PRICE_MARKUP_RANGES[product_family]
-    markup = Decimal(str(random.uniform(minimum_markup, maximum_markup)))
+    markup = Decimal(str(rng.uniform(minimum_markup, maximum_markup)))
 
     _, maximum_quantity, _ = QUANTITY_RULES[product_family]
     quantity_ratio = ordered_quantity / maximum_quantity
@@ -66,7 +66,7 @@ def get_line_status(order_status):
     return status_mapping[order_status]
 
 
-def generate_customer_order_items(customer_orders, products):
+def generate_customer_order_items(customer_orders, products, rng=random):
     """Generate one to five unique product lines for each customer order."""
 
     if not products:
@@ -76,12 +76,13 @@ def generate_customer_order_items(customer_orders, products):
     maximum_lines = min(5, len(products))
 
     for customer_order in customer_orders:
-        line_count = random.randint(1, maximum_lines)
-        selected_products = random.sample(products, k=line_count)
+        line_count = rng.randint(1, maximum_lines)
+        selected_products = rng.sample(products, k=line_count)
 
         for line_number, product in enumerate(selected_products, start=1):
             ordered_quantity = generate_ordered_quantity(
-                product["product_family"]
+                product["product_family"],
+                rng,
             )
 
             order_items.append(
@@ -93,6 +94,7 @@ def generate_customer_order_items(customer_orders, products):
                     "unit_price": generate_unit_price(
                         product,
                         ordered_quantity,
+                        rng,
                     ),
                     "line_status": get_line_status(
                         customer_order["order_status"]
@@ -1,15 +1,22 @@
 import random
-from datetime import timedelta
+from datetime import date, timedelta
 
-from faker import Faker
 
+ORDER_HISTORY_DAYS = 365
 
-fake = Faker()
 
+def generate_customer_orders(
+    customer_ids,
+    num_orders=500,
+    rng=random,
+    as_of_date=None,
+):
+    """Generate synthetic customer-order header records.
 
-def generate_customer_orders(customer_ids, num_orders=500):
-    """Generate synthetic customer-order header records."""
+    Order dates fall in the year up to ``as_of_date`` (today by default).
+    """
 
+    as_of_date = as_of_date or date.today()
     orders = []
 
     priorities = ["Low", "Standard", "High", "Rush"]
@@ -25,26 +32,25 @@ def generate_customer_orders(customer_ids, num_orders=500):
     status_weights = [0.15, 0.15, 0.08, 0.60, 0.02]
 
     for index in range(num_orders):
-        order_date = fake.date_between(
-            start_date="-1y",
-            end_date="today",
+        order_date = as_of_date - timedelta(
+            days=rng.randint(0, ORDER_HISTORY_DAYS)
         )
 
         requested_delivery_date = order_date + timedelta(
-            days=random.randint(7, 45)
+            days=rng.randint(7, 45)
         )
 
         order = {
             "customer_order_number": f"SO-{100001 + index}",
-            "customer_id": random.choice(customer_ids),
+            "customer_id": rng.choice(customer_ids),
             "order_date": order_date,
             "requested_delivery_date": requested_delivery_date,
-            "priority": random.choices(
+            "priority": rng.choices(
                 priorities,
                 weights=priority_weights,
                 k=1,
             )[0],
-            "order_status": random.choices(
+            "order_status": rng.choices(
                 statuses,
                 weights=status_weights,
                 k=1,
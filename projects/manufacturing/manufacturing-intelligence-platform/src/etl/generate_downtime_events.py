@@ -62,7 +62,7 @@ LINKED_CATEGORY_WEIGHTS = {
 }
 
 
-def choose_linked_category(operation_type):
+def choose_linked_category(operation_type, rng=random):
     """Choose a downtime category for an active manufacturing run."""
 
     weights = LINKED_CATEGORY_WEIGHTS.copy()
@@ -77,14 +77,14 @@ def choose_linked_category(operation_type):
         weights["Operator Unavailable"] += 10
 
     categories = list(weights)
-    return random.choices(
+    return rng.choices(
         categories,
         weights=[weights[category] for category in categories],
         k=1,
     )[0]
 
 
-def generate_event_timestamps(window_start, window_end, category):
+def generate_event_timestamps(window_start, window_end, category, rng=random):
     """Generate an event fully contained within an operating window."""
 
     available_minutes = max(
@@ -94,14 +94,14 @@ def generate_event_timestamps(window_start, window_end, category):
     minimum_minutes, maximum_minutes = DOWNTIME_RULES[category]["minutes"]
     maximum_allowed = min(maximum_minutes, available_minutes)
     minimum_allowed = min(minimum_minutes, maximum_allowed)
-    downtime_minutes = random.randint(minimum_allowed, maximum_allowed)
+    downtime_minutes = rng.randint(minimum_allowed, maximum_allowed)
     latest_start = window_end - timedelta(minutes=downtime_minutes)
     start_range_seconds = max(
         0,
         int((latest_start - window_start).total_seconds()),
     )
     downtime_start = window_start + timedelta(
-        seconds=random.randint(0, start_range_seconds)
+        seconds=rng.randint(0, start_range_seconds)
     )
     downtime_end = downtime_start + timedelta(minutes=downtime_minutes)
 
@@ -125,7 +125,13 @@ def build_downtime_event(machine_id, production_run_id, category, start, end):
     }
 
 
-def generate_downtime_events(production_runs, machines, start_date, end_date):
+def generate_downtime_events(
+    production_runs,
+    machines,
+    start_date,
+    end_date,
+    rng=random,
+):
     """Generate run-linked interruptions and standalone planned downtime."""
 
     downtime_events = []
@@ -140,7 +146,7 @@ def generate_downtime_events(production_runs, machines, start_date, end_date):
         else:
             continue
 
-        if random.random() >= event_probability:
+        if rng.random() >= event_probability:
             continue
 
         window_start = production_run["start_timestamp"]
@@ -150,12 +156,14 @@ def generate_downtime_events(production_runs, machines, start_date, end_date):
             window_end = window_start + timedelta(hours=10)
 
         category = choose_linked_category(
-            production_run["operation_type"]
+            production_run["operation_type"],
+            rng,
         )
         downtime_start, downtime_end, _ = generate_event_timestamps(
             window_start,
             window_end,
             category,
+            rng,
         )
         downtime_events.append(
             build_downtime_event(
@@ -170,16 +178,16 @@ def generate_downtime_events(production_runs, machines, start_date, end_date):
     operating_days = (end_date - start_date).days
 
     for machine in machines:
-        standalone_event_count = random.randint(2, 5)
+        standalone_event_count = rng.randint(2, 5)
 
         for _ in range(standalone_event_count):
-            category = random.choices(
+            category = rng.choices(
                 ["Preventive Maintenance", "Setup", "Changeover"],
                 weights=[55, 20, 25],
                 k=1,
             )[0]
             event_date = start_date + timedelta(
-                days=random.randint(0, operating_days)
+                days=rng.randint(0, operating_days)
             )
             window_start = datetime.combine(
                 event_date,
@@ -191,6 +199,7 @@ def generate_downtime_events(production_runs, machines, start_date, end_date):
                 window_start,
                 window_end,
                 category,
+                rng,
             )
             downtime_events.append(
                 build_downtime_event(
@@ -51,11 +51,11 @@ def calculate_machine_hours(machine, maintenance_start):
     return machine_hours.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
 
-def generate_maintenance_cost(maintenance_type, duration_hours):
+def generate_maintenance_cost(maintenance_type, duration_hours, rng=random):
     """Generate a maintenance cost influenced by type and duration."""
 
     minimum_cost, maximum_cost = COST_RANGES[maintenance_type]
-    base_cost = Decimal(str(random.uniform(minimum_cost, maximum_cost)))
+    base_cost = Decimal(str(rng.uniform(minimum_cost, maximum_cost)))
     duration_factor = Decimal("1") + Decimal(str(duration_hours)) * Decimal(
         "0.03"
     )
@@ -72,6 +72,7 @@ def build_maintenance_event(
     maintenance_end,
     reported_timestamp,
     technician_names,
+    rng=random,
 ):
     """Build one internally consistent maintenance event."""
 
@@ -85,14 +86,15 @@ def build_maintenance_event(
         "reported_timestamp": reported_timestamp,
         "maintenance_start": maintenance_start,
         "maintenance_end": maintenance_end,
-        "technician": random.choice(technician_names),
-        "failure_component": random.choice(
+        "technician": rng.choice(technician_names),
+        "failure_component": rng.choice(
             COMPONENTS_BY_OPERATION[machine["operation_type"]]
         ),
         "maintenance_action": MAINTENANCE_ACTIONS[maintenance_type],
         "maintenance_cost": generate_maintenance_cost(
             maintenance_type,
             duration_hours,
+            rng,
         ),
         "machine_hours_at_service": calculate_machine_hours(
             machine,
@@ -107,6 +109,7 @@ def generate_maintenance_events(
     technician_names,
     start_date,
     end_date,
+    rng=random,
 ):
     """Generate downtime-driven and routine equipment maintenance history."""
 
@@ -124,12 +127,12 @@ def generate_maintenance_events(
         if category == "Mechanical Failure":
             maintenance_type = "Corrective"
             reported_timestamp = downtime_event["downtime_start"] - timedelta(
-                minutes=random.randint(0, 30)
+                minutes=rng.randint(0, 30)
             )
         elif category == "Preventive Maintenance":
             maintenance_type = "Preventive"
             reported_timestamp = downtime_event["downtime_start"] - timedelta(
-                days=random.randint(7, 30)
+                days=rng.randint(7, 30)
             )
         else:
             continue
@@ -142,6 +145,7 @@ def generate_maintenance_events(
                 downtime_event["downtime_end"],
                 reported_timestamp,
                 technician_names,
+                rng,
             )
         )
 
@@ -155,9 +159,9 @@ def generate_maintenance_events(
 
         for maintenance_type in planned_types:
             event_date = start_date + timedelta(
-                days=random.randint(0, operating_days)
+                days=rng.randint(0, operating_days)
             )
-            start_hour = random.randint(6, 14)
+            start_hour = rng.randint(6, 14)
             maintenance_start = datetime.combine(
                 event_date,
                 time(hour=start_hour),
@@ -165,10 +169,10 @@ def generate_maintenance_events(
             )
             minimum_hours, maximum_hours = DURATION_HOURS[maintenance_type]
             maintenance_end = maintenance_start + timedelta(
-                hours=random.randint(minimum_hours, maximum_hours)
+                hours=rng.randint(minimum_hours, maximum_hours)
             )
             reported_timestamp = maintenance_start - timedelta(
-                days=random.randint(3, 21)
+                days=rng.randint(3, 21)
             )
             maintenance_events.append(
                 build_maintenance_event(
@@ -178,6 +182,7 @@ def generate_maintenance_events(
                     maintenance_end,
                     reported_timestamp,
                     technician_names,
+                    rng,
                 )
             )
 
@@ -17,17 +17,17 @@ RECEIPT_QUANTITY_RANGES = {
 }
 
 
-def choose_supplier(suppliers):
+def choose_supplier(suppliers, rng=random):
     """Choose a supplier with preference for higher quality ratings."""
 
-    return random.choices(
+    return rng.choices(
         suppliers,
         weights=[float(supplier["quality_rating"]) for supplier in suppliers],
         k=1,
     )[0]
 
 
-def generate_lot_status(quality_rating):
+def generate_lot_status(quality_rating, rng=random):
     """Generate a lot status influenced by supplier quality."""
 
     rejection_probability = max(
@@ -43,7 +43,7 @@ def generate_lot_status(quality_rating):
         - depleted_probability
     )
 
-    return random.choices(
+    return rng.choices(
         ["Available", "On Hold", "Depleted", "Rejected"],
         weights=[
             available_probability,
@@ -55,24 +55,24 @@ def generate_lot_status(quality_rating):
     )[0]
 
 
-def generate_received_quantity(material_form):
+def generate_received_quantity(material_form, rng=random):
     """Generate a receipt quantity appropriate for the material form."""
 
     minimum, maximum = RECEIPT_QUANTITY_RANGES[material_form]
-    quantity = Decimal(str(random.uniform(minimum, maximum)))
+    quantity = Decimal(str(rng.uniform(minimum, maximum)))
     return quantity.quantize(Decimal("0.001"), rounding=ROUND_HALF_UP)
 
 
-def generate_available_quantity(lot_status, quantity_received):
+def generate_available_quantity(lot_status, quantity_received, rng=random):
     """Generate current usable inventory consistent with the lot status."""
 
     if lot_status in {"Depleted", "Rejected"}:
         return Decimal("0.000")
 
     if lot_status == "On Hold":
-        remaining_ratio = random.uniform(0.40, 1.00)
+        remaining_ratio = rng.uniform(0.40, 1.00)
     else:
-        remaining_ratio = random.uniform(0.15, 0.90)
+        remaining_ratio = rng.uniform(0.15, 0.90)
 
     quantity_available = quantity_received * Decimal(str(remaining_ratio))
     return quantity_available.quantize(
@@ -88,6 +88,7 @@ def generate_material_lots(
     start_date,
     end_date,
     background_lots_per_material=3,
+    rng=random,
 ):
     """Generate demand-aware receipts plus background inventory history."""
 
@@ -132,7 +133,7 @@ def generate_material_lots(
             monthly_orders = demand_by_material_month[month_key]
             monthly_demand = sum(
                 (
-                    calculate_required_material(production_order)
+                    calculate_required_material(production_order, rng)
                     for production_order in monthly_orders
                 ),
                 start=Decimal("0.000"),
@@ -154,11 +155,11 @@ def generate_material_lots(
             )
 
             for _ in range(lot_count):
-                supplier = choose_supplier(suppliers)
+                supplier = choose_supplier(suppliers, rng)
                 received_date = max(
                     start_date,
                     earliest_production_date
-                    - timedelta(days=random.randint(7, 21)),
+                    - timedelta(days=rng.randint(7, 21)),
                 )
                 received_date = min(received_date, end_date)
                 lot_sequence = len(material_lots) + 1
@@ -178,14 +179,15 @@ def generate_material_lots(
                 )
 
         for _ in range(background_lots_per_material):
-            supplier = choose_supplier(suppliers)
+            supplier = choose_supplier(suppliers, rng)
             received_date = start_date + timedelta(
-                days=random.randint(0, date_range_days)
+                days=rng.randint(0, date_range_days)
             )
             quantity_received = generate_received_quantity(
-                material["material_form"]
+                material["material_form"],
+                rng,
             )
-            lot_status = generate_lot_status(supplier["quality_rating"])
+            lot_status = generate_lot_status(supplier["quality_rating"], rng)
             lot_sequence = len(material_lots) + 1
 
             material_lots.append(
@@ -200,6 +202,7 @@ def generate_material_lots(
                     "quantity_available": generate_available_quantity(
                         lot_status,
                         quantity_received,
+                        rng,
                     ),
                     "lot_status": lot_status,
                 }
@@ -22,7 +22,7 @@ GEOMETRY_FACTOR_BY_FAMILY = {
 }
 
 
-def calculate_required_material(production_order):
+def calculate_required_material(production_order, rng=random):
     """Estimate primary material required for a production order in pounds."""
 
     product_family = production_order["product_family"]
@@ -41,7 +41,7 @@ def calculate_required_material(production_order):
         geometry_factor = GEOMETRY_FACTOR_BY_FAMILY[product_family]
         unit_weight_lb = volume * density * geometry_factor
 
-    process_loss_factor = Decimal(str(random.uniform(1.02, 1.05)))
+    process_loss_factor = Decimal(str(rng.uniform(1.02, 1.05)))
     required_quantity = planned_quantity * unit_weight_lb * process_loss_factor
 
     return max(required_quantity, Decimal("0.001")).quantize(
@@ -50,7 +50,11 @@ def calculate_required_material(production_order):
     )
 
 
-def generate_production_order_materials(production_orders, material_lots):
+def generate_production_order_materials(
+    production_orders,
+    material_lots,
+    rng=random,
+):
     """Allocate compatible material lots to production orders using FIFO."""
 
     lots_by_material = defaultdict(list)
@@ -91,7 +95,7 @@ def generate_production_order_materials(production_orders, material_lots):
             continue
 
         material_id = production_order["material_id"]
-        required_quantity = calculate_required_material(production_order)
+        required_quantity = calculate_required_material(production_order, rng)
         remaining_quantity = required_quantity
 
         if production_order["production_status"] == "Completed":
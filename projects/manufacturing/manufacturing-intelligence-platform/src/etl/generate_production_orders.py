@@ -24,11 +24,11 @@ PRODUCTION_DAYS_BY_FAMILY = {
 }
 
 
-def get_production_status(line_status):
+def get_production_status(line_status, rng=random):
     """Return a production status consistent with an order-line status."""
 
     if line_status == "Allocated":
-        return random.choices(
+        return rng.choices(
             ["Released", "Scheduled"],
             weights=[0.30, 0.70],
             k=1,
@@ -42,28 +42,33 @@ def get_production_status(line_status):
     return status_mapping[line_status]
 
 
-def generate_planned_quantity(ordered_quantity, product_family):
+def generate_planned_quantity(ordered_quantity, product_family, rng=random):
     """Add a small production allowance for expected manufacturing scrap."""
 
     if product_family == "Installation Tool":
-        extra_quantity = 1 if random.random() < 0.10 else 0
+        extra_quantity = 1 if rng.random() < 0.10 else 0
         return ordered_quantity + extra_quantity
 
-    scrap_allowance = random.uniform(0.01, 0.04)
+    scrap_allowance = rng.uniform(0.01, 0.04)
     return math.ceil(ordered_quantity * (1 + scrap_allowance))
 
 
-def generate_schedule(order_date, requested_delivery_date, product_family):
+def generate_schedule(
+    order_date,
+    requested_delivery_date,
+    product_family,
+    rng=random,
+):
     """Generate scheduled dates within the customer order's delivery window."""
 
     minimum_days, maximum_days = PRODUCTION_DAYS_BY_FAMILY[product_family]
     available_days = max((requested_delivery_date - order_date).days, 1)
     duration_days = min(
-        random.randint(minimum_days, maximum_days),
+        rng.randint(minimum_days, maximum_days),
         available_days,
     )
     latest_start_offset = max(1, available_days - duration_days)
-    start_offset = random.randint(1, latest_start_offset)
+    start_offset = rng.randint(1, latest_start_offset)
     scheduled_start_date = order_date + timedelta(days=start_offset)
     scheduled_end_date = scheduled_start_date + timedelta(days=duration_days)
 
@@ -77,13 +82,14 @@ def generate_actual_timestamps(
     production_status,
     scheduled_start_date,
     scheduled_end_date,
+    rng=random,
 ):
     """Generate actual timestamps appropriate for the production status."""
 
     if production_status not in {"In Production", "Completed"}:
         return None, None
 
-    start_hour = random.randint(6, 14)
+    start_hour = rng.randint(6, 14)
     actual_start = datetime.combine(
         scheduled_start_date,
         time(hour=start_hour),
@@ -93,7 +99,7 @@ def generate_actual_timestamps(
     if production_status == "In Production":
         return actual_start, None
 
-    end_hour = random.randint(14, 22)
+    end_hour = rng.randint(14, 22)
     actual_end = datetime.combine(
         scheduled_end_date,
         time(hour=end_hour),
@@ -106,6 +112,7 @@ def generate_output_quantities(
     production_status,
     ordered_quantity,
     planned_quantity,
+    rng=random,
 ):
     """Generate completed and scrapped quantities for a work-order status."""
 
@@ -116,17 +123,21 @@ def generate_output_quantities(
         return ordered_quantity, planned_quantity - ordered_quantity
 
     completed_quantity = math.floor(
-        ordered_quantity * random.uniform(0.25, 0.75)
+        ordered_quantity * rng.uniform(0.25, 0.75)
     )
     maximum_scrap = planned_quantity - completed_quantity
     scrapped_quantity = min(
         maximum_scrap,
-        math.floor(completed_quantity * random.uniform(0.005, 0.025)),
+        math.floor(completed_quantity * rng.uniform(0.005, 0.025)),
     )
     return completed_quantity, scrapped_quantity
 
 
-def generate_production_orders(customer_order_items, machines_by_operation):
+def generate_production_orders(
+    customer_order_items,
+    machines_by_operation,
+    rng=random,
+):
     """Generate work orders for manufacturing-ready customer order lines."""
 
     production_orders = []
@@ -137,7 +148,7 @@ def generate_production_orders(customer_order_items, machines_by_operation):
         if line_status == "Open":
             continue
 
-        if line_status == "Cancelled" and random.random() < 0.50:
+        if line_status == "Cancelled" and rng.random() < 0.50:
             continue
 
         product_family = customer_order_item["product_family"]
@@ -149,11 +160,12 @@ def generate_production_orders(customer_order_items, machines_by_operation):
                 f"No available machine found for operation: {primary_operation}"
             )
 
-        production_status = get_production_status(line_status)
+        production_status = get_production_status(line_status, rng)
         ordered_quantity = customer_order_item["ordered_quantity"]
         planned_quantity = generate_planned_quantity(
             ordered_quantity,
             product_family,
+            rng,
         )
 
         if production_status == "Released":
@@ -161,22 +173,25 @@ def generate_production_orders(customer_order_items, machines_by_operation):
             scheduled_start_date = None
             scheduled_end_date = None
         else:
-            machine_id = random.choice(available_machine_ids)
+            machine_id = rng.choice(available_machine_ids)
             scheduled_start_date, scheduled_end_date = generate_schedule(
                 customer_order_item["order_date"],
                 customer_order_item["requested_delivery_date"],
                 product_family,
+                rng,
             )
 
         actual_start, actual_end = generate_actual_timestamps(
             production_status,
             scheduled_start_date,
             scheduled_end_date,
+            rng,
         )
         completed_quantity, scrapped_quantity = generate_output_quantities(
             production_status,
             ordered_quantity,
             planned_quantity,
+            rng,
         )
 
         production_orders.append(
@@ -59,7 +59,7 @@ CYCLE_TIME_MULTIPLIER = {
 }
 
 
-def distribute_quantity(total_quantity, bucket_count):
+def distribute_quantity(total_quantity, bucket_count, rng=random):
     """Distribute an integer quantity across operation buckets."""
 
     if bucket_count == 0:
@@ -71,11 +71,11 @@ def distribute_quantity(total_quantity, bucket_count):
     for index in range(remainder):
         quantities[index] += 1
 
-    random.shuffle(quantities)
+    rng.shuffle(quantities)
     return quantities
 
 
-def get_run_statuses(production_status, operation_count):
+def get_run_statuses(production_status, operation_count, rng=random):
     """Return route-level run statuses for a production-order status."""
 
     if production_status == "Scheduled":
@@ -88,7 +88,7 @@ def get_run_statuses(production_status, operation_count):
         return ["Cancelled"] * operation_count
 
     if production_status == "In Production":
-        running_index = random.randrange(operation_count)
+        running_index = rng.randrange(operation_count)
         return (
             ["Completed"] * running_index
             + ["Running"]
@@ -98,7 +98,12 @@ def get_run_statuses(production_status, operation_count):
     return []
 
 
-def generate_cycle_times(standard_cycle_time, operation_type, run_status):
+def generate_cycle_times(
+    standard_cycle_time,
+    operation_type,
+    run_status,
+    rng=random,
+):
     """Generate planned and actual cycle times for one operation."""
 
     planned_cycle_time = (
@@ -109,7 +114,7 @@ def generate_cycle_times(standard_cycle_time, operation_type, run_status):
     if run_status not in {"Completed", "Running", "Interrupted"}:
         return planned_cycle_time, None
 
-    performance_factor = Decimal(str(random.uniform(0.92, 1.18)))
+    performance_factor = Decimal(str(rng.uniform(0.92, 1.18)))
     actual_cycle_time = (planned_cycle_time * performance_factor).quantize(
         Decimal("0.01"),
         rounding=ROUND_HALF_UP,
@@ -117,7 +122,7 @@ def generate_cycle_times(standard_cycle_time, operation_type, run_status):
     return planned_cycle_time, actual_cycle_time
 
 
-def generate_operation_quantities(production_order, run_statuses):
+def generate_operation_quantities(production_order, run_statuses, rng=random):
     """Generate balanced quantities that flow through active operations."""
 
     quantities = []
@@ -131,6 +136,7 @@ def generate_operation_quantities(production_order, run_statuses):
     scrap_by_operation = distribute_quantity(
         production_order["scrapped_quantity"],
         active_count,
+        rng,
     )
     current_input = (
         production_order["completed_quantity"]
@@ -151,7 +157,7 @@ def generate_operation_quantities(production_order, run_statuses):
         else:
             rework_quantity = min(
                 current_input - scrap_quantity,
-                round(current_input * random.uniform(0.002, 0.015)),
+                round(current_input * rng.uniform(0.002, 0.015)),
             )
 
         good_quantity = (
@@ -218,6 +224,7 @@ def generate_production_runs(
     production_orders,
     machines_by_operation,
     operators_by_role,
+    rng=random,
 ):
     """Generate routed manufacturing-operation runs for production orders."""
 
@@ -230,6 +237,7 @@ def generate_production_runs(
         run_statuses = get_run_statuses(
             production_order["production_status"],
             len(route),
+            rng,
         )
 
         if not run_statuses:
@@ -238,6 +246,7 @@ def generate_production_runs(
         operation_quantities = generate_operation_quantities(
             production_order,
             run_statuses,
+            rng,
         )
         run_timestamps = generate_run_timestamps(
             production_order,
@@ -265,6 +274,7 @@ def generate_production_runs(
                 production_order["standard_cycle_time_seconds"],
                 operation_type,
                 run_statuses[index],
+                rng,
             )
             input_quantity, good_quantity, scrap_quantity, rework_quantity = (
                 operation_quantities[index]
@@ -276,8 +286,8 @@ def generate_production_runs(
                     "production_order_id": production_order[
                         "production_order_id"
                     ],
-                    "machine_id": random.choice(machine_ids),
-                    "operator_id": random.choice(operator_ids),
+                    "machine_id": rng.choice(machine_ids),
+                    "operator_id": rng.choice(operator_ids),
                     "operation_sequence": index + 1,
                     "operation_type": operation_type,
                     "start_timestamp": start_timestamp,
@@ -35,14 +35,14 @@ CORRECTIVE_ACTION_BY_ROOT_CAUSE = {
 }
 
 
-def partition_defect_quantity(total_quantity, defect_count):
+def partition_defect_quantity(total_quantity, defect_count, rng=random):
     """Partition failed units into positive quantities across defect types."""
 
     if defect_count == 1:
         return [total_quantity]
 
     cut_points = sorted(
-        random.sample(range(1, total_quantity), defect_count - 1)
+        rng.sample(range(1, total_quantity), defect_count - 1)
     )
     boundaries = [0, *cut_points, total_quantity]
     return [
@@ -51,11 +51,16 @@ def partition_defect_quantity(total_quantity, defect_count):
     ]
 
 
-def choose_disposition(severity, inspection_result, defect_category):
+def choose_disposition(
+    severity,
+    inspection_result,
+    defect_category,
+    rng=random,
+):
     """Choose a disposition based on severity and inspection outcome."""
 
     if inspection_result == "Conditional":
-        return random.choices(
+        return rng.choices(
             ["Rework", "Use As Is", "Pending Review"],
             weights=[45, 35, 20],
             k=1,
@@ -75,17 +80,17 @@ def choose_disposition(severity, inspection_result, defect_category):
         supplier_index = dispositions.index("Return to Supplier")
         dispositions[supplier_index] = "Scrap"
 
-    return random.choices(dispositions, weights=weights, k=1)[0]
+    return rng.choices(dispositions, weights=weights, k=1)[0]
 
 
-def choose_root_cause(defect_category):
+def choose_root_cause(defect_category, rng=random):
     """Choose a root-cause category compatible with the defect category."""
 
     categories, weights = ROOT_CAUSES_BY_CATEGORY[defect_category]
-    return random.choices(categories, weights=weights, k=1)[0]
+    return rng.choices(categories, weights=weights, k=1)[0]
 
 
-def generate_quality_defects(quality_inspections, defect_types):
+def generate_quality_defects(quality_inspections, defect_types, rng=random):
     """Generate classified defect records for failed inspection samples."""
 
     defect_types_by_code = {
@@ -118,23 +123,28 @@ def generate_quality_defects(quality_inspections, defect_types):
         defect_count = min(
             len(eligible_defects),
             failed_quantity,
-            random.choices([1, 2, 3], weights=[70, 25, 5], k=1)[0],
+            rng.choices([1, 2, 3], weights=[70, 25, 5], k=1)[0],
         )
-        selected_defects = random.sample(eligible_defects, defect_count)
+        selected_defects = rng.sample(eligible_defects, defect_count)
         defect_quantities = partition_defect_quantity(
             failed_quantity,
             defect_count,
+            rng,
         )
 
         for defect_type, defect_quantity in zip(
             selected_defects,
             defect_quantities,
         ):
-            root_cause = choose_root_cause(defect_type["defect_category"])
+            root_cause = choose_root_cause(
+                defect_type["defect_category"],
+                rng,
+            )
             disposition = choose_disposition(
                 defect_type["severity"],
                 inspection["inspection_result"],
                 defect_type["defect_category"],
+                rng,
             )
 
             quality_defects.append(
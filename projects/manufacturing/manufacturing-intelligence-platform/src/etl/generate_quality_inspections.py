@@ -11,7 +11,7 @@ TENSILE_STRENGTH_BY_MATERIAL = {
 }
 
 
-def choose_measurement_type(production_run):
+def choose_measurement_type(production_run, rng=random):
     """Choose a primary measurement appropriate for an operation."""
 
     operation_measurements = {
@@ -42,7 +42,7 @@ def choose_measurement_type(production_run):
             if measurement != "Length"
         ] or ["Assembly Gap"]
 
-    return random.choice(available_measurements)
+    return rng.choice(available_measurements)
 
 
 def get_specification(production_run, measurement_type):
@@ -90,7 +90,7 @@ def get_specification(production_run, measurement_type):
     return Decimal("0.0000"), Decimal("0.0000"), Decimal("0.0000")
 
 
-def generate_sample_results(production_run):
+def generate_sample_results(production_run, rng=random):
     """Generate balanced sampled pass and failure quantities."""
 
     processed_quantity = (
@@ -102,7 +102,7 @@ def generate_sample_results(production_run):
     if processed_quantity == 0:
         return 0, 0, 0, "Pending"
 
-    target_sample_size = random.choice([5, 10, 20, 32, 50])
+    target_sample_size = rng.choice([5, 10, 20, 32, 50])
     sample_size = min(processed_quantity, target_sample_size)
     observed_loss_rate = (
         production_run["scrap_quantity"]
@@ -110,7 +110,7 @@ def generate_sample_results(production_run):
     ) / processed_quantity
     failure_probability = min(0.15, max(0.005, observed_loss_rate * 1.5))
     failed_quantity = sum(
-        random.random() < failure_probability for _ in range(sample_size)
+        rng.random() < failure_probability for _ in range(sample_size)
     )
     passed_quantity = sample_size - failed_quantity
 
@@ -134,6 +134,7 @@ def generate_measured_value(
     upper_limit,
     nominal,
     inspection_result,
+    rng=random,
 ):
     """Generate a measurement consistent with the inspection result."""
 
@@ -143,22 +144,22 @@ def generate_measured_value(
     specification_width = upper_limit - lower_limit
 
     if inspection_result == "Fail":
-        if random.random() < 0.50:
+        if rng.random() < 0.50:
             measured_value = lower_limit - specification_width * Decimal(
-                str(random.uniform(0.02, 0.15))
+                str(rng.uniform(0.02, 0.15))
             )
         else:
             measured_value = upper_limit + specification_width * Decimal(
-                str(random.uniform(0.02, 0.15))
+                str(rng.uniform(0.02, 0.15))
             )
     elif inspection_result == "Conditional":
-        direction = random.choice([-1, 1])
+        direction = rng.choice([-1, 1])
         measured_value = nominal + Decimal(direction) * specification_width * Decimal(
-            str(random.uniform(0.40, 0.52))
+            str(rng.uniform(0.40, 0.52))
         )
     else:
         measured_value = nominal + specification_width * Decimal(
-            str(random.uniform(-0.25, 0.25))
+            str(rng.uniform(-0.25, 0.25))
         )
 
     measured_value = measured_value.quantize(
@@ -170,14 +171,14 @@ def generate_measured_value(
         inspection_result == "Fail"
         and lower_limit <= measured_value <= upper_limit
     ):
-        measured_value = random.choice(
+        measured_value = rng.choice(
             [lower_limit - Decimal("0.0001"), upper_limit + Decimal("0.0001")]
         )
 
     return measured_value
 
 
-def should_generate_inspection(production_run):
+def should_generate_inspection(production_run, rng=random):
     """Return whether a production run should receive an inspection."""
 
     if production_run["run_status"] == "Running":
@@ -199,11 +200,11 @@ def should_generate_inspection(production_run):
     }
     return (
         production_run["operation_type"] in in_process_operations
-        and random.random() < 0.20
+        and rng.random() < 0.20
     )
 
 
-def generate_quality_inspections(production_runs, inspector_ids):
+def generate_quality_inspections(production_runs, inspector_ids, rng=random):
     """Generate in-process and final quality inspection events."""
 
     if not inspector_ids:
@@ -212,10 +213,10 @@ def generate_quality_inspections(production_runs, inspector_ids):
     inspections = []
 
     for production_run in production_runs:
-        if not should_generate_inspection(production_run):
+        if not should_generate_inspection(production_run, rng):
             continue
 
-        measurement_type = choose_measurement_type(production_run)
+        measurement_type = choose_measurement_type(production_run, rng)
         lower_limit, upper_limit, nominal = get_specification(
             production_run,
             measurement_type,
@@ -230,7 +231,7 @@ def generate_quality_inspections(production_runs, inspector_ids):
                 passed_quantity,
                 failed_quantity,
                 inspection_result,
-            ) = generate_sample_results(production_run)
+            ) = generate_sample_results(production_run, rng)
 
         inspection_timestamp = (
             production_run["end_timestamp"]
@@ -240,7 +241,7 @@ def generate_quality_inspections(production_runs, inspector_ids):
         inspections.append(
             {
                 "production_run_id": production_run["production_run_id"],
-                "inspector_id": random.choice(inspector_ids),
+                "inspector_id": rng.choice(inspector_ids),
                 "inspection_timestamp": inspection_timestamp,
                 "sample_size": sample_size,
                 "passed_quantity": passed_quantity,
@@ -252,6 +253,7 @@ def generate_quality_inspections(production_runs, inspector_ids):
                     upper_limit,
                     nominal,
                     inspection_result,
+                    rng,
                 ),
                 "lower_spec_limit": lower_limit.quantize(Decimal("0.0001")),
                 "upper_spec_limit": upper_limit.quantize(Decimal("0.0001")),
@@ -1,7 +1,7 @@
-import random
 from collections import defaultdict
-from datetime import timedelta
-from decimal import Decimal, ROUND_HALF_UP
+from datetime import timezone
+
+import numpy as np
 
 
 SENSOR_PROFILES = {
@@ -96,33 +96,79 @@ GENERIC_FAILURE_MULTIPLIERS = {
 }
 
 
-def is_operating(timestamp, machine_status):
-    """Return whether a machine is likely operating at a timestamp."""
+SENSOR_COLUMNS = {
+    "temperature": ("temperature_c", 2),
+    "vibration": ("vibration_mm_s", 3),
+    "power": ("power_kw", 2),
+    "pressure": ("pressure_psi", 2),
+    "rpm": ("rpm", 0),
+}
 
-    weekday = timestamp.weekday()
-    hour = timestamp.hour
+SENSOR_READING_COLUMNS = (
+    "machine_id",
+    "reading_timestamp",
+    *(column for column, _ in SENSOR_COLUMNS.values()),
+)
 
-    if 6 <= hour < 22:
-        probability = 0.85 if weekday < 5 else 0.55
-    else:
-        probability = 0.18 if weekday < 5 else 0.08
+BACKGROUND_ANOMALY_PROBABILITY = 0.002
+
+FAILURE_WARNING_WINDOW = np.timedelta64(60, "m")
+
+# Days of one machine's telemetry per streamed chunk.
+SENSOR_CHUNK_DAYS = 31
+
+
+def to_utc_datetime64(timestamps):
+    """Return timezone-aware datetimes as a naive UTC ``datetime64[us]`` array."""
+    return np.array(
+        [
+            timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+            for timestamp in timestamps
+        ],
+        dtype="datetime64[us]",
+    )
+
+
+def build_timestamp_grid(start_timestamp, end_timestamp, interval_minutes):
+    """Return every reading timestamp from start to end inclusive, in UTC."""
+    start, end = to_utc_datetime64([start_timestamp, end_timestamp])
+    interval = np.timedelta64(interval_minutes, "m")
+    return start + np.arange((end - start) // interval + 1) * interval
 
-    if machine_status == "Idle":
-        probability *= 0.35
 
-    return random.random() < probability
+def get_operating_probabilities(timestamps, machine_status):
+    """Return the chance that a machine is operating at each UTC timestamp."""
+    days = timestamps.astype("datetime64[D]")
+    # The epoch fell on a Thursday, so this gives Monday = 0.
+    weekday = (days.astype(np.int64) + 3) % 7
+    hour = (timestamps - days).astype("timedelta64[h]").astype(np.int64)
+
+    probabilities = np.where(
+        (hour >= 6) & (hour < 22),
+        np.where(weekday < 5, 0.85, 0.55),
+        np.where(weekday < 5, 0.18, 0.08),
+    )
+    if machine_status == "Idle":
+        probabilities *= 0.35
+    return probabilities
 
 
-def generate_sensor_value(value_ranges, operating, multiplier=1.0, places=2):
-    """Generate one nonnegative sensor value from operating or idle ranges."""
+def generate_sensor_values(value_ranges, operating, multipliers, places, rng):
+    """Generate nonnegative values from operating or idle ranges.
 
+    Values are rounded half up to ``places`` decimals. A sensor that does not
+    apply to the machine type yields all-NaN values, loaded as NULL.
+    """
     if value_ranges is None:
-        return None
+        return np.full(len(operating), np.nan)
 
-    value_range = value_ranges[0] if operating else value_ranges[1]
-    value = max(0, random.uniform(*value_range) * multiplier)
-    quantum = Decimal("1").scaleb(-places)
-    return Decimal(str(value)).quantize(quantum, rounding=ROUND_HALF_UP)
+    (operating_low, operating_high), (idle_low, idle_high) = value_ranges
+    values = rng.uniform(
+        np.where(operating, operating_low, idle_low),
+        np.where(operating, operating_high, idle_high),
+    )
+    scale = 10.0**places
+    return np.floor(np.maximum(values * multipliers, 0) * scale + 0.5) / scale
 
 
 def get_failure_multipliers(operation_type, failure_component):
@@ -136,24 +182,30 @@ def get_failure_multipliers(operation_type, failure_component):
     return GENERIC_FAILURE_MULTIPLIERS
 
 
-def generate_sensor_readings(
-    machines,
-    downtime_events,
-    start_timestamp,
-    end_timestamp,
-    interval_minutes=5,
-):
-    """Generate five-minute machine telemetry with downtime and anomalies."""
+def merge_intervals(starts, ends):
+    """Return sorted, non-overlapping ``(starts, ends)`` covering the intervals."""
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    running_end = np.maximum.accumulate(ends) if len(ends) else ends
+    # A new interval begins wherever a start falls after every earlier end.
+    is_new = np.ones(len(starts), dtype=bool)
+    is_new[1:] = starts[1:] > running_end[:-1]
+    group_ends = np.append(np.flatnonzero(is_new)[1:], len(starts)) - 1
+    return starts[is_new], running_end[group_ends]
 
-    downtime_by_machine = defaultdict(list)
+
+def index_downtime_events(downtime_events):
+    """Group downtime windows and mechanical failures into per-machine arrays.
+
+    Downtime windows are merged so each timestamp falls in at most one, and
+    failures are sorted by start for ``searchsorted`` lookups.
+    """
+    windows_by_machine = defaultdict(list)
     failures_by_machine = defaultdict(list)
 
     for downtime_event in downtime_events:
-        downtime_by_machine[downtime_event["machine_id"]].append(
-            (
-                downtime_event["downtime_start"],
-                downtime_event["downtime_end"],
-            )
+        windows_by_machine[downtime_event["machine_id"]].append(
+            (downtime_event["downtime_start"], downtime_event["downtime_end"])
         )
 
         if downtime_event["downtime_category"] == "Mechanical Failure":
@@ -164,96 +216,189 @@ def generate_sensor_readings(
                 )
             )
 
-    readings = []
-    interval = timedelta(minutes=interval_minutes)
+    downtime_index = {}
+    for machine_id in windows_by_machine.keys() | failures_by_machine.keys():
+        windows = windows_by_machine[machine_id]
+        downtime_starts, downtime_ends = merge_intervals(
+            to_utc_datetime64(start for start, _ in windows),
+            to_utc_datetime64(end for _, end in windows),
+        )
+        # Stable sorting keeps the first listed failure when starts tie.
+        failures = sorted(failures_by_machine[machine_id], key=lambda row: row[0])
+        downtime_index[machine_id] = {
+            "downtime_starts": downtime_starts,
+            "downtime_ends": downtime_ends,
+            "failure_starts": to_utc_datetime64(start for start, _ in failures),
+            "failure_components": [component for _, component in failures],
+        }
+    return downtime_index
 
-    for machine in machines:
-        machine_id = machine["machine_id"]
-        profile = SENSOR_PROFILES[machine["operation_type"]]
-        reading_timestamp = start_timestamp
-
-        while reading_timestamp <= end_timestamp:
-            in_downtime = any(
-                downtime_start <= reading_timestamp <= downtime_end
-                for downtime_start, downtime_end
-                in downtime_by_machine[machine_id]
-            )
-            upcoming_failure = next(
-                (
-                    (failure_start, failure_component)
-                    for failure_start, failure_component
-                    in failures_by_machine[machine_id]
-                    if failure_start - timedelta(minutes=60)
-                    <= reading_timestamp
-                    < failure_start
-                ),
-                None,
-            )
-            before_failure = upcoming_failure is not None
-            background_anomaly = random.random() < 0.002
-            anomaly = before_failure or background_anomaly
-            operating = (
-                is_operating(reading_timestamp, machine["status"])
-                and not in_downtime
+
+def find_downtime(timestamps, downtime_starts, downtime_ends):
+    """Return whether each timestamp lies in a merged, inclusive downtime window."""
+    if not len(downtime_starts):
+        return np.zeros(len(timestamps), dtype=bool)
+    window = np.searchsorted(downtime_starts, timestamps, side="right") - 1
+    return (window >= 0) & (timestamps <= downtime_ends[np.maximum(window, 0)])
+
+
+def find_upcoming_failures(timestamps, failure_starts):
+    """Return the index of the failure each timestamp precedes, or -1.
+
+    A timestamp precedes the earliest failure starting after it when that
+    failure starts within the warning window.
+    """
+    failure = np.searchsorted(failure_starts, timestamps, side="right")
+    has_failure = failure < len(failure_starts)
+    failure_start = failure_starts[np.minimum(failure, len(failure_starts) - 1)]
+    return np.where(
+        has_failure & (failure_start - FAILURE_WARNING_WINDOW <= timestamps),
+        failure,
+        -1,
+    )
+
+
+def generate_machine_sensor_readings(machine, machine_downtime, timestamps, rng):
+    """Generate one machine's telemetry as columnar arrays.
+
+    All random draws for the machine are taken in bulk from ``rng``. Failure
+    signatures apply only while the machine is operating.
+    """
+    operation_type = machine["operation_type"]
+    profile = SENSOR_PROFILES[operation_type]
+    reading_count = len(timestamps)
+
+    operating = rng.random(reading_count) < get_operating_probabilities(
+        timestamps, machine["status"]
+    )
+    background_anomaly = rng.random(reading_count) < BACKGROUND_ANOMALY_PROBABILITY
+    upcoming_failure = np.full(reading_count, -1)
+    failure_signatures = []
+
+    if machine_downtime is not None:
+        operating &= ~find_downtime(
+            timestamps,
+            machine_downtime["downtime_starts"],
+            machine_downtime["downtime_ends"],
+        )
+        if machine_downtime["failure_components"]:
+            upcoming_failure = find_upcoming_failures(
+                timestamps, machine_downtime["failure_starts"]
             )
+            failure_signatures = [
+                get_failure_multipliers(operation_type, component)
+                for component in machine_downtime["failure_components"]
+            ]
 
-            if before_failure:
-                failure_multipliers = get_failure_multipliers(
-                    machine["operation_type"],
-                    upcoming_failure[1],
-                )
-            elif background_anomaly:
-                failure_multipliers = GENERIC_FAILURE_MULTIPLIERS
-            else:
-                failure_multipliers = {
-                    sensor_name: 1.0
-                    for sensor_name in GENERIC_FAILURE_MULTIPLIERS
-                }
-
-            if not anomaly or not operating:
-                failure_multipliers = {
-                    sensor_name: 1.0
-                    for sensor_name in GENERIC_FAILURE_MULTIPLIERS
-                }
-
-            rpm_value = generate_sensor_value(
-                profile["rpm"],
-                operating,
-                multiplier=failure_multipliers["rpm"],
-                places=0,
+    before_failure = operating & (upcoming_failure >= 0)
+    generic_anomaly = operating & ~before_failure & background_anomaly
+
+    readings = {
+        "machine_id": np.full(reading_count, machine["machine_id"], dtype=np.int64),
+        "reading_timestamp": timestamps,
+    }
+    for sensor_name, (column, places) in SENSOR_COLUMNS.items():
+        multipliers = np.where(
+            generic_anomaly, GENERIC_FAILURE_MULTIPLIERS[sensor_name], 1.0
+        )
+        if failure_signatures:
+            signature = np.array(
+                [signature[sensor_name] for signature in failure_signatures]
             )
+            multipliers[before_failure] = signature[upcoming_failure[before_failure]]
+        readings[column] = generate_sensor_values(
+            profile[sensor_name], operating, multipliers, places, rng
+        )
+    return readings
+
+
+def iter_sensor_reading_chunks(
+    machines,
+    downtime_events,
+    start_timestamp,
+    end_timestamp,
+    interval_minutes=5,
+    rng=None,
+    chunk_days=SENSOR_CHUNK_DAYS,
+):
+    """Yield telemetry one machine and ``chunk_days`` window at a time.
+
+    Each chunk holds ``SENSOR_READING_COLUMNS`` as NumPy arrays: UTC
+    ``datetime64`` timestamps and float sensor values, with NaN for
+    non-applicable sensors. Memory stays bounded by one chunk however large
+    the fleet or history. ``rng`` is a ``numpy.random.Generator``; a fresh
+    unseeded one is used when omitted.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    timestamps = build_timestamp_grid(start_timestamp, end_timestamp, interval_minutes)
+    downtime_index = index_downtime_events(downtime_events)
+    readings_per_chunk = chunk_days * 24 * 60 // interval_minutes
 
-            readings.append(
-                {
-                    "machine_id": machine_id,
-                    "reading_timestamp": reading_timestamp,
-                    "temperature_c": generate_sensor_value(
-                        profile["temperature"],
-                        operating,
-                        multiplier=failure_multipliers["temperature"],
-                        places=2,
-                    ),
-                    "vibration_mm_s": generate_sensor_value(
-                        profile["vibration"],
-                        operating,
-                        multiplier=failure_multipliers["vibration"],
-                        places=3,
-                    ),
-                    "power_kw": generate_sensor_value(
-                        profile["power"],
-                        operating,
-                        multiplier=failure_multipliers["power"],
-                        places=2,
-                    ),
-                    "pressure_psi": generate_sensor_value(
-                        profile["pressure"],
-                        operating,
-                        multiplier=failure_multipliers["pressure"],
-                        places=2,
-                    ),
-                    "rpm": int(rpm_value) if rpm_value is not None else None,
-                }
+    for machine in machines:
+        for offset in range(0, len(timestamps), readings_per_chunk):
+            yield generate_machine_sensor_readings(
+                machine,
+                downtime_index.get(machine["machine_id"]),
+                timestamps[offset : offset + readings_per_chunk],
+                rng,
             )
-            reading_timestamp += interval
 
-    return readings
+
+def generate_machine_sensor_chunks(
+    machine,
+    downtime_events,
+    start_timestamp,
+    end_timestamp,
+    seed,
+    interval_minutes=5,
+    chunk_days=SENSOR_CHUNK_DAYS,
+):
+    """Return one machine's telemetry chunks from a generator seeded for it.
+
+    A machine's readings depend only on ``seed``, not on which worker
+    process generates them or which other machines are generated alongside.
+    """
+    return list(
+        iter_sensor_reading_chunks(
+            [machine],
+            downtime_events,
+            start_timestamp,
+            end_timestamp,
+            interval_minutes,
+            np.random.default_rng(seed),
+            chunk_days,
+        )
+    )
+
+
+def generate_sensor_readings(
+    machines,
+    downtime_events,
+    start_timestamp,
+    end_timestamp,
+    interval_minutes=5,
+    rng=None,
+    chunk_days=SENSOR_CHUNK_DAYS,
+):
+    """Generate interval machine telemetry with downtime and anomalies.
+
+    Returns the chunks of ``iter_sensor_reading_chunks`` concatenated into
+    one set of columnar arrays, identical to streaming with the same ``rng``.
+    """
+    chunks = list(
+        iter_sensor_reading_chunks(
+            machines,
+            downtime_events,
+            start_timestamp,
+            end_timestamp,
+            interval_minutes,
+            rng,
+            chunk_days,
+        )
+    )
+    if not chunks:
+        return {column: np.array([]) for column in SENSOR_READING_COLUMNS}
+    return {
+        column: np.concatenate([chunk[column] for chunk in chunks])
+        for column in SENSOR_READING_COLUMNS
+    }
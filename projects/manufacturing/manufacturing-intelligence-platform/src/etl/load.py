@@ -1,8 +1,20 @@
+import numpy as np
+import pandas as pd
 from sqlalchemy import text
 
+from .bulk_load import (
+    copy_chunks,
+    copy_rows,
+    describe_load,
+    format_copy_frame,
+)
+from .generate_sensor_readings import SENSOR_READING_COLUMNS
+from .sensor_partitions import create_sensor_reading_partitions
+from .sensor_rollups import describe_rollup_refresh, refresh_sensor_rollups
+
 
 def load_customer_orders(engine, customer_orders):
-    """Insert generated customer orders into PostgreSQL."""
+    """Bulk-load generated customer orders into PostgreSQL."""
 
     count_query = text(
         """
@@ -11,27 +23,14 @@ def load_customer_orders(engine, customer_orders):
         """
     )
 
-    insert_query = text(
-        """
-        INSERT INTO customer_orders (
-            customer_order_number,
-            customer_id,
-            order_date,
-            requested_delivery_date,
-            priority,
-            order_status,
-            notes
-        )
-        VALUES (
-            :customer_order_number,
-            :customer_id,
-            :order_date,
-            :requested_delivery_date,
-            :priority,
-            :order_status,
-            :notes
-        )
-        """
+    columns = (
+        "customer_order_number",
+        "customer_id",
+        "order_date",
+        "requested_delivery_date",
+        "priority",
+        "order_status",
+        "notes",
     )
 
     with engine.begin() as connection:
@@ -43,13 +42,18 @@ def load_customer_orders(engine, customer_orders):
                 "The load was stopped to prevent duplicate order numbers."
             )
 
-        connection.execute(insert_query, customer_orders)
+        load_stats = copy_rows(
+            connection,
+            "customer_orders",
+            columns,
+            customer_orders,
+        )
 
-    print(f"Loaded {len(customer_orders)} customer orders into PostgreSQL.")
+    print(describe_load(load_stats))
 
 
 def load_customer_order_items(engine, customer_order_items):
-    """Insert generated customer order items into PostgreSQL."""
+    """Bulk-load generated customer order items into PostgreSQL."""
 
     count_query = text(
         """
@@ -58,25 +62,13 @@ def load_customer_order_items(engine, customer_order_items):
         """
     )
 
-    insert_query = text(
-        """
-        INSERT INTO customer_order_items (
-            customer_order_id,
-            line_number,
-            product_id,
-            ordered_quantity,
-            unit_price,
-            line_status
-        )
-        VALUES (
-            :customer_order_id,
-            :line_number,
-            :product_id,
-            :ordered_quantity,
-            :unit_price,
-            :line_status
-        )
-        """
+    columns = (
+        "customer_order_id",
+        "line_number",
+        "product_id",
+        "ordered_quantity",
+        "unit_price",
+        "line_status",
     )
 
     with engine.begin() as connection:
@@ -88,16 +80,18 @@ def load_customer_order_items(engine, customer_order_items):
                 "The load was stopped to prevent duplicate order lines."
             )
 
-        connection.execute(insert_query, customer_order_items)
+        load_stats = copy_rows(
+            connection,
+            "customer_order_items",
+            columns,
+            customer_order_items,
+        )
 
-    print(
-        f"Loaded {len(customer_order_items)} customer order items "
-        "into PostgreSQL."
-    )
+    print(describe_load(load_stats))
 
 
 def load_production_orders(engine, production_orders):
-    """Insert generated production orders into PostgreSQL."""
+    """Bulk-load generated production orders into PostgreSQL."""
 
     count_query = text(
         """
@@ -106,35 +100,18 @@ def load_production_orders(engine, production_orders):
         """
     )
 
-    insert_query = text(
-        """
-        INSERT INTO production_orders (
-            production_order_number,
-            customer_order_item_id,
-            machine_id,
-            scheduled_start_date,
-            scheduled_end_date,
-            actual_start_timestamp,
-            actual_end_timestamp,
-            planned_quantity,
-            completed_quantity,
-            scrapped_quantity,
-            production_status
-        )
-        VALUES (
-            :production_order_number,
-            :customer_order_item_id,
-            :machine_id,
-            :scheduled_start_date,
-            :scheduled_end_date,
-            :actual_start_timestamp,
-            :actual_end_timestamp,
-            :planned_quantity,
-            :completed_quantity,
-            :scrapped_quantity,
-            :production_status
-        )
-        """
+    columns = (
+        "production_order_number",
+        "customer_order_item_id",
+        "machine_id",
+        "scheduled_start_date",
+        "scheduled_end_date",
+        "actual_start_timestamp",
+        "actual_end_timestamp",
+        "planned_quantity",
+        "completed_quantity",
+        "scrapped_quantity",
+        "production_status",
     )
 
     with engine.begin() as connection:
@@ -146,13 +123,18 @@ def load_production_orders(engine, production_orders):
                 "The load was stopped to prevent duplicate work orders."
             )
 
-        connection.execute(insert_query, production_orders)
+        load_stats = copy_rows(
+            connection,
+            "production_orders",
+            columns,
+            production_orders,
+        )
 
-    print(f"Loaded {len(production_orders)} production orders into PostgreSQL.")
+    print(describe_load(load_stats))
 
 
 def load_material_lots(engine, material_lots):
-    """Insert generated material lots into PostgreSQL."""
+    """Bulk-load generated material lots into PostgreSQL."""
 
     count_query = text(
         """
@@ -161,27 +143,14 @@ def load_material_lots(engine, material_lots):
         """
     )
 
-    insert_query = text(
-        """
-        INSERT INTO material_lots (
-            material_id,
-            supplier_id,
-            supplier_lot_number,
-            received_date,
-            quantity_received,
-            quantity_available,
-            lot_status
-        )
-        VALUES (
-            :material_id,
-            :supplier_id,
-            :supplier_lot_number,
-            :received_date,
-            :quantity_received,
-            :quantity_available,
-            :lot_status
-        )
-        """
+    columns = (
+        "material_id",
+        "supplier_id",
+        "supplier_lot_number",
+        "received_date",
+        "quantity_received",
+        "quantity_available",
+        "lot_status",
     )
 
     with engine.begin() as connection:
@@ -193,9 +162,14 @@ def load_material_lots(engine, material_lots):
                 "The load was stopped to prevent duplicate supplier lots."
             )
 
-        connection.execute(insert_query, material_lots)
+        load_stats = copy_rows(
+            connection,
+            "material_lots",
+            columns,
+            material_lots,
+        )
 
-    print(f"Loaded {len(material_lots)} material lots into PostgreSQL.")
+    print(describe_load(load_stats))
 
 
 def load_production_order_materials(
@@ -203,7 +177,7 @@ def load_production_order_materials(
     production_order_materials,
     updated_material_lots,
 ):
-    """Insert material allocations and update remaining lot quantities."""
+    """Bulk-load material allocations and update remaining lot quantities."""
 
     count_query = text(
         """
@@ -212,19 +186,10 @@ def load_production_order_materials(
         """
     )
 
-    insert_query = text(
-        """
-        INSERT INTO production_order_materials (
-            production_order_id,
-            material_lot_id,
-            allocated_quantity
-        )
-        VALUES (
-            :production_order_id,
-            :material_lot_id,
-            :allocated_quantity
-        )
-        """
+    columns = (
+        "production_order_id",
+        "material_lot_id",
+        "allocated_quantity",
     )
 
     update_lot_query = text(
@@ -246,17 +211,19 @@ def load_production_order_materials(
                 "The load was stopped to prevent duplicate allocations."
             )
 
-        connection.execute(insert_query, production_order_materials)
+        load_stats = copy_rows(
+            connection,
+            "production_order_materials",
+            columns,
+            production_order_materials,
+        )
         connection.execute(update_lot_query, updated_material_lots)
 
-    print(
-        f"Loaded {len(production_order_materials)} material allocations "
-        "into PostgreSQL."
-    )
+    print(describe_load(load_stats))
 
 
 def load_production_runs(engine, production_runs):
-    """Insert generated manufacturing operation runs into PostgreSQL."""
+    """Bulk-load generated manufacturing operation runs into PostgreSQL."""
 
     count_query = text(
         """
@@ -265,41 +232,21 @@ def load_production_runs(engine, production_runs):
         """
     )
 
-    insert_query = text(
-        """
-        INSERT INTO production_runs (
-            production_order_id,
-            machine_id,
-            operator_id,
-            operation_sequence,
-            operation_type,
-            start_timestamp,
-            end_timestamp,
-            planned_cycle_time_seconds,
-            actual_cycle_time_seconds,
-            input_quantity,
-            good_quantity,
-            scrap_quantity,
-            rework_quantity,
-            run_status
-        )
-        VALUES (
-            :production_order_id,
-            :machine_id,
-            :operator_id,
-            :operation_sequence,
-            :operation_type,
-            :start_timestamp,
-            :end_timestamp,
-            :planned_cycle_time_seconds,
-            :actual_cycle_time_seconds,
-            :input_quantity,
-            :good_quantity,
-            :scrap_quantity,
-            :rework_quantity,
-            :run_status
-        )
-        """
+    columns = (
+        "production_order_id",
+        "machine_id",
+        "operator_id",
+        "operation_sequence",
+        "operation_type",
+        "start_timestamp",
+        "end_timestamp",
+        "planned_cycle_time_seconds",
+        "actual_cycle_time_seconds",
+        "input_quantity",
+        "good_quantity",
+        "scrap_quantity",
+        "rework_quantity",
+        "run_status",
     )
 
     with engine.begin() as connection:
@@ -311,13 +258,18 @@ def load_production_runs(engine, production_runs):
                 "The load was stopped to prevent duplicate operation runs."
             )
 
-        connection.execute(insert_query, production_runs)
+        load_stats = copy_rows(
+            connection,
+            "production_runs",
+            columns,
+            production_runs,
+        )
 
-    print(f"Loaded {len(production_runs)} production runs into PostgreSQL.")
+    print(describe_load(load_stats))
 
 
 def load_quality_inspections(engine, quality_inspections):
-    """Insert generated quality inspection events into PostgreSQL."""
+    """Bulk-load generated quality inspection events into PostgreSQL."""
 
     count_query = text(
         """
@@ -326,35 +278,18 @@ def load_quality_inspections(engine, quality_inspections):
         """
     )
 
-    insert_query = text(
-        """
-        INSERT INTO quality_inspections (
-            production_run_id,
-            inspector_id,
-            inspection_timestamp,
-            sample_size,
-            passed_quantity,
-            failed_quantity,
-            inspection_result,
-            measurement_type,
-            measured_value,
-            lower_spec_limit,
-            upper_spec_limit
-        )
-        VALUES (
-            :production_run_id,
-            :inspector_id,
-            :inspection_timestamp,
-            :sample_size,
-            :passed_quantity,
-            :failed_quantity,
-            :inspection_result,
-            :measurement_type,
-            :measured_value,
-            :lower_spec_limit,
-            :upper_spec_limit
-        )
-        """
+    columns = (
+        "production_run_id",
+        "inspector_id",
+        "inspection_timestamp",
+        "sample_size",
+        "passed_quantity",
+        "failed_quantity",
+        "inspection_result",
+        "measurement_type",
+        "measured_value",
+        "lower_spec_limit",
+        "upper_spec_limit",
     )
 
     with engine.begin() as connection:
@@ -366,16 +301,18 @@ def load_quality_inspections(engine, quality_inspections):
                 "The load was stopped to prevent duplicate inspections."
             )
 
-        connection.execute(insert_query, quality_inspections)
+        load_stats = copy_rows(
+            connection,
+            "quality_inspections",
+            columns,
+            quality_inspections,
+        )
 
-    print(
-        f"Loaded {len(quality_inspections)} quality inspections "
-        "into PostgreSQL."
-    )
+    print(describe_load(load_stats))
 
 
 def load_quality_defects(engine, quality_defects):
-    """Insert generated quality defect records into PostgreSQL."""
+    """Bulk-load generated quality defect records into PostgreSQL."""
 
     count_query = text(
         """
@@ -384,25 +321,13 @@ def load_quality_defects(engine, quality_defects):
         """
     )
 
-    insert_query = text(
-        """
-        INSERT INTO quality_defects (
-            inspection_id,
-            defect_type_id,
-            defect_quantity,
-            disposition,
-            root_cause_category,
-            corrective_action
-        )
-        VALUES (
-            :inspection_id,
-            :defect_type_id,
-            :defect_quantity,
-            :disposition,
-            :root_cause_category,
-            :corrective_action
-        )
-        """
+    columns = (
+        "inspection_id",
+        "defect_type_id",
+        "defect_quantity",
+        "disposition",
+        "root_cause_category",
+        "corrective_action",
     )
 
     with engine.begin() as connection:
@@ -414,13 +339,18 @@ def load_quality_defects(engine, quality_defects):
                 "The load was stopped to prevent duplicate defects."
             )
 
-        connection.execute(insert_query, quality_defects)
+        load_stats = copy_rows(
+            connection,
+            "quality_defects",
+            columns,
+            quality_defects,
+        )
 
-    print(f"Loaded {len(quality_defects)} quality defects into PostgreSQL.")
+    print(describe_load(load_stats))
 
 
 def load_downtime_events(engine, downtime_events):
-    """Insert generated machine downtime events into PostgreSQL."""
+    """Bulk-load generated machine downtime events into PostgreSQL."""
 
     count_query = text(
         """
@@ -429,29 +359,15 @@ def load_downtime_events(engine, downtime_events):
         """
     )
 
-    insert_query = text(
-        """
-        INSERT INTO downtime_events (
-            machine_id,
-            production_run_id,
-            downtime_start,
-            downtime_end,
-            downtime_minutes,
-            downtime_category,
-            downtime_reason,
-            planned_flag
-        )
-        VALUES (
-            :machine_id,
-            :production_run_id,
-            :downtime_start,
-            :downtime_end,
-            :downtime_minutes,
-            :downtime_category,
-            :downtime_reason,
-            :planned_flag
-        )
-        """
+    columns = (
+        "machine_id",
+        "production_run_id",
+        "downtime_start",
+        "downtime_end",
+        "downtime_minutes",
+        "downtime_category",
+        "downtime_reason",
+        "planned_flag",
     )
 
     with engine.begin() as connection:
@@ -463,13 +379,18 @@ def load_downtime_events(engine, downtime_events):
                 "The load was stopped to prevent duplicate downtime events."
             )
 
-        connection.execute(insert_query, downtime_events)
+        load_stats = copy_rows(
+            connection,
+            "downtime_events",
+            columns,
+            downtime_events,
+        )
 
-    print(f"Loaded {len(downtime_events)} downtime events into PostgreSQL.")
+    print(describe_load(load_stats))
 
 
 def load_maintenance_events(engine, maintenance_events):
-    """Insert generated equipment maintenance events into PostgreSQL."""
+    """Bulk-load generated equipment maintenance events into PostgreSQL."""
 
     count_query = text(
         """
@@ -478,33 +399,17 @@ def load_maintenance_events(engine, maintenance_events):
         """
     )
 
-    insert_query = text(
-        """
-        INSERT INTO maintenance_events (
-            machine_id,
-            maintenance_type,
-            reported_timestamp,
-            maintenance_start,
-            maintenance_end,
-            technician,
-            failure_component,
-            maintenance_action,
-            maintenance_cost,
-            machine_hours_at_service
-        )
-        VALUES (
-            :machine_id,
-            :maintenance_type,
-            :reported_timestamp,
-            :maintenance_start,
-            :maintenance_end,
-            :technician,
-            :failure_component,
-            :maintenance_action,
-            :maintenance_cost,
-            :machine_hours_at_service
-        )
-        """
+    columns = (
+        "machine_id",
+        "maintenance_type",
+        "reported_timestamp",
+        "maintenance_start",
+        "maintenance_end",
+        "technician",
+        "failure_component",
+        "maintenance_action",
+        "maintenance_cost",
+        "machine_hours_at_service",
     )
 
     with engine.begin() as connection:
@@ -516,16 +421,52 @@ def load_maintenance_events(engine, maintenance_events):
                 "The load was stopped to prevent duplicate maintenance."
             )
 
-        connection.execute(insert_query, maintenance_events)
+        load_stats = copy_rows(
+            connection,
+            "maintenance_events",
+            columns,
+            maintenance_events,
+        )
+
+    print(describe_load(load_stats))
+
+
+def build_sensor_reading_frame(sensor_readings):
+    """Return columnar telemetry as a DataFrame ready for COPY.
 
-    print(
-        f"Loaded {len(maintenance_events)} maintenance events "
-        "into PostgreSQL."
+    Timestamps are written as ISO strings with a UTC ``Z`` suffix, which is
+    far faster than timezone-aware pandas formatting. RPM uses a nullable
+    integer type, so COPY receives whole numbers and NULL for missing sensors.
+    """
+    frame = pd.DataFrame(
+        {column: sensor_readings[column] for column in SENSOR_READING_COLUMNS}
     )
+    frame["reading_timestamp"] = np.datetime_as_string(
+        sensor_readings["reading_timestamp"], unit="s", timezone="UTC"
+    )
+    frame["rpm"] = frame["rpm"].astype("Int64")
+    return frame
+
+
+def format_sensor_reading_chunk(sensor_readings):
+    """Return one columnar telemetry chunk in COPY text format."""
+    return format_copy_frame(build_sensor_reading_frame(sensor_readings))
 
 
-def load_sensor_readings(engine, sensor_readings, batch_size=5000):
-    """Insert machine telemetry into PostgreSQL in manageable batches."""
+def load_sensor_readings(
+    engine,
+    sensor_reading_chunks,
+    start_timestamp,
+    end_timestamp,
+):
+    """Stream columnar machine telemetry chunks into PostgreSQL with one COPY.
+
+    Monthly partitions covering ``start_timestamp`` through ``end_timestamp``
+    are created in the same transaction before the COPY, and the hourly and
+    daily rollups for the window are rebuilt after it. Chunks are generated
+    and formatted on a producer thread while earlier chunks are copied, so
+    only a few chunks are held in memory at once.
+    """
 
     count_query = text(
         """
@@ -534,29 +475,6 @@ def load_sensor_readings(engine, sensor_readings, batch_size=5000):
         """
     )
 
-    insert_query = text(
-        """
-        INSERT INTO sensor_readings (
-            machine_id,
-            reading_timestamp,
-            temperature_c,
-            vibration_mm_s,
-            power_kw,
-            pressure_psi,
-            rpm
-        )
-        VALUES (
-            :machine_id,
-            :reading_timestamp,
-            :temperature_c,
-            :vibration_mm_s,
-            :power_kw,
-            :pressure_psi,
-            :rpm
-        )
-        """
-    )
-
     with engine.begin() as connection:
         existing_count = connection.execute(count_query).scalar_one()
 
@@ -566,8 +484,23 @@ def load_sensor_readings(engine, sensor_readings, batch_size=5000):
                 "The load was stopped to prevent duplicate telemetry."
             )
 
-        for batch_start in range(0, len(sensor_readings), batch_size):
-            batch = sensor_readings[batch_start:batch_start + batch_size]
-            connection.execute(insert_query, batch)
+        create_sensor_reading_partitions(
+            connection,
+            start_timestamp,
+            end_timestamp,
+        )
+        load_stats = copy_chunks(
+            connection,
+            "sensor_readings",
+            SENSOR_READING_COLUMNS,
+            sensor_reading_chunks,
+            format_sensor_reading_chunk,
+        )
+        refresh_stats = refresh_sensor_rollups(
+            connection,
+            start_timestamp,
+            end_timestamp,
+        )
 
-    print(f"Loaded {len(sensor_readings)} sensor readings into PostgreSQL.")
+    print(describe_load(load_stats))
+    print(describe_rollup_refresh(refresh_stats))
@@ -0,0 +1,91 @@
+"""Run generation stages as a dependency graph across worker processes.
+
+Each stage names the stages whose tables it reads. A stage starts once all of
+them have finished, so independent branches such as quality inspections and
+downtime run at the same time. Every stage and partition draws from its own
+generator seeded from the run seed, which keeps the output identical for a
+given seed however the work is scheduled.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from graphlib import TopologicalSorter
+import hashlib
+
+
+def derive_seed(seed, *keys):
+    """Return a 64-bit seed for ``keys`` derived from a base seed.
+
+    The seed is a hash of the values' text, so it is the same in every
+    process and Python run, unlike ``hash()`` of a string.
+    """
+    material = ":".join(str(part) for part in (seed, *keys))
+    return int.from_bytes(hashlib.sha256(material.encode()).digest()[:8], "big")
+
+
+def validate_stage_graph(stage_dependencies):
+    """Return a prepared sorter after checking the graph is a valid DAG."""
+    for stage_name, dependencies in stage_dependencies.items():
+        unknown_stages = set(dependencies) - set(stage_dependencies)
+        if unknown_stages:
+            raise ValueError(
+                f"Stage {stage_name} depends on unknown stages: "
+                f"{', '.join(sorted(unknown_stages))}"
+            )
+
+    sorter = TopologicalSorter(stage_dependencies)
+    sorter.prepare()
+    return sorter
+
+
+def run_stage_graph(stage_dependencies, run_stage, max_workers):
+    """Run every stage after its dependencies, independent stages concurrently.
+
+    ``stage_dependencies`` maps each stage name to the names it depends on,
+    and ``run_stage`` is called in a worker process with one stage name. A
+    failed stage stops new stages from starting and is re-raised once the
+    running stages finish. Returns the stage names in completion order.
+    """
+    if max_workers < 1:
+        raise ValueError("Stage execution needs at least one worker.")
+
+    sorter = validate_stage_graph(stage_dependencies)
+    completed_stages = []
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        running_stages = {}
+        while sorter.is_active():
+            for stage_name in sorter.get_ready():
+                future = executor.submit(run_stage, stage_name)
+                running_stages[future] = stage_name
+
+            finished, _ = wait(running_stages, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage_name = running_stages.pop(future)
+                future.result()
+                sorter.done(stage_name)
+                completed_stages.append(stage_name)
+
+    return completed_stages
+
+
+def map_partitions(function, partitions, max_workers):
+    """Yield ``function(*partition)`` for each partition, in partition order.
+
+    Partitions run in worker processes with at most two per worker pending,
+    so results are consumed as a stream rather than held all at once. One
+    worker runs every partition in the calling process.
+    """
+    if max_workers <= 1:
+        for partition in partitions:
+            yield function(*partition)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for partition in partitions:
+            pending.append(executor.submit(function, *partition))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,153 @@
+"""Create and retire monthly ``sensor_readings`` partitions.
+
+Telemetry is range-partitioned by the UTC calendar month of
+``reading_timestamp``. The loader creates every partition a load window needs
+before its COPY, and retention drops whole partitions, which is a catalog
+change instead of a DELETE of millions of rows followed by VACUUM. The hourly
+and daily rollups of a dropped month are deleted in the same transaction, so
+every resolution reports the same retained history.
+"""
+
+from datetime import date, datetime, time, timezone
+import re
+
+from sqlalchemy import create_engine, text
+
+from src.config import DATABASE_URL, SENSOR_RETENTION_MONTHS
+
+from .sensor_rollups import delete_sensor_rollups
+
+
+PARTITION_NAME_PATTERN = re.compile(r"sensor_readings_(\d{4})_(\d{2})")
+
+PARTITION_QUERY = text(
+    """
+    SELECT child.relname AS partition_name
+    FROM pg_inherits AS inheritance
+    JOIN pg_class AS parent
+        ON parent.oid = inheritance.inhparent
+    JOIN pg_class AS child
+        ON child.oid = inheritance.inhrelid
+    WHERE parent.relname = 'sensor_readings'
+    ORDER BY child.relname
+    """
+)
+
+
+def add_months(month, months):
+    """Return the first day of the month ``months`` after ``month``."""
+    year, month_index = divmod(month.year * 12 + month.month - 1 + months, 12)
+    return date(year, month_index + 1, 1)
+
+
+def get_partition_months(start_timestamp, end_timestamp):
+    """Return the first day of every UTC month from start to end inclusive."""
+    start_month = start_timestamp.astimezone(timezone.utc).date().replace(day=1)
+    end_month = end_timestamp.astimezone(timezone.utc).date().replace(day=1)
+    months = []
+    month = start_month
+    while month <= end_month:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def get_partition_name(month):
+    """Return the partition table name for a month."""
+    return f"sensor_readings_{month:%Y_%m}"
+
+
+def get_partition_month(partition_name):
+    """Return a monthly partition's first day, or None for other tables."""
+    match = PARTITION_NAME_PATTERN.fullmatch(partition_name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def create_sensor_reading_partitions(connection, start_timestamp, end_timestamp):
+    """Create any missing monthly partitions covering the window.
+
+    Runs inside the caller's transaction so partitions and the rows loaded
+    into them commit together. Returns the partition names covering the
+    window.
+    """
+    partition_names = []
+    for month in get_partition_months(start_timestamp, end_timestamp):
+        partition_name = get_partition_name(month)
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {partition_name}
+                PARTITION OF sensor_readings
+                FOR VALUES FROM ('{month.isoformat()} 00:00:00+00')
+                TO ('{add_months(month, 1).isoformat()} 00:00:00+00')
+                """
+            )
+        )
+        partition_names.append(partition_name)
+    return partition_names
+
+
+def get_expired_partitions(partition_names, retention_months, as_of_timestamp):
+    """Return partitions that end before the retention window starts.
+
+    The window keeps the current UTC month and the ``retention_months``
+    months before it. Tables not named like monthly partitions are ignored.
+    """
+    if retention_months < 1:
+        raise ValueError("Sensor retention must keep at least one month.")
+
+    current_month = as_of_timestamp.astimezone(timezone.utc).date().replace(day=1)
+    retention_start = add_months(current_month, -retention_months)
+    expired_partitions = []
+    for partition_name in partition_names:
+        month = get_partition_month(partition_name)
+        if month is not None and month < retention_start:
+            expired_partitions.append(partition_name)
+    return expired_partitions
+
+
+def drop_expired_sensor_partitions(
+    engine,
+    retention_months=SENSOR_RETENTION_MONTHS,
+    as_of_timestamp=None,
+):
+    """Drop monthly partitions older than the retention window.
+
+    The rollups of each dropped month are deleted in the same transaction.
+    Returns the names of the dropped partitions.
+    """
+    as_of_timestamp = as_of_timestamp or datetime.now(timezone.utc)
+
+    with engine.begin() as connection:
+        partition_names = [
+            row.partition_name for row in connection.execute(PARTITION_QUERY)
+        ]
+        expired_partitions = get_expired_partitions(
+            partition_names,
+            retention_months,
+            as_of_timestamp,
+        )
+        for partition_name in expired_partitions:
+            month = get_partition_month(partition_name)
+            connection.execute(text(f"DROP TABLE {partition_name}"))
+            delete_sensor_rollups(
+                connection,
+                datetime.combine(month, time(), tzinfo=timezone.utc),
+                datetime.combine(add_months(month, 1), time(), tzinfo=timezone.utc),
+            )
+
+    return expired_partitions
+
+
+def main():
+    """Drop sensor-reading partitions outside the retention window."""
+    expired_partitions = drop_expired_sensor_partitions(create_engine(DATABASE_URL))
+    print(f"Dropped {len(expired_partitions)} expired sensor-reading partitions.")
+    for partition_name in expired_partitions:
+        print(f"- {partition_name}")
+
+
+if __name__ == "__main__":
+    main()
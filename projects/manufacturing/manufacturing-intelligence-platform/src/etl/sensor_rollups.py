@@ -0,0 +1,181 @@
+"""Maintain hourly and daily telemetry rollups from raw sensor readings.
+
+Each rollup row holds the count, sum, sum of squares, minimum, and maximum of
+one sensor on one machine over a UTC hour or day. Loads rebuild only the days
+their window touches: hourly buckets from raw readings, then daily buckets
+from those hourly buckets. Rebuilding whole buckets keeps repeated or
+overlapping loads exact without per-row bookkeeping.
+"""
+
+from datetime import datetime, time, timedelta, timezone
+
+from sqlalchemy import create_engine, text
+
+from src.config import DATABASE_URL
+
+from .generate_sensor_readings import SENSOR_READING_COLUMNS
+
+
+ROLLUP_SENSOR_NAMES = SENSOR_READING_COLUMNS[2:]
+
+SENSOR_VALUES = ",\n            ".join(
+    f"('{sensor_name}', s.{sensor_name}::NUMERIC)"
+    for sensor_name in ROLLUP_SENSOR_NAMES
+)
+
+DELETE_HOURLY_ROLLUP = text(
+    """
+    DELETE FROM sensor_reading_hourly
+    WHERE bucket_start >= :start_timestamp
+      AND bucket_start < :end_timestamp
+    """
+)
+
+INSERT_HOURLY_ROLLUP = text(
+    f"""
+    INSERT INTO sensor_reading_hourly (
+        machine_id,
+        sensor_name,
+        bucket_start,
+        reading_count,
+        value_sum,
+        value_sum_squares,
+        min_value,
+        max_value
+    )
+    SELECT
+        s.machine_id,
+        sensor.sensor_name,
+        date_trunc('hour', s.reading_timestamp, 'UTC'),
+        COUNT(*),
+        SUM(sensor.value),
+        SUM(sensor.value * sensor.value),
+        MIN(sensor.value),
+        MAX(sensor.value)
+    FROM sensor_readings s
+    CROSS JOIN LATERAL (
+        VALUES
+            {SENSOR_VALUES}
+    ) AS sensor (sensor_name, value)
+    WHERE s.reading_timestamp >= :start_timestamp
+      AND s.reading_timestamp < :end_timestamp
+      AND sensor.value IS NOT NULL
+    GROUP BY 1, 2, 3
+    """
+)
+
+DELETE_DAILY_ROLLUP = text(
+    """
+    DELETE FROM sensor_reading_daily
+    WHERE bucket_start >= :start_timestamp
+      AND bucket_start < :end_timestamp
+    """
+)
+
+INSERT_DAILY_ROLLUP = text(
+    """
+    INSERT INTO sensor_reading_daily (
+        machine_id,
+        sensor_name,
+        bucket_start,
+        reading_count,
+        value_sum,
+        value_sum_squares,
+        min_value,
+        max_value
+    )
+    SELECT
+        machine_id,
+        sensor_name,
+        date_trunc('day', bucket_start, 'UTC'),
+        SUM(reading_count),
+        SUM(value_sum),
+        SUM(value_sum_squares),
+        MIN(min_value),
+        MAX(max_value)
+    FROM sensor_reading_hourly
+    WHERE bucket_start >= :start_timestamp
+      AND bucket_start < :end_timestamp
+    GROUP BY 1, 2, 3
+    """
+)
+
+RAW_READING_RANGE_QUERY = text(
+    """
+    SELECT MIN(reading_timestamp), MAX(reading_timestamp)
+    FROM sensor_readings
+    """
+)
+
+
+def get_rollup_window(start_timestamp, end_timestamp):
+    """Return the whole UTC days covering a load window, end exclusive."""
+    start_day = start_timestamp.astimezone(timezone.utc).date()
+    end_day = end_timestamp.astimezone(timezone.utc).date() + timedelta(days=1)
+    return (
+        datetime.combine(start_day, time(), tzinfo=timezone.utc),
+        datetime.combine(end_day, time(), tzinfo=timezone.utc),
+    )
+
+
+def refresh_sensor_rollups(connection, start_timestamp, end_timestamp):
+    """Rebuild hourly and daily rollups for the days a window touches.
+
+    Runs inside the caller's transaction, so rollups commit with the readings
+    they summarize. Returns the number of hourly and daily rows written.
+    """
+    start_day, end_day = get_rollup_window(start_timestamp, end_timestamp)
+    window = {"start_timestamp": start_day, "end_timestamp": end_day}
+
+    connection.execute(DELETE_HOURLY_ROLLUP, window)
+    hourly_rows = connection.execute(INSERT_HOURLY_ROLLUP, window).rowcount
+    connection.execute(DELETE_DAILY_ROLLUP, window)
+    daily_rows = connection.execute(INSERT_DAILY_ROLLUP, window).rowcount
+    return {"hourly_rows": hourly_rows, "daily_rows": daily_rows}
+
+
+def delete_sensor_rollups(connection, start_timestamp, end_timestamp):
+    """Delete hourly and daily rollups for buckets inside a window.
+
+    Runs inside the caller's transaction, so rollups for dropped raw
+    readings go with them. Returns the number of hourly and daily rows
+    deleted.
+    """
+    window = {"start_timestamp": start_timestamp, "end_timestamp": end_timestamp}
+    hourly_rows = connection.execute(DELETE_HOURLY_ROLLUP, window).rowcount
+    daily_rows = connection.execute(DELETE_DAILY_ROLLUP, window).rowcount
+    return {"hourly_rows": hourly_rows, "daily_rows": daily_rows}
+
+
+def describe_rollup_refresh(refresh_stats):
+    """Return a one-line summary of a rollup refresh."""
+    return (
+        f"Refreshed {refresh_stats['hourly_rows']:,} hourly and "
+        f"{refresh_stats['daily_rows']:,} daily sensor rollup rows."
+    )
+
+
+def main():
+    """Rebuild telemetry rollups over every stored raw reading."""
+    engine = create_engine(DATABASE_URL)
+
+    with engine.begin() as connection:
+        start_timestamp, end_timestamp = connection.execute(
+            RAW_READING_RANGE_QUERY
+        ).one()
+
+        if start_timestamp is None:
+            print("No sensor readings are stored; rollups were not changed.")
+            return
+
+        refresh_stats = refresh_sensor_rollups(
+            connection,
+            start_timestamp,
+            end_timestamp,
+        )
+
+    print(describe_rollup_refresh(refresh_stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,17 @@
-from datetime import date, datetime, time, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
+from itertools import chain
+import random
+import secrets
 
 from sqlalchemy import create_engine, text
 
-from .config import DATABASE_URL
+from .config import (
+    DATABASE_URL,
+    GENERATION_AS_OF,
+    GENERATION_SEED,
+    GENERATION_WORKERS,
+)
 
 from .etl.generate_customer_order_items import generate_customer_order_items
 from .etl.generate_customer_orders import generate_customer_orders
@@ -16,7 +25,7 @@ from .etl.generate_quality_inspections import generate_quality_inspections
 from .etl.generate_quality_defects import generate_quality_defects
 from .etl.generate_downtime_events import generate_downtime_events
 from .etl.generate_maintenance_events import generate_maintenance_events
-from .etl.generate_sensor_readings import generate_sensor_readings
+from .etl.generate_sensor_readings import generate_machine_sensor_chunks
 from .etl.load import (
     load_customer_order_items,
     load_customer_orders,
@@ -30,6 +39,7 @@ from .etl.load import (
     load_maintenance_events,
     load_sensor_readings,
 )
+from .etl.orchestration import derive_seed, map_partitions, run_stage_graph
 
 
 def get_engine():
@@ -229,7 +239,7 @@ def get_raw_material_suppliers(engine):
         return [dict(row._mapping) for row in connection.execute(query)]
 
 
-def get_material_lot_date_range(engine):
+def get_material_lot_date_range(engine, as_of_date=None):
     """Return the simulated operating period for material receipts."""
 
     query = text(
@@ -248,7 +258,7 @@ def get_material_lot_date_range(engine):
         raise ValueError("Customer orders are required before material lots.")
 
     start_date = row.earliest_order_date - timedelta(days=120)
-    end_date = min(row.latest_delivery_date, date.today())
+    end_date = min(row.latest_delivery_date, as_of_date or date.today())
     return start_date, end_date
 
 
@@ -722,22 +732,17 @@ def get_sensor_reading_count(engine):
         return connection.execute(query).scalar_one()
 
 
-def main():
-    engine = get_engine()
-
-    customer_ids = get_customer_ids(engine)
-    products = get_products(engine)
-
-    print("Database connected successfully.")
-    print(f"Customer rows found: {len(customer_ids)}")
-    print(f"Product rows found: {len(products)}")
+def generate_customer_order_stage(engine, seed, as_of_timestamp):
+    """Generate and load customer orders when the table is empty."""
 
     existing_order_count = get_customer_order_count(engine)
 
     if existing_order_count == 0:
         customer_orders = generate_customer_orders(
-            customer_ids=customer_ids,
+            customer_ids=get_customer_ids(engine),
             num_orders=500,
+            rng=random.Random(seed),
+            as_of_date=as_of_timestamp.date(),
         )
 
         print(f"Generated {len(customer_orders)} customer orders.")
@@ -756,13 +761,17 @@ def main():
 
     print(f"Customer orders stored in PostgreSQL: {stored_count}")
 
+
+def generate_customer_order_item_stage(engine, seed, as_of_timestamp):
+    """Generate and load customer order lines when the table is empty."""
+
     existing_item_count = get_customer_order_item_count(engine)
 
     if existing_item_count == 0:
-        customer_orders = get_customer_orders(engine)
         customer_order_items = generate_customer_order_items(
-            customer_orders=customer_orders,
-            products=products,
+            customer_orders=get_customer_orders(engine),
+            products=get_products(engine),
+            rng=random.Random(seed),
         )
 
         print(f"Generated {len(customer_order_items)} customer order items.")
@@ -780,14 +789,19 @@ def main():
     stored_item_count = get_customer_order_item_count(engine)
     print(f"Customer order items stored in PostgreSQL: {stored_item_count}")
 
+
+def generate_production_order_stage(engine, seed, as_of_timestamp):
+    """Generate and load production orders when the table is empty."""
+
     existing_production_order_count = get_production_order_count(engine)
 
     if existing_production_order_count == 0:
-        customer_order_items = get_customer_order_items_for_production(engine)
-        machines_by_operation = get_machines_by_operation(engine)
         production_orders = generate_production_orders(
-            customer_order_items=customer_order_items,
-            machines_by_operation=machines_by_operation,
+            customer_order_items=get_customer_order_items_for_production(
+                engine
+            ),
+            machines_by_operation=get_machines_by_operation(engine),
+            rng=random.Random(seed),
         )
 
         print(f"Generated {len(production_orders)} production orders.")
@@ -808,21 +822,26 @@ def main():
         f"{stored_production_order_count}"
     )
 
+
+def generate_material_lot_stage(engine, seed, as_of_timestamp):
+    """Generate and load supplier material lots when the table is empty."""
+
     existing_material_lot_count = get_material_lot_count(engine)
 
     if existing_material_lot_count == 0:
-        materials = get_active_materials(engine)
-        suppliers = get_raw_material_suppliers(engine)
-        production_orders = get_production_orders_for_material_allocation(
-            engine
+        start_date, end_date = get_material_lot_date_range(
+            engine,
+            as_of_timestamp.date(),
         )
-        start_date, end_date = get_material_lot_date_range(engine)
         material_lots = generate_material_lots(
-            materials=materials,
-            suppliers=suppliers,
-            production_orders=production_orders,
+            materials=get_active_materials(engine),
+            suppliers=get_raw_material_suppliers(engine),
+            production_orders=get_production_orders_for_material_allocation(
+                engine
+            ),
             start_date=start_date,
             end_date=end_date,
+            rng=random.Random(seed),
         )
 
         print(f"Generated {len(material_lots)} material lots.")
@@ -840,17 +859,20 @@ def main():
     stored_material_lot_count = get_material_lot_count(engine)
     print(f"Material lots stored in PostgreSQL: {stored_material_lot_count}")
 
+
+def generate_material_allocation_stage(engine, seed, as_of_timestamp):
+    """Allocate material lots to production orders when none are stored."""
+
     existing_allocation_count = get_production_order_material_count(engine)
 
     if existing_allocation_count == 0:
-        production_orders = get_production_orders_for_material_allocation(
-            engine
-        )
-        material_lots = get_material_lots_for_allocation(engine)
         production_order_materials, updated_material_lots = (
             generate_production_order_materials(
-                production_orders=production_orders,
-                material_lots=material_lots,
+                production_orders=(
+                    get_production_orders_for_material_allocation(engine)
+                ),
+                material_lots=get_material_lots_for_allocation(engine),
+                rng=random.Random(seed),
             )
         )
 
@@ -876,16 +898,18 @@ def main():
         f"{stored_allocation_count}"
     )
 
+
+def generate_production_run_stage(engine, seed, as_of_timestamp):
+    """Generate and load routed production runs when the table is empty."""
+
     existing_production_run_count = get_production_run_count(engine)
 
     if existing_production_run_count == 0:
-        production_orders = get_production_orders_for_runs(engine)
-        machines_by_operation = get_machines_by_operation(engine)
-        operators_by_role = get_operators_by_role(engine)
         production_runs = generate_production_runs(
-            production_orders=production_orders,
-            machines_by_operation=machines_by_operation,
-            operators_by_role=operators_by_role,
+            production_orders=get_production_orders_for_runs(engine),
+            machines_by_operation=get_machines_by_operation(engine),
+            operators_by_role=get_operators_by_role(engine),
+            rng=random.Random(seed),
         )
 
         print(f"Generated {len(production_runs)} production runs.")
@@ -906,14 +930,17 @@ def main():
         f"{stored_production_run_count}"
     )
 
+
+def generate_quality_inspection_stage(engine, seed, as_of_timestamp):
+    """Generate and load quality inspections when the table is empty."""
+
     existing_inspection_count = get_quality_inspection_count(engine)
 
     if existing_inspection_count == 0:
-        production_runs = get_production_runs_for_inspection(engine)
-        inspector_ids = get_certified_inspector_ids(engine)
         quality_inspections = generate_quality_inspections(
-            production_runs=production_runs,
-            inspector_ids=inspector_ids,
+            production_runs=get_production_runs_for_inspection(engine),
+            inspector_ids=get_certified_inspector_ids(engine),
+            rng=random.Random(seed),
         )
 
         print(f"Generated {len(quality_inspections)} quality inspections.")
@@ -934,14 +961,17 @@ def main():
         f"{stored_inspection_count}"
     )
 
+
+def generate_quality_defect_stage(engine, seed, as_of_timestamp):
+    """Generate and load quality defects when the table is empty."""
+
     existing_defect_count = get_quality_defect_count(engine)
 
     if existing_defect_count == 0:
-        quality_inspections = get_inspections_for_defect_generation(engine)
-        defect_types = get_active_defect_types(engine)
         quality_defects = generate_quality_defects(
-            quality_inspections=quality_inspections,
-            defect_types=defect_types,
+            quality_inspections=get_inspections_for_defect_generation(engine),
+            defect_types=get_active_defect_types(engine),
+            rng=random.Random(seed),
         )
 
         print(f"Generated {len(quality_defects)} quality defects.")
@@ -959,17 +989,20 @@ def main():
     stored_defect_count = get_quality_defect_count(engine)
     print(f"Quality defects stored in PostgreSQL: {stored_defect_count}")
 
+
+def generate_downtime_event_stage(engine, seed, as_of_timestamp):
+    """Generate and load downtime events when the table is empty."""
+
     existing_downtime_count = get_downtime_event_count(engine)
 
     if existing_downtime_count == 0:
-        production_runs = get_production_runs_for_downtime(engine)
-        machines = get_available_machines(engine)
         start_date, end_date = get_downtime_date_range(engine)
         downtime_events = generate_downtime_events(
-            production_runs=production_runs,
-            machines=machines,
+            production_runs=get_production_runs_for_downtime(engine),
+            machines=get_available_machines(engine),
             start_date=start_date,
             end_date=end_date,
+            rng=random.Random(seed),
         )
 
         print(f"Generated {len(downtime_events)} downtime events.")
@@ -987,19 +1020,21 @@ def main():
     stored_downtime_count = get_downtime_event_count(engine)
     print(f"Downtime events stored in PostgreSQL: {stored_downtime_count}")
 
+
+def generate_maintenance_event_stage(engine, seed, as_of_timestamp):
+    """Generate and load maintenance events when the table is empty."""
+
     existing_maintenance_count = get_maintenance_event_count(engine)
 
     if existing_maintenance_count == 0:
-        downtime_events = get_downtime_events_for_maintenance(engine)
-        machines = get_machines_for_maintenance(engine)
-        technician_names = get_certified_technician_names(engine)
         start_date, end_date = get_downtime_date_range(engine)
         maintenance_events = generate_maintenance_events(
-            downtime_events=downtime_events,
-            machines=machines,
-            technician_names=technician_names,
+            downtime_events=get_downtime_events_for_maintenance(engine),
+            machines=get_machines_for_maintenance(engine),
+            technician_names=get_certified_technician_names(engine),
             start_date=start_date,
             end_date=end_date,
+            rng=random.Random(seed),
         )
 
         print(f"Generated {len(maintenance_events)} maintenance events.")
@@ -1020,52 +1055,83 @@ def main():
         f"{stored_maintenance_count}"
     )
 
+
+def get_sensor_reading_partitions(
+    machines,
+    downtime_events,
+    end_timestamp,
+    seed,
+):
+    """Return one generation partition per machine, each with its own seed.
+
+    Cold-heading machines get a year of history for the predictive-maintenance
+    model and other machines get 30 days.
+    """
+
+    downtime_by_machine = {}
+    for downtime_event in downtime_events:
+        downtime_by_machine.setdefault(downtime_event["machine_id"], []).append(
+            downtime_event
+        )
+
+    partitions = []
+    for machine in machines:
+        history_days = 365 if machine["operation_type"] == "Cold Heading" else 30
+        partitions.append(
+            (
+                machine,
+                downtime_by_machine.get(machine["machine_id"], []),
+                end_timestamp - timedelta(days=history_days),
+                end_timestamp,
+                derive_seed(seed, machine["machine_id"]),
+            )
+        )
+    return partitions
+
+
+def generate_sensor_reading_stage(engine, seed, as_of_timestamp):
+    """Stream per-machine telemetry into PostgreSQL when none is stored.
+
+    Machines are generated in worker processes and their chunks are copied
+    in machine order, so the stored readings do not depend on worker count.
+    """
+
     existing_sensor_count = get_sensor_reading_count(engine)
 
     if existing_sensor_count == 0:
-        current_timestamp = datetime.now(timezone.utc)
-        end_timestamp = current_timestamp.replace(
-            minute=(current_timestamp.minute // 5) * 5,
+        end_timestamp = as_of_timestamp.replace(
+            minute=(as_of_timestamp.minute // 5) * 5,
             second=0,
             microsecond=0,
         )
+        start_timestamp = end_timestamp - timedelta(days=365)
         machines = get_machines_for_sensor_readings(engine)
-        cold_heading_machines = [
-            machine
-            for machine in machines
-            if machine["operation_type"] == "Cold Heading"
-        ]
-        other_machines = [
-            machine
-            for machine in machines
-            if machine["operation_type"] != "Cold Heading"
-        ]
-        cold_heading_start = end_timestamp - timedelta(days=365)
-        other_machine_start = end_timestamp - timedelta(days=30)
         downtime_events = get_recent_downtime_events(
             engine,
-            cold_heading_start,
+            start_timestamp,
             end_timestamp,
         )
-        cold_heading_readings = generate_sensor_readings(
-            machines=cold_heading_machines,
-            downtime_events=downtime_events,
-            start_timestamp=cold_heading_start,
-            end_timestamp=end_timestamp,
+        partitions = get_sensor_reading_partitions(
+            machines,
+            downtime_events,
+            end_timestamp,
+            seed,
         )
-        other_machine_readings = generate_sensor_readings(
-            machines=other_machines,
-            downtime_events=downtime_events,
-            start_timestamp=other_machine_start,
-            end_timestamp=end_timestamp,
+        sensor_reading_chunks = chain.from_iterable(
+            map_partitions(
+                generate_machine_sensor_chunks,
+                partitions,
+                GENERATION_WORKERS,
+            )
         )
-        sensor_readings = cold_heading_readings + other_machine_readings
 
-        print(f"Generated {len(sensor_readings)} sensor readings.")
+        print(f"Streaming sensor readings for {len(machines)} machines.")
 
         load_sensor_readings(
             engine=engine,
-            sensor_readings=sensor_readings,
+            sensor_reading_chunks=sensor_reading_chunks,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
         )
     else:
         print(
@@ -1077,5 +1143,114 @@ def main():
     print(f"Sensor readings stored in PostgreSQL: {stored_sensor_count}")
 
 
+# Stage name: (stage function, stages whose tables it reads).
+GENERATION_STAGES = {
+    "customer_orders": (generate_customer_order_stage, ()),
+    "customer_order_items": (
+        generate_customer_order_item_stage,
+        ("customer_orders",),
+    ),
+    "production_orders": (
+        generate_production_order_stage,
+        ("customer_order_items",),
+    ),
+    "material_lots": (generate_material_lot_stage, ("production_orders",)),
+    "production_order_materials": (
+        generate_material_allocation_stage,
+        ("material_lots",),
+    ),
+    "production_runs": (
+        generate_production_run_stage,
+        ("production_orders",),
+    ),
+    "quality_inspections": (
+        generate_quality_inspection_stage,
+        ("production_runs",),
+    ),
+    "quality_defects": (
+        generate_quality_defect_stage,
+        ("quality_inspections",),
+    ),
+    "downtime_events": (
+        generate_downtime_event_stage,
+        ("production_runs",),
+    ),
+    "maintenance_events": (
+        generate_maintenance_event_stage,
+        ("downtime_events",),
+    ),
+    "sensor_readings": (
+        generate_sensor_reading_stage,
+        ("maintenance_events",),
+    ),
+}
+
+
+def run_generation_stage(stage_name, seed, as_of_timestamp):
+    """Run one generation stage with its own engine and derived seed."""
+
+    engine = get_engine()
+    stage_function, _ = GENERATION_STAGES[stage_name]
+
+    try:
+        stage_function(engine, derive_seed(seed, stage_name), as_of_timestamp)
+    finally:
+        engine.dispose()
+
+
+def get_generation_seed():
+    """Return the configured generation seed, or a new random one."""
+
+    if GENERATION_SEED is not None:
+        return int(GENERATION_SEED)
+    return secrets.randbits(32)
+
+
+def get_generation_as_of():
+    """Return the configured UTC end of generated history, or now."""
+
+    if GENERATION_AS_OF is None:
+        return datetime.now(timezone.utc)
+
+    as_of_timestamp = datetime.fromisoformat(GENERATION_AS_OF)
+    if as_of_timestamp.tzinfo is None:
+        return as_of_timestamp.replace(tzinfo=timezone.utc)
+    return as_of_timestamp.astimezone(timezone.utc)
+
+
+def main():
+    engine = get_engine()
+
+    customer_ids = get_customer_ids(engine)
+    products = get_products(engine)
+    engine.dispose()
+
+    print("Database connected successfully.")
+    print(f"Customer rows found: {len(customer_ids)}")
+    print(f"Product rows found: {len(products)}")
+
+    seed = get_generation_seed()
+    as_of_timestamp = get_generation_as_of()
+
+    print(
+        "Reproduce this run with "
+        f"GENERATION_SEED={seed} "
+        f"GENERATION_AS_OF={as_of_timestamp.isoformat()}"
+    )
+
+    run_stage_graph(
+        {
+            stage_name: dependencies
+            for stage_name, (_, dependencies) in GENERATION_STAGES.items()
+        },
+        partial(
+            run_generation_stage,
+            seed=seed,
+            as_of_timestamp=as_of_timestamp,
+        ),
+        GENERATION_WORKERS,
+    )
+
+
 if __name__ == "__main__":
     main()
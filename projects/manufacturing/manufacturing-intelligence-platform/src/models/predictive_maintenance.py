@@ -25,8 +25,27 @@ SENSOR_COLUMNS = [
 ROLLING_WINDOW_SIZE = 12
 FAILURE_HORIZON_MINUTES = 60
 
+# Telemetry history read for modeling, counted back from the newest stored
+# cold-heading reading rather than the wall clock, so old or backdated data
+# keeps its full training window. The lower bound is resolved before the scan,
+# which lets PostgreSQL prune monthly sensor_readings partitions outside it.
+SENSOR_HISTORY_DAYS = 366
+
 SENSOR_QUERY = text(
     """
+    WITH latest_reading AS (
+        SELECT MAX(latest.reading_timestamp) AS reading_timestamp
+        FROM machines m
+        CROSS JOIN LATERAL (
+            SELECT s.reading_timestamp
+            FROM sensor_readings s
+            WHERE s.machine_id = m.machine_id
+              AND s.reading_timestamp <= CURRENT_TIMESTAMP
+            ORDER BY s.reading_timestamp DESC
+            LIMIT 1
+        ) latest
+        WHERE m.operation_type = 'Cold Heading'
+    )
     SELECT
         s.machine_id,
         m.machine_code,
@@ -39,6 +58,9 @@ SENSOR_QUERY = text(
     FROM sensor_readings s
     JOIN machines m ON m.machine_id = s.machine_id
     WHERE m.operation_type = 'Cold Heading'
+      AND s.reading_timestamp >= (
+          SELECT reading_timestamp FROM latest_reading
+      ) - make_interval(days => :history_days)
       AND s.reading_timestamp <= CURRENT_TIMESTAMP
     ORDER BY s.machine_id, s.reading_timestamp
     """
@@ -75,9 +97,15 @@ DOWNTIME_QUERY = text(
 )
 
 
-def load_source_data(engine):
-    """Load cold-heading telemetry, failures, and downtime from PostgreSQL."""
-    sensors = pd.read_sql(SENSOR_QUERY, engine)
+def load_source_data(engine, history_days=SENSOR_HISTORY_DAYS):
+    """Load cold-heading telemetry, failures, and downtime from PostgreSQL.
+
+    Telemetry is read for the ``history_days`` up to the newest stored
+    cold-heading reading.
+    """
+    sensors = pd.read_sql(
+        SENSOR_QUERY, engine, params={"history_days": history_days}
+    )
     failures = pd.read_sql(FAILURE_QUERY, engine)
     downtime = pd.read_sql(DOWNTIME_QUERY, engine)
 
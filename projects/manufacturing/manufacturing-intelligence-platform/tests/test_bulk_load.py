@@ -0,0 +1,102 @@
+"""Tests for COPY text formatting and streaming."""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+import queue
+import threading
+
+import pytest
+
+from src.etl.bulk_load import (
+    CopyBuffer,
+    QueueBuffer,
+    format_copy_value,
+    iter_copy_lines,
+    produce_copy_blocks,
+)
+
+
+def test_copy_values_use_postgresql_text_format():
+    assert format_copy_value(None) == r"\N"
+    assert format_copy_value(True) == "t"
+    assert format_copy_value(Decimal("12.500")) == "12.500"
+    assert format_copy_value(date(2026, 9, 1)) == "2026-09-01"
+    assert (
+        format_copy_value(datetime(2026, 9, 1, 8, 30, tzinfo=timezone.utc))
+        == "2026-09-01T08:30:00+00:00"
+    )
+    assert format_copy_value("a\tb\\c\nd") == "a\\tb\\\\c\\nd"
+
+
+def test_copy_lines_follow_column_order():
+    rows = [{"priority": "High", "demand_reference": "PD-1", "extra": 1}]
+
+    assert list(iter_copy_lines(rows, ("demand_reference", "priority"))) == [
+        "PD-1\tHigh\n"
+    ]
+
+
+def test_copy_buffer_streams_generator_in_sized_chunks():
+    lines = (f"{index}\n" for index in range(1000))
+    buffer = CopyBuffer(lines)
+
+    chunks = []
+    while chunk := buffer.read(100):
+        assert len(chunk) <= 100
+        chunks.append(chunk)
+
+    assert "".join(chunks) == "".join(f"{index}\n" for index in range(1000))
+    assert buffer.row_count == 1000
+
+
+def test_queue_buffer_streams_formatted_chunks_in_order():
+    blocks = queue.Queue(maxsize=2)
+    stopped = threading.Event()
+    producer = threading.Thread(
+        target=produce_copy_blocks,
+        args=(range(50), lambda chunk: f"{chunk}\n", blocks, stopped),
+    )
+    producer.start()
+
+    buffer = QueueBuffer(blocks)
+    chunks = []
+    while chunk := buffer.read(7):
+        assert len(chunk) <= 7
+        chunks.append(chunk)
+    producer.join()
+
+    assert "".join(chunks) == "".join(f"{index}\n" for index in range(50))
+
+
+def test_producer_error_is_raised_by_the_reader():
+    def format_chunk(chunk):
+        if chunk == 2:
+            raise ValueError("bad chunk")
+        return f"{chunk}\n"
+
+    blocks = queue.Queue(maxsize=1)
+    producer = threading.Thread(
+        target=produce_copy_blocks,
+        args=(range(5), format_chunk, blocks, threading.Event()),
+    )
+    producer.start()
+
+    buffer = QueueBuffer(blocks)
+    with pytest.raises(ValueError, match="bad chunk"):
+        while buffer.read(1):
+            pass
+    producer.join()
+
+
+def test_stopped_producer_does_not_block_on_a_full_queue():
+    blocks = queue.Queue(maxsize=1)
+    stopped = threading.Event()
+    producer = threading.Thread(
+        target=produce_copy_blocks,
+        args=(range(100), str, blocks, stopped),
+    )
+    producer.start()
+    stopped.set()
+    producer.join(timeout=5)
+
+    assert not producer.is_alive()
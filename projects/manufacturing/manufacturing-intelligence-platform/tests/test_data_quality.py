@@ -2,6 +2,8 @@ from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 from unittest.mock import patch
 
+import numpy as np
+
 from src.etl.generate_customer_order_items import (
     generate_customer_order_items,
     generate_ordered_quantity,
@@ -43,9 +45,13 @@ from src.etl.generate_maintenance_events import (
     calculate_machine_hours,
 )
 from src.etl.generate_sensor_readings import (
+    build_timestamp_grid,
+    generate_machine_sensor_readings,
     generate_sensor_readings,
-    generate_sensor_value,
+    generate_sensor_values,
     get_failure_multipliers,
+    index_downtime_events,
+    iter_sensor_reading_chunks,
 )
 
 
@@ -463,7 +469,15 @@ def test_maintenance_event_has_valid_cost_and_timestamps():
 
 
 def test_non_applicable_sensor_returns_null():
-    assert generate_sensor_value(None, operating=True) is None
+    values = generate_sensor_values(
+        None,
+        operating=np.array([True, False]),
+        multipliers=np.ones(2),
+        places=2,
+        rng=np.random.default_rng(1),
+    )
+
+    assert np.isnan(values).all()
 
 
 def test_cold_heading_failure_signatures_match_failed_component():
@@ -502,12 +516,113 @@ def test_sensor_readings_have_unique_machine_timestamps():
         downtime_events=[],
         start_timestamp=start_timestamp,
         end_timestamp=end_timestamp,
+        rng=np.random.default_rng(7),
+    )
+    keys = set(
+        zip(
+            readings["machine_id"].tolist(),
+            readings["reading_timestamp"].tolist(),
+        )
+    )
+
+    assert len(readings["machine_id"]) == 8
+    assert len(keys) == 8
+    assert (readings["temperature_c"] >= 0).all()
+    assert np.isnan(readings["rpm"][4:]).all()
+
+
+def test_sensor_readings_repeat_for_the_same_seed():
+    start_timestamp = datetime(2026, 1, 1, 0, 0, tzinfo=timezone.utc)
+    machines = [
+        {"machine_id": 1, "operation_type": "Cold Heading", "status": "Idle"}
+    ]
+
+    first, second = (
+        generate_sensor_readings(
+            machines=machines,
+            downtime_events=[],
+            start_timestamp=start_timestamp,
+            end_timestamp=start_timestamp + timedelta(days=2),
+            rng=np.random.default_rng(11),
+        )
+        for _ in range(2)
+    )
+
+    for column, values in first.items():
+        np.testing.assert_array_equal(values, second[column])
+
+
+def test_streamed_chunks_match_whole_generation():
+    start_timestamp = datetime(2026, 1, 1, 0, 0, tzinfo=timezone.utc)
+    machines = [
+        {"machine_id": 1, "operation_type": "Cold Heading", "status": "Active"},
+        {"machine_id": 2, "operation_type": "Assembly", "status": "Active"},
+    ]
+    window = {
+        "machines": machines,
+        "downtime_events": [],
+        "start_timestamp": start_timestamp,
+        "end_timestamp": start_timestamp + timedelta(days=5),
+        "chunk_days": 2,
+    }
+
+    chunks = list(
+        iter_sensor_reading_chunks(**window, rng=np.random.default_rng(5))
     )
-    keys = {
-        (reading["machine_id"], reading["reading_timestamp"])
-        for reading in readings
+    readings = generate_sensor_readings(**window, rng=np.random.default_rng(5))
+
+    assert [len(chunk["machine_id"]) for chunk in chunks] == [576, 576, 289] * 2
+    for column, values in readings.items():
+        np.testing.assert_array_equal(
+            values, np.concatenate([chunk[column] for chunk in chunks])
+        )
+
+
+def test_downtime_and_pre_failure_windows_use_interval_lookups():
+    failure_start = datetime(2026, 1, 1, 3, 0, tzinfo=timezone.utc)
+    downtime_events = [
+        {
+            "machine_id": 1,
+            "downtime_start": failure_start,
+            "downtime_end": failure_start + timedelta(minutes=30),
+            "downtime_category": "Mechanical Failure",
+            "failure_component": "Hydraulic System",
+        },
+        {
+            "machine_id": 1,
+            "downtime_start": failure_start + timedelta(minutes=20),
+            "downtime_end": failure_start + timedelta(minutes=50),
+            "downtime_category": "Changeover",
+            "failure_component": None,
+        },
+    ]
+    machine = {
+        "machine_id": 1,
+        "operation_type": "Cold Heading",
+        "status": "Active",
     }
+    timestamps = build_timestamp_grid(
+        failure_start - timedelta(hours=2),
+        failure_start + timedelta(hours=1),
+        interval_minutes=5,
+    )
 
-    assert len(readings) == 8
-    assert len(keys) == len(readings)
-    assert all(reading["temperature_c"] >= 0 for reading in readings)
+    readings = generate_machine_sensor_readings(
+        machine,
+        index_downtime_events(downtime_events)[1],
+        timestamps,
+        np.random.default_rng(3),
+    )
+
+    # Overlapping windows merge into 03:00-03:50; every reading there is idle.
+    in_downtime = (timestamps >= np.datetime64("2026-01-01T03:00")) & (
+        timestamps <= np.datetime64("2026-01-01T03:50")
+    )
+    assert (readings["rpm"][in_downtime] == 0).all()
+    # Operating readings in the hour before the failure carry low pressure.
+    warning = (timestamps >= np.datetime64("2026-01-01T02:00")) & (
+        timestamps < np.datetime64("2026-01-01T03:00")
+    )
+    operating_warning = warning & (readings["rpm"] > 0)
+    assert operating_warning.any()
+    assert (readings["pressure_psi"][operating_warning] <= 2200 * 0.65).all()
@@ -0,0 +1,144 @@
+"""Tests for seeded, dependency-ordered generation stages."""
+
+from datetime import date, datetime, timezone
+from functools import partial
+import random
+
+import numpy as np
+import pytest
+
+from src.etl.generate_customer_orders import generate_customer_orders
+from src.etl.generate_sensor_readings import (
+    generate_machine_sensor_chunks,
+    iter_sensor_reading_chunks,
+)
+from src.etl.orchestration import derive_seed, map_partitions, run_stage_graph
+
+
+def record_stage(log_path, stage_name):
+    """Append stage start and finish markers to a shared log file."""
+    with open(log_path, "a") as log_file:
+        log_file.write(f"start {stage_name}\n")
+    if stage_name == "broken":
+        raise RuntimeError("stage failed")
+    with open(log_path, "a") as log_file:
+        log_file.write(f"finish {stage_name}\n")
+
+
+def add(left, right):
+    return left + right
+
+
+def test_derived_seeds_are_stable_and_distinct_per_key():
+    assert derive_seed(7, "customer_orders") == derive_seed(7, "customer_orders")
+    assert derive_seed(7, "customer_orders") != derive_seed(7, "production_runs")
+    assert derive_seed(7, "sensor_readings", 1) != derive_seed(8, "sensor_readings", 1)
+    assert 0 <= derive_seed(7, "sensor_readings", 1) < 2**64
+
+
+def test_stages_start_only_after_their_dependencies_finish(tmp_path):
+    log_path = tmp_path / "stages.log"
+    stage_dependencies = {
+        "orders": (),
+        "runs": ("orders",),
+        "inspections": ("runs",),
+        "downtime": ("runs",),
+        "sensors": ("downtime",),
+    }
+
+    completed_stages = run_stage_graph(
+        stage_dependencies,
+        partial(record_stage, log_path),
+        max_workers=3,
+    )
+
+    events = log_path.read_text().splitlines()
+    assert sorted(completed_stages) == sorted(stage_dependencies)
+    for stage_name, dependencies in stage_dependencies.items():
+        for dependency in dependencies:
+            assert events.index(f"finish {dependency}") < events.index(
+                f"start {stage_name}"
+            )
+
+
+def test_failed_stage_stops_its_dependents(tmp_path):
+    log_path = tmp_path / "stages.log"
+
+    with pytest.raises(RuntimeError, match="stage failed"):
+        run_stage_graph(
+            {"broken": (), "after": ("broken",)},
+            partial(record_stage, log_path),
+            max_workers=2,
+        )
+
+    assert "start after" not in log_path.read_text()
+
+
+def test_invalid_stage_graphs_are_rejected(tmp_path):
+    run_stage = partial(record_stage, tmp_path / "stages.log")
+
+    with pytest.raises(ValueError, match="unknown stages: missing"):
+        run_stage_graph({"orders": ("missing",)}, run_stage, max_workers=1)
+    with pytest.raises(ValueError):
+        run_stage_graph({"a": ("b",), "b": ("a",)}, run_stage, max_workers=1)
+    with pytest.raises(ValueError):
+        run_stage_graph({"a": ()}, run_stage, max_workers=0)
+
+
+def test_partition_results_keep_partition_order():
+    partitions = [(index, 100) for index in range(9)]
+
+    assert list(map_partitions(add, partitions, max_workers=2)) == [
+        index + 100 for index in range(9)
+    ]
+    assert list(map_partitions(add, partitions, max_workers=1)) == [
+        index + 100 for index in range(9)
+    ]
+
+
+def test_seeded_generators_repeat_exactly():
+    first = generate_customer_orders(
+        [1, 2, 3],
+        num_orders=25,
+        rng=random.Random(11),
+        as_of_date=date(2026, 10, 17),
+    )
+    second = generate_customer_orders(
+        [1, 2, 3],
+        num_orders=25,
+        rng=random.Random(11),
+        as_of_date=date(2026, 10, 17),
+    )
+
+    assert first == second
+    assert all(
+        date(2025, 10, 17) <= order["order_date"] <= date(2026, 10, 17)
+        for order in first
+    )
+
+
+def test_machine_partition_matches_streaming_that_machine_with_its_seed():
+    machines = [
+        {"machine_id": 1, "operation_type": "Cold Heading", "status": "Active"},
+        {"machine_id": 2, "operation_type": "Assembly", "status": "Idle"},
+    ]
+    start_timestamp = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    end_timestamp = datetime(2026, 1, 3, tzinfo=timezone.utc)
+
+    alone = generate_machine_sensor_chunks(
+        machines[1], [], start_timestamp, end_timestamp, seed=5
+    )
+    streamed = list(
+        iter_sensor_reading_chunks(
+            machines[1:],
+            [],
+            start_timestamp,
+            end_timestamp,
+            rng=np.random.default_rng(5),
+        )
+    )
+
+    assert len(alone) == len(streamed)
+    for alone_chunk, streamed_chunk in zip(alone, streamed):
+        for column, values in alone_chunk.items():
+            np.testing.assert_array_equal(values, streamed_chunk[column])
@@ -0,0 +1,132 @@
+"""Tests for monthly sensor-reading partition maintenance."""
+
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from src.etl.sensor_partitions import (
+    PARTITION_QUERY,
+    create_sensor_reading_partitions,
+    drop_expired_sensor_partitions,
+    get_expired_partitions,
+    get_partition_months,
+)
+
+
+class RecordingConnection:
+    """Collect SQL text executed by partition maintenance."""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(" ".join(statement.text.split()))
+
+
+def test_partition_months_use_utc_calendar_months():
+    eastern = timezone(timedelta(hours=-5))
+
+    months = get_partition_months(
+        datetime(2025, 11, 30, 21, 0, tzinfo=eastern),
+        datetime(2026, 2, 1, 0, 0, tzinfo=timezone.utc),
+    )
+
+    assert months == [
+        date(2025, 12, 1),
+        date(2026, 1, 1),
+        date(2026, 2, 1),
+    ]
+
+
+def test_partitions_cover_whole_months_across_year_end():
+    connection = RecordingConnection()
+
+    partition_names = create_sensor_reading_partitions(
+        connection,
+        datetime(2025, 12, 15, tzinfo=timezone.utc),
+        datetime(2026, 1, 2, tzinfo=timezone.utc),
+    )
+
+    assert partition_names == ["sensor_readings_2025_12", "sensor_readings_2026_01"]
+    assert connection.statements[0] == (
+        "CREATE TABLE IF NOT EXISTS sensor_readings_2025_12 "
+        "PARTITION OF sensor_readings "
+        "FOR VALUES FROM ('2025-12-01 00:00:00+00') "
+        "TO ('2026-01-01 00:00:00+00')"
+    )
+
+
+def test_only_partitions_before_the_retention_window_expire():
+    partition_names = [
+        "sensor_readings_2025_08",
+        "sensor_readings_2025_09",
+        "sensor_readings_2025_10",
+        "sensor_readings_archive",
+    ]
+
+    expired_partitions = get_expired_partitions(
+        partition_names,
+        retention_months=12,
+        as_of_timestamp=datetime(2026, 10, 17, tzinfo=timezone.utc),
+    )
+
+    assert expired_partitions == [
+        "sensor_readings_2025_08",
+        "sensor_readings_2025_09",
+    ]
+    with pytest.raises(ValueError):
+        get_expired_partitions(partition_names, 0, datetime.now(timezone.utc))
+
+
+class RetentionConnection:
+    """List fixed partitions and record retention statements with parameters."""
+
+    def __init__(self, partition_names):
+        self.partition_names = partition_names
+        self.statements = []
+
+    def execute(self, statement, parameters=None):
+        if statement is PARTITION_QUERY:
+            return [
+                SimpleNamespace(partition_name=partition_name)
+                for partition_name in self.partition_names
+            ]
+        self.statements.append((" ".join(statement.text.split()), parameters))
+        return SimpleNamespace(rowcount=0)
+
+
+class RetentionEngine:
+    """Hand out one retention connection inside ``begin``."""
+
+    def __init__(self, partition_names):
+        self.connection = RetentionConnection(partition_names)
+
+    @contextmanager
+    def begin(self):
+        yield self.connection
+
+
+def test_dropping_a_partition_deletes_its_month_of_rollups():
+    engine = RetentionEngine(["sensor_readings_2024_12", "sensor_readings_2026_10"])
+
+    dropped = drop_expired_sensor_partitions(
+        engine,
+        retention_months=12,
+        as_of_timestamp=datetime(2026, 10, 17, tzinfo=timezone.utc),
+    )
+
+    month_window = {
+        "start_timestamp": datetime(2024, 12, 1, tzinfo=timezone.utc),
+        "end_timestamp": datetime(2025, 1, 1, tzinfo=timezone.utc),
+    }
+    assert dropped == ["sensor_readings_2024_12"]
+    assert [
+        (statement.split(" WHERE")[0], parameters)
+        for statement, parameters in engine.connection.statements
+    ] == [
+        ("DROP TABLE sensor_readings_2024_12", None),
+        ("DELETE FROM sensor_reading_hourly", month_window),
+        ("DELETE FROM sensor_reading_daily", month_window),
+    ]
@@ -0,0 +1,56 @@
+"""Tests for telemetry rollup windows and resolution selection."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.analytics.sensor_statistics import (
+    choose_sensor_resolution,
+    get_sensor_statistics,
+)
+from src.etl.sensor_rollups import get_rollup_window
+
+
+MIDNIGHT = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def test_rollup_window_covers_whole_utc_days():
+    eastern = timezone(timedelta(hours=-5))
+
+    window = get_rollup_window(
+        datetime(2026, 2, 28, 21, 30, tzinfo=eastern),
+        datetime(2026, 3, 2, 0, 0, tzinfo=timezone.utc),
+    )
+
+    assert window == (MIDNIGHT, MIDNIGHT + timedelta(days=2))
+
+
+@pytest.mark.parametrize(
+    ("start_offset", "end_offset", "bucket_minutes", "expected"),
+    [
+        (timedelta(0), timedelta(days=30), 24 * 60, "daily"),
+        (timedelta(0), timedelta(days=28), 7 * 24 * 60, "daily"),
+        (timedelta(hours=6), timedelta(days=30), 24 * 60, "hourly"),
+        (timedelta(0), timedelta(days=1), 120, "hourly"),
+        (timedelta(0), timedelta(hours=3), 15, "raw"),
+        (timedelta(minutes=5), timedelta(days=1), 60, "raw"),
+    ],
+)
+def test_coarsest_resolution_that_tiles_the_request_is_chosen(
+    start_offset, end_offset, bucket_minutes, expected
+):
+    assert (
+        choose_sensor_resolution(
+            MIDNIGHT + start_offset,
+            MIDNIGHT + end_offset,
+            bucket_minutes,
+        )
+        == expected
+    )
+
+
+def test_invalid_requests_fail_before_querying():
+    with pytest.raises(ValueError, match="Unknown sensor"):
+        get_sensor_statistics(None, "humidity", MIDNIGHT, MIDNIGHT, 60)
+    with pytest.raises(ValueError, match="end after the start"):
+        get_sensor_statistics(None, "rpm", MIDNIGHT, MIDNIGHT, 60)